@@ -7,19 +7,31 @@ import type { TacticalMaterialOptions } from './themes/tacticalMaterial';
  */
 declare global {
     interface Window {
-        E3_CONFIG?: {
-            terrainUrl?: string;
-            baseMapUrl?: string;
-            themePack?: ThemePackName;
-        };
+        E3_CONFIG?: RuntimeConfig;
     }
 }
 
-function getRuntimeConfig(): {
+/**
+ * 运行时配置（public/config*.js 注入）。
+ * mppThresholds/modeSwitch 允许按字段覆盖，用于测试矩阵在不重新构建的情况下扫描 LOD 参数。
+ */
+export interface RuntimeConfig {
     terrainUrl?: string;
     baseMapUrl?: string;
     themePack?: ThemePackName;
-} {
+    mppThresholds?: Partial<{ global: number; continental: number; regional: number }>;
+    modeSwitch?: Partial<{ debounceMs: number; hysteresisRatio: number; cooldownMs: number }>;
+    startupWarmup?: boolean;
+    preserveDrawingBuffer?: boolean;
+    overlayBackend?: TacticalOverlayBackend;
+    kinematicsWorker?: boolean;
+    scenarioWorker?: boolean;
+    reliefIndexUrl?: string;
+    terrainPrefetch?: boolean;
+    tilePipelineTelemetry?: boolean;
+}
+
+function getRuntimeConfig(): RuntimeConfig {
     if (typeof window === 'undefined') {
         return {};
     }
@@ -32,6 +44,7 @@ export type TerrainLodProfileName = 'global' | 'continental' | 'regional' | 'tac
 export type TacticalMaterialPreset = 'off' | 'low' | 'mid' | 'high';
 export type SceneThemeRenderMode = 'tactical' | 'satellite';
 export type TacticalOverlayScenario = 'off' | 'redFlagDemo';
+export type TacticalOverlayBackend = 'primitive' | 'entity';
 
 export interface SceneThemeDefinition {
     renderMode: SceneThemeRenderMode;
@@ -65,21 +78,27 @@ export const AppConfig = {
          */
         url: runtimeConfig.terrainUrl ?? 'http://localhost:4444/terrain/',
 
+        /**
+         * 离线地形起伏索引 URL（tests/terrain_relief.py 生成，terrain_server.py --relief-index 提供）。
+         * 为空时诊断回退到运行时地形采样。
+         */
+        reliefIndexUrl: runtimeConfig.reliefIndexUrl ?? '',
+
         /**
          * 是否请求顶点法线（用于法线驱动地形表达）
          */
         requestVertexNormals: true,
 
         modeSwitch: {
-            debounceMs: 80,
-            hysteresisRatio: 0.08,
-            cooldownMs: 180
+            debounceMs: runtimeConfig.modeSwitch?.debounceMs ?? 80,
+            hysteresisRatio: runtimeConfig.modeSwitch?.hysteresisRatio ?? 0.08,
+            cooldownMs: runtimeConfig.modeSwitch?.cooldownMs ?? 180
         },
 
         mppThresholds: {
-            global: 9000,
-            continental: 2800,
-            regional: 700
+            global: runtimeConfig.mppThresholds?.global ?? 9000,
+            continental: runtimeConfig.mppThresholds?.continental ?? 2800,
+            regional: runtimeConfig.mppThresholds?.regional ?? 700
         },
 
         lodProfiles: {
@@ -266,9 +285,166 @@ export const AppConfig = {
         themePacks: THEME_PACKS
     },
 
+    /**
+     * 运行时性能采样配置
+     */
+    perf: {
+        frameTime: {
+            // 环形缓冲容量（帧）；60fps 下约 34s 窗口。
+            capacity: 2048,
+            // 超过该时长的帧记为长帧（约 30fps 预算）。
+            budgetMs: 33.3,
+            // 直方图桶上界（ms），最后一个桶收集超出最大上界的帧。
+            histogramBoundsMs: [8, 16.7, 33.3, 50, 100, 200]
+        },
+        lodSwitchTrace: {
+            // 保留最近的切档记录条数。
+            historySize: 64,
+            // 切档后等待 globe.tilesLoaded 的最长时间，超时记为 timedOut。
+            settleTimeoutMs: 15000
+        },
+        startupWarmup: {
+            // 可选的启动预热：加载阶段预编译各档材质并预取 terrain 根瓦片。
+            enabled: runtimeConfig.startupWarmup ?? false,
+            // 每个档位渲染的帧数，确保着色器变体完成编译。
+            framesPerProfile: 2,
+            // 预取到的最大瓦片层级（地理坐标切片下 level 0/1 共 10 块）。
+            prefetchMaxLevel: 1,
+            // 每个空闲时间片发起的瓦片请求数。
+            tilesPerIdleSlice: 2,
+            // 等帧超时（后台标签页 rAF 暂停时兜底）。
+            frameTimeoutMs: 2000
+        },
+        materialCache: {
+            // 战术材质 uniform 快照缓存条数（按 档位 × 主题包风格 组合计）。
+            maxEntries: 16
+        },
+        frameCapture: {
+            // 帧读取在 postRender 内完成，默认关闭 preserveDrawingBuffer；仅外部工具需要 canvas.toDataURL 时开启。
+            preserveDrawingBuffer: runtimeConfig.preserveDrawingBuffer ?? false,
+            // 请求渲染后等待 postRender 的最长时间。
+            timeoutMs: 3000
+        },
+        heightCache: {
+            // 高程查询缓存条数上限（每条约 100B 含键，50000 条约 5MB）。
+            maxEntries: 50000,
+            // 经纬度量化步长（度），1e-4° 约 11m，小于任何查询层级的地形采样间距。
+            quantizationDegrees: 1e-4
+        },
+        hudPick: {
+            // 拾取点处视线与地表法线夹角不超过该值时，HUD m/px 按距离解析计算，不再额外拾取。
+            analyticMppMaxIncidenceDegrees: 25
+        },
+        trackKinematics: {
+            // 航迹运动学在 Worker 中推进；关闭时在主线程同步计算。
+            useWorker: runtimeConfig.kinematicsWorker ?? true,
+            // 跨源隔离页面使用 SharedArrayBuffer 双缓冲，否则以可转移 ArrayBuffer 往返。
+            useSharedMemory: true
+        },
+        terrainPrefetch: {
+            // 沿相机运动外推与 flyTo 目标预取本地地形瓦片，Globe 请求时直接复用。
+            enabled: runtimeConfig.terrainPrefetch ?? true,
+            // 预取自身的并发请求上限（不占用 Cesium 请求调度器名额）。
+            maxConcurrent: 6,
+            // 已预取未使用的瓦片缓存上限（MB），超出或过期按 LRU 淘汰。
+            maxCacheMegabytes: 64,
+            entryTtlMs: 20000,
+            // 每次预测最多排队的瓦片数；目标层级之外附带的父层级数。
+            maxTilesPerPrediction: 48,
+            parentLevels: 2,
+            // 相机运动外推时长与采样间隔；位移小于 高度 × minMotionRatio 视为静止。
+            lookaheadSeconds: 1.2,
+            sampleIntervalMs: 120,
+            minMotionRatio: 0.02
+        },
+        tilePipeline: {
+            // 地形瓦片管线遥测：队列深度、请求字节、逐瓦片耗时与 time-to-tilesLoaded。
+            enabled: runtimeConfig.tilePipelineTelemetry ?? true,
+            // 每段耗时的样本环形缓冲容量（瓦片）。
+            latencyCapacity: 2048,
+            // 队列深度变化的采样容量；getStats 只返回最近 queueSeriesLength 个点。
+            queueSampleCapacity: 4096,
+            queueSeriesLength: 240,
+            // 保留的 time-to-loaded 记录条数；超过 settleTimeoutMs 仍未 tilesLoaded 记为 timedOut。
+            episodeHistory: 128,
+            settleTimeoutMs: 15000
+        }
+    },
+
     tacticalOverlay: {
         enabled: false,
-        scenario: 'off' as TacticalOverlayScenario
+        scenario: 'off' as TacticalOverlayScenario,
+        // primitive：批量图元集合（目标约 10 万实体）；entity：原 Entity API 路径，作为兼容回退。
+        backend: (runtimeConfig.overlayBackend ?? 'primitive') as TacticalOverlayBackend,
+        // primitive 后端每组图元集合容纳的单位数：集合内增删会整组重建顶点缓冲，分组使单帧上传量有界。
+        primitiveChunkUnits: 8192,
+        trails: {
+            // 尾迹环形缓冲：按仿真时间每 sampleIntervalSeconds 记一个点，capacity × 间隔 = 尾迹时长（对应原 trailTime=180s）。
+            sampleIntervalSeconds: 1.0,
+            capacity: 180,
+            width: 4.0,
+            alpha: 0.55,
+            // 各档位绘制抽稀步长（每 N 个采样取一个顶点），0 表示该档位不绘制尾迹。
+            lodStride: {
+                global: 0,
+                continental: 12,
+                regional: 3,
+                tactical: 1
+            } as Record<TerrainLodProfileName, number>
+        },
+        unitIndex: {
+            // 单位空间索引网格单元（度），0.25° 约 28km。
+            cellDegrees: 0.25,
+            // 标签可见性刷新间隔：只为视口内单位显示标签，并按屏幕网格避让。
+            labelRefreshMs: 200,
+            // 标签避让网格（像素）：每格最多保留一个标签。
+            labelDeclutterPx: 56,
+            maxLabels: 400,
+            // HUD 最近单位搜索半径（像素，按光标处 m/px 换算为米）。
+            hudNearestRadiusPx: 24
+        },
+        scenarioStream: {
+            // 外部想定（NDJSON / E3SU 二进制）在 Worker 中流式解析；关闭时在主线程逐段解析。
+            useWorker: runtimeConfig.scenarioWorker ?? true,
+            // Worker 每凑满 chunkUnits 个单位转移一块回主线程。
+            chunkUnits: 4096,
+            // 每帧写入图层的时间预算（ms）与每批单位数（批间检查预算）。
+            frameBudgetMs: 6,
+            unitsPerBatch: 256
+        },
+        rangeVolumes: {
+            // 作用范围体（环/穹顶/扇区）细分：按屏幕上每段弧长 pixelsPerSegment 估算分段数，取 2 的幂，
+            // 并限制在 [minSegments, 当前档位上限] 内以共享模板几何。
+            minSegments: 16,
+            maxSegmentsByLod: {
+                global: 32,
+                continental: 64,
+                regional: 128,
+                tactical: 128
+            } as Record<TerrainLodProfileName, number>,
+            pixelsPerSegment: 12,
+            // 几何变化（增删、移动、改半径）后批次重建的去抖间隔。
+            rebuildDebounceMs: 250,
+            // 每个 Primitive 批次容纳的体数；只重建有变化的批次。
+            batchSize: 64,
+            // 每帧最多提交的批次重建数，其余顺延到后续帧。
+            maxBatchBuildsPerFrame: 2,
+            // 相机缩放使中心 m/px 变化超过该倍数时按新屏幕尺寸重新细分。
+            retessellateRatio: 2.0
+        },
+        referenceGrid: {
+            // 参考网格由地表材质程序化绘制（材质为 off 的档位不显示），不再创建贴地折线。
+            color: '#f4c76a',
+            alpha: 0.30,
+            widthPx: 1.15,
+            // 各档位网格间距（度，[经向, 纬向]）：越近越密，保持屏幕上的网格密度大致稳定。
+            spacingByLod: {
+                global: [0.88, 0.72],
+                continental: [0.44, 0.36],
+                regional: [0.11, 0.09],
+                tactical: [0.055, 0.045]
+            } as Record<TerrainLodProfileName, [number, number]>
+        }
     },
 
     /**
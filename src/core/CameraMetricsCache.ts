@@ -0,0 +1,118 @@
+import { Cartesian3, Math as CesiumMath, type Viewer } from 'cesium';
+
+export interface CameraMetrics {
+    // 计算时所在的渲染帧序号（postRender 计数）。
+    frameStamp: number;
+    centerMetersPerPixel: number;
+    height: number;
+    pitch: number;
+    heading: number;
+}
+
+export interface CameraMetricsCacheStats {
+    frameStamp: number;
+    hits: number;
+    recomputes: number;
+}
+
+const POSE_EPSILON = 1e-9;
+
+/**
+ * 相机指标帧缓存
+ * 中心 m/px 需要两次拾取，LOD 定时器、滚轮守卫与切档流程会在同一帧内多次读取。
+ * 这里按帧打戳：每个渲染帧至多重算一次（首次读取时惰性计算）；
+ * 同一帧内相机被 setView 改动时按位姿比较判定失效，保证读到的值与当前相机一致。
+ */
+export class CameraMetricsCache {
+    private viewer: Viewer;
+    private computeCenterMetersPerPixel: () => number;
+    private frameStamp: number;
+    private cached?: CameraMetrics;
+    private readonly cachedPosition: Cartesian3;
+    private readonly cachedDirection: Cartesian3;
+    private cachedViewportHeight: number;
+    private hits: number;
+    private recomputes: number;
+
+    constructor(viewer: Viewer, computeCenterMetersPerPixel: () => number) {
+        this.viewer = viewer;
+        this.computeCenterMetersPerPixel = computeCenterMetersPerPixel;
+        this.frameStamp = 0;
+        this.cachedPosition = new Cartesian3();
+        this.cachedDirection = new Cartesian3();
+        this.cachedViewportHeight = 0;
+        this.hits = 0;
+        this.recomputes = 0;
+    }
+
+    /**
+     * 在 postRender 中调用：进入新的一帧，缓存失效（地形细化会改变拾取结果）。
+     */
+    public onFrameRendered(): void {
+        this.frameStamp += 1;
+    }
+
+    public invalidate(): void {
+        this.cached = undefined;
+    }
+
+    public get(): CameraMetrics {
+        if (this.cached && this.isFresh()) {
+            this.hits += 1;
+            return this.cached;
+        }
+        const camera = this.viewer.camera;
+        this.recomputes += 1;
+        Cartesian3.clone(camera.positionWC, this.cachedPosition);
+        Cartesian3.clone(camera.directionWC, this.cachedDirection);
+        this.cachedViewportHeight = this.viewer.scene.canvas.clientHeight;
+        this.cached = {
+            frameStamp: this.frameStamp,
+            centerMetersPerPixel: this.computeCenterMetersPerPixel(),
+            height: camera.positionCartographic.height,
+            pitch: camera.pitch,
+            heading: camera.heading
+        };
+        return this.cached;
+    }
+
+    public getCenterMetersPerPixel(): number {
+        return this.get().centerMetersPerPixel;
+    }
+
+    /**
+     * m/px 的反函数：按垂直视场角与视口高度估算达到目标 m/px 的相机高度（俯视近似）。
+     */
+    public estimateHeightForMetersPerPixel(targetMpp: number): number {
+        const frustum = this.viewer.camera.frustum as { fovy?: number };
+        const fovy = frustum.fovy ?? CesiumMath.toRadians(60.0);
+        const viewportHeight = Math.max(1, this.viewer.scene.canvas.clientHeight);
+        const height = (Math.max(0.001, targetMpp) * viewportHeight) / (2 * Math.tan(fovy / 2));
+        return Math.max(1.0, height);
+    }
+
+    public getStats(): CameraMetricsCacheStats {
+        return {
+            frameStamp: this.frameStamp,
+            hits: this.hits,
+            recomputes: this.recomputes
+        };
+    }
+
+    public resetStats(): void {
+        this.hits = 0;
+        this.recomputes = 0;
+    }
+
+    private isFresh(): boolean {
+        if (!this.cached || this.cached.frameStamp !== this.frameStamp) {
+            return false;
+        }
+        const camera = this.viewer.camera;
+        return (
+            this.cachedViewportHeight === this.viewer.scene.canvas.clientHeight &&
+            Cartesian3.equalsEpsilon(camera.positionWC, this.cachedPosition, POSE_EPSILON, POSE_EPSILON) &&
+            Cartesian3.equalsEpsilon(camera.directionWC, this.cachedDirection, POSE_EPSILON, POSE_EPSILON)
+        );
+    }
+}
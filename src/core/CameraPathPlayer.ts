@@ -0,0 +1,248 @@
+import { Cartesian3, JulianDate, Math as CesiumMath, type Viewer } from 'cesium';
+import { AppConfig } from '../config';
+import { FrameTimeRecorder, type FrameTimeStats } from './FrameTimeRecorder';
+
+/**
+ * 相机路径关键帧（角度单位为度，与 window.getCameraPose() 一致）。
+ */
+export interface CameraPathKeyframe {
+    t: number;
+    longitude: number;
+    latitude: number;
+    height: number;
+    heading: number;
+    pitch: number;
+    roll?: number;
+    label?: string;
+}
+
+export interface CameraPath {
+    version: 1;
+    name: string;
+    keyframes: CameraPathKeyframe[];
+}
+
+export interface CameraPathReplayOptions {
+    // 每秒模拟帧数：决定回放步长，与实际渲染帧率无关。
+    fps?: number;
+}
+
+export interface CameraPathSegmentReport {
+    index: number;
+    label: string;
+    fromT: number;
+    toT: number;
+    frames: number;
+    frameTime: FrameTimeStats;
+}
+
+export interface CameraPathReplayReport {
+    name: string;
+    frames: number;
+    simulatedSeconds: number;
+    wallClockMs: number;
+    overall: FrameTimeStats;
+    segments: CameraPathSegmentReport[];
+}
+
+/**
+ * 相机路径录制与逐帧回放
+ * 录制按固定间隔采样当前相机位姿；回放以固定步长推进 viewer.clock，每一步设置插值位姿并等待一次渲染，
+ * 因此两次回放经过的相机位姿序列完全一致，帧间隔按路径分段统计。
+ */
+export class CameraPathPlayer {
+    private viewer: Viewer;
+    private recordTimer?: ReturnType<typeof setInterval>;
+    private recordStartedAtMs: number;
+    private recording: CameraPathKeyframe[];
+    private replaying: boolean;
+
+    constructor(viewer: Viewer) {
+        this.viewer = viewer;
+        this.recordStartedAtMs = 0;
+        this.recording = [];
+        this.replaying = false;
+    }
+
+    public startRecording(sampleIntervalMs: number = 250): void {
+        this.stopRecordingTimer();
+        this.recording = [];
+        this.recordStartedAtMs = performance.now();
+        this.captureKeyframe();
+        this.recordTimer = setInterval(() => this.captureKeyframe(), Math.max(16, sampleIntervalMs));
+        console.log(`CameraPathPlayer: Recording started (interval=${sampleIntervalMs}ms).`);
+    }
+
+    public stopRecording(name: string = 'recorded'): CameraPath {
+        this.stopRecordingTimer();
+        this.captureKeyframe();
+        const path: CameraPath = { version: 1, name, keyframes: this.recording };
+        this.recording = [];
+        console.log(`CameraPathPlayer: Recording stopped (keyframes=${path.keyframes.length}).`);
+        return path;
+    }
+
+    public async replay(path: CameraPath, options: CameraPathReplayOptions = {}): Promise<CameraPathReplayReport> {
+        const keyframes = this.validatePath(path);
+        if (this.replaying) {
+            throw new Error('CameraPathPlayer: replay already in progress.');
+        }
+        this.replaying = true;
+        const { clock, scene } = this.viewer;
+        const fps = Math.max(1, options.fps ?? 60);
+        const step = 1 / fps;
+        const startT = keyframes[0].t;
+        const endT = keyframes[keyframes.length - 1].t;
+        const clockStart = JulianDate.clone(clock.currentTime);
+        const shouldAnimate = clock.shouldAnimate;
+        // 回放中每一帧都是主动请求的，不接入 recordTick，按相邻两帧计算间隔。
+        const frameTimeOptions = {
+            ...AppConfig.perf.frameTime,
+            capacity: Math.ceil((endT - startT) * fps) + 2
+        };
+        const overall = new FrameTimeRecorder(frameTimeOptions);
+        const segments = keyframes.slice(0, -1).map((keyframe, index) => ({
+            index,
+            label: keyframe.label ?? `${index}`,
+            fromT: keyframe.t,
+            toT: keyframes[index + 1].t,
+            frames: 0,
+            recorder: new FrameTimeRecorder(frameTimeOptions)
+        }));
+
+        const begin = performance.now();
+        let frames = 0;
+        let segmentIndex = 0;
+        clock.shouldAnimate = false;
+        try {
+            for (let t = startT; t <= endT + 1e-9; t += step) {
+                if (this.viewer.isDestroyed()) {
+                    break;
+                }
+                while (segmentIndex < segments.length - 1 && t > segments[segmentIndex].toT) {
+                    segmentIndex += 1;
+                }
+                clock.currentTime = JulianDate.addSeconds(clockStart, t - startT, new JulianDate());
+                this.applyPose(this.interpolate(keyframes, t));
+                const renderedAtMs = await this.renderOneFrame();
+                const segment = segments[segmentIndex];
+                if (segment) {
+                    segment.frames += 1;
+                    segment.recorder.recordFrame(renderedAtMs);
+                }
+                overall.recordFrame(renderedAtMs);
+                frames += 1;
+            }
+        } finally {
+            clock.currentTime = clockStart;
+            clock.shouldAnimate = shouldAnimate;
+            this.replaying = false;
+            if (!this.viewer.isDestroyed()) {
+                scene.requestRender();
+            }
+        }
+
+        const report: CameraPathReplayReport = {
+            name: path.name,
+            frames,
+            simulatedSeconds: endT - startT,
+            wallClockMs: performance.now() - begin,
+            overall: overall.getStats(),
+            segments: segments.map(({ recorder, ...segment }) => ({
+                ...segment,
+                frameTime: recorder.getStats()
+            }))
+        };
+        console.log(
+            `CameraPathPlayer: Replayed '${path.name}' (frames=${frames}, p95=${report.overall.p95Ms.toFixed(2)}ms, wall=${report.wallClockMs.toFixed(0)}ms).`
+        );
+        return report;
+    }
+
+    public destroy(): void {
+        this.stopRecordingTimer();
+    }
+
+    private captureKeyframe(): void {
+        if (this.viewer.isDestroyed()) {
+            return;
+        }
+        const camera = this.viewer.camera;
+        const c = camera.positionCartographic;
+        this.recording.push({
+            t: (performance.now() - this.recordStartedAtMs) / 1000,
+            longitude: CesiumMath.toDegrees(c.longitude),
+            latitude: CesiumMath.toDegrees(c.latitude),
+            height: c.height,
+            heading: CesiumMath.toDegrees(camera.heading),
+            pitch: CesiumMath.toDegrees(camera.pitch),
+            roll: CesiumMath.toDegrees(camera.roll)
+        });
+    }
+
+    private stopRecordingTimer(): void {
+        if (this.recordTimer) {
+            clearInterval(this.recordTimer);
+            this.recordTimer = undefined;
+        }
+    }
+
+    private validatePath(path: CameraPath): CameraPathKeyframe[] {
+        const keyframes = [...(path?.keyframes ?? [])].sort((a, b) => a.t - b.t);
+        if (keyframes.length < 2) {
+            throw new Error('CameraPathPlayer: camera path requires at least 2 keyframes.');
+        }
+        for (const keyframe of keyframes) {
+            const values = [keyframe.t, keyframe.longitude, keyframe.latitude, keyframe.height, keyframe.heading, keyframe.pitch];
+            if (!values.every(Number.isFinite) || keyframe.height <= 0) {
+                throw new Error(`CameraPathPlayer: invalid keyframe at t=${keyframe.t}.`);
+            }
+        }
+        return keyframes;
+    }
+
+    private interpolate(keyframes: CameraPathKeyframe[], t: number): CameraPathKeyframe {
+        let index = 0;
+        while (index < keyframes.length - 2 && t > keyframes[index + 1].t) {
+            index += 1;
+        }
+        const a = keyframes[index];
+        const b = keyframes[index + 1];
+        const span = b.t - a.t;
+        const u = span > 0 ? CesiumMath.clamp((t - a.t) / span, 0, 1) : 1;
+        // 高度按对数插值，使大跨度缩放时每帧的 mpp 变化均匀；航向走最短角。
+        const headingDelta = CesiumMath.negativePiToPi(CesiumMath.toRadians(b.heading - a.heading));
+        return {
+            t,
+            longitude: CesiumMath.lerp(a.longitude, b.longitude, u),
+            latitude: CesiumMath.lerp(a.latitude, b.latitude, u),
+            height: Math.exp(CesiumMath.lerp(Math.log(a.height), Math.log(b.height), u)),
+            heading: a.heading + CesiumMath.toDegrees(headingDelta) * u,
+            pitch: CesiumMath.lerp(a.pitch, b.pitch, u),
+            roll: CesiumMath.lerp(a.roll ?? 0, b.roll ?? 0, u)
+        };
+    }
+
+    private applyPose(pose: CameraPathKeyframe): void {
+        this.viewer.camera.setView({
+            destination: Cartesian3.fromDegrees(pose.longitude, pose.latitude, pose.height),
+            orientation: {
+                heading: CesiumMath.toRadians(pose.heading),
+                pitch: CesiumMath.toRadians(pose.pitch),
+                roll: CesiumMath.toRadians(pose.roll ?? 0)
+            }
+        });
+    }
+
+    private renderOneFrame(): Promise<number> {
+        const { scene } = this.viewer;
+        return new Promise((resolve) => {
+            const onPostRender = (): void => {
+                scene.postRender.removeEventListener(onPostRender);
+                resolve(performance.now());
+            };
+            scene.postRender.addEventListener(onPostRender);
+            scene.requestRender();
+        });
+    }
+}
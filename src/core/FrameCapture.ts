@@ -0,0 +1,161 @@
+import type { Viewer } from 'cesium';
+import { AppConfig } from '../config';
+
+/**
+ * 读取区域（绘制缓冲像素坐标，左上角为原点）。
+ */
+export interface FrameCaptureRegion {
+    x: number;
+    y: number;
+    width: number;
+    height: number;
+}
+
+export interface FrameCaptureOptions {
+    // 整数降采样倍数（盒式滤波），1 表示原始分辨率。
+    downsample?: number;
+    // 缺省读取整个绘制缓冲。
+    region?: FrameCaptureRegion;
+    timeoutMs?: number;
+}
+
+export interface FrameCaptureResult {
+    width: number;
+    height: number;
+    // RGBA8，行序自上而下（与截图一致）。
+    data: Uint8Array;
+    sourceWidth: number;
+    sourceHeight: number;
+    downsample: number;
+    // requestRender 到 postRender 的耗时。
+    renderMs: number;
+    // readPixels + 翻转/降采样的耗时。
+    readMs: number;
+}
+
+/**
+ * 按需帧读取
+ * 主动请求渲染一帧，在同一帧的 postRender 中通过 readPixels 读取绘制缓冲（此时缓冲尚未被合成清空），
+ * 因此不依赖 preserveDrawingBuffer，也不经过 PNG 编码。
+ */
+export class FrameCapture {
+    private viewer: Viewer;
+
+    constructor(viewer: Viewer) {
+        this.viewer = viewer;
+    }
+
+    public canCapture(): boolean {
+        return this.getWebGlContext() !== null;
+    }
+
+    public capture(options: FrameCaptureOptions = {}): Promise<FrameCaptureResult> {
+        const { scene } = this.viewer;
+        const downsample = Math.max(1, Math.floor(options.downsample ?? 1));
+        const timeoutMs = options.timeoutMs ?? AppConfig.perf.frameCapture.timeoutMs;
+        return new Promise((resolve, reject) => {
+            const requestedAtMs = performance.now();
+            const onPostRender = (): void => {
+                scene.postRender.removeEventListener(onPostRender);
+                clearTimeout(timeout);
+                try {
+                    resolve(this.read(options.region, downsample, performance.now() - requestedAtMs));
+                } catch (error) {
+                    reject(error);
+                }
+            };
+            const timeout = setTimeout(() => {
+                scene.postRender.removeEventListener(onPostRender);
+                reject(new Error(`FrameCapture: no frame rendered within ${timeoutMs}ms.`));
+            }, timeoutMs);
+            scene.postRender.addEventListener(onPostRender);
+            scene.requestRender();
+        });
+    }
+
+    private read(region: FrameCaptureRegion | undefined, downsample: number, renderMs: number): FrameCaptureResult {
+        const gl = this.getWebGlContext();
+        if (!gl) {
+            throw new Error('FrameCapture: WebGL context unavailable.');
+        }
+        const begin = performance.now();
+        const bufferWidth = gl.drawingBufferWidth;
+        const bufferHeight = gl.drawingBufferHeight;
+        const x = Math.max(0, Math.floor(region?.x ?? 0));
+        const y = Math.max(0, Math.floor(region?.y ?? 0));
+        const width = Math.min(bufferWidth - x, Math.floor(region?.width ?? bufferWidth));
+        const height = Math.min(bufferHeight - y, Math.floor(region?.height ?? bufferHeight));
+        if (width <= 0 || height <= 0) {
+            throw new Error(`FrameCapture: empty region ${width}x${height}.`);
+        }
+
+        // WebGL 原点在左下角，读取后再按行翻转。
+        const raw = new Uint8Array(width * height * 4);
+        gl.readPixels(x, bufferHeight - y - height, width, height, gl.RGBA, gl.UNSIGNED_BYTE, raw);
+        const data = downsample > 1
+            ? this.downsampleFlipped(raw, width, height, downsample)
+            : this.flipRows(raw, width, height);
+
+        return {
+            width: downsample > 1 ? Math.floor(width / downsample) : width,
+            height: downsample > 1 ? Math.floor(height / downsample) : height,
+            data,
+            sourceWidth: width,
+            sourceHeight: height,
+            downsample,
+            renderMs,
+            readMs: performance.now() - begin
+        };
+    }
+
+    private flipRows(raw: Uint8Array, width: number, height: number): Uint8Array {
+        const rowBytes = width * 4;
+        const out = new Uint8Array(raw.length);
+        for (let row = 0; row < height; row += 1) {
+            const src = (height - 1 - row) * rowBytes;
+            out.set(raw.subarray(src, src + rowBytes), row * rowBytes);
+        }
+        return out;
+    }
+
+    private downsampleFlipped(raw: Uint8Array, width: number, height: number, factor: number): Uint8Array {
+        const outWidth = Math.floor(width / factor);
+        const outHeight = Math.floor(height / factor);
+        const out = new Uint8Array(outWidth * outHeight * 4);
+        const sums = new Uint32Array(outWidth * 4);
+        const area = factor * factor;
+        for (let oy = 0; oy < outHeight; oy += 1) {
+            sums.fill(0);
+            for (let dy = 0; dy < factor; dy += 1) {
+                // 输出第 oy 行对应 GL 缓冲中自底向上的源行。
+                const srcRow = height - 1 - (oy * factor + dy);
+                let src = srcRow * width * 4;
+                for (let ox = 0; ox < outWidth; ox += 1) {
+                    const base = ox * 4;
+                    for (let dx = 0; dx < factor; dx += 1) {
+                        sums[base] += raw[src];
+                        sums[base + 1] += raw[src + 1];
+                        sums[base + 2] += raw[src + 2];
+                        sums[base + 3] += raw[src + 3];
+                        src += 4;
+                    }
+                }
+            }
+            const dst = oy * outWidth * 4;
+            for (let i = 0; i < sums.length; i += 1) {
+                out[dst + i] = Math.round(sums[i] / area);
+            }
+        }
+        return out;
+    }
+
+    private getWebGlContext(): WebGLRenderingContext | WebGL2RenderingContext | null {
+        type SceneContext = {
+            context?: {
+                _gl?: WebGLRenderingContext | WebGL2RenderingContext;
+            };
+        };
+        const sceneWithContext = this.viewer.scene as unknown as SceneContext;
+        return sceneWithContext.context?._gl ?? null;
+    }
+}
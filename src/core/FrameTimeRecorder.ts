@@ -0,0 +1,160 @@
+export interface FrameTimeHistogram {
+    boundsMs: number[];
+    counts: number[];
+}
+
+export interface FrameTimeStats {
+    sampleCount: number;
+    meanMs: number;
+    p50Ms: number;
+    p95Ms: number;
+    p99Ms: number;
+    maxMs: number;
+    budgetMs: number;
+    longFrameCount: number;
+    totalLongFrameCount: number;
+    totalFrameCount: number;
+    // 空闲（未出帧的 tick）后恢复出帧的次数；这些帧的间隔从最后一个空闲 tick 起算。
+    idleResumeCount: number;
+    histogram: FrameTimeHistogram;
+}
+
+export interface FrameTimeRecorderOptions {
+    capacity: number;
+    budgetMs: number;
+    histogramBoundsMs: readonly number[];
+}
+
+/**
+ * 帧间隔环形缓冲
+ * 每帧只写入一个 Float32 槽位，不产生分配；分位数与直方图在读取统计时按当前窗口计算。
+ * requestRenderMode 下渲染循环每个 tick 都会运行，只是无需出帧时跳过绘制：
+ * 接入 recordTick 后，帧间隔从上一个 tick 结束时刻起算，静止空闲不产生长样本，
+ * 而主线程被阻塞（tick 本身停摆）的时长仍完整计入。未接入 recordTick 时按相邻两帧计算。
+ */
+export class FrameTimeRecorder {
+    private readonly samples: Float32Array;
+    private readonly sortScratch: Float32Array;
+    private readonly budgetMs: number;
+    private readonly histogramBoundsMs: number[];
+    private writeIndex: number;
+    private sampleCount: number;
+    private lastFrameAtMs?: number;
+    private lastTickAtMs?: number;
+    private previousTickAtMs?: number;
+    private totalFrameCount: number;
+    private totalLongFrameCount: number;
+    private idleResumeCount: number;
+
+    constructor(options: FrameTimeRecorderOptions) {
+        const capacity = Math.max(16, Math.floor(options.capacity));
+        this.samples = new Float32Array(capacity);
+        this.sortScratch = new Float32Array(capacity);
+        this.budgetMs = options.budgetMs;
+        this.histogramBoundsMs = [...options.histogramBoundsMs].sort((a, b) => a - b);
+        this.writeIndex = 0;
+        this.sampleCount = 0;
+        this.totalFrameCount = 0;
+        this.totalLongFrameCount = 0;
+        this.idleResumeCount = 0;
+    }
+
+    /**
+     * 在 scene.postUpdate 中调用（每个 tick 都触发，无论是否出帧；出帧时先于 postRender）。
+     */
+    public recordTick(nowMs: number): void {
+        this.previousTickAtMs = this.lastTickAtMs;
+        this.lastTickAtMs = nowMs;
+    }
+
+    /**
+     * 在 postRender 中调用，记录与上一帧的间隔。
+     */
+    public recordFrame(nowMs: number): void {
+        const lastFrameAtMs = this.lastFrameAtMs;
+        this.lastFrameAtMs = nowMs;
+        if (lastFrameAtMs === undefined) {
+            return;
+        }
+        // 本帧所在 tick 已先调用过 recordTick，previousTickAtMs 即上一个 tick 的结束时刻；
+        // 它晚于上一帧说明中间有未出帧的空闲 tick，空闲时长不属于本帧。
+        let startMs = lastFrameAtMs;
+        if (this.previousTickAtMs !== undefined && this.previousTickAtMs > lastFrameAtMs) {
+            startMs = this.previousTickAtMs;
+            this.idleResumeCount += 1;
+        }
+        const deltaMs = nowMs - startMs;
+        this.samples[this.writeIndex] = deltaMs;
+        this.writeIndex = (this.writeIndex + 1) % this.samples.length;
+        if (this.sampleCount < this.samples.length) {
+            this.sampleCount += 1;
+        }
+        this.totalFrameCount += 1;
+        if (deltaMs > this.budgetMs) {
+            this.totalLongFrameCount += 1;
+        }
+    }
+
+    public reset(): void {
+        this.writeIndex = 0;
+        this.sampleCount = 0;
+        this.lastFrameAtMs = undefined;
+        this.lastTickAtMs = undefined;
+        this.previousTickAtMs = undefined;
+        this.totalFrameCount = 0;
+        this.totalLongFrameCount = 0;
+        this.idleResumeCount = 0;
+    }
+
+    public getStats(): FrameTimeStats {
+        const count = this.sampleCount;
+        const counts = new Array<number>(this.histogramBoundsMs.length + 1).fill(0);
+        // 环形缓冲写满前有效样本位于 [0, count)，写满后整段都有效，两种情况都可直接取前 count 个。
+        const sorted = this.sortScratch.subarray(0, count);
+        sorted.set(this.samples.subarray(0, count));
+        sorted.sort();
+
+        let sum = 0;
+        let longFrameCount = 0;
+        let bucket = 0;
+        for (let i = 0; i < count; i += 1) {
+            const value = sorted[i];
+            sum += value;
+            if (value > this.budgetMs) {
+                longFrameCount += 1;
+            }
+            // 样本已升序，桶游标只需单调前进。
+            while (bucket < this.histogramBoundsMs.length && value > this.histogramBoundsMs[bucket]) {
+                bucket += 1;
+            }
+            counts[bucket] += 1;
+        }
+
+        return {
+            sampleCount: count,
+            meanMs: count > 0 ? sum / count : 0,
+            p50Ms: this.percentile(sorted, 0.5),
+            p95Ms: this.percentile(sorted, 0.95),
+            p99Ms: this.percentile(sorted, 0.99),
+            maxMs: count > 0 ? sorted[count - 1] : 0,
+            budgetMs: this.budgetMs,
+            longFrameCount,
+            totalLongFrameCount: this.totalLongFrameCount,
+            totalFrameCount: this.totalFrameCount,
+            idleResumeCount: this.idleResumeCount,
+            histogram: {
+                boundsMs: [...this.histogramBoundsMs],
+                counts
+            }
+        };
+    }
+
+    private percentile(sorted: Float32Array, ratio: number): number {
+        if (sorted.length === 0) {
+            return 0;
+        }
+        // nearest-rank：与 p99 的“最慢 1% 帧”口径一致。
+        const rank = Math.min(sorted.length - 1, Math.max(0, Math.ceil(ratio * sorted.length) - 1));
+        return sorted[rank];
+    }
+}
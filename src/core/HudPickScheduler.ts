@@ -0,0 +1,112 @@
+import { Cartesian2 } from 'cesium';
+
+export interface HudPipelineStats {
+    mouseMoveEvents: number;
+    // 实际执行拾取处理的动画帧数（每帧至多一次）。
+    processedFrames: number;
+    // 被合并掉、未单独处理的鼠标事件数。
+    coalescedEvents: number;
+    picks: number;
+    picksPerFrame: number;
+    avgPickMs: number;
+    maxPickMs: number;
+    // HUD m/px 走解析公式与走拾取回退的次数。
+    analyticMppCount: number;
+    pickMppCount: number;
+}
+
+/**
+ * HUD 拾取调度
+ * 鼠标事件只记录最新位置，每个动画帧至多处理一次，避免快速移动时同一帧内多次 globe.pick；
+ * 同时统计拾取次数与耗时，作为 HUD 管线的性能计数。
+ */
+export class HudPickScheduler {
+    private readonly process: (screenPosition: Cartesian2) => void;
+    private readonly pendingPosition: Cartesian2;
+    private frameHandle?: number;
+    private mouseMoveEvents: number;
+    private processedFrames: number;
+    private picks: number;
+    private totalPickMs: number;
+    private maxPickMs: number;
+    private analyticMppCount: number;
+    private pickMppCount: number;
+
+    constructor(process: (screenPosition: Cartesian2) => void) {
+        this.process = process;
+        this.pendingPosition = new Cartesian2();
+        this.mouseMoveEvents = 0;
+        this.processedFrames = 0;
+        this.picks = 0;
+        this.totalPickMs = 0;
+        this.maxPickMs = 0;
+        this.analyticMppCount = 0;
+        this.pickMppCount = 0;
+    }
+
+    public schedule(screenPosition: Cartesian2): void {
+        this.mouseMoveEvents += 1;
+        // Cesium 会复用事件里的 Cartesian2，需要拷贝。
+        Cartesian2.clone(screenPosition, this.pendingPosition);
+        if (this.frameHandle !== undefined) {
+            return;
+        }
+        this.frameHandle = requestAnimationFrame(() => {
+            this.frameHandle = undefined;
+            this.processedFrames += 1;
+            this.process(Cartesian2.clone(this.pendingPosition));
+        });
+    }
+
+    /**
+     * 执行并计时一次拾取；count 为 fn 内部实际发起的拾取次数。
+     */
+    public timePick<T>(fn: () => T, count: number = 1): T {
+        const begin = performance.now();
+        const result = fn();
+        const elapsed = performance.now() - begin;
+        this.picks += count;
+        this.totalPickMs += elapsed;
+        this.maxPickMs = Math.max(this.maxPickMs, elapsed);
+        return result;
+    }
+
+    public recordMppSource(analytic: boolean): void {
+        if (analytic) {
+            this.analyticMppCount += 1;
+        } else {
+            this.pickMppCount += 1;
+        }
+    }
+
+    public getStats(): HudPipelineStats {
+        return {
+            mouseMoveEvents: this.mouseMoveEvents,
+            processedFrames: this.processedFrames,
+            coalescedEvents: Math.max(0, this.mouseMoveEvents - this.processedFrames),
+            picks: this.picks,
+            picksPerFrame: this.processedFrames > 0 ? this.picks / this.processedFrames : 0,
+            avgPickMs: this.picks > 0 ? this.totalPickMs / this.picks : 0,
+            maxPickMs: this.maxPickMs,
+            analyticMppCount: this.analyticMppCount,
+            pickMppCount: this.pickMppCount
+        };
+    }
+
+    public reset(): void {
+        this.mouseMoveEvents = 0;
+        this.processedFrames = 0;
+        this.picks = 0;
+        this.totalPickMs = 0;
+        this.maxPickMs = 0;
+        this.analyticMppCount = 0;
+        this.pickMppCount = 0;
+    }
+
+    public destroy(): void {
+        if (this.frameHandle !== undefined) {
+            cancelAnimationFrame(this.frameHandle);
+            this.frameHandle = undefined;
+        }
+    }
+}
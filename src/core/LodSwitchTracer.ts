@@ -0,0 +1,100 @@
+import type { TerrainLodProfileName } from '../config';
+
+export type LodSwitchPhaseName =
+    | 'safetyBounds'
+    | 'terrainProvider'
+    | 'queryLevel'
+    | 'obliqueView'
+    | 'theme'
+    | 'visualizationHints';
+
+export interface LodSwitchPhaseSpan {
+    name: LodSwitchPhaseName;
+    durationMs: number;
+}
+
+export type LodSwitchSettleState = 'pending' | 'tilesLoaded' | 'superseded' | 'timedOut';
+
+export interface LodSwitchTraceEntry {
+    from: TerrainLodProfileName;
+    to: TerrainLodProfileName;
+    metersPerPixel: number;
+    startedAtEpochMs: number;
+    totalMs: number;
+    phases: LodSwitchPhaseSpan[];
+    settleState: LodSwitchSettleState;
+    framesUntilTilesLoaded: number;
+    msUntilTilesLoaded?: number;
+}
+
+/**
+ * 切档分阶段耗时记录
+ * 保存最近 N 次切档的同步阶段耗时，并在后续 postRender 中统计直到 globe.tilesLoaded 的帧数与时长。
+ */
+export class LodSwitchTracer {
+    private readonly historySize: number;
+    private readonly settleTimeoutMs: number;
+    private history: LodSwitchTraceEntry[];
+    private pending?: LodSwitchTraceEntry;
+    private pendingStartedAtMs: number;
+
+    constructor(historySize: number, settleTimeoutMs: number) {
+        this.historySize = Math.max(1, Math.floor(historySize));
+        this.settleTimeoutMs = settleTimeoutMs;
+        this.history = [];
+        this.pendingStartedAtMs = 0;
+    }
+
+    public record(
+        entry: Omit<LodSwitchTraceEntry, 'settleState' | 'framesUntilTilesLoaded' | 'msUntilTilesLoaded'>,
+        startedAtMs: number
+    ): void {
+        if (this.pending) {
+            // 上一次切档尚未等到瓦片加载完成就被新的切档打断。
+            this.pending.settleState = 'superseded';
+        }
+        const traced: LodSwitchTraceEntry = {
+            ...entry,
+            settleState: 'pending',
+            framesUntilTilesLoaded: 0
+        };
+        this.history.push(traced);
+        if (this.history.length > this.historySize) {
+            this.history.shift();
+        }
+        this.pending = traced;
+        this.pendingStartedAtMs = startedAtMs;
+    }
+
+    /**
+     * 在 postRender 中调用；只跟踪最近一次切档。
+     */
+    public onFrameRendered(nowMs: number, tilesLoaded: boolean): void {
+        const pending = this.pending;
+        if (!pending) {
+            return;
+        }
+        pending.framesUntilTilesLoaded += 1;
+        const elapsedMs = nowMs - this.pendingStartedAtMs;
+        if (tilesLoaded) {
+            pending.settleState = 'tilesLoaded';
+            pending.msUntilTilesLoaded = elapsedMs;
+            this.pending = undefined;
+        } else if (elapsedMs > this.settleTimeoutMs) {
+            pending.settleState = 'timedOut';
+            this.pending = undefined;
+        }
+    }
+
+    public getHistory(): LodSwitchTraceEntry[] {
+        return this.history.map((entry) => ({
+            ...entry,
+            phases: entry.phases.map((phase) => ({ ...phase }))
+        }));
+    }
+
+    public reset(): void {
+        this.history = [];
+        this.pending = undefined;
+    }
+}
@@ -0,0 +1,487 @@
+import {
+    BoundingSphere,
+    Cartesian3,
+    ColorGeometryInstanceAttribute,
+    ComponentDatatype,
+    EllipsoidGeometry,
+    Geometry,
+    GeometryAttribute,
+    GeometryAttributes,
+    GeometryInstance,
+    Math as CesiumMath,
+    Matrix3,
+    Matrix4,
+    PerInstanceColorAppearance,
+    Primitive,
+    PrimitiveType,
+    Transforms,
+    type Color,
+    type Viewer
+} from 'cesium';
+import { AppConfig, type TerrainLodProfileName } from '../config';
+
+export type RangeVolumeKind = 'ring' | 'dome' | 'sector';
+
+/**
+ * 作用范围体描述：ring 为水平圆环线，dome 为半球穹顶，sector 为按朝向与张角截取的扇形穹顶。
+ */
+export interface RangeVolumeSpec {
+    id: string;
+    kind: RangeVolumeKind;
+    longitude: number;
+    latitude: number;
+    height?: number;
+    // 作用半径（米）。
+    radius: number;
+    color: Color;
+    // sector 中心朝向（度，正北顺时针）与张角（度）。
+    headingDegrees?: number;
+    sweepDegrees?: number;
+}
+
+export type RangeVolumeUpdate = Partial<Omit<RangeVolumeSpec, 'id'>> & { id: string };
+
+export interface RangeVolumeOptions {
+    minSegments: number;
+    maxSegmentsByLod: Record<TerrainLodProfileName, number>;
+    pixelsPerSegment: number;
+    rebuildDebounceMs: number;
+    // 中心 m/px 相对上次构建变化超过该倍数时按新的屏幕尺寸重新细分。
+    retessellateRatio: number;
+    batchSize: number;
+    maxBatchBuildsPerFrame: number;
+}
+
+export interface RangeVolumeStats {
+    volumes: number;
+    // 细分模板数（按 类型 × 分段数 × 张角 共享）。
+    templates: number;
+    batches: number;
+    // 待重建或已提交、尚未 ready 的批次数。
+    pendingBatches: number;
+    // 累计批次重建次数（每次只重建一个批次）。
+    rebuilds: number;
+    // 最近一帧提交批次重建的主线程耗时。
+    lastRebuildMs: number;
+    // 只改颜色、未触发重建的就地更新次数。
+    attributeUpdates: number;
+}
+
+interface VolumeBatch {
+    ids: Set<string>;
+    dirty: boolean;
+    surface?: Primitive;
+    outline?: Primitive;
+    // 已提交、尚未 ready 的新批次（隐藏），ready 后替换当前批次；替换前旧批次保持显示。
+    pending: boolean;
+    pendingSurface?: Primitive;
+    pendingOutline?: Primitive;
+}
+
+interface VolumeState {
+    spec: RangeVolumeSpec;
+    batch: VolumeBatch;
+}
+
+/**
+ * 作用范围体图层（雷达/武器/通信/干扰范围）
+ * 所有体共用少量单位尺寸模板，按实例的 modelMatrix（ENU × 朝向 × 半径缩放）放置；
+ * 体按固定容量分入多个批次，每批面片与线框各一个 Primitive。颜色经实例属性就地更新，
+ * 几何变化只把所在批次标脏，去抖后每帧最多重建 maxBatchBuildsPerFrame 个批次。
+ * 面片批次异步构建（几何在 Cesium Worker 中生成与合并），新批次 ready 前旧批次保持显示。
+ * 分段数随 LOD 档位上限与屏幕上的像素半径变化，并取 2 的幂以便共享模板。
+ */
+export class RangeVolumeLayer {
+    private readonly viewer: Viewer;
+    private readonly getMetersPerPixel: () => number;
+    private readonly options: RangeVolumeOptions;
+    private readonly volumes: Map<string, VolumeState>;
+    private readonly templates: Map<string, Geometry | EllipsoidGeometry>;
+    private readonly removePreUpdate: () => void;
+    private batches: VolumeBatch[];
+    private profile: TerrainLodProfileName;
+    // 有批次待重建、尚未开始本轮构建。
+    private dirty: boolean;
+    // 本轮构建进行中：剩余脏批次逐帧提交，不再等待去抖。
+    private building: boolean;
+    private builtMetersPerPixel: number;
+    private lastBuildCheckMs: number;
+    private rebuilds: number;
+    private lastRebuildMs: number;
+    private attributeUpdates: number;
+
+    constructor(
+        viewer: Viewer,
+        getMetersPerPixel: () => number,
+        options: RangeVolumeOptions = AppConfig.tacticalOverlay.rangeVolumes
+    ) {
+        this.viewer = viewer;
+        this.getMetersPerPixel = getMetersPerPixel;
+        this.options = options;
+        this.volumes = new Map();
+        this.templates = new Map();
+        this.batches = [];
+        this.profile = 'global';
+        this.dirty = false;
+        this.building = false;
+        this.builtMetersPerPixel = Number.NaN;
+        this.lastBuildCheckMs = Number.NEGATIVE_INFINITY;
+        this.rebuilds = 0;
+        this.lastRebuildMs = 0;
+        this.attributeUpdates = 0;
+        const onPreUpdate = (): void => this.maybeRebuild();
+        viewer.scene.preUpdate.addEventListener(onPreUpdate);
+        this.removePreUpdate = () => viewer.scene.preUpdate.removeEventListener(onPreUpdate);
+    }
+
+    public get size(): number {
+        return this.volumes.size;
+    }
+
+    /**
+     * 批量添加（同 id 覆盖，沿用原批次）。
+     */
+    public addVolumes(specs: RangeVolumeSpec[]): void {
+        for (const spec of specs) {
+            const existing = this.volumes.get(spec.id);
+            const batch = existing ? existing.batch : this.assignBatch(spec.id);
+            this.volumes.set(spec.id, { spec: { ...spec }, batch });
+            this.markBatchDirty(batch);
+        }
+        this.viewer.scene.requestRender();
+    }
+
+    /**
+     * 批量更新：只改颜色的体直接写实例属性；位置、半径、朝向等几何变化只重建所在批次。
+     */
+    public updateVolumes(updates: RangeVolumeUpdate[]): void {
+        for (const update of updates) {
+            const state = this.volumes.get(update.id);
+            if (!state) continue;
+            const colorOnly = Object.keys(update).every((key) => key === 'id' || key === 'color');
+            state.spec = { ...state.spec, ...update };
+            if (colorOnly && update.color && this.writeColorAttribute(state)) {
+                this.attributeUpdates += 1;
+                continue;
+            }
+            this.markBatchDirty(state.batch);
+        }
+        this.viewer.scene.requestRender();
+    }
+
+    public removeVolumes(ids: readonly string[]): number {
+        let removed = 0;
+        for (const id of ids) {
+            const state = this.volumes.get(id);
+            if (!state) continue;
+            this.volumes.delete(id);
+            state.batch.ids.delete(id);
+            this.markBatchDirty(state.batch);
+            removed += 1;
+        }
+        if (removed > 0) {
+            this.viewer.scene.requestRender();
+        }
+        return removed;
+    }
+
+    public has(id: string): boolean {
+        return this.volumes.has(id);
+    }
+
+    public setLodProfile(profile: TerrainLodProfileName): void {
+        if (profile === this.profile) return;
+        this.profile = profile;
+        if (this.volumes.size > 0) {
+            this.markAllBatchesDirty();
+            this.viewer.scene.requestRender();
+        }
+    }
+
+    public getStats(): RangeVolumeStats {
+        return {
+            volumes: this.volumes.size,
+            templates: this.templates.size,
+            batches: this.batches.length,
+            pendingBatches: this.batches.filter((batch) => batch.dirty || batch.pending).length,
+            rebuilds: this.rebuilds,
+            lastRebuildMs: this.lastRebuildMs,
+            attributeUpdates: this.attributeUpdates
+        };
+    }
+
+    public clear(): void {
+        this.volumes.clear();
+        for (const batch of this.batches) {
+            this.discardPending(batch);
+            this.removePrimitive(batch.surface);
+            this.removePrimitive(batch.outline);
+        }
+        this.batches = [];
+        this.dirty = false;
+        this.building = false;
+        this.viewer.scene.requestRender();
+    }
+
+    public destroy(): void {
+        this.removePreUpdate();
+        this.clear();
+        this.templates.clear();
+    }
+
+    /**
+     * 新体放入第一个未满的批次，全部已满时新开一个批次。
+     */
+    private assignBatch(id: string): VolumeBatch {
+        const capacity = Math.max(1, this.options.batchSize);
+        let batch = this.batches.find((candidate) => candidate.ids.size < capacity);
+        if (!batch) {
+            batch = { ids: new Set(), dirty: false, pending: false };
+            this.batches.push(batch);
+        }
+        batch.ids.add(id);
+        return batch;
+    }
+
+    private markBatchDirty(batch: VolumeBatch): void {
+        batch.dirty = true;
+        this.dirty = true;
+    }
+
+    private markAllBatchesDirty(): void {
+        for (const batch of this.batches) {
+            this.markBatchDirty(batch);
+        }
+    }
+
+    /**
+     * preUpdate 中调用：先换上已 ready 的新批次；再按去抖间隔检查增删改与相机缩放，
+     * 开始一轮构建后每帧提交有限个脏批次，直到本轮没有剩余。
+     */
+    private maybeRebuild(): void {
+        this.promoteReadyBatches();
+        if (!this.building) {
+            const now = performance.now();
+            if (now - this.lastBuildCheckMs < this.options.rebuildDebounceMs) {
+                // 按需渲染模式下没有后续帧会再次触发检查，待重建时继续请求渲染直到去抖结束。
+                if (this.dirty || this.hasPendingBatches()) {
+                    this.viewer.scene.requestRender();
+                }
+                return;
+            }
+            this.lastBuildCheckMs = now;
+            const mpp = this.getMetersPerPixel();
+            const scaleChanged = this.volumes.size > 0 && Number.isFinite(mpp) && (
+                !Number.isFinite(this.builtMetersPerPixel) ||
+                Math.max(mpp, this.builtMetersPerPixel) / Math.max(1e-6, Math.min(mpp, this.builtMetersPerPixel)) > this.options.retessellateRatio
+            );
+            if (scaleChanged) {
+                this.markAllBatchesDirty();
+            }
+            if (!this.dirty) {
+                if (this.hasPendingBatches()) {
+                    this.viewer.scene.requestRender();
+                }
+                return;
+            }
+            if (Number.isFinite(mpp) && mpp > 0) {
+                this.builtMetersPerPixel = mpp;
+            }
+            this.dirty = false;
+            this.building = true;
+        }
+
+        const begin = performance.now();
+        const maxBuilds = Math.max(1, this.options.maxBatchBuildsPerFrame);
+        let builds = 0;
+        for (const batch of this.batches) {
+            if (builds >= maxBuilds) break;
+            // 上一次构建尚未换上的批次先等它 ready，避免连续编辑时新批次反复作废、始终显示不出来。
+            if (!batch.dirty || batch.pending) continue;
+            this.buildBatch(batch);
+            builds += 1;
+        }
+        if (builds > 0) {
+            this.lastRebuildMs = performance.now() - begin;
+        }
+        if (!this.batches.some((batch) => batch.dirty)) {
+            this.building = false;
+        }
+        this.viewer.scene.requestRender();
+    }
+
+    private buildBatch(batch: VolumeBatch): void {
+        const surfaces: GeometryInstance[] = [];
+        const outlines: GeometryInstance[] = [];
+        for (const id of batch.ids) {
+            const state = this.volumes.get(id);
+            if (!state) continue;
+            const { spec } = state;
+            const segments = this.resolveSegments(spec.radius, this.builtMetersPerPixel);
+            const instance = new GeometryInstance({
+                id: spec.id,
+                geometry: this.getTemplate(spec, segments),
+                modelMatrix: this.computeModelMatrix(spec),
+                attributes: {
+                    color: ColorGeometryInstanceAttribute.fromColor(spec.color)
+                }
+            });
+            (spec.kind === 'ring' ? outlines : surfaces).push(instance);
+        }
+        const primitives = this.viewer.scene.primitives;
+        // 新批次先隐藏加入场景以推进加载，ready 后在 promoteReadyBatches 中与旧批次交换。
+        // 穹顶/扇区模板是几何描述，可在 Worker 中异步生成；环线模板为预建 Geometry，只能同步构建（顶点量很小）。
+        batch.pendingSurface = surfaces.length > 0 ? primitives.add(new Primitive({
+            geometryInstances: surfaces,
+            appearance: new PerInstanceColorAppearance({ flat: true, translucent: true, closed: false }),
+            asynchronous: true,
+            show: false
+        })) : undefined;
+        batch.pendingOutline = outlines.length > 0 ? primitives.add(new Primitive({
+            geometryInstances: outlines,
+            appearance: new PerInstanceColorAppearance({ flat: true, translucent: true }),
+            asynchronous: false,
+            show: false
+        })) : undefined;
+        batch.pending = true;
+        batch.dirty = false;
+        this.rebuilds += 1;
+    }
+
+    private promoteReadyBatches(): void {
+        let emptied = false;
+        for (const batch of this.batches) {
+            if (!batch.pending) continue;
+            if ((batch.pendingSurface && !batch.pendingSurface.ready) || (batch.pendingOutline && !batch.pendingOutline.ready)) {
+                continue;
+            }
+            this.removePrimitive(batch.surface);
+            this.removePrimitive(batch.outline);
+            batch.surface = batch.pendingSurface;
+            batch.outline = batch.pendingOutline;
+            batch.pendingSurface = undefined;
+            batch.pendingOutline = undefined;
+            batch.pending = false;
+            if (batch.surface) batch.surface.show = true;
+            if (batch.outline) batch.outline.show = true;
+            // 构建期间的纯颜色更新只写到了旧批次，这里补写到新批次。
+            for (const id of batch.ids) {
+                const state = this.volumes.get(id);
+                if (state) this.writeColorAttribute(state);
+            }
+            emptied = emptied || batch.ids.size === 0;
+        }
+        if (emptied) {
+            this.batches = this.batches.filter((batch) => batch.ids.size > 0 || batch.dirty || batch.pending);
+        }
+    }
+
+    private hasPendingBatches(): boolean {
+        return this.batches.some((batch) => batch.pending);
+    }
+
+    private discardPending(batch: VolumeBatch): void {
+        this.removePrimitive(batch.pendingSurface);
+        this.removePrimitive(batch.pendingOutline);
+        batch.pendingSurface = undefined;
+        batch.pendingOutline = undefined;
+        batch.pending = false;
+    }
+
+    private removePrimitive(primitive?: Primitive): void {
+        if (primitive) {
+            this.viewer.scene.primitives.remove(primitive);
+        }
+    }
+
+    private writeColorAttribute(state: VolumeState): boolean {
+        const { spec, batch } = state;
+        const primitive = spec.kind === 'ring' ? batch.outline : batch.surface;
+        if (!primitive || !primitive.ready || batch.dirty) {
+            return false;
+        }
+        const attributes = primitive.getGeometryInstanceAttributes(spec.id);
+        if (!attributes) {
+            return false;
+        }
+        attributes.color = ColorGeometryInstanceAttribute.toValue(spec.color, attributes.color);
+        return true;
+    }
+
+    /**
+     * 分段数：按屏幕上的圆周像素长度估算，取 2 的幂并限制在 [minSegments, 当前档位上限]。
+     */
+    private resolveSegments(radius: number, metersPerPixel: number): number {
+        const maxSegments = this.options.maxSegmentsByLod[this.profile];
+        const minSegments = Math.min(this.options.minSegments, maxSegments);
+        if (!Number.isFinite(metersPerPixel) || metersPerPixel <= 0) {
+            return minSegments;
+        }
+        const circumferencePx = (2 * Math.PI * radius) / metersPerPixel;
+        const wanted = Math.max(1, Math.ceil(circumferencePx / this.options.pixelsPerSegment));
+        const pow2 = 2 ** Math.ceil(Math.log2(wanted));
+        return CesiumMath.clamp(pow2, minSegments, maxSegments);
+    }
+
+    private getTemplate(spec: RangeVolumeSpec, segments: number): Geometry | EllipsoidGeometry {
+        const sweep = spec.kind === 'sector' ? CesiumMath.clamp(Math.round(spec.sweepDegrees ?? 90), 1, 360) : 360;
+        const key = `${spec.kind}|${segments}|${sweep}`;
+        const cached = this.templates.get(key);
+        if (cached) {
+            return cached;
+        }
+        // 穹顶/扇区模板只保存几何描述，由 Primitive 在 Worker 中按实例生成。
+        const template = spec.kind === 'ring'
+            ? createUnitRingGeometry(segments)
+            : new EllipsoidGeometry({
+                radii: new Cartesian3(1.0, 1.0, 1.0),
+                // 上半球：cone 从 +Z 量起。
+                maximumCone: CesiumMath.PI_OVER_TWO,
+                // sector 模板以 +X（东）为中心，左右各半个张角。
+                minimumClock: CesiumMath.toRadians(-sweep / 2),
+                maximumClock: CesiumMath.toRadians(sweep / 2),
+                slicePartitions: segments,
+                stackPartitions: Math.max(4, segments / 4),
+                vertexFormat: PerInstanceColorAppearance.FLAT_VERTEX_FORMAT
+            });
+        this.templates.set(key, template);
+        return template;
+    }
+
+    private computeModelMatrix(spec: RangeVolumeSpec): Matrix4 {
+        const center = Cartesian3.fromDegrees(spec.longitude, spec.latitude, spec.height ?? 0.0);
+        const enu = Transforms.eastNorthUpToFixedFrame(center);
+        // 模板中心朝 +X（东）；航向自正北顺时针，对应绕 Z 轴旋转 90° - heading。
+        const rotation = Matrix3.fromRotationZ(CesiumMath.toRadians(90.0 - (spec.headingDegrees ?? 0.0)));
+        const local = Matrix4.fromRotationTranslation(Matrix3.multiplyByScalar(rotation, spec.radius, rotation));
+        return Matrix4.multiply(enu, local, enu);
+    }
+}
+
+/**
+ * 单位半径水平圆环（LINES），位于局部 ENU 的 XY 平面。
+ */
+function createUnitRingGeometry(segments: number): Geometry {
+    const positions = new Float64Array(segments * 3);
+    const indices = new Uint16Array(segments * 2);
+    for (let i = 0; i < segments; i += 1) {
+        const angle = (i / segments) * CesiumMath.TWO_PI;
+        positions[i * 3] = Math.cos(angle);
+        positions[i * 3 + 1] = Math.sin(angle);
+        positions[i * 3 + 2] = 0.0;
+        indices[i * 2] = i;
+        indices[i * 2 + 1] = (i + 1) % segments;
+    }
+    return new Geometry({
+        attributes: new GeometryAttributes({
+            position: new GeometryAttribute({
+                componentDatatype: ComponentDatatype.DOUBLE,
+                componentsPerAttribute: 3,
+                values: positions
+            })
+        }),
+        indices,
+        primitiveType: PrimitiveType.LINES,
+        boundingSphere: new BoundingSphere(Cartesian3.ZERO, 1.0)
+    });
+}
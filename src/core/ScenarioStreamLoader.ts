@@ -0,0 +1,359 @@
+import { Color, type Viewer } from 'cesium';
+import {
+    ScenarioStreamParser,
+    SCENARIO_FLAG_CLAMP_TO_GROUND,
+    streamScenarioSource,
+    type ScenarioSource,
+    type ScenarioStreamRequest,
+    type ScenarioStreamResponse,
+    type ScenarioUnitChunk
+} from './ScenarioStreamProtocol';
+import type { TacticalUnitLayer, TacticalUnitSpec } from './TacticalUnitLayer';
+
+export interface ScenarioStreamOptions {
+    useWorker: boolean;
+    chunkUnits: number;
+    frameBudgetMs: number;
+    unitsPerBatch: number;
+}
+
+// 加载后段：最后这部分切片的帧间隔单独统计，集合随已加载单位增多而变慢时在这里暴露。
+const LATE_LOAD_SLICE_FRACTION = 0.25;
+
+export type ScenarioLoadState = 'idle' | 'loading' | 'done' | 'cancelled' | 'failed';
+
+export interface ScenarioLoadProgress {
+    state: ScenarioLoadState;
+    mode: 'worker' | 'main-thread';
+    bytesRead: number;
+    // 0 表示未知（无 Content-Length）。
+    totalBytes: number;
+    unitsParsed: number;
+    unitsApplied: number;
+    // 0 表示未知（NDJSON 无 header 行）。
+    totalUnits: number;
+    rejected: number;
+    // 已解析、等待按帧写入图层的单位数。
+    queuedUnits: number;
+    slices: number;
+    avgSliceMs: number;
+    maxSliceMs: number;
+    // 最后 25% 切片所在帧的帧间隔 p99（相邻两次写入切片的时间差，含上一帧的渲染与缓冲上传）；加载结束时计算。
+    lateFrameP99Ms: number;
+    parseMs: number;
+    elapsedMs: number;
+    // 写入图层的吞吐（单位/秒，按开始加载至今计）。
+    unitsPerSecond: number;
+    error?: string;
+}
+
+interface QueuedChunk {
+    chunk: ScenarioUnitChunk;
+    // 已写入图层的单位下标。
+    cursor: number;
+}
+
+/**
+ * 想定流式加载：
+ * 1) NDJSON / E3SU 二进制在 Worker 中边下载边解析，按块（列式类型化数组）转移回主线程；
+ * 2) 主线程在 preUpdate 中按帧预算分批写入单位图层，单帧写入耗时不超过 frameBudgetMs，
+ *    十万级单位的想定不会长时间阻塞渲染与 HUD；
+ * 3) 进度与吞吐通过 getProgress() / onProgress 报告。
+ * Worker 不可用时在主线程逐段解析（每次只解析一个网络分段，段间让出事件循环）。
+ */
+export class ScenarioStreamLoader {
+    private readonly viewer: Viewer;
+    private readonly unitLayer: TacticalUnitLayer;
+    private readonly options: ScenarioStreamOptions;
+    private readonly removePreUpdate: () => void;
+    private readonly colorCache: Map<number, Color>;
+    private worker?: Worker;
+    private generation: number;
+    private queue: QueuedChunk[];
+    private progress: ScenarioLoadProgress;
+    private startedAtMs: number;
+    private totalSliceMs: number;
+    // 连续写入期间每个切片与上一切片的间隔；队列排空（等待解析）时断开，不计入等待时间。
+    private sliceFrameMs: number[];
+    private lastSliceAtMs?: number;
+    private parseDone: boolean;
+    private onProgress?: (progress: ScenarioLoadProgress) => void;
+    private resolveLoad?: (progress: ScenarioLoadProgress) => void;
+
+    constructor(viewer: Viewer, unitLayer: TacticalUnitLayer, options: ScenarioStreamOptions) {
+        this.viewer = viewer;
+        this.unitLayer = unitLayer;
+        this.options = options;
+        this.colorCache = new Map();
+        this.generation = 0;
+        this.queue = [];
+        this.startedAtMs = 0;
+        this.totalSliceMs = 0;
+        this.sliceFrameMs = [];
+        this.parseDone = false;
+        this.progress = this.emptyProgress('idle');
+        if (options.useWorker && typeof Worker !== 'undefined') {
+            try {
+                this.worker = new Worker(new URL('./ScenarioStreamWorker.ts', import.meta.url), { type: 'module' });
+                this.worker.onmessage = (event: MessageEvent<ScenarioStreamResponse>) => this.onWorkerMessage(event.data);
+                this.worker.onerror = (event) => {
+                    console.error('ScenarioStreamLoader: worker error.', event.message);
+                    this.fail(event.message || 'worker error');
+                };
+            } catch (error) {
+                console.warn('ScenarioStreamLoader: worker unavailable, parsing on main thread.', error);
+                this.worker = undefined;
+            }
+        }
+        const onPreUpdate = (): void => this.applySlice();
+        viewer.scene.preUpdate.addEventListener(onPreUpdate);
+        this.removePreUpdate = () => viewer.scene.preUpdate.removeEventListener(onPreUpdate);
+    }
+
+    /**
+     * 开始加载；进行中的上一次加载会被取消。返回的 Promise 在全部单位写入图层、取消或失败时兑现。
+     * ArrayBuffer 源会转移给 Worker，调用后不可再使用。
+     */
+    public load(
+        source: ScenarioSource,
+        onProgress?: (progress: ScenarioLoadProgress) => void
+    ): Promise<ScenarioLoadProgress> {
+        this.cancel();
+        this.generation += 1;
+        const generation = this.generation;
+        this.queue = [];
+        this.totalSliceMs = 0;
+        this.sliceFrameMs = [];
+        this.lastSliceAtMs = undefined;
+        this.parseDone = false;
+        this.startedAtMs = performance.now();
+        this.progress = this.emptyProgress('loading');
+        this.onProgress = onProgress;
+        const finished = new Promise<ScenarioLoadProgress>((resolve) => {
+            this.resolveLoad = resolve;
+        });
+        if (this.worker) {
+            // Worker 内的 fetch 以 Worker 脚本地址为基准解析相对路径，URL 需先按页面地址解析为绝对地址。
+            const message: ScenarioStreamRequest = {
+                type: 'start',
+                generation,
+                source: typeof source === 'string' ? new URL(source, location.href).href : source,
+                chunkUnits: this.options.chunkUnits
+            };
+            this.worker.postMessage(message, source instanceof ArrayBuffer ? [source] : []);
+        } else {
+            void this.parseOnMainThread(generation, source);
+        }
+        this.viewer.scene.requestRender();
+        return finished;
+    }
+
+    public cancel(): void {
+        if (this.progress.state !== 'loading') return;
+        if (this.worker) {
+            const message: ScenarioStreamRequest = { type: 'cancel', generation: this.generation };
+            this.worker.postMessage(message);
+        }
+        // 递增代号，丢弃之后到达的旧块；已写入图层的单位保留，由调用方决定是否清空。
+        this.generation += 1;
+        this.queue = [];
+        this.settle('cancelled');
+    }
+
+    public getProgress(): ScenarioLoadProgress {
+        const elapsedMs = this.progress.state === 'loading'
+            ? performance.now() - this.startedAtMs
+            : this.progress.elapsedMs;
+        return {
+            ...this.progress,
+            queuedUnits: this.countQueuedUnits(),
+            elapsedMs,
+            unitsPerSecond: elapsedMs > 0 ? (this.progress.unitsApplied * 1000) / elapsedMs : 0
+        };
+    }
+
+    public destroy(): void {
+        this.cancel();
+        this.removePreUpdate();
+        this.worker?.terminate();
+        this.worker = undefined;
+    }
+
+    private onWorkerMessage(message: ScenarioStreamResponse): void {
+        if (message.generation !== this.generation || this.progress.state !== 'loading') return;
+        if (message.type === 'chunk') {
+            this.enqueue(message.chunk, message.bytesRead, message.totalBytes, message.totalUnits);
+        } else if (message.type === 'done') {
+            this.progress.bytesRead = message.bytesRead;
+            this.progress.rejected = message.rejected;
+            this.progress.parseMs = message.parseMs;
+            this.parseDone = true;
+            this.viewer.scene.requestRender();
+        } else {
+            this.fail(message.message);
+        }
+    }
+
+    private async parseOnMainThread(generation: number, source: ScenarioSource): Promise<void> {
+        const begin = performance.now();
+        let bytesRead = 0;
+        let totalBytes = 0;
+        const parser = new ScenarioStreamParser(this.options.chunkUnits, (chunk) =>
+            this.enqueue(chunk, bytesRead, totalBytes, parser.totalUnits)
+        );
+        const isCancelled = (): boolean => generation !== this.generation;
+        try {
+            await streamScenarioSource(source, parser, isCancelled, (read, total) => {
+                bytesRead = read;
+                totalBytes = total;
+            });
+            if (isCancelled()) return;
+            parser.finish();
+            this.progress.bytesRead = bytesRead;
+            this.progress.rejected = parser.rejected;
+            this.progress.parseMs = performance.now() - begin;
+            this.parseDone = true;
+            this.viewer.scene.requestRender();
+        } catch (error) {
+            if (isCancelled()) return;
+            this.fail(error instanceof Error ? error.message : String(error));
+        }
+    }
+
+    private enqueue(chunk: ScenarioUnitChunk, bytesRead: number, totalBytes: number, totalUnits: number): void {
+        this.queue.push({ chunk, cursor: 0 });
+        this.progress.unitsParsed += chunk.count;
+        this.progress.bytesRead = bytesRead;
+        this.progress.totalBytes = totalBytes;
+        this.progress.totalUnits = totalUnits;
+        this.viewer.scene.requestRender();
+    }
+
+    /**
+     * 每帧渲染前调用：按批写入单位，超出帧预算即停，剩余部分留到下一帧。
+     */
+    private applySlice(): void {
+        if (this.progress.state !== 'loading') return;
+        if (this.queue.length > 0) {
+            const begin = performance.now();
+            if (this.lastSliceAtMs !== undefined) {
+                this.sliceFrameMs.push(begin - this.lastSliceAtMs);
+            }
+            this.lastSliceAtMs = begin;
+            const batchSize = Math.max(1, this.options.unitsPerBatch);
+            let applied = 0;
+            while (this.queue.length > 0 && performance.now() - begin < this.options.frameBudgetMs) {
+                const entry = this.queue[0];
+                const end = Math.min(entry.chunk.count, entry.cursor + batchSize);
+                this.unitLayer.addUnits(this.buildSpecs(entry.chunk, entry.cursor, end));
+                applied += end - entry.cursor;
+                entry.cursor = end;
+                if (entry.cursor >= entry.chunk.count) {
+                    this.queue.shift();
+                }
+            }
+            const sliceMs = performance.now() - begin;
+            this.progress.unitsApplied += applied;
+            this.progress.slices += 1;
+            this.totalSliceMs += sliceMs;
+            this.progress.avgSliceMs = this.totalSliceMs / this.progress.slices;
+            this.progress.maxSliceMs = Math.max(this.progress.maxSliceMs, sliceMs);
+            this.onProgress?.(this.getProgress());
+        } else {
+            this.lastSliceAtMs = undefined;
+        }
+        if (this.queue.length === 0 && this.parseDone) {
+            this.settle('done');
+            console.log(
+                `ScenarioStreamLoader: ${this.progress.unitsApplied} units loaded in ${this.progress.elapsedMs.toFixed(0)}ms ` +
+                `(mode=${this.progress.mode}, rejected=${this.progress.rejected}, maxSlice=${this.progress.maxSliceMs.toFixed(2)}ms).`
+            );
+        }
+        // requestRenderMode 下队列未清空时继续出帧，推动下一批写入。
+        this.viewer.scene.requestRender();
+    }
+
+    private buildSpecs(chunk: ScenarioUnitChunk, start: number, end: number): TacticalUnitSpec[] {
+        const specs: TacticalUnitSpec[] = [];
+        for (let i = start; i < end; i += 1) {
+            const label = chunk.labels[i];
+            specs.push({
+                id: chunk.ids[i],
+                longitude: chunk.lonLatHeight[i * 3],
+                latitude: chunk.lonLatHeight[i * 3 + 1],
+                height: chunk.lonLatHeight[i * 3 + 2],
+                color: this.getColor(chunk.colors[i]),
+                pixelSize: chunk.pixelSizes[i],
+                clampToGround: (chunk.flags[i] & SCENARIO_FLAG_CLAMP_TO_GROUND) !== 0,
+                label: label || undefined
+            });
+        }
+        return specs;
+    }
+
+    private getColor(rgba: number): Color {
+        let color = this.colorCache.get(rgba);
+        if (!color) {
+            color = Color.fromBytes((rgba >>> 24) & 0xff, (rgba >>> 16) & 0xff, (rgba >>> 8) & 0xff, rgba & 0xff);
+            this.colorCache.set(rgba, color);
+        }
+        return color;
+    }
+
+    private countQueuedUnits(): number {
+        let queued = 0;
+        for (const entry of this.queue) {
+            queued += entry.chunk.count - entry.cursor;
+        }
+        return queued;
+    }
+
+    private fail(message: string): void {
+        if (this.progress.state !== 'loading') return;
+        console.error(`ScenarioStreamLoader: load failed: ${message}`);
+        this.generation += 1;
+        this.queue = [];
+        this.progress.error = message;
+        this.settle('failed');
+    }
+
+    private settle(state: ScenarioLoadState): void {
+        this.progress.elapsedMs = performance.now() - this.startedAtMs;
+        this.progress.lateFrameP99Ms = this.computeLateFrameP99();
+        this.progress.state = state;
+        const snapshot = this.getProgress();
+        this.onProgress?.(snapshot);
+        this.onProgress = undefined;
+        this.resolveLoad?.(snapshot);
+        this.resolveLoad = undefined;
+    }
+
+    private computeLateFrameP99(): number {
+        const count = this.sliceFrameMs.length;
+        if (count === 0) return 0;
+        const late = this.sliceFrameMs.slice(Math.floor(count * (1 - LATE_LOAD_SLICE_FRACTION))).sort((a, b) => a - b);
+        // nearest-rank：与 FrameTimeRecorder 口径一致。
+        return late[Math.min(late.length - 1, Math.max(0, Math.ceil(0.99 * late.length) - 1))];
+    }
+
+    private emptyProgress(state: ScenarioLoadState): ScenarioLoadProgress {
+        return {
+            state,
+            mode: this.worker ? 'worker' : 'main-thread',
+            bytesRead: 0,
+            totalBytes: 0,
+            unitsParsed: 0,
+            unitsApplied: 0,
+            totalUnits: 0,
+            rejected: 0,
+            queuedUnits: 0,
+            slices: 0,
+            avgSliceMs: 0,
+            maxSliceMs: 0,
+            lateFrameP99Ms: 0,
+            parseMs: 0,
+            elapsedMs: 0,
+            unitsPerSecond: 0
+        };
+    }
+}
@@ -0,0 +1,414 @@
+/**
+ * 想定流式加载：主线程加载器与 Worker 共用的数据格式、消息协议与增量解析器。
+ * 本文件不依赖 Cesium，Worker 打包时不引入渲染库。
+ *
+ * 支持两种输入，按前 4 字节自动识别：
+ * 1) NDJSON：每行一个单位 {"id","lon","lat","height"?,"color"?,"size"?,"label"?,"ground"?}，
+ *    color 为 #rgb/#rgba/#rrggbb/#rrggbbaa；可选首行 {"type":"header","units":N} 声明总数用于进度；
+ * 2) E3SU 二进制（小端）：16 字节头 "E3SU" | uint16 版本 | uint16 保留 | uint32 单位数（0 为未知）| uint32 保留，
+ *    随后逐条记录：float64 经度 | float64 纬度 | float32 高度 | uint32 RGBA | uint8 像素大小 | uint8 标志
+ *    （bit0 贴地）| uint16 id 字节数 | uint16 标签字节数 | UTF-8 id | UTF-8 标签。
+ */
+
+export type ScenarioSource = string | Blob | ArrayBuffer;
+
+/**
+ * 解析产出的单位块（列式）：数值列为类型化数组，可零拷贝转移回主线程。
+ */
+export interface ScenarioUnitChunk {
+    count: number;
+    ids: string[];
+    // 空字符串表示无标签。
+    labels: string[];
+    // [经度°, 纬度°, 高度m] 三元组序列。
+    lonLatHeight: Float64Array;
+    // 0xRRGGBBAA。
+    colors: Uint32Array;
+    pixelSizes: Uint8Array;
+    flags: Uint8Array;
+}
+
+export type ScenarioStreamRequest =
+    | {
+        type: 'start';
+        generation: number;
+        source: ScenarioSource;
+        chunkUnits: number;
+    }
+    | {
+        type: 'cancel';
+        generation: number;
+    };
+
+export type ScenarioStreamResponse =
+    | {
+        type: 'chunk';
+        generation: number;
+        chunk: ScenarioUnitChunk;
+        bytesRead: number;
+        totalBytes: number;
+        totalUnits: number;
+    }
+    | {
+        type: 'done';
+        generation: number;
+        bytesRead: number;
+        units: number;
+        rejected: number;
+        parseMs: number;
+    }
+    | {
+        type: 'error';
+        generation: number;
+        message: string;
+    };
+
+export const SCENARIO_BINARY_MAGIC = 'E3SU';
+export const SCENARIO_BINARY_VERSION = 1;
+export const SCENARIO_BINARY_HEADER_BYTES = 16;
+export const SCENARIO_RECORD_FIXED_BYTES = 30;
+export const SCENARIO_FLAG_CLAMP_TO_GROUND = 1;
+
+const DEFAULT_COLOR = 0xffffffff;
+const DEFAULT_PIXEL_SIZE = 10;
+// ArrayBuffer 输入按此大小分段解析，段间让出事件循环。
+const SLICE_BYTES = 256 * 1024;
+
+export function chunkTransferables(chunk: ScenarioUnitChunk): Transferable[] {
+    return [chunk.lonLatHeight.buffer, chunk.colors.buffer, chunk.pixelSizes.buffer, chunk.flags.buffer];
+}
+
+export function parseHexColor(value: unknown): number {
+    if (typeof value !== 'string' || value[0] !== '#') {
+        return DEFAULT_COLOR;
+    }
+    let hex = value.slice(1);
+    if (hex.length === 3 || hex.length === 4) {
+        hex = hex.split('').map((c) => c + c).join('');
+    }
+    if (hex.length === 6) {
+        hex += 'ff';
+    }
+    if (hex.length !== 8 || !/^[0-9a-fA-F]+$/.test(hex)) {
+        return DEFAULT_COLOR;
+    }
+    return parseInt(hex, 16) >>> 0;
+}
+
+/**
+ * 定长单位块的累加器：写满 capacity 个单位后整体交出。
+ */
+class ChunkBuilder {
+    private readonly capacity: number;
+    private chunk: ScenarioUnitChunk;
+
+    constructor(capacity: number) {
+        this.capacity = Math.max(1, Math.floor(capacity));
+        this.chunk = this.allocate();
+    }
+
+    public get count(): number {
+        return this.chunk.count;
+    }
+
+    public get full(): boolean {
+        return this.chunk.count >= this.capacity;
+    }
+
+    public push(
+        id: string,
+        lon: number,
+        lat: number,
+        height: number,
+        color: number,
+        pixelSize: number,
+        flags: number,
+        label: string
+    ): void {
+        const chunk = this.chunk;
+        const i = chunk.count;
+        chunk.ids.push(id);
+        chunk.labels.push(label);
+        chunk.lonLatHeight[i * 3] = lon;
+        chunk.lonLatHeight[i * 3 + 1] = lat;
+        chunk.lonLatHeight[i * 3 + 2] = height;
+        chunk.colors[i] = color;
+        chunk.pixelSizes[i] = pixelSize;
+        chunk.flags[i] = flags;
+        chunk.count = i + 1;
+    }
+
+    /**
+     * 交出当前块（数值列裁剪到实际长度）并换一块新的。
+     */
+    public take(): ScenarioUnitChunk {
+        const chunk = this.chunk;
+        this.chunk = this.allocate();
+        if (chunk.count === this.capacity) {
+            return chunk;
+        }
+        return {
+            count: chunk.count,
+            ids: chunk.ids,
+            labels: chunk.labels,
+            lonLatHeight: chunk.lonLatHeight.slice(0, chunk.count * 3),
+            colors: chunk.colors.slice(0, chunk.count),
+            pixelSizes: chunk.pixelSizes.slice(0, chunk.count),
+            flags: chunk.flags.slice(0, chunk.count)
+        };
+    }
+
+    private allocate(): ScenarioUnitChunk {
+        return {
+            count: 0,
+            ids: [],
+            labels: [],
+            lonLatHeight: new Float64Array(this.capacity * 3),
+            colors: new Uint32Array(this.capacity),
+            pixelSizes: new Uint8Array(this.capacity),
+            flags: new Uint8Array(this.capacity)
+        };
+    }
+}
+
+/**
+ * 增量解析器：按到达顺序 push 字节片段，每凑满一块回调一次；finish() 交出尾块。
+ * 格式由首批字节的 magic 决定，之后不再切换。
+ */
+export class ScenarioStreamParser {
+    private readonly builder: ChunkBuilder;
+    private readonly onChunk: (chunk: ScenarioUnitChunk) => void;
+    private readonly textDecoder: TextDecoder;
+    private format?: 'ndjson' | 'binary';
+    private pending: Uint8Array;
+    private pendingText: string;
+    private headerParsed: boolean;
+    public units: number;
+    public rejected: number;
+    public totalUnits: number;
+
+    constructor(chunkUnits: number, onChunk: (chunk: ScenarioUnitChunk) => void) {
+        this.builder = new ChunkBuilder(chunkUnits);
+        this.onChunk = onChunk;
+        this.textDecoder = new TextDecoder();
+        this.pending = new Uint8Array(0);
+        this.pendingText = '';
+        this.headerParsed = false;
+        this.units = 0;
+        this.rejected = 0;
+        this.totalUnits = 0;
+    }
+
+    public push(bytes: Uint8Array): void {
+        if (!this.format) {
+            this.pending = concatBytes(this.pending, bytes);
+            if (this.pending.length < SCENARIO_BINARY_MAGIC.length) return;
+            const magic = String.fromCharCode(...this.pending.subarray(0, SCENARIO_BINARY_MAGIC.length));
+            this.format = magic === SCENARIO_BINARY_MAGIC ? 'binary' : 'ndjson';
+            bytes = this.pending;
+            this.pending = new Uint8Array(0);
+        }
+        if (this.format === 'ndjson') {
+            this.pushText(this.textDecoder.decode(bytes, { stream: true }));
+        } else {
+            this.pushBinary(bytes);
+        }
+    }
+
+    public finish(): void {
+        if (!this.format && this.pending.length > 0) {
+            // 不足 4 字节的输入只可能是 NDJSON。
+            this.format = 'ndjson';
+            this.pushText(this.textDecoder.decode(this.pending, { stream: true }));
+            this.pending = new Uint8Array(0);
+        }
+        if (this.format === 'ndjson') {
+            this.pushText(this.textDecoder.decode());
+            if (this.pendingText.trim()) {
+                this.parseLine(this.pendingText);
+            }
+            this.pendingText = '';
+        } else if (this.pending.length > 0) {
+            // 二进制尾部残缺记录。
+            this.rejected += 1;
+            this.pending = new Uint8Array(0);
+        }
+        this.flush();
+    }
+
+    private pushText(text: string): void {
+        const buffered = this.pendingText + text;
+        let start = 0;
+        let newline = buffered.indexOf('\n', start);
+        while (newline >= 0) {
+            this.parseLine(buffered.slice(start, newline));
+            start = newline + 1;
+            newline = buffered.indexOf('\n', start);
+        }
+        this.pendingText = buffered.slice(start);
+    }
+
+    private parseLine(line: string): void {
+        const trimmed = line.trim();
+        if (!trimmed) return;
+        let record: Record<string, unknown>;
+        try {
+            record = JSON.parse(trimmed) as Record<string, unknown>;
+        } catch {
+            this.rejected += 1;
+            return;
+        }
+        if (record.type === 'header') {
+            this.totalUnits = Number(record.units) || 0;
+            return;
+        }
+        const lon = Number(record.lon);
+        const lat = Number(record.lat);
+        if (typeof record.id !== 'string' || !Number.isFinite(lon) || !Number.isFinite(lat)) {
+            this.rejected += 1;
+            return;
+        }
+        const height = Number(record.height ?? 0);
+        const size = Number(record.size ?? DEFAULT_PIXEL_SIZE);
+        this.emit(
+            record.id,
+            lon,
+            lat,
+            Number.isFinite(height) ? height : 0,
+            parseHexColor(record.color),
+            Number.isFinite(size) ? Math.min(255, Math.max(1, size)) : DEFAULT_PIXEL_SIZE,
+            record.ground === true ? SCENARIO_FLAG_CLAMP_TO_GROUND : 0,
+            typeof record.label === 'string' ? record.label : ''
+        );
+    }
+
+    private pushBinary(bytes: Uint8Array): void {
+        const buffer = this.pending.length > 0 ? concatBytes(this.pending, bytes) : bytes;
+        const view = new DataView(buffer.buffer, buffer.byteOffset, buffer.byteLength);
+        let offset = 0;
+        if (!this.headerParsed) {
+            if (buffer.length < SCENARIO_BINARY_HEADER_BYTES) {
+                this.pending = buffer.slice();
+                return;
+            }
+            const version = view.getUint16(4, true);
+            if (version !== SCENARIO_BINARY_VERSION) {
+                throw new Error(`ScenarioStreamParser: unsupported binary version ${version}.`);
+            }
+            this.totalUnits = view.getUint32(8, true);
+            this.headerParsed = true;
+            offset = SCENARIO_BINARY_HEADER_BYTES;
+        }
+        while (buffer.length - offset >= SCENARIO_RECORD_FIXED_BYTES) {
+            const idBytes = view.getUint16(offset + 26, true);
+            const labelBytes = view.getUint16(offset + 28, true);
+            const recordBytes = SCENARIO_RECORD_FIXED_BYTES + idBytes + labelBytes;
+            if (buffer.length - offset < recordBytes) break;
+            const textStart = offset + SCENARIO_RECORD_FIXED_BYTES;
+            this.emit(
+                this.textDecoder.decode(buffer.subarray(textStart, textStart + idBytes)),
+                view.getFloat64(offset, true),
+                view.getFloat64(offset + 8, true),
+                view.getFloat32(offset + 16, true),
+                view.getUint32(offset + 20, true),
+                view.getUint8(offset + 24),
+                view.getUint8(offset + 25),
+                labelBytes > 0
+                    ? this.textDecoder.decode(buffer.subarray(textStart + idBytes, textStart + idBytes + labelBytes))
+                    : ''
+            );
+            offset += recordBytes;
+        }
+        // 残缺记录留到下一片段；复制一份，避免持有整段输入。
+        this.pending = buffer.slice(offset);
+    }
+
+    private emit(
+        id: string,
+        lon: number,
+        lat: number,
+        height: number,
+        color: number,
+        pixelSize: number,
+        flags: number,
+        label: string
+    ): void {
+        this.builder.push(id, lon, lat, height, color, pixelSize, flags, label);
+        this.units += 1;
+        if (this.builder.full) {
+            this.flush();
+        }
+    }
+
+    private flush(): void {
+        if (this.builder.count > 0) {
+            this.onChunk(this.builder.take());
+        }
+    }
+}
+
+function concatBytes(a: Uint8Array, b: Uint8Array): Uint8Array {
+    if (a.length === 0) return b;
+    const merged = new Uint8Array(a.length + b.length);
+    merged.set(a, 0);
+    merged.set(b, a.length);
+    return merged;
+}
+
+function yieldToEventLoop(): Promise<void> {
+    return new Promise((resolve) => setTimeout(resolve, 0));
+}
+
+/**
+ * 逐段读取想定源（URL 走流式 fetch，Blob 走 stream()，ArrayBuffer 分段）并送入解析器。
+ * isCancelled 返回 true 时中止读取；onBytes 报告已读与总字节数（总数未知为 0）。
+ */
+export async function streamScenarioSource(
+    source: ScenarioSource,
+    parser: ScenarioStreamParser,
+    isCancelled: () => boolean,
+    onBytes: (bytesRead: number, totalBytes: number) => void
+): Promise<number> {
+    let bytesRead = 0;
+    if (source instanceof ArrayBuffer) {
+        const bytes = new Uint8Array(source);
+        for (let offset = 0; offset < bytes.length && !isCancelled(); offset += SLICE_BYTES) {
+            const slice = bytes.subarray(offset, Math.min(bytes.length, offset + SLICE_BYTES));
+            parser.push(slice);
+            bytesRead += slice.length;
+            onBytes(bytesRead, bytes.length);
+            await yieldToEventLoop();
+        }
+        return bytesRead;
+    }
+
+    let stream: ReadableStream<Uint8Array>;
+    let totalBytes = 0;
+    if (typeof source === 'string') {
+        const response = await fetch(source);
+        if (!response.ok || !response.body) {
+            throw new Error(`ScenarioStreamParser: HTTP ${response.status} for ${source}.`);
+        }
+        totalBytes = Number(response.headers.get('Content-Length')) || 0;
+        stream = response.body;
+    } else {
+        totalBytes = source.size;
+        stream = source.stream() as ReadableStream<Uint8Array>;
+    }
+    const reader = stream.getReader();
+    try {
+        while (!isCancelled()) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            parser.push(value);
+            bytesRead += value.length;
+            onBytes(bytesRead, totalBytes);
+        }
+    } finally {
+        if (isCancelled()) {
+            await reader.cancel().catch(() => undefined);
+        }
+        reader.releaseLock();
+    }
+    return bytesRead;
+}
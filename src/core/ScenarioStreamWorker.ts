@@ -0,0 +1,67 @@
+import {
+    chunkTransferables,
+    ScenarioStreamParser,
+    streamScenarioSource,
+    type ScenarioStreamRequest,
+    type ScenarioStreamResponse
+} from './ScenarioStreamProtocol';
+
+// tsconfig 只带 DOM 类型库，这里声明 Worker 全局作用域用到的最小接口。
+interface ScenarioWorkerScope {
+    onmessage: ((event: MessageEvent<ScenarioStreamRequest>) => void) | null;
+    postMessage(message: ScenarioStreamResponse, transfer?: Transferable[]): void;
+}
+
+const scope = self as unknown as ScenarioWorkerScope;
+
+// 最新一次 start 的代号；旧代号的读取循环在下一次读之前退出。
+let activeGeneration = 0;
+
+async function load(generation: number, request: Extract<ScenarioStreamRequest, { type: 'start' }>): Promise<void> {
+    const begin = performance.now();
+    let bytesRead = 0;
+    let totalBytes = 0;
+    const parser = new ScenarioStreamParser(request.chunkUnits, (chunk) => {
+        scope.postMessage(
+            { type: 'chunk', generation, chunk, bytesRead, totalBytes, totalUnits: parser.totalUnits },
+            chunkTransferables(chunk)
+        );
+    });
+    const isCancelled = (): boolean => generation !== activeGeneration;
+    try {
+        await streamScenarioSource(request.source, parser, isCancelled, (read, total) => {
+            bytesRead = read;
+            totalBytes = total;
+        });
+        if (isCancelled()) return;
+        parser.finish();
+        scope.postMessage({
+            type: 'done',
+            generation,
+            bytesRead,
+            units: parser.units,
+            rejected: parser.rejected,
+            parseMs: performance.now() - begin
+        });
+    } catch (error) {
+        if (isCancelled()) return;
+        scope.postMessage({
+            type: 'error',
+            generation,
+            message: error instanceof Error ? error.message : String(error)
+        });
+    }
+}
+
+scope.onmessage = (event) => {
+    const message = event.data;
+    if (message.type === 'cancel') {
+        // 代号从 1 开始，置 0 即令当前读取循环退出。
+        if (message.generation === activeGeneration) {
+            activeGeneration = 0;
+        }
+        return;
+    }
+    activeGeneration = message.generation;
+    void load(message.generation, message);
+};
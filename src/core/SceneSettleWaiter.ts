@@ -0,0 +1,164 @@
+import { Cartesian3, type Viewer } from 'cesium';
+
+export interface SceneSettleOptions {
+    // 相机静止且没有挂起的切档定时器。
+    lodSettled?: boolean;
+    // globe.tilesLoaded 为 true。
+    tilesLoaded?: boolean;
+    // 条件连续满足的渲染帧数。
+    frames?: number;
+    timeoutMs?: number;
+}
+
+export interface SceneSettleResult {
+    settled: boolean;
+    elapsedMs: number;
+    framesObserved: number;
+    tilesLoaded: boolean;
+    lodPending: boolean;
+}
+
+interface PendingWait {
+    options: Required<SceneSettleOptions>;
+    startedAtMs: number;
+    stableFrames: number;
+    framesObserved: number;
+    timeout: ReturnType<typeof setTimeout>;
+    resolve: (result: SceneSettleResult) => void;
+}
+
+const CAMERA_EPSILON = 1e-6;
+
+/**
+ * 场景稳定等待
+ * 由 camera.moveEnd、切档定时器回调与 globe.tileLoadProgressEvent 驱动请求渲染，
+ * 在 postRender 中判断条件，替代测试脚本里固定时长的 sleep 轮询。
+ */
+export class SceneSettleWaiter {
+    private viewer: Viewer;
+    private isLodPending: () => boolean;
+    private waits: PendingWait[];
+    private heartbeat?: ReturnType<typeof setInterval>;
+    private lastCameraPosition: Cartesian3;
+    private lastCameraDirection: Cartesian3;
+    private cameraMovedInLastFrame: boolean;
+    private readonly removeListeners: Array<() => void>;
+
+    constructor(viewer: Viewer, isLodPending: () => boolean) {
+        this.viewer = viewer;
+        this.isLodPending = isLodPending;
+        this.waits = [];
+        this.lastCameraPosition = Cartesian3.clone(viewer.camera.positionWC);
+        this.lastCameraDirection = Cartesian3.clone(viewer.camera.directionWC);
+        this.cameraMovedInLastFrame = false;
+
+        const { scene } = viewer;
+        const wake = (): void => this.notify();
+        const onPostRender = (): void => this.onFrameRendered();
+        scene.postRender.addEventListener(onPostRender);
+        scene.camera.moveEnd.addEventListener(wake);
+        scene.globe.tileLoadProgressEvent.addEventListener(wake);
+        this.removeListeners = [
+            () => scene.postRender.removeEventListener(onPostRender),
+            () => scene.camera.moveEnd.removeEventListener(wake),
+            () => scene.globe.tileLoadProgressEvent.removeEventListener(wake)
+        ];
+    }
+
+    public wait(options: SceneSettleOptions = {}): Promise<SceneSettleResult> {
+        return new Promise((resolve) => {
+            const resolved: Required<SceneSettleOptions> = {
+                lodSettled: options.lodSettled ?? true,
+                tilesLoaded: options.tilesLoaded ?? true,
+                frames: Math.max(1, Math.floor(options.frames ?? 2)),
+                timeoutMs: options.timeoutMs ?? 10000
+            };
+            const pending: PendingWait = {
+                options: resolved,
+                startedAtMs: performance.now(),
+                stableFrames: 0,
+                framesObserved: 0,
+                timeout: setTimeout(() => this.finish(pending, false), resolved.timeoutMs),
+                resolve
+            };
+            this.waits.push(pending);
+            this.ensureHeartbeat();
+            this.notify();
+        });
+    }
+
+    /**
+     * 有可能改变稳定状态的事件发生时调用（按需渲染模式下需要主动请求一帧来重新判定）。
+     */
+    public notify(): void {
+        if (this.waits.length > 0 && !this.viewer.isDestroyed()) {
+            this.viewer.scene.requestRender();
+        }
+    }
+
+    public destroy(): void {
+        for (const remove of this.removeListeners) {
+            remove();
+        }
+        for (const pending of [...this.waits]) {
+            this.finish(pending, false);
+        }
+    }
+
+    private onFrameRendered(): void {
+        const camera = this.viewer.camera;
+        this.cameraMovedInLastFrame =
+            !Cartesian3.equalsEpsilon(camera.positionWC, this.lastCameraPosition, CAMERA_EPSILON, CAMERA_EPSILON) ||
+            !Cartesian3.equalsEpsilon(camera.directionWC, this.lastCameraDirection, CAMERA_EPSILON, CAMERA_EPSILON);
+        Cartesian3.clone(camera.positionWC, this.lastCameraPosition);
+        Cartesian3.clone(camera.directionWC, this.lastCameraDirection);
+        if (this.waits.length === 0) {
+            return;
+        }
+
+        const tilesLoaded = this.viewer.scene.globe.tilesLoaded;
+        const lodPending = this.isLodPending();
+        for (const pending of [...this.waits]) {
+            pending.framesObserved += 1;
+            const lodOk = !pending.options.lodSettled || (!lodPending && !this.cameraMovedInLastFrame);
+            const tilesOk = !pending.options.tilesLoaded || tilesLoaded;
+            pending.stableFrames = lodOk && tilesOk ? pending.stableFrames + 1 : 0;
+            if (pending.stableFrames >= pending.options.frames) {
+                this.finish(pending, true);
+            }
+        }
+        if (this.waits.some((pending) => pending.stableFrames > 0)) {
+            // 已进入稳定计数时连续请求帧，凑满所需的帧数。
+            this.viewer.scene.requestRender();
+        }
+    }
+
+    private ensureHeartbeat(): void {
+        if (this.heartbeat) {
+            return;
+        }
+        // 兜底心跳：防止在没有任何事件触发时（例如防抖定时器刚结束）等待挂起。
+        this.heartbeat = setInterval(() => this.notify(), 100);
+    }
+
+    private finish(pending: PendingWait, settled: boolean): void {
+        const index = this.waits.indexOf(pending);
+        if (index < 0) {
+            return;
+        }
+        this.waits.splice(index, 1);
+        clearTimeout(pending.timeout);
+        if (this.waits.length === 0 && this.heartbeat) {
+            clearInterval(this.heartbeat);
+            this.heartbeat = undefined;
+        }
+        const destroyed = this.viewer.isDestroyed();
+        pending.resolve({
+            settled,
+            elapsedMs: performance.now() - pending.startedAtMs,
+            framesObserved: pending.framesObserved,
+            tilesLoaded: !destroyed && this.viewer.scene.globe.tilesLoaded,
+            lodPending: !destroyed && this.isLodPending()
+        });
+    }
+}
@@ -0,0 +1,148 @@
+import type { Viewer, TerrainProvider, TerrainData } from 'cesium';
+import type { TerrainLodProfileName } from '../config';
+
+export interface StartupWarmupOptions {
+    framesPerProfile: number;
+    prefetchMaxLevel: number;
+    tilesPerIdleSlice: number;
+    frameTimeoutMs: number;
+}
+
+export interface StartupWarmupReport {
+    enabled: boolean;
+    profilesCompiled: TerrainLodProfileName[];
+    tilesRequested: number;
+    tilesDecoded: number;
+    tilesFailed: number;
+    durationMs: number;
+}
+
+/**
+ * 启动预热
+ * 1) 逐档套用各 LOD 档位的材质/图层组合并渲染若干帧，让地表着色器变体在加载阶段完成编译；
+ * 2) 在空闲时间片中预取本地 terrain 根层级瓦片并解码，提前拉起网络连接与解码 worker。
+ */
+export class StartupWarmup {
+    private viewer: Viewer;
+    private options: StartupWarmupOptions;
+
+    constructor(viewer: Viewer, options: StartupWarmupOptions) {
+        this.viewer = viewer;
+        this.options = options;
+    }
+
+    public async precompileProfiles(
+        profiles: TerrainLodProfileName[],
+        applyProfile: (profile: TerrainLodProfileName) => void,
+        shouldContinue: () => boolean = () => true
+    ): Promise<TerrainLodProfileName[]> {
+        const compiled: TerrainLodProfileName[] = [];
+        for (const profile of profiles) {
+            // 预热期间用户已切档时立即停止，避免后续档位覆盖用户选择的真实状态。
+            if (this.viewer.isDestroyed() || !shouldContinue()) {
+                break;
+            }
+            applyProfile(profile);
+            await this.waitFrames(this.options.framesPerProfile);
+            compiled.push(profile);
+        }
+        return compiled;
+    }
+
+    public async prefetchRootTiles(
+        provider: TerrainProvider
+    ): Promise<{ requested: number; decoded: number; failed: number }> {
+        const tilingScheme = provider.tilingScheme;
+        const tiles: Array<{ x: number; y: number; level: number }> = [];
+        for (let level = 0; level <= this.options.prefetchMaxLevel; level += 1) {
+            const nx = tilingScheme.getNumberOfXTilesAtLevel(level);
+            const ny = tilingScheme.getNumberOfYTilesAtLevel(level);
+            for (let y = 0; y < ny; y += 1) {
+                for (let x = 0; x < nx; x += 1) {
+                    if (provider.getTileDataAvailable(x, y, level) !== false) {
+                        tiles.push({ x, y, level });
+                    }
+                }
+            }
+        }
+
+        let decoded = 0;
+        let failed = 0;
+        const sliceSize = Math.max(1, this.options.tilesPerIdleSlice);
+        for (let i = 0; i < tiles.length; i += sliceSize) {
+            if (this.viewer.isDestroyed()) {
+                break;
+            }
+            await this.nextIdleSlice();
+            const slice = tiles.slice(i, i + sliceSize);
+            const results = await Promise.allSettled(
+                slice.map(async ({ x, y, level }) => {
+                    const data = await provider.requestTileGeometry(x, y, level);
+                    if (!data) {
+                        throw new Error(`tile ${level}/${x}/${y} unavailable`);
+                    }
+                    await this.decodeTile(data, provider, x, y, level);
+                })
+            );
+            for (const result of results) {
+                if (result.status === 'fulfilled') {
+                    decoded += 1;
+                } else {
+                    failed += 1;
+                }
+            }
+        }
+        return { requested: tiles.length, decoded, failed };
+    }
+
+    private async decodeTile(
+        data: TerrainData,
+        provider: TerrainProvider,
+        x: number,
+        y: number,
+        level: number
+    ): Promise<void> {
+        // createMesh 走 Cesium 的解码 worker；预热阶段关闭节流，保证每个根瓦片都真正解码一次。
+        await data.createMesh({
+            tilingScheme: provider.tilingScheme,
+            x,
+            y,
+            level,
+            throttle: false
+        });
+    }
+
+    private waitFrames(count: number): Promise<void> {
+        const { scene } = this.viewer;
+        return new Promise((resolve) => {
+            let remaining = Math.max(1, count);
+            const finish = (): void => {
+                clearTimeout(timeout);
+                scene.postRender.removeEventListener(onFrame);
+                resolve();
+            };
+            const onFrame = (): void => {
+                remaining -= 1;
+                if (remaining <= 0) {
+                    finish();
+                } else {
+                    scene.requestRender();
+                }
+            };
+            // 标签页在后台时 rAF 暂停，超时后放行，避免预热永远挂起。
+            const timeout = setTimeout(finish, this.options.frameTimeoutMs);
+            scene.postRender.addEventListener(onFrame);
+            scene.requestRender();
+        });
+    }
+
+    private nextIdleSlice(): Promise<void> {
+        return new Promise((resolve) => {
+            if (typeof requestIdleCallback === 'function') {
+                requestIdleCallback(() => resolve(), { timeout: 200 });
+            } else {
+                setTimeout(resolve, 16);
+            }
+        });
+    }
+}
@@ -2,17 +2,28 @@ import {
     Viewer,
     Color,
     Cartesian3,
-    CallbackPositionProperty,
     JulianDate,
-    LabelStyle,
-    HeightReference,
+    Math as CesiumMath,
     HorizontalOrigin,
     VerticalOrigin,
     Cartesian2,
-    Math as CesiumMath,
     PolylineDashMaterialProperty,
-    type Entity
+    Material,
+    PolylineCollection,
+    Rectangle,
+    type Entity,
+    type Scene
 } from 'cesium';
+import { AppConfig, type TacticalOverlayBackend, type TerrainLodProfileName } from '../config';
+import type { TacticalMaterialOptions } from '../themes/tacticalMaterial';
+import { RangeVolumeLayer } from './RangeVolumeLayer';
+import { ScenarioStreamLoader, type ScenarioLoadProgress } from './ScenarioStreamLoader';
+import type { ScenarioSource } from './ScenarioStreamProtocol';
+import { TrackKinematicsEngine, type TrackKinematicsStats } from './TrackKinematicsEngine';
+import { buildRouteTable } from './TrackKinematicsProtocol';
+import { TrackTrailLayer, type TrackTrailStats } from './TrackTrailLayer';
+import type { NearestUnit, UnitSpatialIndexStats } from './UnitSpatialIndex';
+import { UnitEntityLayer, UnitPrimitiveLayer, type TacticalUnitLayer, type TacticalUnitSpec } from './TacticalUnitLayer';
 
 interface Waypoint {
     lon: number;
@@ -28,82 +39,388 @@ interface AirTrackSpec {
     waypoints: Waypoint[];
 }
 
+interface GroundUnitSpec {
+    id: string;
+    lon: number;
+    lat: number;
+    color: string;
+}
+
+// 参考网格范围（度）[west, south, east, north]。
+const RED_FLAG_GRID_BOUNDS: [number, number, number, number] = [-118.95, 36.15, -117.55, 36.92];
+
+const RED_FLAG_GROUND_UNITS: GroundUnitSpec[] = [
+    { id: 'SAM-A', lon: -118.54, lat: 36.36, color: '#ffcf66' },
+    { id: 'SAM-B', lon: -118.22, lat: 36.48, color: '#ffcf66' },
+    { id: 'EW-1', lon: -117.95, lat: 36.62, color: '#ff5f5f' },
+    { id: 'CMD', lon: -118.67, lat: 36.58, color: '#8affc9' }
+];
+
+function createRedFlagAirTracks(): AirTrackSpec[] {
+    return [
+        {
+            id: 'BLUE-11',
+            callsign: 'BLUE-11',
+            color: Color.fromCssColorString('#4be6ff'),
+            speed: 0.22,
+            waypoints: [
+                { lon: -118.84, lat: 36.26, alt: 7100 },
+                { lon: -118.45, lat: 36.48, alt: 7600 },
+                { lon: -118.05, lat: 36.64, alt: 7300 },
+                { lon: -117.78, lat: 36.80, alt: 6900 }
+            ]
+        },
+        {
+            id: 'BLUE-12',
+            callsign: 'BLUE-12',
+            color: Color.fromCssColorString('#52f5d2'),
+            speed: 0.20,
+            waypoints: [
+                { lon: -118.92, lat: 36.17, alt: 6600 },
+                { lon: -118.58, lat: 36.33, alt: 6900 },
+                { lon: -118.22, lat: 36.52, alt: 6700 },
+                { lon: -117.90, lat: 36.70, alt: 6400 }
+            ]
+        },
+        {
+            id: 'RED-31',
+            callsign: 'RED-31',
+            color: Color.fromCssColorString('#ff57b0'),
+            speed: 0.24,
+            waypoints: [
+                { lon: -117.74, lat: 36.38, alt: 6200 },
+                { lon: -118.03, lat: 36.49, alt: 6400 },
+                { lon: -118.32, lat: 36.57, alt: 6000 },
+                { lon: -118.56, lat: 36.68, alt: 5900 }
+            ]
+        }
+    ];
+}
+
 /**
  * 战术态势叠加层管理器：
  * 负责绘制演示用途的航迹、编队、地面阵位与战术网格。
+ * 两种后端：primitive 把单位/线条批量放入图元集合（面向大规模实体）；entity 为原 Entity 实现，作为兼容回退。
  */
 export class TacticalOverlayManager {
     private readonly viewer: Viewer;
+    private readonly backend: TacticalOverlayBackend;
     private readonly entities: Entity[] = [];
+    private readonly unitLayer: TacticalUnitLayer;
+    private readonly staticPolylines: PolylineCollection;
+    private readonly trails: TrackTrailLayer;
+    private readonly rangeVolumes: RangeVolumeLayer;
+    private readonly scenarioLoader: ScenarioStreamLoader;
+    private referenceGridBounds?: [number, number, number, number];
+    private removeTrackAnimation?: () => void;
+    private kinematics?: TrackKinematicsEngine;
     private scenarioStart?: JulianDate;
+    private readonly removeLabelRefresh: () => void;
+    private readonly viewRectangle: Rectangle;
+    private lastLabelRefreshMs: number;
+    private visibleLabelCount: number;
 
-    constructor(viewer: Viewer) {
+    constructor(
+        viewer: Viewer,
+        backend: TacticalOverlayBackend = AppConfig.tacticalOverlay.backend,
+        getMetersPerPixel: () => number = () => Number.NaN
+    ) {
         this.viewer = viewer;
+        this.backend = backend;
+        this.unitLayer = backend === 'primitive' ? new UnitPrimitiveLayer(viewer) : new UnitEntityLayer(viewer);
+        this.staticPolylines = viewer.scene.primitives.add(new PolylineCollection());
+        this.trails = new TrackTrailLayer(viewer);
+        this.rangeVolumes = new RangeVolumeLayer(viewer, getMetersPerPixel);
+        this.scenarioLoader = new ScenarioStreamLoader(viewer, this.unitLayer, AppConfig.tacticalOverlay.scenarioStream);
+        this.viewRectangle = new Rectangle();
+        this.lastLabelRefreshMs = Number.NEGATIVE_INFINITY;
+        this.visibleLabelCount = 0;
+        const onPreUpdate = (): void => this.refreshVisibleLabels();
+        viewer.scene.preUpdate.addEventListener(onPreUpdate);
+        this.removeLabelRefresh = () => viewer.scene.preUpdate.removeEventListener(onPreUpdate);
+    }
+
+    public getBackend(): TacticalOverlayBackend {
+        return this.backend;
+    }
+
+    /**
+     * 单位图层：供仿真数据按 id 批量增删改单位。
+     */
+    public getUnitLayer(): TacticalUnitLayer {
+        return this.unitLayer;
+    }
+
+    /**
+     * 作用范围体图层：供仿真数据按 id 批量增删改雷达/武器范围。
+     */
+    public getRangeVolumeLayer(): RangeVolumeLayer {
+        return this.rangeVolumes;
+    }
+
+    public getTrackKinematicsStats(): TrackKinematicsStats | undefined {
+        return this.kinematics?.getStats();
+    }
+
+    public getTrackTrailStats(): TrackTrailStats {
+        return this.trails.getStats();
+    }
+
+    public getUnitIndexStats(): UnitSpatialIndexStats & { visibleLabels: number } {
+        return { ...this.unitLayer.spatialIndex.getStats(), visibleLabels: this.visibleLabelCount };
+    }
+
+    /**
+     * 最近单位（经纬度为度，距离为米）。
+     */
+    public findNearestUnit(longitude: number, latitude: number, maxDistanceMeters?: number): NearestUnit | undefined {
+        return this.unitLayer.spatialIndex.nearest(longitude, latitude, maxDistanceMeters);
+    }
+
+    /**
+     * 半径内的单位，按距离升序（用于框选）。
+     */
+    public queryUnitsInRadius(longitude: number, latitude: number, radiusMeters: number): NearestUnit[] {
+        return this.unitLayer.spatialIndex.queryRadius(longitude, latitude, radiusMeters);
+    }
+
+    /**
+     * 参考网格的材质参数：场景开启时返回网格范围与当前档位的间距，由 TacticalViewer 合并进地表材质风格。
+     */
+    public getReferenceGridStyle(profile: TerrainLodProfileName): Partial<TacticalMaterialOptions> {
+        if (!this.referenceGridBounds) {
+            return {};
+        }
+        const grid = AppConfig.tacticalOverlay.referenceGrid;
+        return {
+            enableReferenceGrid: true,
+            referenceGridSpacing: grid.spacingByLod[profile],
+            referenceGridBounds: this.referenceGridBounds,
+            colorReferenceGrid: grid.color,
+            referenceGridAlpha: grid.alpha,
+            referenceGridWidth: grid.widthPx
+        };
+    }
+
+    /**
+     * LOD 档位变化时调整尾迹抽稀（global 档不绘制）与范围体细分上限。
+     */
+    public setLodProfile(profile: TerrainLodProfileName): void {
+        this.trails.setLodProfile(profile);
+        this.rangeVolumes.setLodProfile(profile);
     }
 
     public applyRedFlagScenario(): void {
         this.clear();
         this.scenarioStart = JulianDate.now();
-        this.addGroundGrid();
-        this.addAirCorridors();
+        this.referenceGridBounds = RED_FLAG_GRID_BOUNDS;
+        // 单位统一经 unitLayer（两种后端都维护空间索引），只有航线/走廊折线按后端分别绘制。
+        const tracks = createRedFlagAirTracks();
+        if (this.backend === 'primitive') {
+            this.addAirCorridorsPrimitive();
+            this.addPlannedRoutesPrimitive(tracks);
+        } else {
+            this.addAirCorridors();
+            this.addPlannedRoutes(tracks);
+        }
         this.addGroundUnits();
-        this.addAirTracks();
-        console.log('TacticalOverlay: Red Flag scenario applied.');
+        this.addAirTracks(tracks);
+        this.viewer.scene.requestRender();
+        console.log(`TacticalOverlay: Red Flag scenario applied (backend=${this.backend}).`);
+    }
+
+    /**
+     * 流式加载外部想定（NDJSON 或 E3SU 二进制的 URL / Blob / ArrayBuffer），替换当前叠加层内容。
+     * 解析在 Worker 中进行，单位按帧预算分批写入图层。
+     */
+    public loadScenarioStream(
+        source: ScenarioSource,
+        onProgress?: (progress: ScenarioLoadProgress) => void
+    ): Promise<ScenarioLoadProgress> {
+        this.clear();
+        console.log(`TacticalOverlay: streaming scenario (backend=${this.backend}).`);
+        return this.scenarioLoader.load(source, onProgress);
+    }
+
+    public getScenarioLoadProgress(): ScenarioLoadProgress {
+        return this.scenarioLoader.getProgress();
+    }
+
+    public cancelScenarioLoad(): void {
+        this.scenarioLoader.cancel();
     }
 
     public clear(): void {
+        this.scenarioLoader.cancel();
         for (const entity of this.entities) {
             this.viewer.entities.remove(entity);
         }
         this.entities.length = 0;
+        this.removeTrackAnimation?.();
+        this.removeTrackAnimation = undefined;
+        this.kinematics?.setRoutes(buildRouteTable([]));
+        this.trails.clear();
+        this.unitLayer.clear();
+        this.rangeVolumes.clear();
+        this.staticPolylines.removeAll();
+        this.referenceGridBounds = undefined;
+        this.visibleLabelCount = 0;
+    }
+
+    /**
+     * 标签裁剪与避让：按固定间隔从空间索引取视口内单位，屏幕上每个避让格只保留一个标签，并限制总数。
+     * 视口外与被避让的单位只隐藏标签，点/图标仍由各自集合绘制。
+     */
+    private refreshVisibleLabels(): void {
+        const settings = AppConfig.tacticalOverlay.unitIndex;
+        const index = this.unitLayer.spatialIndex;
+        const now = performance.now();
+        if (index.size === 0 || now - this.lastLabelRefreshMs < settings.labelRefreshMs) {
+            return;
+        }
+        this.lastLabelRefreshMs = now;
+        const { camera, canvas } = this.viewer.scene;
+        const rect = camera.computeViewRectangle(this.viewer.scene.globe.ellipsoid, this.viewRectangle);
+        const west = rect ? CesiumMath.toDegrees(rect.west) : -180.0;
+        const south = rect ? CesiumMath.toDegrees(rect.south) : -90.0;
+        const east = rect ? CesiumMath.toDegrees(rect.east) : 180.0;
+        const north = rect ? CesiumMath.toDegrees(rect.north) : 90.0;
+        const candidates = index.queryRectangle(west, south, east, north);
+
+        // 以视口经纬跨度换算避让格的度数（近似俯视，倾斜视角下远处格子偏大，只会更稀疏）。
+        const lonSpan = west > east ? east + 360.0 - west : east - west;
+        const binLon = Math.max(1e-6, (lonSpan * settings.labelDeclutterPx) / Math.max(1, canvas.clientWidth));
+        const binLat = Math.max(1e-6, ((north - south) * settings.labelDeclutterPx) / Math.max(1, canvas.clientHeight));
+        const occupied = new Set<number>();
+        const visible = new Set<string>();
+        for (const id of candidates) {
+            if (visible.size >= settings.maxLabels) break;
+            const position = index.getPosition(id);
+            if (!position) continue;
+            const lonOffset = position.lon >= west ? position.lon - west : position.lon + 360.0 - west;
+            const bin = Math.floor(lonOffset / binLon) * 100003 + Math.floor((position.lat - south) / binLat);
+            if (occupied.has(bin)) continue;
+            occupied.add(bin);
+            visible.add(id);
+        }
+        this.unitLayer.setVisibleLabels(visible);
+        this.visibleLabelCount = visible.size;
     }
 
     public destroy(): void {
+        this.removeLabelRefresh();
         this.clear();
+        this.scenarioLoader.destroy();
+        this.unitLayer.destroy();
+        this.trails.destroy();
+        this.rangeVolumes.destroy();
+        this.kinematics?.destroy();
+        this.kinematics = undefined;
+        this.viewer.scene.primitives.remove(this.staticPolylines);
     }
 
-    private addGroundGrid(): void {
-        const west = -118.95;
-        const east = -117.55;
-        const south = 36.15;
-        const north = 36.92;
-        const lonStep = 0.11;
-        const latStep = 0.09;
-        const gridColor = Color.fromCssColorString('#f4c76a').withAlpha(0.30);
-
-        for (let lon = west; lon <= east + 1e-6; lon += lonStep) {
-            const entity = this.viewer.entities.add({
-                name: 'RedFlag.Grid.Lon',
-                polyline: {
-                    positions: Cartesian3.fromDegreesArray([
-                        lon, south,
-                        lon, north
-                    ]),
-                    width: 1.15,
-                    clampToGround: true,
-                    material: gridColor
-                }
+    private addAirCorridorsPrimitive(): void {
+        const corridorColor = Color.fromCssColorString('#4ae8ff').withAlpha(0.78);
+        const strikeColor = Color.fromCssColorString('#ff45a1').withAlpha(0.82);
+        const lines: Array<{ positions: number[]; width: number; color: Color }> = [
+            { positions: [-118.78, 36.35, 6200, -118.42, 36.55, 6800, -118.05, 36.70, 6400], width: 10.5, color: corridorColor },
+            { positions: [-118.72, 36.22, 6200, -118.34, 36.40, 6600, -117.95, 36.58, 6200], width: 10.5, color: corridorColor },
+            { positions: [-118.18, 36.28, 5200, -117.86, 36.45, 5600], width: 5.0, color: strikeColor }
+        ];
+        for (const line of lines) {
+            this.staticPolylines.add({
+                positions: Cartesian3.fromDegreesArrayHeights(line.positions),
+                width: line.width,
+                material: Material.fromType('Color', { color: line.color })
             });
-            this.entities.push(entity);
         }
+    }
 
-        for (let lat = south; lat <= north + 1e-6; lat += latStep) {
-            const entity = this.viewer.entities.add({
-                name: 'RedFlag.Grid.Lat',
-                polyline: {
-                    positions: Cartesian3.fromDegreesArray([
-                        west, lat,
-                        east, lat
-                    ]),
-                    width: 1.15,
-                    clampToGround: true,
-                    material: gridColor
-                }
+    private addGroundUnits(): void {
+        const specs: TacticalUnitSpec[] = RED_FLAG_GROUND_UNITS.map((unit) => ({
+            id: unit.id,
+            longitude: unit.lon,
+            latitude: unit.lat,
+            height: 1400.0,
+            color: Color.fromCssColorString(unit.color),
+            pixelSize: 15,
+            outlineWidth: 2,
+            clampToGround: true,
+            label: unit.id
+        }));
+        this.unitLayer.addUnits(specs);
+    }
+
+    private addPlannedRoutesPrimitive(tracks: AirTrackSpec[]): void {
+        for (const spec of tracks) {
+            this.staticPolylines.add({
+                positions: Cartesian3.fromDegreesArrayHeights(spec.waypoints.flatMap((p) => [p.lon, p.lat, p.alt])),
+                width: 2.4,
+                material: Material.fromType('PolylineDash', {
+                    color: spec.color.withAlpha(0.65),
+                    dashLength: 18.0,
+                    dashPattern: 255
+                })
             });
-            this.entities.push(entity);
         }
     }
 
+    private addAirTracks(tracks: AirTrackSpec[]): void {
+        this.unitLayer.addUnits(tracks.map((spec) => ({
+            id: spec.id,
+            longitude: spec.waypoints[0].lon,
+            latitude: spec.waypoints[0].lat,
+            height: spec.waypoints[0].alt,
+            color: spec.color,
+            pixelSize: 16,
+            outlineColor: Color.WHITE.withAlpha(0.92),
+            outlineWidth: 1.5,
+            label: spec.callsign,
+            labelFont: '700 13px "JetBrains Mono", monospace',
+            labelOffset: new Cartesian2(15, -12),
+            labelHorizontalOrigin: HorizontalOrigin.LEFT,
+            labelVerticalOrigin: VerticalOrigin.CENTER
+        })));
+
+        // 运动学引擎输出的 ECEF 缓冲直接批量写入单位图层。
+        const ids = tracks.map((spec) => spec.id);
+        this.startTrackKinematics(tracks, (positions) => this.unitLayer.updateCartesianPositions(ids, positions));
+    }
+
+    /**
+     * 航线交给运动学引擎（默认在 Worker 中推进），每帧渲染前读取上一帧结果写入尾迹并投递当前仿真时间。
+     * requestRenderMode 下只在仿真时间前进至少 maximumRenderTimeChange 时写入位置（写入会请求渲染），
+     * 其余 tick 不改动图元，避免航迹存在时场景持续出帧。
+     */
+    private startTrackKinematics(tracks: AirTrackSpec[], onPositions?: (positions: Float64Array) => void): void {
+        if (!this.kinematics) {
+            this.kinematics = new TrackKinematicsEngine(AppConfig.perf.trackKinematics);
+            console.log(`TacticalOverlay: track kinematics mode=${this.kinematics.getMode()}.`);
+        }
+        const kinematics = this.kinematics;
+        kinematics.setRoutes(buildRouteTable(tracks));
+        this.trails.setTracks(tracks.map((spec) => spec.color));
+        let lastPushedSeconds = Number.NEGATIVE_INFINITY;
+        const onPreUpdate = (scene: Scene, time: JulianDate): void => {
+            if (!this.scenarioStart) return;
+            const positions = kinematics.getPositions();
+            if (positions) {
+                const frameSeconds = kinematics.getFrameSeconds();
+                const minAdvance = scene.requestRenderMode ? scene.maximumRenderTimeChange : 0.0;
+                // 仿真时间回拨（重置时钟）时立即写入。
+                if (frameSeconds < lastPushedSeconds || frameSeconds - lastPushedSeconds >= minAdvance) {
+                    lastPushedSeconds = frameSeconds;
+                    onPositions?.(positions);
+                    this.trails.append(positions, frameSeconds);
+                }
+            }
+            kinematics.step(Math.max(0.0, JulianDate.secondsDifference(time, this.scenarioStart)));
+        };
+        const scene = this.viewer.scene;
+        scene.preUpdate.addEventListener(onPreUpdate);
+        this.removeTrackAnimation = () => scene.preUpdate.removeEventListener(onPreUpdate);
+    }
+
     private addAirCorridors(): void {
         const corridorColor = Color.fromCssColorString('#4ae8ff').withAlpha(0.78);
         const strikeColor = Color.fromCssColorString('#ff45a1').withAlpha(0.82);
@@ -145,83 +462,8 @@ export class TacticalOverlayManager {
         this.entities.push(corridorA, corridorB, strikeAxis);
     }
 
-    private addGroundUnits(): void {
-        const units = [
-            { id: 'SAM-A', lon: -118.54, lat: 36.36, color: '#ffcf66' },
-            { id: 'SAM-B', lon: -118.22, lat: 36.48, color: '#ffcf66' },
-            { id: 'EW-1', lon: -117.95, lat: 36.62, color: '#ff5f5f' },
-            { id: 'CMD', lon: -118.67, lat: 36.58, color: '#8affc9' }
-        ];
-        for (const unit of units) {
-            const entity = this.viewer.entities.add({
-                name: `RedFlag.Ground.${unit.id}`,
-                position: Cartesian3.fromDegrees(unit.lon, unit.lat, 1400.0),
-                point: {
-                    pixelSize: 15,
-                    color: Color.fromCssColorString(unit.color),
-                    outlineColor: Color.BLACK.withAlpha(0.8),
-                    outlineWidth: 2,
-                    heightReference: HeightReference.CLAMP_TO_GROUND,
-                    disableDepthTestDistance: Number.POSITIVE_INFINITY
-                },
-                label: {
-                    text: unit.id,
-                    font: '600 13px "JetBrains Mono", monospace',
-                    fillColor: Color.fromCssColorString(unit.color),
-                    outlineColor: Color.BLACK.withAlpha(0.9),
-                    outlineWidth: 2,
-                    style: LabelStyle.FILL_AND_OUTLINE,
-                    pixelOffset: new Cartesian2(0, -18),
-                    horizontalOrigin: HorizontalOrigin.CENTER,
-                    verticalOrigin: VerticalOrigin.BOTTOM,
-                    disableDepthTestDistance: Number.POSITIVE_INFINITY
-                }
-            });
-            this.entities.push(entity);
-        }
-    }
-
-    private addAirTracks(): void {
-        const specs: AirTrackSpec[] = [
-            {
-                id: 'BLUE-11',
-                callsign: 'BLUE-11',
-                color: Color.fromCssColorString('#4be6ff'),
-                speed: 0.22,
-                waypoints: [
-                    { lon: -118.84, lat: 36.26, alt: 7100 },
-                    { lon: -118.45, lat: 36.48, alt: 7600 },
-                    { lon: -118.05, lat: 36.64, alt: 7300 },
-                    { lon: -117.78, lat: 36.80, alt: 6900 }
-                ]
-            },
-            {
-                id: 'BLUE-12',
-                callsign: 'BLUE-12',
-                color: Color.fromCssColorString('#52f5d2'),
-                speed: 0.20,
-                waypoints: [
-                    { lon: -118.92, lat: 36.17, alt: 6600 },
-                    { lon: -118.58, lat: 36.33, alt: 6900 },
-                    { lon: -118.22, lat: 36.52, alt: 6700 },
-                    { lon: -117.90, lat: 36.70, alt: 6400 }
-                ]
-            },
-            {
-                id: 'RED-31',
-                callsign: 'RED-31',
-                color: Color.fromCssColorString('#ff57b0'),
-                speed: 0.24,
-                waypoints: [
-                    { lon: -117.74, lat: 36.38, alt: 6200 },
-                    { lon: -118.03, lat: 36.49, alt: 6400 },
-                    { lon: -118.32, lat: 36.57, alt: 6000 },
-                    { lon: -118.56, lat: 36.68, alt: 5900 }
-                ]
-            }
-        ];
-
-        for (const spec of specs) {
+    private addPlannedRoutes(tracks: AirTrackSpec[]): void {
+        for (const spec of tracks) {
             const plannedRoute = this.viewer.entities.add({
                 name: `RedFlag.Route.${spec.callsign}`,
                 polyline: {
@@ -237,68 +479,6 @@ export class TacticalOverlayManager {
                 }
             });
             this.entities.push(plannedRoute);
-
-            const position = new CallbackPositionProperty((time?: JulianDate) => {
-                if (!this.scenarioStart) return Cartesian3.fromDegrees(spec.waypoints[0].lon, spec.waypoints[0].lat, spec.waypoints[0].alt);
-                if (!time) return Cartesian3.fromDegrees(spec.waypoints[0].lon, spec.waypoints[0].lat, spec.waypoints[0].alt);
-                const elapsedSeconds = Math.max(0.0, JulianDate.secondsDifference(time, this.scenarioStart));
-                const progress = (elapsedSeconds * spec.speed) % 1.0;
-                return this.interpolateWaypoint(spec.waypoints, progress);
-            }, false);
-
-            const track = this.viewer.entities.add({
-                id: spec.id,
-                name: `RedFlag.Air.${spec.callsign}`,
-                position,
-                point: {
-                    pixelSize: 16,
-                    color: spec.color,
-                    outlineColor: Color.WHITE.withAlpha(0.92),
-                    outlineWidth: 1.5,
-                    disableDepthTestDistance: Number.POSITIVE_INFINITY
-                },
-                path: {
-                    width: 4.0,
-                    leadTime: 0,
-                    trailTime: 180,
-                    material: spec.color.withAlpha(0.55),
-                    resolution: 1
-                },
-                label: {
-                    text: spec.callsign,
-                    font: '700 13px "JetBrains Mono", monospace',
-                    fillColor: spec.color,
-                    outlineColor: Color.BLACK.withAlpha(0.92),
-                    outlineWidth: 2,
-                    style: LabelStyle.FILL_AND_OUTLINE,
-                    pixelOffset: new Cartesian2(15, -12),
-                    horizontalOrigin: HorizontalOrigin.LEFT,
-                    verticalOrigin: VerticalOrigin.CENTER,
-                    disableDepthTestDistance: Number.POSITIVE_INFINITY
-                }
-            });
-            this.entities.push(track);
-        }
-    }
-
-    private interpolateWaypoint(waypoints: Waypoint[], progress: number): Cartesian3 {
-        const pointCount = waypoints.length;
-        if (pointCount === 0) {
-            return Cartesian3.fromDegrees(-118.30, 36.58, 6000.0);
-        }
-        if (pointCount === 1) {
-            const p = waypoints[0];
-            return Cartesian3.fromDegrees(p.lon, p.lat, p.alt);
         }
-        const scaled = progress * pointCount;
-        const startIndex = Math.floor(scaled) % pointCount;
-        const endIndex = (startIndex + 1) % pointCount;
-        const t = scaled - Math.floor(scaled);
-        const a = waypoints[startIndex];
-        const b = waypoints[endIndex];
-        const lon = CesiumMath.lerp(a.lon, b.lon, t);
-        const lat = CesiumMath.lerp(a.lat, b.lat, t);
-        const alt = CesiumMath.lerp(a.alt, b.alt, t);
-        return Cartesian3.fromDegrees(lon, lat, alt);
     }
 }
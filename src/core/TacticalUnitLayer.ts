@@ -0,0 +1,510 @@
+import {
+    BillboardCollection,
+    Cartesian2,
+    Cartesian3,
+    Color,
+    ConstantPositionProperty,
+    ConstantProperty,
+    Ellipsoid,
+    HeightReference,
+    HorizontalOrigin,
+    LabelCollection,
+    LabelStyle,
+    PointPrimitiveCollection,
+    PrimitiveCollection,
+    VerticalOrigin,
+    type Billboard,
+    type Entity,
+    type Label,
+    type PointPrimitive,
+    type Viewer
+} from 'cesium';
+import { AppConfig } from '../config';
+import { UnitSpatialIndex } from './UnitSpatialIndex';
+
+/**
+ * 态势单位描述（经纬度为度，高度为米）。
+ */
+export interface TacticalUnitSpec {
+    id: string;
+    longitude: number;
+    latitude: number;
+    height: number;
+    color: Color;
+    pixelSize?: number;
+    outlineColor?: Color;
+    outlineWidth?: number;
+    // 提供图标时以 billboard 绘制，否则绘制圆点。
+    image?: string;
+    // 贴地单位：高度由地形决定（随垂直夸张一起变化）。
+    clampToGround?: boolean;
+    label?: string;
+    labelFont?: string;
+    labelOffset?: Cartesian2;
+    labelHorizontalOrigin?: HorizontalOrigin;
+    // 缺省 BOTTOM（标签在点上方）；航迹标签与点并排时用 CENTER。
+    labelVerticalOrigin?: VerticalOrigin;
+}
+
+/**
+ * 单位图层：按 id 增删改，位置以类型化数组批量更新。
+ */
+export interface TacticalUnitLayer {
+    readonly size: number;
+    // 随增删改同步维护的经纬度空间索引。
+    readonly spatialIndex: UnitSpatialIndex;
+    addUnits(specs: TacticalUnitSpec[]): void;
+    /**
+     * lonLatHeight 为 [经度°, 纬度°, 高度m] 三元组序列，顺序与 ids 对应；未知 id 忽略。
+     */
+    updatePositions(ids: readonly string[], lonLatHeight: Float64Array): void;
+    /**
+     * xyz 为 ECEF 坐标三元组序列（米），顺序与 ids 对应；用于运动学引擎直接输出的位置缓冲。
+     */
+    updateCartesianPositions(ids: readonly string[], xyz: Float64Array): void;
+    removeUnits(ids: readonly string[]): number;
+    has(id: string): boolean;
+    /**
+     * 只显示给定单位的标签；传入 undefined 恢复全部显示。
+     */
+    setVisibleLabels(ids: ReadonlySet<string> | undefined): void;
+    clear(): void;
+    destroy(): void;
+}
+
+const DEFAULT_PIXEL_SIZE = 12;
+const DEFAULT_LABEL_FONT = '600 13px "JetBrains Mono", monospace';
+const DEFAULT_LABEL_OFFSET = new Cartesian2(0, -18);
+
+function assertPositionBuffer(ids: readonly string[], lonLatHeight: Float64Array): void {
+    if (lonLatHeight.length < ids.length * 3) {
+        throw new RangeError(`TacticalUnitLayer: expected ${ids.length * 3} position values, got ${lonLatHeight.length}.`);
+    }
+}
+
+// 一组图元集合：集合内增删会整组重建顶点缓冲，按固定容量分组使单帧上传量与单位总数无关。
+interface UnitChunk {
+    points: PointPrimitiveCollection;
+    billboards: BillboardCollection;
+    labels: LabelCollection;
+    count: number;
+}
+
+interface UnitPrimitives {
+    chunk: UnitChunk;
+    point?: PointPrimitive;
+    billboard?: Billboard;
+    label?: Label;
+}
+
+/**
+ * 批量图元后端：单位按 primitiveChunkUnits 分组，每组共用一套 PointPrimitiveCollection/BillboardCollection/LabelCollection，
+ * 每个集合一次绘制调用，位置更新只改写图元属性，不经过 Entity 的 Property 求值与可视化器同步。
+ * 新单位写入第一个未满的分组，流式加载时每帧只有接收新单位的分组重建顶点缓冲。
+ */
+export class UnitPrimitiveLayer implements TacticalUnitLayer {
+    private readonly viewer: Viewer;
+    private readonly chunkUnits: number;
+    // 标记与标签分属两个父集合，后建分组的圆点也不会盖住先建分组的标签。
+    private readonly markerRoot: PrimitiveCollection;
+    private readonly labelRoot: PrimitiveCollection;
+    private chunks: UnitChunk[];
+    private readonly units: Map<string, UnitPrimitives>;
+    private readonly dotImages: Map<string, string>;
+    private readonly scratchPosition: Cartesian3;
+    private visibleLabels?: ReadonlySet<string>;
+    public readonly spatialIndex: UnitSpatialIndex;
+
+    constructor(viewer: Viewer) {
+        this.viewer = viewer;
+        this.spatialIndex = new UnitSpatialIndex(AppConfig.tacticalOverlay.unitIndex.cellDegrees);
+        this.chunkUnits = Math.max(1, AppConfig.tacticalOverlay.primitiveChunkUnits);
+        this.markerRoot = viewer.scene.primitives.add(new PrimitiveCollection());
+        this.labelRoot = viewer.scene.primitives.add(new PrimitiveCollection());
+        this.chunks = [];
+        this.units = new Map();
+        this.dotImages = new Map();
+        this.scratchPosition = new Cartesian3();
+    }
+
+    public get size(): number {
+        return this.units.size;
+    }
+
+    public addUnits(specs: TacticalUnitSpec[]): void {
+        for (const spec of specs) {
+            if (this.units.has(spec.id)) {
+                this.removeUnits([spec.id]);
+            }
+            const position = Cartesian3.fromDegrees(spec.longitude, spec.latitude, spec.height);
+            const heightReference = spec.clampToGround ? HeightReference.CLAMP_TO_GROUND : HeightReference.NONE;
+            const chunk = this.acquireChunk();
+            const entry: UnitPrimitives = { chunk };
+            if (spec.image || spec.clampToGround) {
+                // PointPrimitive 不支持贴地，贴地单位改用圆点图标的 billboard。
+                entry.billboard = chunk.billboards.add({
+                    id: spec.id,
+                    position,
+                    image: spec.image ?? this.getDotImage(spec),
+                    color: spec.image ? spec.color : Color.WHITE,
+                    heightReference,
+                    disableDepthTestDistance: Number.POSITIVE_INFINITY
+                });
+            } else {
+                entry.point = chunk.points.add({
+                    id: spec.id,
+                    position,
+                    pixelSize: spec.pixelSize ?? DEFAULT_PIXEL_SIZE,
+                    color: spec.color,
+                    outlineColor: spec.outlineColor ?? Color.BLACK.withAlpha(0.8),
+                    outlineWidth: spec.outlineWidth ?? 1.5,
+                    disableDepthTestDistance: Number.POSITIVE_INFINITY
+                });
+            }
+            if (spec.label) {
+                entry.label = chunk.labels.add({
+                    id: spec.id,
+                    position,
+                    // 已启用标签裁剪时，新单位沿用当前可见集合，等待下一次刷新。
+                    show: !this.visibleLabels || this.visibleLabels.has(spec.id),
+                    text: spec.label,
+                    font: spec.labelFont ?? DEFAULT_LABEL_FONT,
+                    fillColor: spec.color,
+                    outlineColor: Color.BLACK.withAlpha(0.9),
+                    outlineWidth: 2,
+                    style: LabelStyle.FILL_AND_OUTLINE,
+                    pixelOffset: spec.labelOffset ?? DEFAULT_LABEL_OFFSET,
+                    horizontalOrigin: spec.labelHorizontalOrigin ?? HorizontalOrigin.CENTER,
+                    verticalOrigin: spec.labelVerticalOrigin ?? VerticalOrigin.BOTTOM,
+                    heightReference,
+                    disableDepthTestDistance: Number.POSITIVE_INFINITY
+                });
+            }
+            chunk.count += 1;
+            this.units.set(spec.id, entry);
+            this.spatialIndex.upsert(spec.id, spec.longitude, spec.latitude);
+        }
+        this.viewer.scene.requestRender();
+    }
+
+    public updatePositions(ids: readonly string[], lonLatHeight: Float64Array): void {
+        assertPositionBuffer(ids, lonLatHeight);
+        const position = this.scratchPosition;
+        for (let i = 0; i < ids.length; i += 1) {
+            const entry = this.units.get(ids[i]);
+            if (!entry) continue;
+            const offset = i * 3;
+            Cartesian3.fromDegrees(
+                lonLatHeight[offset],
+                lonLatHeight[offset + 1],
+                lonLatHeight[offset + 2],
+                Ellipsoid.WGS84,
+                position
+            );
+            this.applyPosition(entry, position);
+            this.spatialIndex.upsert(ids[i], lonLatHeight[offset], lonLatHeight[offset + 1]);
+        }
+        this.viewer.scene.requestRender();
+    }
+
+    public updateCartesianPositions(ids: readonly string[], xyz: Float64Array): void {
+        assertPositionBuffer(ids, xyz);
+        const position = this.scratchPosition;
+        for (let i = 0; i < ids.length; i += 1) {
+            const entry = this.units.get(ids[i]);
+            if (!entry) continue;
+            this.applyPosition(entry, Cartesian3.fromArray(xyz, i * 3, position));
+            this.spatialIndex.upsertCartesian(ids[i], position.x, position.y, position.z);
+        }
+        this.viewer.scene.requestRender();
+    }
+
+    public removeUnits(ids: readonly string[]): number {
+        let removed = 0;
+        for (const id of ids) {
+            const entry = this.units.get(id);
+            if (!entry) continue;
+            const { chunk } = entry;
+            if (entry.point) chunk.points.remove(entry.point);
+            if (entry.billboard) chunk.billboards.remove(entry.billboard);
+            if (entry.label) chunk.labels.remove(entry.label);
+            chunk.count -= 1;
+            this.units.delete(id);
+            this.spatialIndex.remove(id);
+            removed += 1;
+        }
+        if (removed > 0) {
+            this.viewer.scene.requestRender();
+        }
+        return removed;
+    }
+
+    public has(id: string): boolean {
+        return this.units.has(id);
+    }
+
+    public setVisibleLabels(ids: ReadonlySet<string> | undefined): void {
+        const previous = this.visibleLabels;
+        this.visibleLabels = ids;
+        // 只改动可见性发生变化的标签；无变化时不请求渲染。
+        let changed = 0;
+        if (previous && ids) {
+            for (const id of previous) {
+                if (!ids.has(id)) changed += this.setLabelShow(id, false);
+            }
+            for (const id of ids) {
+                if (!previous.has(id)) changed += this.setLabelShow(id, true);
+            }
+        } else {
+            for (const id of this.units.keys()) {
+                changed += this.setLabelShow(id, !ids || ids.has(id));
+            }
+        }
+        if (changed > 0) {
+            this.viewer.scene.requestRender();
+        }
+    }
+
+    public clear(): void {
+        // PrimitiveCollection.removeAll 默认会销毁各分组的集合。
+        this.markerRoot.removeAll();
+        this.labelRoot.removeAll();
+        this.chunks = [];
+        this.units.clear();
+        this.spatialIndex.clear();
+        this.visibleLabels = undefined;
+        this.viewer.scene.requestRender();
+    }
+
+    public destroy(): void {
+        this.clear();
+        const primitives = this.viewer.scene.primitives;
+        // PrimitiveCollection.remove 默认会销毁被移除的集合。
+        primitives.remove(this.markerRoot);
+        primitives.remove(this.labelRoot);
+    }
+
+    /**
+     * 第一个未满的分组；全部已满时新建一组。
+     */
+    private acquireChunk(): UnitChunk {
+        for (const chunk of this.chunks) {
+            if (chunk.count < this.chunkUnits) return chunk;
+        }
+        const { scene } = this.viewer;
+        // 传入 scene 以支持 heightReference 贴地。
+        const chunk: UnitChunk = {
+            points: this.markerRoot.add(new PointPrimitiveCollection()),
+            billboards: this.markerRoot.add(new BillboardCollection({ scene })),
+            labels: this.labelRoot.add(new LabelCollection({ scene })),
+            count: 0
+        };
+        this.chunks.push(chunk);
+        return chunk;
+    }
+
+    private setLabelShow(id: string, show: boolean): number {
+        const label = this.units.get(id)?.label;
+        if (!label || label.show === show) return 0;
+        label.show = show;
+        return 1;
+    }
+
+    private applyPosition(entry: UnitPrimitives, position: Cartesian3): void {
+        // 图元的 position setter 会拷贝传入值，可复用同一个 scratch。
+        if (entry.point) entry.point.position = position;
+        if (entry.billboard) entry.billboard.position = position;
+        if (entry.label) entry.label.position = position;
+    }
+
+    /**
+     * 按颜色/尺寸生成圆点图标；以 data URL 作为图像 id，同样式单位在纹理图集中共用一份。
+     */
+    private getDotImage(spec: TacticalUnitSpec): string {
+        const pixelSize = spec.pixelSize ?? DEFAULT_PIXEL_SIZE;
+        const outlineWidth = spec.outlineWidth ?? 1.5;
+        const outlineColor = spec.outlineColor ?? Color.BLACK.withAlpha(0.8);
+        const key = `${spec.color.toCssColorString()}|${pixelSize}|${outlineWidth}|${outlineColor.toCssColorString()}`;
+        const cached = this.dotImages.get(key);
+        if (cached) {
+            return cached;
+        }
+        const size = Math.ceil(pixelSize + outlineWidth * 2);
+        const canvas = document.createElement('canvas');
+        canvas.width = size;
+        canvas.height = size;
+        const ctx = canvas.getContext('2d');
+        if (ctx) {
+            ctx.beginPath();
+            ctx.arc(size / 2, size / 2, pixelSize / 2, 0, Math.PI * 2);
+            ctx.fillStyle = spec.color.toCssColorString();
+            ctx.fill();
+            if (outlineWidth > 0) {
+                ctx.lineWidth = outlineWidth;
+                ctx.strokeStyle = outlineColor.toCssColorString();
+                ctx.stroke();
+            }
+        }
+        const url = canvas.toDataURL();
+        this.dotImages.set(key, url);
+        return url;
+    }
+}
+
+/**
+ * Entity 回退后端：接口与批量后端一致，便于在兼容性问题时切回 Entity API。
+ */
+export class UnitEntityLayer implements TacticalUnitLayer {
+    private readonly viewer: Viewer;
+    private readonly units: Map<string, Entity>;
+    private readonly scratchPosition: Cartesian3;
+    private readonly labelShown: Map<string, boolean>;
+    public readonly spatialIndex: UnitSpatialIndex;
+
+    constructor(viewer: Viewer) {
+        this.viewer = viewer;
+        this.units = new Map();
+        this.labelShown = new Map();
+        this.scratchPosition = new Cartesian3();
+        this.spatialIndex = new UnitSpatialIndex(AppConfig.tacticalOverlay.unitIndex.cellDegrees);
+    }
+
+    public get size(): number {
+        return this.units.size;
+    }
+
+    public addUnits(specs: TacticalUnitSpec[]): void {
+        const entities = this.viewer.entities;
+        entities.suspendEvents();
+        try {
+            for (const spec of specs) {
+                if (this.units.has(spec.id)) {
+                    this.removeUnits([spec.id]);
+                }
+                const heightReference = spec.clampToGround ? HeightReference.CLAMP_TO_GROUND : HeightReference.NONE;
+                const entity = entities.add({
+                    // 加前缀，避免与场景中其他 Entity 的 id 冲突。
+                    id: `Unit.${spec.id}`,
+                    position: new ConstantPositionProperty(
+                        Cartesian3.fromDegrees(spec.longitude, spec.latitude, spec.height)
+                    ),
+                    point: spec.image ? undefined : {
+                        pixelSize: spec.pixelSize ?? DEFAULT_PIXEL_SIZE,
+                        color: spec.color,
+                        outlineColor: spec.outlineColor ?? Color.BLACK.withAlpha(0.8),
+                        outlineWidth: spec.outlineWidth ?? 1.5,
+                        heightReference,
+                        disableDepthTestDistance: Number.POSITIVE_INFINITY
+                    },
+                    billboard: spec.image ? {
+                        image: spec.image,
+                        color: spec.color,
+                        heightReference,
+                        disableDepthTestDistance: Number.POSITIVE_INFINITY
+                    } : undefined,
+                    label: spec.label ? {
+                        text: spec.label,
+                        font: spec.labelFont ?? DEFAULT_LABEL_FONT,
+                        fillColor: spec.color,
+                        outlineColor: Color.BLACK.withAlpha(0.9),
+                        outlineWidth: 2,
+                        style: LabelStyle.FILL_AND_OUTLINE,
+                        pixelOffset: spec.labelOffset ?? DEFAULT_LABEL_OFFSET,
+                        horizontalOrigin: spec.labelHorizontalOrigin ?? HorizontalOrigin.CENTER,
+                        verticalOrigin: spec.labelVerticalOrigin ?? VerticalOrigin.BOTTOM,
+                        heightReference,
+                        disableDepthTestDistance: Number.POSITIVE_INFINITY
+                    } : undefined
+                });
+                this.units.set(spec.id, entity);
+                this.spatialIndex.upsert(spec.id, spec.longitude, spec.latitude);
+            }
+        } finally {
+            entities.resumeEvents();
+        }
+        this.viewer.scene.requestRender();
+    }
+
+    public updatePositions(ids: readonly string[], lonLatHeight: Float64Array): void {
+        assertPositionBuffer(ids, lonLatHeight);
+        for (let i = 0; i < ids.length; i += 1) {
+            const entity = this.units.get(ids[i]);
+            if (!entity) continue;
+            const offset = i * 3;
+            const position = Cartesian3.fromDegrees(lonLatHeight[offset], lonLatHeight[offset + 1], lonLatHeight[offset + 2]);
+            this.applyPosition(entity, position);
+            this.spatialIndex.upsert(ids[i], lonLatHeight[offset], lonLatHeight[offset + 1]);
+        }
+        this.viewer.scene.requestRender();
+    }
+
+    public updateCartesianPositions(ids: readonly string[], xyz: Float64Array): void {
+        assertPositionBuffer(ids, xyz);
+        const position = this.scratchPosition;
+        for (let i = 0; i < ids.length; i += 1) {
+            const entity = this.units.get(ids[i]);
+            if (!entity) continue;
+            this.applyPosition(entity, Cartesian3.fromArray(xyz, i * 3, position));
+            this.spatialIndex.upsertCartesian(ids[i], position.x, position.y, position.z);
+        }
+        this.viewer.scene.requestRender();
+    }
+
+    public removeUnits(ids: readonly string[]): number {
+        let removed = 0;
+        for (const id of ids) {
+            const entity = this.units.get(id);
+            if (!entity) continue;
+            this.viewer.entities.remove(entity);
+            this.units.delete(id);
+            this.labelShown.delete(id);
+            this.spatialIndex.remove(id);
+            removed += 1;
+        }
+        if (removed > 0) {
+            this.viewer.scene.requestRender();
+        }
+        return removed;
+    }
+
+    public has(id: string): boolean {
+        return this.units.has(id);
+    }
+
+    public setVisibleLabels(ids: ReadonlySet<string> | undefined): void {
+        const entities = this.viewer.entities;
+        let changed = 0;
+        entities.suspendEvents();
+        try {
+            for (const [id, entity] of this.units) {
+                const show = !ids || ids.has(id);
+                if (!entity.label || this.labelShown.get(id) === show) continue;
+                entity.label.show = new ConstantProperty(show);
+                this.labelShown.set(id, show);
+                changed += 1;
+            }
+        } finally {
+            entities.resumeEvents();
+        }
+        if (changed > 0) {
+            this.viewer.scene.requestRender();
+        }
+    }
+
+    public clear(): void {
+        this.removeUnits([...this.units.keys()]);
+    }
+
+    public destroy(): void {
+        this.clear();
+    }
+
+    private applyPosition(entity: Entity, position: Cartesian3): void {
+        // ConstantPositionProperty.setValue 拷贝传入值，不保留引用。
+        if (entity.position instanceof ConstantPositionProperty) {
+            entity.position.setValue(position);
+        } else {
+            entity.position = new ConstantPositionProperty(Cartesian3.clone(position));
+        }
+    }
+}
@@ -22,9 +22,26 @@ import {
 } from '../config';
 import { ThemeManager } from '../themes/ThemeManager';
 import type { TacticalMaterialOptions } from '../themes/tacticalMaterial';
-import { DataManager } from '../data';
+import { DataManager, type HeightCacheStats, type LocationInfo } from '../data';
 import { HudManager, type HudMode, type HudMetrics } from '../ui/HudManager';
 import { TacticalOverlayManager } from './TacticalOverlayManager';
+import type { TacticalUnitSpec } from './TacticalUnitLayer';
+import type { RangeVolumeSpec, RangeVolumeStats, RangeVolumeUpdate } from './RangeVolumeLayer';
+import type { TrackKinematicsStats } from './TrackKinematicsEngine';
+import type { TrackTrailStats } from './TrackTrailLayer';
+import type { NearestUnit, UnitSpatialIndexStats } from './UnitSpatialIndex';
+import { FrameTimeRecorder, type FrameTimeStats } from './FrameTimeRecorder';
+import { CameraPathPlayer } from './CameraPathPlayer';
+import { FrameCapture, type FrameCaptureOptions, type FrameCaptureResult } from './FrameCapture';
+import { HudPickScheduler, type HudPipelineStats } from './HudPickScheduler';
+import { CameraMetricsCache, type CameraMetrics, type CameraMetricsCacheStats } from './CameraMetricsCache';
+import { SceneSettleWaiter, type SceneSettleOptions, type SceneSettleResult } from './SceneSettleWaiter';
+import { StartupWarmup, type StartupWarmupReport } from './StartupWarmup';
+import { TerrainPrefetcher, type TerrainPrefetchStats } from './TerrainPrefetcher';
+import { TilePipelineTelemetry, type TilePipelineStats } from './TilePipelineTelemetry';
+import type { ScenarioLoadProgress } from './ScenarioStreamLoader';
+import type { ScenarioSource } from './ScenarioStreamProtocol';
+import { LodSwitchTracer, type LodSwitchPhaseName, type LodSwitchPhaseSpan, type LodSwitchTraceEntry } from './LodSwitchTracer';
 
 /**
  * 战术视图配置接口
@@ -63,6 +80,8 @@ export class TacticalViewer {
     public viewer: Viewer;
     private themeManager: ThemeManager;
     private initPromise: Promise<void>;
+    private warmupPromise: Promise<StartupWarmupReport>;
+    private resolveWarmup!: (report: StartupWarmupReport) => void;
     private baseLayerEnabled: boolean;
     private baseMapUrl: string;
     private tacticalStyle: TacticalMaterialOptions;
@@ -100,7 +119,17 @@ export class TacticalViewer {
     private perfRecentWindowStartMs: number;
     private perfRecentFrameCount: number;
     private perfRecentFps: number;
+    private frameTimeRecorder: FrameTimeRecorder;
+    private lodSwitchTracer: LodSwitchTracer;
+    private sceneSettleWaiter: SceneSettleWaiter;
+    private terrainPrefetcher: TerrainPrefetcher;
+    private tilePipeline: TilePipelineTelemetry;
+    private cameraPathPlayer: CameraPathPlayer;
+    private frameCapture: FrameCapture;
+    private hudPickScheduler: HudPickScheduler;
+    private cameraMetrics: CameraMetricsCache;
     private readonly onPostRender: () => void;
+    private readonly onPostUpdate: () => void;
 
     constructor(containerId: string, config: TacticalConfig = {}) {
         // 合并配置与默认值
@@ -136,8 +165,21 @@ export class TacticalViewer {
         this.perfRecentWindowStartMs = this.perfStartTimeMs;
         this.perfRecentFrameCount = 0;
         this.perfRecentFps = 0;
+        this.frameTimeRecorder = new FrameTimeRecorder(AppConfig.perf.frameTime);
+        this.lodSwitchTracer = new LodSwitchTracer(
+            AppConfig.perf.lodSwitchTrace.historySize,
+            AppConfig.perf.lodSwitchTrace.settleTimeoutMs
+        );
+        this.onPostUpdate = () => {
+            this.frameTimeRecorder.recordTick(performance.now());
+        };
         this.onPostRender = () => {
             const now = performance.now();
+            this.cameraMetrics.onFrameRendered();
+            this.frameTimeRecorder.recordFrame(now);
+            const tilesLoaded = this.viewer.scene.globe.tilesLoaded;
+            this.lodSwitchTracer.onFrameRendered(now, tilesLoaded);
+            this.tilePipeline.onFrameRendered(now, tilesLoaded);
             this.perfFrameCount += 1;
             this.perfRecentFrameCount += 1;
             const windowMs = now - this.perfRecentWindowStartMs;
@@ -171,7 +213,8 @@ export class TacticalViewer {
                 webgl: {
                     alpha: true, // Allow background to show through if nothing is rendered
                     antialias: true,
-                    preserveDrawingBuffer: true // Required for pixel reading in some drivers
+                    // 像素读取改由 FrameCapture 在 postRender 内完成，无需常驻保留绘制缓冲。
+                    preserveDrawingBuffer: AppConfig.perf.frameCapture.preserveDrawingBuffer
                 }
             }
         });
@@ -182,18 +225,34 @@ export class TacticalViewer {
         this.viewer.scene.backgroundColor = Color.DARKBLUE;
         this.viewer.scene.globe.baseColor = Color.DARKGRAY;
         this.viewer.scene.globe.show = true;
+        this.viewer.scene.postUpdate.addEventListener(this.onPostUpdate);
         this.viewer.scene.postRender.addEventListener(this.onPostRender);
 
         // Force initial view: full globe with geocenter near screen center
         this.applyInitialView();
 
-        this.themeManager = new ThemeManager(this.viewer);
+        this.themeManager = new ThemeManager(this.viewer, AppConfig.perf.materialCache.maxEntries);
         this.dataManager = new DataManager(this.viewer);
         this.dataManager.setQueryLevel(this.currentLodConfig.queryLevel);
-        this.diagnostics = new VisualDiagnostics(this.viewer);
-        this.overlayManager = new TacticalOverlayManager(this.viewer);
+        this.cameraMetrics = new CameraMetricsCache(this.viewer, () => this.estimateCenterMetersPerPixel());
+        this.frameCapture = new FrameCapture(this.viewer);
+        this.diagnostics = new VisualDiagnostics(this.viewer, this.frameCapture);
+        this.overlayManager = new TacticalOverlayManager(
+            this.viewer,
+            AppConfig.tacticalOverlay.backend,
+            () => this.cameraMetrics.getCenterMetersPerPixel()
+        );
+        this.overlayManager.setLodProfile(this.currentLodProfile);
+        this.terrainPrefetcher = new TerrainPrefetcher(this.viewer, AppConfig.perf.terrainPrefetch);
+        this.tilePipeline = new TilePipelineTelemetry(this.viewer, AppConfig.perf.tilePipeline);
+        this.sceneSettleWaiter = new SceneSettleWaiter(this.viewer, () => this.lodSwitchTimer !== undefined);
+        this.cameraPathPlayer = new CameraPathPlayer(this.viewer);
         const hudContainer = this.viewer.container as HTMLElement;
         this.hudManager = new HudManager(hudContainer, 'docked');
+        this.hudPickScheduler = new HudPickScheduler((screenPosition) => this.processHudPointer(screenPosition));
+        this.warmupPromise = new Promise((resolve) => {
+            this.resolveWarmup = resolve;
+        });
         this.initPromise = this.initialize(terrainUrl, useDynamicTerrain, theme);
     }
 
@@ -203,7 +262,7 @@ export class TacticalViewer {
     public applyTheme(name: string): void {
         this.currentTheme = name;
         const sceneTheme = this.resolveSceneTheme(name);
-        const cameraHeight = this.viewer.camera.positionCartographic.height;
+        const cameraHeight = this.cameraMetrics.get().height;
         const forceEllipsoidByHeight =
             AppConfig.terrain.enableGlobalFallback &&
             Number.isFinite(cameraHeight) &&
@@ -223,7 +282,7 @@ export class TacticalViewer {
         this.themeManager.applyTheme(sceneTheme.renderMode, {
             baseLayerEnabled,
             baseMapUrl: sceneTheme.baseMapUrl ?? this.baseMapUrl,
-            tacticalStyle: this.resolveTacticalStyleByLod(this.currentLodConfig),
+            tacticalStyle: this.resolveTacticalStyleByLod(this.currentLodProfile),
             tacticalMaterialPreset: materialPreset
         });
     }
@@ -255,6 +314,7 @@ export class TacticalViewer {
         } else {
             this.overlayManager.clear();
         }
+        this.refreshOverlayMaterial();
         const redFlagArea = BoundingSphere.fromPoints([
             Cartesian3.fromDegrees(-118.95, 36.15, 0.0),
             Cartesian3.fromDegrees(-118.95, 36.92, 0.0),
@@ -276,9 +336,30 @@ export class TacticalViewer {
      */
     public clearTacticalOverlay(): void {
         this.overlayManager.clear();
+        this.refreshOverlayMaterial();
         this.viewer.scene.requestRender();
     }
 
+    /**
+     * 流式加载外部想定（NDJSON / E3SU 二进制），替换当前叠加层；单位按帧预算分批写入，不阻塞渲染。
+     */
+    public loadOverlayScenario(
+        source: ScenarioSource,
+        onProgress?: (progress: ScenarioLoadProgress) => void
+    ): Promise<ScenarioLoadProgress> {
+        const finished = this.overlayManager.loadScenarioStream(source, onProgress);
+        this.refreshOverlayMaterial();
+        return finished;
+    }
+
+    public getOverlayScenarioLoadProgress(): ScenarioLoadProgress {
+        return this.overlayManager.getScenarioLoadProgress();
+    }
+
+    public cancelOverlayScenarioLoad(): void {
+        this.overlayManager.cancelScenarioLoad();
+    }
+
     /**
      * 设置 HUD 模式
      */
@@ -297,6 +378,13 @@ export class TacticalViewer {
         return this.initPromise;
     }
 
+    /**
+     * 等待启动预热完成（未启用预热时立即返回 enabled=false 的报告）。
+     */
+    public warmupReady(): Promise<StartupWarmupReport> {
+        return this.warmupPromise;
+    }
+
     public getCurrentLodProfile(): TerrainLodProfileName {
         return this.currentLodProfile;
     }
@@ -327,6 +415,177 @@ export class TacticalViewer {
         };
     }
 
+    /**
+     * 帧间隔分布（p50/p95/p99/max、长帧数、直方图），用于定位平均帧率掩盖的切档/瓦片卡顿。
+     */
+    public getFrameTimeStats(): FrameTimeStats {
+        return this.frameTimeRecorder.getStats();
+    }
+
+    /**
+     * 最近若干次切档的分阶段耗时，以及切档后直到 tilesLoaded 的帧数/时长。
+     */
+    public getLodSwitchTrace(): LodSwitchTraceEntry[] {
+        return this.lodSwitchTracer.getHistory();
+    }
+
+    /**
+     * 等待场景稳定：相机静止且无挂起切档、瓦片加载完成，并连续保持指定帧数。
+     */
+    public waitForSceneSettled(options: SceneSettleOptions = {}): Promise<SceneSettleResult> {
+        return this.sceneSettleWaiter.wait(options);
+    }
+
+    /**
+     * 相机路径录制/回放入口，供基准测试复现固定的飞行路径。
+     */
+    public getCameraPathPlayer(): CameraPathPlayer {
+        return this.cameraPathPlayer;
+    }
+
+    /**
+     * 批量查询点位高程与信息（经量化高程缓存），用于场景加载时批量贴地。
+     */
+    public queryPositionsInfo(cartographics: Cartographic[]): Promise<LocationInfo[]> {
+        return this.dataManager.queryPositionsInfo(cartographics);
+    }
+
+    /**
+     * 地形预取计数：预测次数、预取请求与 Globe 命中率、缓存占用。
+     */
+    public getTerrainPrefetchStats(): TerrainPrefetchStats {
+        return this.terrainPrefetcher.getStats();
+    }
+
+    /**
+     * 地形瓦片管线遥测：加载队列深度、请求数与字节、逐瓦片 fetch/wait/decode 耗时、
+     * 相机移动或 LOD 切档后的 time-to-tilesLoaded。
+     */
+    public getTilePipelineStats(): TilePipelineStats {
+        return this.tilePipeline.getStats();
+    }
+
+    /**
+     * HUD 管线计数：鼠标事件合并情况、每帧拾取次数与拾取耗时、m/px 计算路径。
+     */
+    public getHudPipelineStats(): HudPipelineStats {
+        return this.hudPickScheduler.getStats();
+    }
+
+    /**
+     * 当前帧的相机指标（中心 m/px、高度、俯仰、航向）与缓存命中统计。
+     */
+    public getCameraMetrics(): CameraMetrics & { cache: CameraMetricsCacheStats } {
+        return { ...this.cameraMetrics.get(), cache: this.cameraMetrics.getStats() };
+    }
+
+    /**
+     * 叠加层单位接口：批量添加、按 id 批量更新位置（[经度°, 纬度°, 高度m] 三元组）与移除。
+     */
+    public addOverlayUnits(specs: TacticalUnitSpec[]): void {
+        this.overlayManager.getUnitLayer().addUnits(specs);
+        this.viewer.scene.requestRender();
+    }
+
+    public updateOverlayUnitPositions(ids: readonly string[], lonLatHeight: Float64Array): void {
+        this.overlayManager.getUnitLayer().updatePositions(ids, lonLatHeight);
+        this.viewer.scene.requestRender();
+    }
+
+    public removeOverlayUnits(ids: readonly string[]): number {
+        const removed = this.overlayManager.getUnitLayer().removeUnits(ids);
+        this.viewer.scene.requestRender();
+        return removed;
+    }
+
+    public getOverlayUnitCount(): number {
+        return this.overlayManager.getUnitLayer().size;
+    }
+
+    /**
+     * 作用范围体接口：批量添加（同 id 覆盖）、按 id 批量更新（只改颜色时不重建批次）与移除。
+     */
+    public addRangeVolumes(specs: RangeVolumeSpec[]): void {
+        this.overlayManager.getRangeVolumeLayer().addVolumes(specs);
+    }
+
+    public updateRangeVolumes(updates: RangeVolumeUpdate[]): void {
+        this.overlayManager.getRangeVolumeLayer().updateVolumes(updates);
+    }
+
+    public removeRangeVolumes(ids: readonly string[]): number {
+        return this.overlayManager.getRangeVolumeLayer().removeVolumes(ids);
+    }
+
+    public getRangeVolumeStats(): RangeVolumeStats {
+        return this.overlayManager.getRangeVolumeLayer().getStats();
+    }
+
+    public getTrackKinematicsStats(): TrackKinematicsStats | undefined {
+        return this.overlayManager.getTrackKinematicsStats();
+    }
+
+    public getTrackTrailStats(): TrackTrailStats {
+        return this.overlayManager.getTrackTrailStats();
+    }
+
+    public getOverlayUnitIndexStats(): UnitSpatialIndexStats & { visibleLabels: number } {
+        return this.overlayManager.getUnitIndexStats();
+    }
+
+    /**
+     * 叠加层单位空间查询（经纬度为度，距离为米）。
+     */
+    public findNearestOverlayUnit(longitude: number, latitude: number, maxDistanceMeters?: number): NearestUnit | undefined {
+        return this.overlayManager.findNearestUnit(longitude, latitude, maxDistanceMeters);
+    }
+
+    public queryOverlayUnitsInRadius(longitude: number, latitude: number, radiusMeters: number): NearestUnit[] {
+        return this.overlayManager.queryUnitsInRadius(longitude, latitude, radiusMeters);
+    }
+
+    public getHeightCacheStats(): HeightCacheStats {
+        return this.dataManager.getHeightCacheStats();
+    }
+
+    /**
+     * 渲染一帧并直接读回 RGBA 像素（可降采样），供图像指标门禁绕过截图的 PNG 编解码。
+     */
+    public captureFrame(options: FrameCaptureOptions = {}): Promise<FrameCaptureResult> {
+        return this.frameCapture.capture(options);
+    }
+
+    /**
+     * 清零切档与帧率统计。
+     * 供测试 harness 在同一页面的多个场景之间复位，避免预热阶段的数据污染测量结果。
+     */
+    public resetRuntimeStats(): void {
+        this.lodSwitchCount = 0;
+        this.totalLodSwitchDurationMs = 0;
+        this.lastLodSwitchDurationMs = 0;
+        this.lastLodSwitchAtEpochMs = undefined;
+        this.perfStartTimeMs = performance.now();
+        this.perfFrameCount = 0;
+        this.perfRecentWindowStartMs = this.perfStartTimeMs;
+        this.perfRecentFrameCount = 0;
+        this.perfRecentFps = 0;
+        this.frameTimeRecorder.reset();
+        this.lodSwitchTracer.reset();
+        this.hudPickScheduler.reset();
+        this.cameraMetrics.resetStats();
+        this.terrainPrefetcher.resetStats();
+        this.tilePipeline.resetStats();
+    }
+
+    /**
+     * 恢复初始视角，并按恢复后的 mpp 立即重新定档。
+     */
+    public resetView(): void {
+        this.applyInitialView();
+        this.reconcileLodProfileNow();
+        this.viewer.scene.requestRender();
+    }
+
     public getRuntimeRenderMode(): string {
         if (this.localTerrainBlockedByOom) {
             return 'SAFE_GLOBAL_FALLBACK_WASM_OOM';
@@ -338,7 +597,7 @@ export class TacticalViewer {
         if (reason === 'wasm-oom') {
             this.applyInitialView();
         }
-        const mpp = this.estimateCenterMetersPerPixel();
+        const mpp = this.cameraMetrics.getCenterMetersPerPixel();
         this.currentMetersPerPixel = mpp;
         this.applyLodProfile('global', mpp, true);
         console.warn(`TacticalViewer: Safe mode activated (${reason}).`);
@@ -362,6 +621,9 @@ export class TacticalViewer {
         this.localTerrainBlockedByOom = true;
         this.localTerrainLoading = false;
         this.localTerrainProvider = undefined;
+        // 先解绑遥测（包装在外层），再解绑预取，保证 requestTileGeometry 按序还原。
+        this.tilePipeline.attach(undefined);
+        this.terrainPrefetcher.attach(undefined);
         this.terrainUrl = undefined;
         this.activateSafeMode('wasm-oom');
         this.onTerrainStatusChange?.('failed', 'WASM_OOM_LOCAL_TERRAIN_DISABLED');
@@ -397,8 +659,14 @@ export class TacticalViewer {
             window.removeEventListener('resize', this.onWindowResize);
             this.onWindowResize = undefined;
         }
+        this.hudPickScheduler.destroy();
         this.hudManager.destroy();
         this.overlayManager.destroy();
+        this.sceneSettleWaiter.destroy();
+        this.tilePipeline.destroy();
+        this.terrainPrefetcher.destroy();
+        this.cameraPathPlayer.destroy();
+        this.viewer.scene.postUpdate.removeEventListener(this.onPostUpdate);
         this.viewer.scene.postRender.removeEventListener(this.onPostRender);
         if (!this.viewer.isDestroyed()) {
             this.viewer.destroy();
@@ -414,7 +682,7 @@ export class TacticalViewer {
         this.configureBaseLayer(this.baseLayerEnabled);
 
         // 3. 应用初始主题
-        this.currentMetersPerPixel = this.estimateCenterMetersPerPixel();
+        this.currentMetersPerPixel = this.cameraMetrics.getCenterMetersPerPixel();
         // 初始化阶段直接按绝对阈值定档，避免因过渡态和冷却策略卡在中间档位。
         this.currentLodProfile = this.classifyLodProfile(this.currentMetersPerPixel);
         this.applyLodProfile(this.currentLodProfile, this.currentMetersPerPixel, false);
@@ -425,12 +693,26 @@ export class TacticalViewer {
         this.setupZoomInputGuard();
         if (AppConfig.tacticalOverlay.enabled && AppConfig.tacticalOverlay.scenario === 'redFlagDemo') {
             this.overlayManager.applyRedFlagScenario();
+            this.refreshOverlayMaterial();
         }
 
+        let terrainReady: Promise<void> = Promise.resolve();
         if (!this.terrainUrl) {
             this.onTerrainStatusChange?.('disabled', 'Terrain URL is empty.');
         } else {
-            void this.configureTerrain(this.terrainUrl, this.terrainRequestVertexNormals);
+            terrainReady = this.configureTerrain(this.terrainUrl, this.terrainRequestVertexNormals);
+        }
+        if (AppConfig.perf.startupWarmup.enabled) {
+            // 预热在地形连接之后异步进行，不阻塞 ready()。
+            void terrainReady
+                .then(() => this.runStartupWarmup())
+                .catch((error) => {
+                    console.warn('TacticalViewer: Startup warm-up failed:', error);
+                    return this.emptyWarmupReport(true);
+                })
+                .then((report) => this.resolveWarmup(report));
+        } else {
+            this.resolveWarmup(this.emptyWarmupReport(false));
         }
 
         // 初始化视觉诊断模块（通过实例方法 runDiagnostics 调用）
@@ -439,6 +721,66 @@ export class TacticalViewer {
         // 视角已在构造阶段初始化，避免在此覆盖用户当前镜头状态。
     }
 
+    private async runStartupWarmup(): Promise<StartupWarmupReport> {
+        const begin = performance.now();
+        const report = this.emptyWarmupReport(true);
+        const warmup = new StartupWarmup(this.viewer, AppConfig.perf.startupWarmup);
+        const sceneTheme = this.resolveSceneTheme(this.currentTheme);
+        const lodProfiles = AppConfig.terrain.lodProfiles;
+        if (sceneTheme.renderMode === 'tactical') {
+            const profiles = (Object.keys(lodProfiles) as TerrainLodProfileName[])
+                .filter((name) => lodProfiles[name].materialPreset !== 'off');
+            // 绕过 applyTheme 的高空回退判断，直接按目标档位的 terrain/材质/图层组合渲染，
+            // 使各档对应的地表着色器变体都完成一次编译。
+            const lodSwitchesBefore = this.lodSwitchCount;
+            const lodProfileBefore = this.currentLodProfile;
+            const lodUnchanged = () =>
+                this.lodSwitchCount === lodSwitchesBefore && this.currentLodProfile === lodProfileBefore;
+            report.profilesCompiled = await warmup.precompileProfiles(profiles, (name) => {
+                const profile = lodProfiles[name];
+                if (profile.useLocalTerrain && this.localTerrainProvider) {
+                    this.viewer.terrainProvider = this.localTerrainProvider;
+                }
+                this.themeManager.applyTheme(sceneTheme.renderMode, {
+                    baseLayerEnabled: profile.enableImagery,
+                    baseMapUrl: sceneTheme.baseMapUrl ?? this.baseMapUrl,
+                    tacticalStyle: this.resolveTacticalStyleByLod(name),
+                    tacticalMaterialPreset: profile.materialPreset
+                });
+            }, lodUnchanged);
+            // 恢复当前档位的真实状态；预热期间用户已切档时，切档流程已套用了真实状态，不再覆盖。
+            if (lodUnchanged()) {
+                this.applyLodProfile(this.currentLodProfile, this.currentMetersPerPixel, false);
+            }
+        }
+        if (this.localTerrainProvider) {
+            const prefetch = await warmup.prefetchRootTiles(this.localTerrainProvider);
+            report.tilesRequested = prefetch.requested;
+            report.tilesDecoded = prefetch.decoded;
+            report.tilesFailed = prefetch.failed;
+            // 预取走的是经 TerrainPrefetcher / TilePipelineTelemetry 包装后的请求，
+            // 预热结束后清零两者统计，避免预热瓦片混入运行期命中率与延迟分布。
+            this.terrainPrefetcher.resetStats();
+            this.tilePipeline.resetStats();
+        }
+        report.durationMs = performance.now() - begin;
+        console.log(
+            `TacticalViewer: Startup warm-up finished (profiles=${report.profilesCompiled.join(',') || '-'}, tiles=${report.tilesDecoded}/${report.tilesRequested}, cost=${report.durationMs.toFixed(0)}ms).`
+        );
+        return report;
+    }
+
+    private emptyWarmupReport(enabled: boolean): StartupWarmupReport {
+        return {
+            enabled,
+            profilesCompiled: [],
+            tilesRequested: 0,
+            tilesDecoded: 0,
+            tilesFailed: 0,
+            durationMs: 0
+        };
+    }
+
     private applyInitialView(): void {
         this.viewer.camera.setView({
             destination: Cartesian3.fromDegrees(
@@ -456,26 +798,36 @@ export class TacticalViewer {
 
     private setupHudTracking(): void {
         this.mouseMoveHandler = new ScreenSpaceEventHandler(this.viewer.scene.canvas);
+        // 鼠标事件只登记位置，拾取与 HUD 计算合并到下一动画帧执行。
         this.mouseMoveHandler.setInputAction((movement: { endPosition: Cartesian2 }) => {
-            const token = ++this.hudUpdateToken;
-            const pos = movement.endPosition;
-            this.hudManager.setFollowPosition(pos.x, pos.y);
-            const cartographic = this.pickCartographic(pos);
-            if (!cartographic) return;
-            const metrics = this.computeHudMetrics(pos, cartographic);
-
-            // 用户要求：移动过程中不刷新高度，避免显示错误数据。
-            // 仅在鼠标短暂停留后执行精确查询更新 HUD。
-            if (this.hudDebounceTimer) {
-                clearTimeout(this.hudDebounceTimer);
-            }
-            this.hudDebounceTimer = setTimeout(() => {
-                if (token !== this.hudUpdateToken) return;
-                void this.queryAndUpdateHudDetailed(token, cartographic, metrics);
-            }, 180);
+            this.hudPickScheduler.schedule(movement.endPosition);
         }, ScreenSpaceEventType.MOUSE_MOVE);
     }
 
+    private processHudPointer(pos: Cartesian2): void {
+        const token = ++this.hudUpdateToken;
+        this.hudManager.setFollowPosition(pos.x, pos.y);
+        const cartographic = this.hudPickScheduler.timePick(() => this.pickCartographic(pos));
+        if (!cartographic) return;
+        const metrics = this.computeHudMetrics(pos, cartographic);
+        // 光标附近的叠加层单位经空间索引查找，不额外拾取。
+        metrics.nearestUnit = this.overlayManager.findNearestUnit(
+            CesiumMath.toDegrees(cartographic.longitude),
+            CesiumMath.toDegrees(cartographic.latitude),
+            metrics.metersPerPixel * AppConfig.tacticalOverlay.unitIndex.hudNearestRadiusPx
+        );
+
+        // 用户要求：移动过程中不刷新高度，避免显示错误数据。
+        // 仅在鼠标短暂停留后执行精确查询更新 HUD。
+        if (this.hudDebounceTimer) {
+            clearTimeout(this.hudDebounceTimer);
+        }
+        this.hudDebounceTimer = setTimeout(() => {
+            if (token !== this.hudUpdateToken) return;
+            void this.queryAndUpdateHudDetailed(token, cartographic, metrics);
+        }, 180);
+    }
+
     private setupZoomInputGuard(): void {
         const tacticalMinMpp = 100.0;
         this.onCanvasWheel = (evt: Event) => {
@@ -483,7 +835,7 @@ export class TacticalViewer {
             if (this.currentLodProfile !== 'tactical') return;
             const sign = Math.sign(event.deltaY) as -1 | 0 | 1;
             if (sign === 0) return;
-            const mppBefore = this.estimateCenterMetersPerPixel();
+            const mppBefore = this.cameraMetrics.getCenterMetersPerPixel();
             if (!Number.isFinite(mppBefore)) return;
 
             // 在 tactical 下，当达到最小 mpp 边界时，拦截“继续放大”输入。
@@ -502,7 +854,7 @@ export class TacticalViewer {
             // 在非边界区间采样一次输入方向，自动识别当前设备的 zoom-in 符号。
             if (mppBefore > tacticalMinMpp + 8.0 && mppBefore < tacticalMinMpp * 6.0) {
                 requestAnimationFrame(() => {
-                    const mppAfter = this.estimateCenterMetersPerPixel();
+                    const mppAfter = this.cameraMetrics.getCenterMetersPerPixel();
                     if (!Number.isFinite(mppAfter)) return;
                     if (mppAfter < mppBefore - 0.5) {
                         this.wheelZoomInSign = sign;
@@ -525,7 +877,7 @@ export class TacticalViewer {
     }
 
     private computeHudMetrics(screenPosition: Cartesian2, cartographic: Cartographic): HudMetrics {
-        const metersPerPixel = this.estimateMetersPerPixel(screenPosition);
+        const metersPerPixel = this.estimateHudMetersPerPixel(screenPosition, cartographic);
         const earthRadius = 6378137.0;
         const earthCircumference = 2 * Math.PI * earthRadius;
         const latCos = Math.max(0.01, Math.cos(cartographic.latitude));
@@ -539,6 +891,38 @@ export class TacticalViewer {
         };
     }
 
+    private estimateHudMetersPerPixel(screenPosition: Cartesian2, cartographic: Cartographic): number {
+        const analytic = this.estimateAnalyticMetersPerPixel(screenPosition, cartographic);
+        this.hudPickScheduler.recordMppSource(analytic !== undefined);
+        if (analytic !== undefined) {
+            return analytic;
+        }
+        // 斜视时像素足迹随入射角拉伸，回退到左右相邻像素拾取（两次拾取）。
+        return this.hudPickScheduler.timePick(() => this.estimateMetersPerPixel(screenPosition), 2);
+    }
+
+    /**
+     * 近垂直视角下按相机到拾取点的距离解析计算 m/px（像素张角 × 距离），复用已拾取的点，无需额外拾取。
+     */
+    private estimateAnalyticMetersPerPixel(screenPosition: Cartesian2, cartographic: Cartographic): number | undefined {
+        const { camera, scene } = this.viewer;
+        const ray = camera.getPickRay(screenPosition);
+        if (!ray) return undefined;
+        const normal = Ellipsoid.WGS84.geodeticSurfaceNormalCartographic(cartographic);
+        const cosIncidence = Math.abs(Cartesian3.dot(ray.direction, normal));
+        const maxIncidence = CesiumMath.toRadians(AppConfig.perf.hudPick.analyticMppMaxIncidenceDegrees);
+        if (cosIncidence < Math.cos(maxIncidence)) return undefined;
+        const distance = Cartesian3.distance(camera.positionWC, Cartographic.toCartesian(cartographic));
+        const pixelSize = camera.frustum.getPixelDimensions(
+            scene.drawingBufferWidth,
+            scene.drawingBufferHeight,
+            distance,
+            scene.pixelRatio,
+            new Cartesian2()
+        );
+        return Number.isFinite(pixelSize.x) && pixelSize.x > 0 ? pixelSize.x : undefined;
+    }
+
     private estimateMetersPerPixel(screenPosition: Cartesian2): number {
         const left = new Cartesian2(Math.max(0, screenPosition.x - 1), screenPosition.y);
         const right = new Cartesian2(Math.min(this.viewer.scene.canvas.clientWidth - 1, screenPosition.x + 1), screenPosition.y);
@@ -598,6 +982,8 @@ export class TacticalViewer {
             console.log("TacticalViewer: CesiumTerrainProvider.fromUrl returned successfully.");
             this.localTerrainProvider = provider;
             this.dataManager.setPreferredTerrainProvider(provider);
+            this.terrainPrefetcher.attach(provider);
+            this.tilePipeline.attach(provider, url);
             console.log("TacticalViewer: Terrain provider ready.");
             this.onTerrainStatusChange?.('connected', url);
             this.applyTerrainProviderByLod(this.currentLodConfig);
@@ -623,7 +1009,9 @@ export class TacticalViewer {
                 clearTimeout(this.lodSwitchTimer);
             }
             this.lodSwitchTimer = setTimeout(() => {
-                const mpp = this.estimateCenterMetersPerPixel();
+                this.lodSwitchTimer = undefined;
+                this.sceneSettleWaiter.notify();
+                const mpp = this.cameraMetrics.getCenterMetersPerPixel();
                 const nextProfile = this.evaluateLodProfile(mpp, this.currentLodProfile);
                 this.currentMetersPerPixel = mpp;
                 if (nextProfile !== this.currentLodProfile) {
@@ -652,8 +1040,10 @@ export class TacticalViewer {
             clearTimeout(this.lodSwitchTimer);
         }
         this.lodSwitchTimer = setTimeout(() => {
+            this.lodSwitchTimer = undefined;
+            this.sceneSettleWaiter.notify();
             this.enforceCameraSafetyBounds();
-            const mpp = this.estimateCenterMetersPerPixel();
+            const mpp = this.cameraMetrics.getCenterMetersPerPixel();
             this.currentMetersPerPixel = mpp;
             const target = this.classifyLodProfile(mpp);
             if (target !== this.currentLodProfile) {
@@ -665,7 +1055,7 @@ export class TacticalViewer {
     }
 
     private reconcileLodProfileNow(): void {
-        const mpp = this.estimateCenterMetersPerPixel();
+        const mpp = this.cameraMetrics.getCenterMetersPerPixel();
         this.currentMetersPerPixel = mpp;
         const target = this.classifyLodProfile(mpp);
         if (target !== this.currentLodProfile) {
@@ -679,21 +1069,49 @@ export class TacticalViewer {
         if (this.localTerrainBlockedByOom && profile !== 'global') {
             profile = 'global';
         }
+        const previousProfile = this.currentLodProfile;
         const begin = performance.now();
+        // 分阶段计时：每个阶段结束时记录与上一标记点的差值。
+        const phases: LodSwitchPhaseSpan[] = [];
+        let phaseMark = begin;
+        const endPhase = (name: LodSwitchPhaseName): void => {
+            const now = performance.now();
+            phases.push({ name, durationMs: now - phaseMark });
+            phaseMark = now;
+        };
         this.currentLodProfile = profile;
         this.currentLodConfig = AppConfig.terrain.lodProfiles[profile];
         this.enforceCameraSafetyBounds();
+        endPhase('safetyBounds');
         this.applyTerrainProviderByLod(this.currentLodConfig);
+        endPhase('terrainProvider');
         this.dataManager.setQueryLevel(this.currentLodConfig.queryLevel);
+        endPhase('queryLevel');
         this.ensureTacticalObliqueView(profile);
+        endPhase('obliqueView');
         this.applyTheme(this.currentTheme);
+        endPhase('theme');
         this.applyTacticalVisualizationHints(profile);
+        this.overlayManager.setLodProfile(profile);
+        endPhase('visualizationHints');
         if (emitLog) {
-            const durationMs = performance.now() - begin;
+            const durationMs = phaseMark - begin;
             this.lodSwitchCount += 1;
             this.totalLodSwitchDurationMs += durationMs;
             this.lastLodSwitchDurationMs = durationMs;
             this.lastLodSwitchAtEpochMs = Date.now();
+            this.lodSwitchTracer.record(
+                {
+                    from: previousProfile,
+                    to: profile,
+                    metersPerPixel,
+                    startedAtEpochMs: this.lastLodSwitchAtEpochMs,
+                    totalMs: durationMs,
+                    phases
+                },
+                phaseMark
+            );
+            this.tilePipeline.beginEpisode('lodSwitch', begin);
             console.log(
                 `TacticalViewer: LOD profile switched to ${profile} (mpp=${metersPerPixel.toFixed(2)}, material=${this.currentLodConfig.materialPreset}, imagery=${this.currentLodConfig.enableImagery}, cost=${durationMs.toFixed(2)}ms).`
             );
@@ -737,7 +1155,7 @@ export class TacticalViewer {
             this.viewer.scene.globe.maximumScreenSpaceError = 1.6;
             this.viewer.scene.globe.showSkirts = true;
             // tactical 下最小缩放距离按 mpp=100 反推，避免输入设备差异导致继续放大。
-            const minHeightByMpp = this.estimateHeightForMetersPerPixel(100.0);
+            const minHeightByMpp = this.cameraMetrics.estimateHeightForMetersPerPixel(100.0);
             this.viewer.scene.screenSpaceCameraController.minimumZoomDistance = Math.max(18000.0, minHeightByMpp);
             this.viewer.scene.screenSpaceCameraController.maximumZoomDistance = this.maxZoomOutHeight;
             this.viewer.scene.screenSpaceCameraController.inertiaZoom = 0.0;
@@ -769,14 +1187,6 @@ export class TacticalViewer {
         this.viewer.scene.screenSpaceCameraController.inertiaZoom = 0.8;
     }
 
-    private estimateHeightForMetersPerPixel(targetMpp: number): number {
-        const frustum = this.viewer.camera.frustum as { fovy?: number };
-        const fovy = frustum.fovy ?? CesiumMath.toRadians(60.0);
-        const viewportHeight = Math.max(1, this.viewer.scene.canvas.clientHeight);
-        const height = (Math.max(0.001, targetMpp) * viewportHeight) / (2 * Math.tan(fovy / 2));
-        return Math.max(1.0, height);
-    }
-
     private ensureTacticalObliqueView(profile: TerrainLodProfileName): void {
         if (profile !== 'tactical') return;
         const camera = this.viewer.camera;
@@ -807,7 +1217,7 @@ export class TacticalViewer {
         }
         const highAltitudeFallbackEnabled = AppConfig.terrain.enableGlobalFallback;
         const fallbackSwitchHeight = AppConfig.terrain.fallbackSwitchHeight;
-        const cameraHeight = this.viewer.camera.positionCartographic.height;
+        const cameraHeight = this.cameraMetrics.get().height;
         const forceEllipsoidByHeight =
             highAltitudeFallbackEnabled &&
             Number.isFinite(cameraHeight) &&
@@ -818,13 +1228,26 @@ export class TacticalViewer {
             : this.ellipsoidTerrainProvider;
     }
 
-    private resolveTacticalStyleByLod(profile: TerrainLodProfile): TacticalMaterialOptions {
+    private resolveTacticalStyleByLod(name: TerrainLodProfileName): TacticalMaterialOptions {
+        const profile = AppConfig.terrain.lodProfiles[name];
         return {
             ...this.tacticalStyle,
-            ...(profile.tacticalStyleOverrides ?? {})
+            ...(profile.tacticalStyleOverrides ?? {}),
+            // 叠加层参考网格按档位间距绘制在地表材质中。
+            ...this.overlayManager.getReferenceGridStyle(name)
         };
     }
 
+    /**
+     * 叠加层增删后刷新地表材质（参考网格随场景开关）。
+     */
+    private refreshOverlayMaterial(): void {
+        const sceneTheme = this.resolveSceneTheme(this.currentTheme);
+        if (sceneTheme.renderMode === 'tactical') {
+            this.applyTheme(this.currentTheme);
+        }
+    }
+
     private evaluateLodProfile(
         mpp: number,
         current: TerrainLodProfileName
@@ -0,0 +1,467 @@
+import {
+    Cartesian2,
+    Cartesian3,
+    Cartographic,
+    Ellipsoid,
+    Math as CesiumMath,
+    Rectangle,
+    type Camera,
+    type CesiumTerrainProvider,
+    type Request,
+    type TerrainData,
+    type Viewer
+} from 'cesium';
+
+export interface TerrainPrefetchOptions {
+    enabled: boolean;
+    maxConcurrent: number;
+    maxCacheMegabytes: number;
+    maxTilesPerPrediction: number;
+    parentLevels: number;
+    lookaheadSeconds: number;
+    sampleIntervalMs: number;
+    minMotionRatio: number;
+    entryTtlMs: number;
+}
+
+export interface TerrainPrefetchStats {
+    enabled: boolean;
+    attached: boolean;
+    predictions: number;
+    flightTargets: number;
+    requested: number;
+    completed: number;
+    failed: number;
+    // 新预测替换队列时丢弃的未发起请求。
+    dropped: number;
+    // Globe 请求的瓦片已在预取缓存中 / 正在预取中 / 需要重新请求。
+    hits: number;
+    inFlightHits: number;
+    misses: number;
+    // 预取完成但未被使用即被淘汰（超预算或过期）。
+    evictions: number;
+    cacheEntries: number;
+    cacheBytes: number;
+    inFlight: number;
+    queued: number;
+    // (hits + inFlightHits) / Globe 请求总数。
+    hitRate: number;
+    // 被 Globe 用到的预取瓦片占已完成预取的比例。
+    usefulRate: number;
+}
+
+interface CachedTile {
+    data: TerrainData;
+    bytes: number;
+    storedAtMs: number;
+}
+
+interface QueuedTile {
+    key: string;
+    x: number;
+    y: number;
+    level: number;
+}
+
+type RequestTileGeometry = (x: number, y: number, level: number, request?: Request) => Promise<TerrainData> | undefined;
+type FlyToOptions = Parameters<Camera['flyTo']>[0];
+
+// 无法估计大小的瓦片按 64KB 计入预算。
+const DEFAULT_TILE_BYTES = 64 * 1024;
+const MIN_PREDICTION_DISTANCE = 100.0;
+
+function tileKey(x: number, y: number, level: number): string {
+    return `${level}/${x}/${y}`;
+}
+
+function estimateTileBytes(data: TerrainData): number {
+    const internal = data as unknown as {
+        _quantizedVertices?: ArrayBufferView;
+        _indices?: ArrayBufferView;
+        _encodedNormals?: ArrayBufferView;
+    };
+    const bytes = (internal._quantizedVertices?.byteLength ?? 0) +
+        (internal._indices?.byteLength ?? 0) +
+        (internal._encodedNormals?.byteLength ?? 0);
+    return bytes > 0 ? bytes : DEFAULT_TILE_BYTES;
+}
+
+/**
+ * 地形瓦片预取
+ * 1) 按相机速度外推未来 lookaheadSeconds 的视点，或直接读取 camera.flyTo 的目标，
+ *    估算该处所需的瓦片层级与覆盖范围，先粗后细、由近及远地排队预取；
+ * 2) 包装本地地形服务的 requestTileGeometry：Globe 请求的瓦片已在缓存或在途时直接复用，
+ *    未命中再走原请求，由此统计命中率；
+ * 3) 并发数与缓存字节数均有上限，未被使用的预取瓦片按 LRU 与过期时间淘汰。
+ */
+export class TerrainPrefetcher {
+    private readonly viewer: Viewer;
+    private readonly options: TerrainPrefetchOptions;
+    private readonly cache: Map<string, CachedTile>;
+    private readonly inFlight: Map<string, Promise<TerrainData | undefined>>;
+    private readonly removePreUpdate: () => void;
+    private readonly restoreFlyTo: () => void;
+    private readonly scratchCenter: Cartesian2;
+    private provider?: CesiumTerrainProvider;
+    private originalRequest?: RequestTileGeometry;
+    // 每次解绑递增；预取结果只在发起时的代号仍有效时进入缓存。
+    private attachGeneration: number;
+    private queue: QueuedTile[];
+    private cacheBytes: number;
+    private lastSampleMs: number;
+    private lastPosition?: Cartesian3;
+    private predictions: number;
+    private flightTargets: number;
+    private requested: number;
+    private completed: number;
+    private failed: number;
+    private dropped: number;
+    private hits: number;
+    private inFlightHits: number;
+    private misses: number;
+    private evictions: number;
+
+    constructor(viewer: Viewer, options: TerrainPrefetchOptions) {
+        this.viewer = viewer;
+        this.options = options;
+        this.cache = new Map();
+        this.inFlight = new Map();
+        this.scratchCenter = new Cartesian2();
+        this.queue = [];
+        this.cacheBytes = 0;
+        this.attachGeneration = 0;
+        this.lastSampleMs = Number.NEGATIVE_INFINITY;
+        this.predictions = 0;
+        this.flightTargets = 0;
+        this.requested = 0;
+        this.completed = 0;
+        this.failed = 0;
+        this.dropped = 0;
+        this.hits = 0;
+        this.inFlightHits = 0;
+        this.misses = 0;
+        this.evictions = 0;
+
+        const onPreUpdate = (): void => this.sampleCameraMotion();
+        viewer.scene.preUpdate.addEventListener(onPreUpdate);
+        this.removePreUpdate = () => viewer.scene.preUpdate.removeEventListener(onPreUpdate);
+
+        // 实例级覆盖 flyTo：flyToBoundingSphere 等也经由 this.flyTo，因此能拿到所有飞行目标。
+        const camera = viewer.camera;
+        const originalFlyTo = camera.flyTo;
+        camera.flyTo = (flyOptions: FlyToOptions): void => {
+            this.prefetchFlight(flyOptions);
+            originalFlyTo.call(camera, flyOptions);
+        };
+        this.restoreFlyTo = () => {
+            camera.flyTo = originalFlyTo;
+        };
+    }
+
+    /**
+     * 绑定（或解绑）本地地形服务；切换时清空缓存与队列并恢复原请求函数。
+     */
+    public attach(provider: CesiumTerrainProvider | undefined): void {
+        if (provider === this.provider) return;
+        this.detach();
+        if (!provider || !this.options.enabled) return;
+        const original = provider.requestTileGeometry as RequestTileGeometry;
+        this.provider = provider;
+        this.originalRequest = original;
+        provider.requestTileGeometry = (x: number, y: number, level: number, request?: Request) =>
+            this.serveTile(provider, original, x, y, level, request);
+    }
+
+    public getStats(): TerrainPrefetchStats {
+        const served = this.hits + this.inFlightHits + this.misses;
+        return {
+            enabled: this.options.enabled,
+            attached: !!this.provider,
+            predictions: this.predictions,
+            flightTargets: this.flightTargets,
+            requested: this.requested,
+            completed: this.completed,
+            failed: this.failed,
+            dropped: this.dropped,
+            hits: this.hits,
+            inFlightHits: this.inFlightHits,
+            misses: this.misses,
+            evictions: this.evictions,
+            cacheEntries: this.cache.size,
+            cacheBytes: this.cacheBytes,
+            inFlight: this.inFlight.size,
+            queued: this.queue.length,
+            hitRate: served > 0 ? (this.hits + this.inFlightHits) / served : 0,
+            usefulRate: this.completed > 0 ? (this.hits + this.inFlightHits) / this.completed : 0
+        };
+    }
+
+    public resetStats(): void {
+        this.predictions = 0;
+        this.flightTargets = 0;
+        this.requested = 0;
+        this.completed = 0;
+        this.failed = 0;
+        this.dropped = 0;
+        this.hits = 0;
+        this.inFlightHits = 0;
+        this.misses = 0;
+        this.evictions = 0;
+    }
+
+    public destroy(): void {
+        this.removePreUpdate();
+        this.restoreFlyTo();
+        this.detach();
+    }
+
+    private detach(): void {
+        if (this.provider && this.originalRequest) {
+            this.provider.requestTileGeometry = this.originalRequest;
+        }
+        this.provider = undefined;
+        this.originalRequest = undefined;
+        this.attachGeneration += 1;
+        this.dropped += this.queue.length;
+        this.queue = [];
+        this.cache.clear();
+        this.cacheBytes = 0;
+        this.inFlight.clear();
+    }
+
+    private serveTile(
+        provider: CesiumTerrainProvider,
+        original: RequestTileGeometry,
+        x: number,
+        y: number,
+        level: number,
+        request?: Request
+    ): Promise<TerrainData> | undefined {
+        const key = tileKey(x, y, level);
+        const cached = this.take(key);
+        if (cached) {
+            this.hits += 1;
+            return Promise.resolve(cached);
+        }
+        const pending = this.inFlight.get(key);
+        if (pending) {
+            this.inFlightHits += 1;
+            // 预取失败时改为不节流的直接请求，保证 Globe 一定拿到数据或明确的失败。
+            return pending.then((data) => {
+                const taken = this.take(key) ?? data;
+                return taken ?? (original.call(provider, x, y, level) as Promise<TerrainData>);
+            });
+        }
+        this.misses += 1;
+        return original.call(provider, x, y, level, request);
+    }
+
+    private take(key: string): TerrainData | undefined {
+        const entry = this.cache.get(key);
+        if (!entry) return undefined;
+        this.cache.delete(key);
+        this.cacheBytes -= entry.bytes;
+        return entry.data;
+    }
+
+    /**
+     * 按固定间隔采样相机位置：运动明显时把位置与视点中心沿速度外推 lookaheadSeconds 再预取。
+     */
+    private sampleCameraMotion(): void {
+        const now = performance.now();
+        const elapsedMs = now - this.lastSampleMs;
+        if (elapsedMs < this.options.sampleIntervalMs) {
+            return;
+        }
+        const camera = this.viewer.camera;
+        const position = Cartesian3.clone(camera.positionWC);
+        const previous = this.lastPosition;
+        const previousSampleMs = this.lastSampleMs;
+        this.lastPosition = position;
+        this.lastSampleMs = now;
+        if (!previous || !Number.isFinite(previousSampleMs) || elapsedMs > this.options.sampleIntervalMs * 4) {
+            return;
+        }
+        const velocity = Cartesian3.subtract(position, previous, new Cartesian3());
+        const scale = this.options.lookaheadSeconds / (elapsedMs / 1000.0);
+        Cartesian3.multiplyByScalar(velocity, scale, velocity);
+        const height = Math.max(1.0, camera.positionCartographic.height);
+        if (Cartesian3.magnitude(velocity) < height * this.options.minMotionRatio) {
+            return;
+        }
+
+        const canvas = this.viewer.scene.canvas;
+        this.scratchCenter.x = canvas.clientWidth / 2;
+        this.scratchCenter.y = canvas.clientHeight / 2;
+        const target = camera.pickEllipsoid(this.scratchCenter, Ellipsoid.WGS84) ??
+            Ellipsoid.WGS84.scaleToGeodeticSurface(position, new Cartesian3());
+        if (!target) {
+            return;
+        }
+        const predictedCamera = Cartesian3.add(position, velocity, new Cartesian3());
+        const predictedTarget = Cartesian3.add(target, velocity, new Cartesian3());
+        const surface = Ellipsoid.WGS84.scaleToGeodeticSurface(predictedTarget, new Cartesian3());
+        if (!surface) {
+            return;
+        }
+        const distance = Cartesian3.distance(predictedCamera, surface);
+        this.predictions += 1;
+        this.prefetchFootprint(Cartographic.fromCartesian(surface, Ellipsoid.WGS84), distance);
+    }
+
+    /**
+     * 由 flyTo 目标推算落点视点：Cartesian3 目标按 orientation 的航向/俯仰（缺省俯视）沿视线投到地表，
+     * Rectangle 目标取矩形中心与 Cesium 为其计算的相机高度。
+     */
+    private prefetchFlight(flyOptions: FlyToOptions): void {
+        const destination = flyOptions.destination;
+        let center: Cartographic | undefined;
+        let distance: number;
+        if (destination instanceof Rectangle) {
+            center = Rectangle.center(destination);
+            const cameraPosition = this.viewer.camera.getRectangleCameraCoordinates(destination);
+            distance = Cartographic.fromCartesian(cameraPosition, Ellipsoid.WGS84)?.height ?? Number.NaN;
+        } else {
+            const cameraCarto = Cartographic.fromCartesian(destination, Ellipsoid.WGS84);
+            if (!cameraCarto) return;
+            const orientation = flyOptions.orientation as { heading?: number; pitch?: number } | undefined;
+            const heading = orientation?.heading ?? 0.0;
+            // 俯仰限制在 -10° 以下，避免贴地平视时落点推到地平线外。
+            const pitch = Math.min(orientation?.pitch ?? -CesiumMath.PI_OVER_TWO, CesiumMath.toRadians(-10.0));
+            const height = Math.max(1.0, cameraCarto.height);
+            const groundRange = height / Math.tan(-pitch);
+            const radius = Ellipsoid.WGS84.maximumRadius;
+            center = new Cartographic(
+                cameraCarto.longitude + (Math.sin(heading) * groundRange) / (radius * Math.max(0.01, Math.cos(cameraCarto.latitude))),
+                CesiumMath.clamp(cameraCarto.latitude + (Math.cos(heading) * groundRange) / radius, -CesiumMath.PI_OVER_TWO, CesiumMath.PI_OVER_TWO),
+                0.0
+            );
+            distance = height / Math.sin(-pitch);
+        }
+        if (!center || !Number.isFinite(distance)) return;
+        this.flightTargets += 1;
+        this.prefetchFootprint(center, distance);
+    }
+
+    /**
+     * 预测视点的覆盖范围内，按屏幕空间误差估算所需层级，并附带 parentLevels 个父层级（Globe 先用粗瓦片填充）。
+     */
+    private prefetchFootprint(center: Cartographic, distanceMeters: number): void {
+        const distance = Math.max(MIN_PREDICTION_DISTANCE, distanceMeters);
+        const provider = this.provider;
+        if (!provider) return;
+        const tilingScheme = provider.tilingScheme;
+        const level = this.resolveLevel(provider, center, distance);
+        const frustum = this.viewer.camera.frustum as { fovy?: number; aspectRatio?: number };
+        const halfFov = (frustum.fovy ?? CesiumMath.toRadians(60.0)) / 2;
+        const aspect = Math.max(1.0, frustum.aspectRatio ?? 1.0);
+        const radiusRadians = (distance * Math.tan(halfFov) * aspect) / Ellipsoid.WGS84.maximumRadius;
+        const lonRadius = Math.min(Math.PI, radiusRadians / Math.max(0.01, Math.cos(center.latitude)));
+        const south = Math.max(-CesiumMath.PI_OVER_TWO, center.latitude - radiusRadians);
+        const north = Math.min(CesiumMath.PI_OVER_TWO, center.latitude + radiusRadians);
+        const northWest = new Cartographic(CesiumMath.negativePiToPi(center.longitude - lonRadius), north);
+        const southEast = new Cartographic(CesiumMath.negativePiToPi(center.longitude + lonRadius), south);
+
+        const candidates: Array<QueuedTile & { distance: number }> = [];
+        const firstLevel = Math.max(0, level - this.options.parentLevels);
+        for (let l = firstLevel; l <= level; l += 1) {
+            const centerTile = tilingScheme.positionToTileXY(center, l);
+            const nw = tilingScheme.positionToTileXY(northWest, l);
+            const se = tilingScheme.positionToTileXY(southEast, l);
+            if (!centerTile || !nw || !se) continue;
+            const columns = tilingScheme.getNumberOfXTilesAtLevel(l);
+            // 跨反子午线时 nw.x > se.x，按环绕列数遍历。
+            const spanX = (se.x - nw.x + columns) % columns;
+            for (let y = nw.y; y <= se.y; y += 1) {
+                for (let i = 0; i <= spanX; i += 1) {
+                    const x = (nw.x + i) % columns;
+                    const key = tileKey(x, y, l);
+                    if (this.cache.has(key) || this.inFlight.has(key)) continue;
+                    if (provider.getTileDataAvailable(x, y, l) === false) continue;
+                    const dx = Math.min(Math.abs(x - centerTile.x), columns - Math.abs(x - centerTile.x));
+                    const dy = y - centerTile.y;
+                    candidates.push({ key, x, y, level: l, distance: dx * dx + dy * dy });
+                }
+            }
+        }
+        candidates.sort((a, b) => a.level - b.level || a.distance - b.distance);
+        this.dropped += this.queue.length;
+        this.queue = candidates.slice(0, this.options.maxTilesPerPrediction);
+        this.pump();
+    }
+
+    /**
+     * 所需层级：几何误差 levelZeroError / 2^L 在该距离上的屏幕误差不超过 globe.maximumScreenSpaceError；
+     * 超出数据可用层级时逐级回退到中心瓦片仍可用的最深层级（更深处由 Globe 上采样）。
+     */
+    private resolveLevel(provider: CesiumTerrainProvider, center: Cartographic, distance: number): number {
+        const scene = this.viewer.scene;
+        const frustum = this.viewer.camera.frustum as { fovy?: number };
+        const fovy = frustum.fovy ?? CesiumMath.toRadians(60.0);
+        const sseDenominator = 2.0 * Math.tan(fovy / 2);
+        const levelZeroError = provider.getLevelMaximumGeometricError(0);
+        const maxScreenError = scene.globe.maximumScreenSpaceError;
+        const viewportHeight = Math.max(1, scene.canvas.clientHeight);
+        const ratio = (levelZeroError * viewportHeight) / (distance * sseDenominator * maxScreenError);
+        let level = Math.max(0, Math.ceil(Math.log2(Math.max(1, ratio))));
+        while (level > 0) {
+            const tile = provider.tilingScheme.positionToTileXY(center, level);
+            if (tile && provider.getTileDataAvailable(tile.x, tile.y, level) !== false) break;
+            level -= 1;
+        }
+        return level;
+    }
+
+    private pump(): void {
+        const provider = this.provider;
+        const original = this.originalRequest;
+        if (!provider || !original) return;
+        const generation = this.attachGeneration;
+        while (this.inFlight.size < this.options.maxConcurrent && this.queue.length > 0) {
+            const tile = this.queue.shift() as QueuedTile;
+            if (this.cache.has(tile.key) || this.inFlight.has(tile.key)) continue;
+            // 不传 Request：预取不占用 Cesium 请求调度器的名额，由自身并发上限约束。
+            const promise = original.call(provider, tile.x, tile.y, tile.level);
+            if (!promise) continue;
+            this.requested += 1;
+            const tracked = promise.then(
+                (data) => {
+                    // 请求期间若已解绑或切换地形服务（包括重新绑定同一服务），结果不能进入当前缓存。
+                    if (this.attachGeneration !== generation) return undefined;
+                    this.completed += 1;
+                    this.store(tile.key, data);
+                    return data;
+                },
+                () => {
+                    if (this.attachGeneration === generation) {
+                        this.failed += 1;
+                    }
+                    return undefined;
+                }
+            ).finally(() => {
+                if (this.inFlight.get(tile.key) === tracked) {
+                    this.inFlight.delete(tile.key);
+                }
+                this.pump();
+            });
+            this.inFlight.set(tile.key, tracked);
+        }
+    }
+
+    private store(key: string, data: TerrainData): void {
+        const now = performance.now();
+        const bytes = estimateTileBytes(data);
+        // 同键覆盖时先扣掉旧条目，并让新条目按插入顺序排到队尾。
+        this.take(key);
+        this.cache.set(key, { data, bytes, storedAtMs: now });
+        this.cacheBytes += bytes;
+        const budget = this.options.maxCacheMegabytes * 1024 * 1024;
+        // Map 按插入顺序迭代：最早的条目最先过期或被挤出。
+        for (const [oldKey, entry] of this.cache) {
+            if (this.cacheBytes <= budget && now - entry.storedAtMs <= this.options.entryTtlMs) break;
+            this.cache.delete(oldKey);
+            this.cacheBytes -= entry.bytes;
+            this.evictions += 1;
+        }
+    }
+}
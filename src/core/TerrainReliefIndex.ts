@@ -0,0 +1,107 @@
+/**
+ * 离线地形起伏索引（tests/terrain_relief.py 从 MBTiles 预计算）的只读视图。
+ * 文件布局：8 字节 magic "E3RELIEF" | uint32 头长度 | JSON 头 | 64 字节对齐的数据区；
+ * 每级一个 int16 数组 [rows, cols, 4]（min/max/mean/relief，米），TMS 行序（y=0 在南）。
+ */
+export interface TerrainReliefSpan {
+    min: number;
+    max: number;
+    mean: number;
+    span: number;
+    tiles: number;
+    zoom: number;
+}
+
+interface ReliefLevelHeader {
+    zoom: number;
+    rows: number;
+    cols: number;
+    offset: number;
+}
+
+interface ReliefIndexHeader {
+    version: number;
+    nodata: number;
+    levels: ReliefLevelHeader[];
+}
+
+const MAGIC = 'E3RELIEF';
+const FORMAT_VERSION = 1;
+const ALIGNMENT = 64;
+const CHANNELS = 4;
+
+export class TerrainReliefIndex {
+    private readonly levels: Int16Array[];
+    private readonly headers: ReliefLevelHeader[];
+    private readonly nodata: number;
+
+    private constructor(buffer: ArrayBuffer) {
+        const magic = String.fromCharCode(...new Uint8Array(buffer, 0, MAGIC.length));
+        if (magic !== MAGIC) {
+            throw new Error('TerrainReliefIndex: invalid magic.');
+        }
+        const headerLength = new DataView(buffer).getUint32(MAGIC.length, true);
+        const headerStart = MAGIC.length + 4;
+        const header = JSON.parse(
+            new TextDecoder().decode(new Uint8Array(buffer, headerStart, headerLength))
+        ) as ReliefIndexHeader;
+        if (header.version !== FORMAT_VERSION) {
+            throw new Error(`TerrainReliefIndex: unsupported version ${header.version}.`);
+        }
+        const dataOffset = Math.ceil((headerStart + headerLength) / ALIGNMENT) * ALIGNMENT;
+        this.nodata = header.nodata;
+        this.headers = header.levels;
+        // 数据区 64 字节对齐，可直接建立 Int16Array 视图（小端平台）。
+        this.levels = header.levels.map((level) =>
+            new Int16Array(buffer, dataOffset + level.offset, level.rows * level.cols * CHANNELS)
+        );
+    }
+
+    public static async load(url: string): Promise<TerrainReliefIndex> {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`TerrainReliefIndex: HTTP ${response.status} for ${url}.`);
+        }
+        return new TerrainReliefIndex(await response.arrayBuffer());
+    }
+
+    public get maxZoom(): number {
+        return this.levels.length - 1;
+    }
+
+    /**
+     * 覆盖 [lon ± r, lat ± r]（度）的瓦片窗口内的高程范围；窗口内全部缺失时返回 undefined。
+     */
+    public spanAround(longitude: number, latitude: number, radiusDegrees: number, zoom: number = this.maxZoom): TerrainReliefSpan | undefined {
+        const level = this.headers[zoom];
+        const values = this.levels[zoom];
+        if (!level || !values) {
+            return undefined;
+        }
+        const tileDegrees = 180.0 / level.rows;
+        const toColumn = (lon: number): number => Math.min(level.cols - 1, Math.max(0, Math.floor((lon + 180.0) / tileDegrees)));
+        const toRow = (lat: number): number => Math.min(level.rows - 1, Math.max(0, Math.floor((lat + 90.0) / tileDegrees)));
+        const x0 = toColumn(longitude - radiusDegrees);
+        const x1 = toColumn(longitude + radiusDegrees);
+        const y0 = toRow(latitude - radiusDegrees);
+        const y1 = toRow(latitude + radiusDegrees);
+        let min = Number.POSITIVE_INFINITY;
+        let max = Number.NEGATIVE_INFINITY;
+        let meanSum = 0;
+        let tiles = 0;
+        for (let y = y0; y <= y1; y += 1) {
+            for (let x = x0; x <= x1; x += 1) {
+                const base = (y * level.cols + x) * CHANNELS;
+                if (values[base] === this.nodata) continue;
+                min = Math.min(min, values[base]);
+                max = Math.max(max, values[base + 1]);
+                meanSum += values[base + 2];
+                tiles += 1;
+            }
+        }
+        if (tiles === 0) {
+            return undefined;
+        }
+        return { min, max, mean: meanSum / tiles, span: max - min, tiles, zoom };
+    }
+}
@@ -0,0 +1,528 @@
+import type {
+    CesiumTerrainProvider,
+    Request,
+    TerrainData,
+    TerrainMesh,
+    Viewer
+} from 'cesium';
+
+export interface TilePipelineOptions {
+    enabled: boolean;
+    latencyCapacity: number;
+    queueSampleCapacity: number;
+    queueSeriesLength: number;
+    episodeHistory: number;
+    settleTimeoutMs: number;
+}
+
+export interface LatencySummary {
+    count: number;
+    meanMs: number;
+    p50Ms: number;
+    p95Ms: number;
+    maxMs: number;
+}
+
+export type TilePipelineTrigger = 'cameraMove' | 'lodSwitch';
+
+export interface TimeToLoadedEpisode {
+    trigger: TilePipelineTrigger;
+    startedAtMs: number;
+    // 从触发到首个 tilesLoaded 帧的时长；timedOut / superseded 时为截止时刻的耗时。
+    durationMs: number;
+    frames: number;
+    peakQueueDepth: number;
+    status: 'settled' | 'timedOut' | 'superseded';
+}
+
+export interface TilePipelineStats {
+    enabled: boolean;
+    attached: boolean;
+    queue: {
+        current: number;
+        max: number;
+        // 采样窗口内按时间加权的平均队列深度。
+        timeWeightedMean: number;
+        sampleCount: number;
+        // 最近的 [相对 resetStats 的时刻 ms, 队列深度]。
+        recent: Array<[number, number]>;
+    };
+    // 来自 Resource Timing：服务端 + 网络耗时与传输字节（跨源时需服务端返回 Timing-Allow-Origin）。
+    network: {
+        requests: number;
+        bytes: number;
+        duration: LatencySummary;
+    };
+    tiles: {
+        requested: number;
+        // Cesium 请求调度器节流返回 undefined 的次数（稍后会重试）。
+        throttled: number;
+        received: number;
+        failed: number;
+        decoded: number;
+        // requestTileGeometry → TerrainData 就绪（服务端 + 网络 + 解包）。
+        fetch: LatencySummary;
+        // TerrainData 就绪 → Globe 首次调用 createMesh（主循环处理队列的等待）。
+        wait: LatencySummary;
+        // createMesh → TerrainMesh 就绪（Worker 解码与上采样）。
+        decode: LatencySummary;
+        // requestTileGeometry → TerrainMesh 就绪。
+        total: LatencySummary;
+    };
+    timeToLoaded: {
+        episodes: number;
+        settled: number;
+        timedOut: number;
+        superseded: number;
+        pending: number;
+        // 分位数含 timedOut 记录（按 settleTimeoutMs 截尾计入），从不加载完成的停滞不会从分位数中消失。
+        p50Ms: number;
+        p95Ms: number;
+        maxMs: number;
+        byTrigger: Record<TilePipelineTrigger, LatencySummary>;
+        recent: TimeToLoadedEpisode[];
+    };
+}
+
+interface PendingEpisode {
+    trigger: TilePipelineTrigger;
+    startedAtMs: number;
+    frames: number;
+    peakQueueDepth: number;
+}
+
+type RequestTileGeometry = (x: number, y: number, level: number, request?: Request) => Promise<TerrainData> | undefined;
+type CreateMesh = TerrainData['createMesh'];
+
+const EMPTY_SUMMARY: LatencySummary = { count: 0, meanMs: 0, p50Ms: 0, p95Ms: 0, maxMs: 0 };
+
+/**
+ * 固定容量的耗时样本环形缓冲。
+ */
+class LatencyRing {
+    private readonly samples: Float32Array;
+    private writeIndex: number;
+    private count: number;
+
+    constructor(capacity: number) {
+        this.samples = new Float32Array(Math.max(1, Math.floor(capacity)));
+        this.writeIndex = 0;
+        this.count = 0;
+    }
+
+    public push(valueMs: number): void {
+        this.samples[this.writeIndex] = valueMs;
+        this.writeIndex = (this.writeIndex + 1) % this.samples.length;
+        this.count = Math.min(this.count + 1, this.samples.length);
+    }
+
+    public reset(): void {
+        this.writeIndex = 0;
+        this.count = 0;
+    }
+
+    public summarize(): LatencySummary {
+        if (this.count === 0) {
+            return { ...EMPTY_SUMMARY };
+        }
+        const sorted = this.samples.slice(0, this.count).sort();
+        let sum = 0;
+        for (let i = 0; i < sorted.length; i += 1) {
+            sum += sorted[i];
+        }
+        return {
+            count: this.count,
+            meanMs: sum / this.count,
+            p50Ms: percentile(sorted, 0.5),
+            p95Ms: percentile(sorted, 0.95),
+            maxMs: sorted[sorted.length - 1]
+        };
+    }
+}
+
+function percentile(sorted: ArrayLike<number>, ratio: number): number {
+    if (sorted.length === 0) {
+        return 0;
+    }
+    // nearest-rank：与 FrameTimeRecorder 口径一致。
+    const rank = Math.min(sorted.length - 1, Math.max(0, Math.ceil(ratio * sorted.length) - 1));
+    return sorted[rank];
+}
+
+/**
+ * 地形瓦片管线遥测
+ * 1) 订阅 globe.tileLoadProgressEvent，按时间记录瓦片加载队列深度；
+ * 2) 包装地形服务的 requestTileGeometry 与返回 TerrainData 的 createMesh，
+ *    把每块瓦片的耗时拆为 fetch（服务端/网络）、wait（主循环排队）、decode（Worker 解码）三段；
+ * 3) Resource Timing 统计地形请求数、字节与网络耗时；
+ * 4) 相机停止移动或 LOD 切档后计时，首个 tilesLoaded 帧结算 time-to-loaded；
+ *    相机计时起点取 moveEnd 时刻减去 scene.cameraEventWaitTime（相机实际停下的时刻），
+ *    超时未加载完成的记录按 settleTimeoutMs 截尾计入分位数。
+ * 包装叠加在 TerrainPrefetcher 之上，记录的是 Globe 实际感知的耗时（预取命中的 fetch 接近 0）。
+ */
+export class TilePipelineTelemetry {
+    private readonly viewer: Viewer;
+    private readonly options: TilePipelineOptions;
+    private readonly removeListeners: () => void;
+    private readonly fetchLatency: LatencyRing;
+    private readonly waitLatency: LatencyRing;
+    private readonly decodeLatency: LatencyRing;
+    private readonly totalLatency: LatencyRing;
+    private readonly networkLatency: LatencyRing;
+    private readonly timeToLoaded: LatencyRing;
+    private readonly timeToLoadedByTrigger: Record<TilePipelineTrigger, LatencyRing>;
+    private readonly queueTimes: Float64Array;
+    private readonly queueDepths: Uint32Array;
+    private readonly pending: Map<TilePipelineTrigger, PendingEpisode>;
+    private resourceObserver?: PerformanceObserver;
+    private resourcePrefix?: string;
+    private provider?: CesiumTerrainProvider;
+    private originalRequest?: RequestTileGeometry;
+    private epochMs: number;
+    private queueWriteIndex: number;
+    private queueSampleCount: number;
+    private queueCurrent: number;
+    private queueMax: number;
+    private queueChangedAtMs: number;
+    private queueWeightedSum: number;
+    private queueWeightedMs: number;
+    private requested: number;
+    private throttled: number;
+    private received: number;
+    private failed: number;
+    private decoded: number;
+    private networkRequests: number;
+    private networkBytes: number;
+    private episodes: TimeToLoadedEpisode[];
+    private settledCount: number;
+    private timedOutCount: number;
+    private supersededCount: number;
+
+    constructor(viewer: Viewer, options: TilePipelineOptions) {
+        this.viewer = viewer;
+        this.options = options;
+        this.fetchLatency = new LatencyRing(options.latencyCapacity);
+        this.waitLatency = new LatencyRing(options.latencyCapacity);
+        this.decodeLatency = new LatencyRing(options.latencyCapacity);
+        this.totalLatency = new LatencyRing(options.latencyCapacity);
+        this.networkLatency = new LatencyRing(options.latencyCapacity);
+        this.timeToLoaded = new LatencyRing(options.episodeHistory);
+        this.timeToLoadedByTrigger = {
+            cameraMove: new LatencyRing(options.episodeHistory),
+            lodSwitch: new LatencyRing(options.episodeHistory)
+        };
+        const queueCapacity = Math.max(1, Math.floor(options.queueSampleCapacity));
+        this.queueTimes = new Float64Array(queueCapacity);
+        this.queueDepths = new Uint32Array(queueCapacity);
+        this.pending = new Map();
+        this.epochMs = performance.now();
+        this.queueWriteIndex = 0;
+        this.queueSampleCount = 0;
+        this.queueCurrent = 0;
+        this.queueMax = 0;
+        this.queueChangedAtMs = this.epochMs;
+        this.queueWeightedSum = 0;
+        this.queueWeightedMs = 0;
+        this.requested = 0;
+        this.throttled = 0;
+        this.received = 0;
+        this.failed = 0;
+        this.decoded = 0;
+        this.networkRequests = 0;
+        this.networkBytes = 0;
+        this.episodes = [];
+        this.settledCount = 0;
+        this.timedOutCount = 0;
+        this.supersededCount = 0;
+
+        if (!options.enabled) {
+            this.removeListeners = () => undefined;
+            return;
+        }
+        const globe = viewer.scene.globe;
+        const camera = viewer.camera;
+        const onQueueChanged = (queueLength: number): void => this.recordQueueDepth(queueLength);
+        // moveEnd 要等相机静止 cameraEventWaitTime（默认 500ms）后才触发，计时起点回拨到相机实际停下的时刻，
+        // 否则这段时间内的细化不计入，且在此期间加载完成的场景会被记成瞬时完成。
+        const onMoveEnd = (): void =>
+            this.beginEpisode('cameraMove', performance.now() - viewer.scene.cameraEventWaitTime);
+        globe.tileLoadProgressEvent.addEventListener(onQueueChanged);
+        camera.moveEnd.addEventListener(onMoveEnd);
+        this.removeListeners = () => {
+            globe.tileLoadProgressEvent.removeEventListener(onQueueChanged);
+            camera.moveEnd.removeEventListener(onMoveEnd);
+        };
+    }
+
+    /**
+     * 绑定（或解绑）地形服务；应在 TerrainPrefetcher.attach 之后调用、之前解绑，保证包装顺序可还原。
+     */
+    public attach(provider: CesiumTerrainProvider | undefined, url?: string): void {
+        if (provider === this.provider) return;
+        this.detach();
+        if (!provider || !this.options.enabled) return;
+        const original = provider.requestTileGeometry as RequestTileGeometry;
+        this.provider = provider;
+        this.originalRequest = original;
+        provider.requestTileGeometry = (x: number, y: number, level: number, request?: Request) =>
+            this.trackRequest(original.call(provider, x, y, level, request));
+        this.observeResources(url);
+    }
+
+    /**
+     * 开始一次 time-to-loaded 计时；同一触发源未结算的上一次记为 superseded。
+     */
+    public beginEpisode(trigger: TilePipelineTrigger, nowMs: number): void {
+        if (!this.options.enabled) return;
+        const previous = this.pending.get(trigger);
+        if (previous) {
+            this.finishEpisode(previous, nowMs, 'superseded');
+        }
+        this.pending.set(trigger, {
+            trigger,
+            startedAtMs: nowMs,
+            frames: 0,
+            peakQueueDepth: this.queueCurrent
+        });
+        // requestRenderMode 下保证至少再出一帧，使已加载完成的场景也能及时结算。
+        this.viewer.scene.requestRender();
+    }
+
+    /**
+     * 每帧 postRender 调用：首个 tilesLoaded 帧结算所有待定计时，超时记为 timedOut。
+     */
+    public onFrameRendered(nowMs: number, tilesLoaded: boolean): void {
+        if (this.pending.size === 0) return;
+        for (const episode of [...this.pending.values()]) {
+            episode.frames += 1;
+            if (tilesLoaded) {
+                this.finishEpisode(episode, nowMs, 'settled');
+            } else if (nowMs - episode.startedAtMs > this.options.settleTimeoutMs) {
+                this.finishEpisode(episode, nowMs, 'timedOut');
+            }
+        }
+    }
+
+    public getStats(): TilePipelineStats {
+        const now = performance.now();
+        const weightedMs = this.queueWeightedMs + (now - this.queueChangedAtMs);
+        const weightedSum = this.queueWeightedSum + this.queueCurrent * (now - this.queueChangedAtMs);
+        const loaded = this.timeToLoaded.summarize();
+        return {
+            enabled: this.options.enabled,
+            attached: !!this.provider,
+            queue: {
+                current: this.queueCurrent,
+                max: this.queueMax,
+                timeWeightedMean: weightedMs > 0 ? weightedSum / weightedMs : 0,
+                sampleCount: this.queueSampleCount,
+                recent: this.recentQueueSeries()
+            },
+            network: {
+                requests: this.networkRequests,
+                bytes: this.networkBytes,
+                duration: this.networkLatency.summarize()
+            },
+            tiles: {
+                requested: this.requested,
+                throttled: this.throttled,
+                received: this.received,
+                failed: this.failed,
+                decoded: this.decoded,
+                fetch: this.fetchLatency.summarize(),
+                wait: this.waitLatency.summarize(),
+                decode: this.decodeLatency.summarize(),
+                total: this.totalLatency.summarize()
+            },
+            timeToLoaded: {
+                episodes: this.settledCount + this.timedOutCount + this.supersededCount,
+                settled: this.settledCount,
+                timedOut: this.timedOutCount,
+                superseded: this.supersededCount,
+                pending: this.pending.size,
+                p50Ms: loaded.p50Ms,
+                p95Ms: loaded.p95Ms,
+                maxMs: loaded.maxMs,
+                byTrigger: {
+                    cameraMove: this.timeToLoadedByTrigger.cameraMove.summarize(),
+                    lodSwitch: this.timeToLoadedByTrigger.lodSwitch.summarize()
+                },
+                recent: this.episodes.map((episode) => ({ ...episode }))
+            }
+        };
+    }
+
+    public resetStats(): void {
+        this.fetchLatency.reset();
+        this.waitLatency.reset();
+        this.decodeLatency.reset();
+        this.totalLatency.reset();
+        this.networkLatency.reset();
+        this.timeToLoaded.reset();
+        this.timeToLoadedByTrigger.cameraMove.reset();
+        this.timeToLoadedByTrigger.lodSwitch.reset();
+        this.pending.clear();
+        this.epochMs = performance.now();
+        this.queueWriteIndex = 0;
+        this.queueSampleCount = 0;
+        this.queueMax = this.queueCurrent;
+        this.queueChangedAtMs = this.epochMs;
+        this.queueWeightedSum = 0;
+        this.queueWeightedMs = 0;
+        this.requested = 0;
+        this.throttled = 0;
+        this.received = 0;
+        this.failed = 0;
+        this.decoded = 0;
+        this.networkRequests = 0;
+        this.networkBytes = 0;
+        this.episodes = [];
+        this.settledCount = 0;
+        this.timedOutCount = 0;
+        this.supersededCount = 0;
+    }
+
+    public destroy(): void {
+        this.removeListeners();
+        this.detach();
+    }
+
+    private detach(): void {
+        if (this.provider && this.originalRequest) {
+            this.provider.requestTileGeometry = this.originalRequest;
+        }
+        this.provider = undefined;
+        this.originalRequest = undefined;
+        this.resourceObserver?.disconnect();
+        this.resourceObserver = undefined;
+        this.resourcePrefix = undefined;
+    }
+
+    private trackRequest(promise: Promise<TerrainData> | undefined): Promise<TerrainData> | undefined {
+        if (!promise) {
+            this.throttled += 1;
+            return promise;
+        }
+        const requestedAtMs = performance.now();
+        this.requested += 1;
+        return promise.then(
+            (data) => {
+                const readyAtMs = performance.now();
+                this.received += 1;
+                this.fetchLatency.push(readyAtMs - requestedAtMs);
+                this.instrumentMesh(data, requestedAtMs, readyAtMs);
+                return data;
+            },
+            (error: unknown) => {
+                this.failed += 1;
+                throw error;
+            }
+        );
+    }
+
+    private instrumentMesh(data: TerrainData, requestedAtMs: number, readyAtMs: number): void {
+        const original = data.createMesh as CreateMesh;
+        let firstCallMs: number | undefined;
+        data.createMesh = ((options: Parameters<CreateMesh>[0]): Promise<TerrainMesh> | undefined => {
+            const callMs = performance.now();
+            const result = original.call(data, options);
+            // 被 Worker 调度节流时返回 undefined，Globe 下一帧重试；wait 从数据就绪算到首次调用。
+            if (firstCallMs === undefined) {
+                firstCallMs = callMs;
+                this.waitLatency.push(callMs - readyAtMs);
+            }
+            if (!result) return result;
+            // 只统计一次，之后恢复原函数，避免重复包装开销。
+            data.createMesh = original;
+            return result.then((mesh) => {
+                const doneMs = performance.now();
+                this.decoded += 1;
+                this.decodeLatency.push(doneMs - callMs);
+                this.totalLatency.push(doneMs - requestedAtMs);
+                return mesh;
+            });
+        }) as CreateMesh;
+    }
+
+    private observeResources(url: string | undefined): void {
+        if (!url || typeof PerformanceObserver === 'undefined') return;
+        try {
+            this.resourcePrefix = new URL(url, window.location.href).href.replace(/\/+$/, '');
+            const observer = new PerformanceObserver((list) => {
+                for (const entry of list.getEntries() as PerformanceResourceTiming[]) {
+                    if (!this.resourcePrefix || !entry.name.startsWith(this.resourcePrefix)) continue;
+                    if (!entry.name.includes('.terrain')) continue;
+                    this.networkRequests += 1;
+                    this.networkBytes += entry.transferSize || entry.encodedBodySize || 0;
+                    this.networkLatency.push(entry.responseEnd - entry.startTime);
+                }
+            });
+            observer.observe({ type: 'resource', buffered: false });
+            this.resourceObserver = observer;
+        } catch (error) {
+            console.warn('TilePipelineTelemetry: resource timing unavailable.', error);
+            this.resourcePrefix = undefined;
+        }
+    }
+
+    private recordQueueDepth(queueLength: number): void {
+        const now = performance.now();
+        const elapsed = now - this.queueChangedAtMs;
+        this.queueWeightedSum += this.queueCurrent * elapsed;
+        this.queueWeightedMs += elapsed;
+        this.queueChangedAtMs = now;
+        this.queueCurrent = queueLength;
+        this.queueMax = Math.max(this.queueMax, queueLength);
+        this.queueTimes[this.queueWriteIndex] = now - this.epochMs;
+        this.queueDepths[this.queueWriteIndex] = queueLength;
+        this.queueWriteIndex = (this.queueWriteIndex + 1) % this.queueTimes.length;
+        this.queueSampleCount += 1;
+        for (const episode of this.pending.values()) {
+            episode.peakQueueDepth = Math.max(episode.peakQueueDepth, queueLength);
+        }
+    }
+
+    private recentQueueSeries(): Array<[number, number]> {
+        const capacity = this.queueTimes.length;
+        const stored = Math.min(this.queueSampleCount, capacity);
+        const length = Math.min(stored, Math.max(0, Math.floor(this.options.queueSeriesLength)));
+        const series: Array<[number, number]> = [];
+        for (let i = length; i > 0; i -= 1) {
+            const index = (this.queueWriteIndex - i + capacity) % capacity;
+            series.push([Math.round(this.queueTimes[index]), this.queueDepths[index]]);
+        }
+        return series;
+    }
+
+    private finishEpisode(
+        episode: PendingEpisode,
+        nowMs: number,
+        status: TimeToLoadedEpisode['status']
+    ): void {
+        this.pending.delete(episode.trigger);
+        const durationMs = Math.max(0, nowMs - episode.startedAtMs);
+        if (status === 'settled') {
+            this.settledCount += 1;
+            this.timeToLoaded.push(durationMs);
+            this.timeToLoadedByTrigger[episode.trigger].push(durationMs);
+        } else if (status === 'timedOut') {
+            this.timedOutCount += 1;
+            // 截尾样本：真实耗时至少为 settleTimeoutMs。
+            this.timeToLoaded.push(this.options.settleTimeoutMs);
+            this.timeToLoadedByTrigger[episode.trigger].push(this.options.settleTimeoutMs);
+        } else {
+            this.supersededCount += 1;
+        }
+        this.episodes.push({
+            trigger: episode.trigger,
+            startedAtMs: episode.startedAtMs - this.epochMs,
+            durationMs,
+            frames: episode.frames,
+            peakQueueDepth: episode.peakQueueDepth,
+            status
+        });
+        if (this.episodes.length > this.options.episodeHistory) {
+            this.episodes.splice(0, this.episodes.length - this.options.episodeHistory);
+        }
+    }
+}
@@ -0,0 +1,232 @@
+import {
+    advanceTracks,
+    getRouteCount,
+    sharedBufferByteLength,
+    sharedPositionRegion,
+    SHARED_FRONT_INDEX,
+    type KinematicsFrameMessage,
+    type KinematicsRequest,
+    type TrackRouteTable
+} from './TrackKinematicsProtocol';
+
+export type TrackKinematicsMode = 'shared' | 'transfer' | 'main-thread';
+
+export interface TrackKinematicsOptions {
+    useWorker: boolean;
+    useSharedMemory: boolean;
+}
+
+export interface TrackKinematicsStats {
+    mode: TrackKinematicsMode;
+    trackCount: number;
+    stepsRequested: number;
+    // Worker 仍在计算上一帧时跳过的推进请求（主线程不排队、不阻塞）。
+    stepsSkipped: number;
+    framesReceived: number;
+    lastComputeMs: number;
+    maxComputeMs: number;
+    // 最近一帧位置对应的仿真时间（秒）。
+    frameSeconds: number;
+}
+
+function canUseSharedMemory(): boolean {
+    // SharedArrayBuffer 仅在跨源隔离（COOP/COEP）页面可用。
+    return typeof SharedArrayBuffer !== 'undefined' &&
+        typeof crossOriginIsolated !== 'undefined' &&
+        crossOriginIsolated;
+}
+
+/**
+ * 航迹运动学引擎
+ * Worker 持有全部航线并按仿真时间推进，ECEF 位置写入共享双缓冲（SharedArrayBuffer），
+ * 不可用时以两块可转移 ArrayBuffer 往返；Worker 不可用时退化为主线程同步计算。
+ * 主线程每帧只做 step() 投递与 getPositions() 读取，均不分配对象，开销与航迹数量无关；
+ * 位置比请求时间滞后约一帧。
+ */
+export class TrackKinematicsEngine {
+    private readonly mode: TrackKinematicsMode;
+    private worker?: Worker;
+    private generation: number;
+    private trackCount: number;
+    private routes?: TrackRouteTable;
+    private inFlight: boolean;
+    private hasFrame: boolean;
+    private sharedHeader?: Int32Array;
+    private sharedRegions: Float64Array[];
+    private frontPositions?: Float64Array;
+    private spareBuffer?: ArrayBuffer;
+    private stepsRequested: number;
+    private stepsSkipped: number;
+    private framesReceived: number;
+    private lastComputeMs: number;
+    private maxComputeMs: number;
+    private frameSeconds: number;
+
+    constructor(options: TrackKinematicsOptions) {
+        this.generation = 0;
+        this.trackCount = 0;
+        this.inFlight = false;
+        this.hasFrame = false;
+        this.sharedRegions = [];
+        this.stepsRequested = 0;
+        this.stepsSkipped = 0;
+        this.framesReceived = 0;
+        this.lastComputeMs = 0;
+        this.maxComputeMs = 0;
+        this.frameSeconds = 0;
+        this.mode = 'main-thread';
+        if (options.useWorker && typeof Worker !== 'undefined') {
+            try {
+                this.worker = new Worker(new URL('./TrackKinematicsWorker.ts', import.meta.url), { type: 'module' });
+                this.worker.onmessage = (event: MessageEvent<KinematicsFrameMessage>) => this.onFrame(event.data);
+                this.worker.onerror = (event) => console.error('TrackKinematicsEngine: worker error.', event.message);
+                this.mode = options.useSharedMemory && canUseSharedMemory() ? 'shared' : 'transfer';
+            } catch (error) {
+                console.warn('TrackKinematicsEngine: worker unavailable, falling back to main thread.', error);
+                this.worker = undefined;
+            }
+        }
+    }
+
+    public getMode(): TrackKinematicsMode {
+        return this.mode;
+    }
+
+    public getTrackCount(): number {
+        return this.trackCount;
+    }
+
+    /**
+     * 替换全部航线；航迹下标即航线在表中的顺序。新航线的首帧到达前 getPositions() 返回 undefined。
+     */
+    public setRoutes(routes: TrackRouteTable): void {
+        this.generation += 1;
+        this.trackCount = getRouteCount(routes);
+        this.inFlight = false;
+        this.hasFrame = false;
+        this.frontPositions = undefined;
+        this.spareBuffer = undefined;
+        this.sharedHeader = undefined;
+        this.sharedRegions = [];
+
+        if (!this.worker) {
+            this.routes = routes;
+            this.frontPositions = new Float64Array(this.trackCount * 3);
+            return;
+        }
+        this.routes = undefined;
+        let shared: SharedArrayBuffer | undefined;
+        if (this.mode === 'shared') {
+            shared = new SharedArrayBuffer(sharedBufferByteLength(this.trackCount));
+            this.sharedHeader = new Int32Array(shared, 0, 2);
+            this.sharedRegions = [0, 1].map((index) => sharedPositionRegion(shared as SharedArrayBuffer, this.trackCount, index));
+        }
+        // 航线表只发送一次，之后每帧仅投递时间。
+        const message: KinematicsRequest = { type: 'setRoutes', generation: this.generation, routes, shared };
+        this.worker.postMessage(message);
+    }
+
+    /**
+     * 请求把航迹推进到 elapsedSeconds；上一帧尚未返回时直接跳过，由下一次调用追上。
+     */
+    public step(elapsedSeconds: number): void {
+        if (this.trackCount === 0) {
+            return;
+        }
+        this.stepsRequested += 1;
+        if (!this.worker) {
+            if (this.routes && this.frontPositions) {
+                const begin = performance.now();
+                advanceTracks(this.routes, elapsedSeconds, this.frontPositions);
+                this.recordFrame(elapsedSeconds, performance.now() - begin);
+            }
+            return;
+        }
+        if (this.inFlight) {
+            this.stepsSkipped += 1;
+            return;
+        }
+        this.inFlight = true;
+        const buffer = this.spareBuffer;
+        this.spareBuffer = undefined;
+        const message: KinematicsRequest = { type: 'step', generation: this.generation, elapsedSeconds, buffer };
+        this.worker.postMessage(message, buffer ? [buffer] : []);
+    }
+
+    /**
+     * 最近一帧的 ECEF 位置（[x, y, z] 三元组，米），按航线顺序排列；返回的视图在下一帧到达前有效，调用方不应保留。
+     */
+    public getPositions(): Float64Array | undefined {
+        if (!this.hasFrame) {
+            return undefined;
+        }
+        if (this.sharedHeader) {
+            return this.sharedRegions[Atomics.load(this.sharedHeader, SHARED_FRONT_INDEX)];
+        }
+        return this.frontPositions;
+    }
+
+    /**
+     * getPositions() 所返回帧对应的仿真时间（秒）。
+     */
+    public getFrameSeconds(): number {
+        return this.frameSeconds;
+    }
+
+    public getStats(): TrackKinematicsStats {
+        return {
+            mode: this.mode,
+            trackCount: this.trackCount,
+            stepsRequested: this.stepsRequested,
+            stepsSkipped: this.stepsSkipped,
+            framesReceived: this.framesReceived,
+            lastComputeMs: this.lastComputeMs,
+            maxComputeMs: this.maxComputeMs,
+            frameSeconds: this.frameSeconds
+        };
+    }
+
+    public resetStats(): void {
+        this.stepsRequested = 0;
+        this.stepsSkipped = 0;
+        this.framesReceived = 0;
+        this.lastComputeMs = 0;
+        this.maxComputeMs = 0;
+    }
+
+    public destroy(): void {
+        this.worker?.terminate();
+        this.worker = undefined;
+        this.routes = undefined;
+        this.frontPositions = undefined;
+        this.spareBuffer = undefined;
+        this.sharedHeader = undefined;
+        this.sharedRegions = [];
+        this.trackCount = 0;
+        this.hasFrame = false;
+    }
+
+    private onFrame(message: KinematicsFrameMessage): void {
+        if (message.generation !== this.generation) {
+            // 旧航线的帧：丢弃，不影响当前在途状态。
+            return;
+        }
+        this.inFlight = false;
+        if (message.buffer) {
+            // 转移模式：新帧成为前台，旧前台缓冲留作下一次 step 的输出缓冲。
+            if (this.frontPositions) {
+                this.spareBuffer = this.frontPositions.buffer as ArrayBuffer;
+            }
+            this.frontPositions = new Float64Array(message.buffer, 0, message.trackCount * 3);
+        }
+        this.recordFrame(message.elapsedSeconds, message.computeMs);
+    }
+
+    private recordFrame(elapsedSeconds: number, computeMs: number): void {
+        this.hasFrame = true;
+        this.framesReceived += 1;
+        this.frameSeconds = elapsedSeconds;
+        this.lastComputeMs = computeMs;
+        this.maxComputeMs = Math.max(this.maxComputeMs, computeMs);
+    }
+}
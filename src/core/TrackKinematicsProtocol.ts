@@ -0,0 +1,145 @@
+/**
+ * 航迹运动学：主线程引擎与 Worker 共用的数据结构、消息协议与推进函数。
+ * 本文件不依赖 Cesium，Worker 打包时不引入渲染库。
+ */
+
+/**
+ * 航线表（列式）：全部航线的航点拼接在一个数组中，便于一次 postMessage 传输上万条航线。
+ */
+export interface TrackRouteTable {
+    // 航点 [经度°, 纬度°, 高度m] 三元组顺序拼接。
+    waypoints: Float64Array;
+    // 第 i 条航线的航点区间为 [routeOffsets[i], routeOffsets[i + 1])（以航点计），长度为航线数 + 1。
+    routeOffsets: Uint32Array;
+    // 每秒推进的航线周期比例：progress = (elapsedSeconds * speed) % 1。
+    speeds: Float64Array;
+}
+
+export interface TrackRouteInput {
+    waypoints: ReadonlyArray<{ lon: number; lat: number; alt: number }>;
+    speed: number;
+}
+
+export type KinematicsRequest =
+    | {
+        type: 'setRoutes';
+        generation: number;
+        routes: TrackRouteTable;
+        // 共享内存模式下的位置缓冲；缺省时走可转移 ArrayBuffer 往返。
+        shared?: SharedArrayBuffer;
+    }
+    | {
+        type: 'step';
+        generation: number;
+        elapsedSeconds: number;
+        // 转移模式下主线程归还的空闲缓冲，Worker 写满后转移回去。
+        buffer?: ArrayBuffer;
+    };
+
+export interface KinematicsFrameMessage {
+    type: 'frame';
+    generation: number;
+    elapsedSeconds: number;
+    trackCount: number;
+    computeMs: number;
+    buffer?: ArrayBuffer;
+}
+
+export type KinematicsResponse = KinematicsFrameMessage;
+
+// 共享缓冲布局：Int32 头 [frontIndex, sequence]（按 8 字节对齐），随后是两块 ECEF 位置区（双缓冲）。
+export const SHARED_HEADER_BYTES = 8;
+export const SHARED_FRONT_INDEX = 0;
+export const SHARED_SEQUENCE_INDEX = 1;
+
+export function sharedBufferByteLength(trackCount: number): number {
+    return SHARED_HEADER_BYTES + 2 * trackCount * 3 * Float64Array.BYTES_PER_ELEMENT;
+}
+
+export function sharedPositionRegion(shared: SharedArrayBuffer, trackCount: number, index: number): Float64Array {
+    const regionBytes = trackCount * 3 * Float64Array.BYTES_PER_ELEMENT;
+    return new Float64Array(shared, SHARED_HEADER_BYTES + index * regionBytes, trackCount * 3);
+}
+
+export function getRouteCount(routes: TrackRouteTable): number {
+    return Math.max(0, routes.routeOffsets.length - 1);
+}
+
+export function buildRouteTable(inputs: readonly TrackRouteInput[]): TrackRouteTable {
+    let waypointCount = 0;
+    for (const input of inputs) {
+        waypointCount += input.waypoints.length;
+    }
+    const waypoints = new Float64Array(waypointCount * 3);
+    const routeOffsets = new Uint32Array(inputs.length + 1);
+    const speeds = new Float64Array(inputs.length);
+    let cursor = 0;
+    inputs.forEach((input, routeIndex) => {
+        routeOffsets[routeIndex] = cursor;
+        speeds[routeIndex] = input.speed;
+        for (const p of input.waypoints) {
+            waypoints[cursor * 3] = p.lon;
+            waypoints[cursor * 3 + 1] = p.lat;
+            waypoints[cursor * 3 + 2] = p.alt;
+            cursor += 1;
+        }
+    });
+    routeOffsets[inputs.length] = cursor;
+    return { waypoints, routeOffsets, speeds };
+}
+
+const WGS84_A = 6378137.0;
+const WGS84_E2 = 6.69437999014e-3;
+const DEG_TO_RAD = Math.PI / 180.0;
+
+/**
+ * 将第 index 条航线推进到 elapsedSeconds，ECEF 坐标（WGS84，米）写入 out[offset..offset+2]。
+ * 航点按闭环插值（末点连回首点），与原 TacticalOverlayManager 的航点插值一致；不分配对象。
+ */
+export function advanceTrack(
+    routes: TrackRouteTable,
+    index: number,
+    elapsedSeconds: number,
+    out: Float64Array,
+    offset: number
+): void {
+    const { waypoints, routeOffsets, speeds } = routes;
+    const begin = routeOffsets[index];
+    const pointCount = routeOffsets[index + 1] - begin;
+    let lon = -118.30;
+    let lat = 36.58;
+    let alt = 6000.0;
+    if (pointCount === 1) {
+        lon = waypoints[begin * 3];
+        lat = waypoints[begin * 3 + 1];
+        alt = waypoints[begin * 3 + 2];
+    } else if (pointCount > 1) {
+        const progress = (elapsedSeconds * speeds[index]) % 1.0;
+        const scaled = progress * pointCount;
+        const floor = Math.floor(scaled);
+        const t = scaled - floor;
+        const a = (begin + (floor % pointCount)) * 3;
+        const b = (begin + ((floor + 1) % pointCount)) * 3;
+        lon = waypoints[a] + (waypoints[b] - waypoints[a]) * t;
+        lat = waypoints[a + 1] + (waypoints[b + 1] - waypoints[a + 1]) * t;
+        alt = waypoints[a + 2] + (waypoints[b + 2] - waypoints[a + 2]) * t;
+    }
+    const lonRad = lon * DEG_TO_RAD;
+    const latRad = lat * DEG_TO_RAD;
+    const sinLat = Math.sin(latRad);
+    const cosLat = Math.cos(latRad);
+    const n = WGS84_A / Math.sqrt(1.0 - WGS84_E2 * sinLat * sinLat);
+    out[offset] = (n + alt) * cosLat * Math.cos(lonRad);
+    out[offset + 1] = (n + alt) * cosLat * Math.sin(lonRad);
+    out[offset + 2] = (n * (1.0 - WGS84_E2) + alt) * sinLat;
+}
+
+/**
+ * 将全部航线推进到 elapsedSeconds，第 i 条航线写入 out[i*3..i*3+2]。
+ */
+export function advanceTracks(routes: TrackRouteTable, elapsedSeconds: number, out: Float64Array): void {
+    const routeCount = getRouteCount(routes);
+    for (let i = 0; i < routeCount; i += 1) {
+        advanceTrack(routes, i, elapsedSeconds, out, i * 3);
+    }
+}
@@ -0,0 +1,82 @@
+import {
+    advanceTracks,
+    getRouteCount,
+    sharedPositionRegion,
+    SHARED_FRONT_INDEX,
+    SHARED_SEQUENCE_INDEX,
+    type KinematicsRequest,
+    type KinematicsResponse,
+    type TrackRouteTable
+} from './TrackKinematicsProtocol';
+
+// tsconfig 只带 DOM 类型库，这里声明 Worker 全局作用域用到的最小接口。
+interface KinematicsWorkerScope {
+    onmessage: ((event: MessageEvent<KinematicsRequest>) => void) | null;
+    postMessage(message: KinematicsResponse, transfer?: Transferable[]): void;
+}
+
+const scope = self as unknown as KinematicsWorkerScope;
+
+let generation = 0;
+let routes: TrackRouteTable | undefined;
+let trackCount = 0;
+let sharedHeader: Int32Array | undefined;
+let sharedRegions: Float64Array[] = [];
+
+scope.onmessage = (event) => {
+    const message = event.data;
+    if (message.type === 'setRoutes') {
+        generation = message.generation;
+        routes = message.routes;
+        trackCount = getRouteCount(message.routes);
+        if (message.shared) {
+            sharedHeader = new Int32Array(message.shared, 0, 2);
+            sharedRegions = [0, 1].map((index) => sharedPositionRegion(message.shared as SharedArrayBuffer, trackCount, index));
+        } else {
+            sharedHeader = undefined;
+            sharedRegions = [];
+        }
+        return;
+    }
+
+    if (!routes || message.generation !== generation) {
+        // 航线已被替换：归还缓冲，主线程按 generation 丢弃。
+        scope.postMessage(
+            { type: 'frame', generation: message.generation, elapsedSeconds: message.elapsedSeconds, trackCount: 0, computeMs: 0, buffer: message.buffer },
+            message.buffer ? [message.buffer] : []
+        );
+        return;
+    }
+
+    const begin = performance.now();
+    if (sharedHeader) {
+        // 写入后台区后原子切换前台索引，主线程读取时不会看到写了一半的帧。
+        const back = 1 - Atomics.load(sharedHeader, SHARED_FRONT_INDEX);
+        advanceTracks(routes, message.elapsedSeconds, sharedRegions[back]);
+        Atomics.store(sharedHeader, SHARED_FRONT_INDEX, back);
+        Atomics.add(sharedHeader, SHARED_SEQUENCE_INDEX, 1);
+        scope.postMessage({
+            type: 'frame',
+            generation,
+            elapsedSeconds: message.elapsedSeconds,
+            trackCount,
+            computeMs: performance.now() - begin
+        });
+        return;
+    }
+
+    const byteLength = trackCount * 3 * Float64Array.BYTES_PER_ELEMENT;
+    const buffer = message.buffer && message.buffer.byteLength >= byteLength ? message.buffer : new ArrayBuffer(byteLength);
+    advanceTracks(routes, message.elapsedSeconds, new Float64Array(buffer, 0, trackCount * 3));
+    scope.postMessage(
+        {
+            type: 'frame',
+            generation,
+            elapsedSeconds: message.elapsedSeconds,
+            trackCount,
+            computeMs: performance.now() - begin,
+            buffer
+        },
+        [buffer]
+    );
+};
@@ -0,0 +1,200 @@
+import {
+    Cartesian3,
+    Material,
+    PolylineCollection,
+    type Color,
+    type Polyline,
+    type Viewer
+} from 'cesium';
+import { AppConfig, type TerrainLodProfileName } from '../config';
+
+export interface TrackTrailOptions {
+    sampleIntervalSeconds: number;
+    capacity: number;
+    width: number;
+    alpha: number;
+    lodStride: Record<TerrainLodProfileName, number>;
+}
+
+export interface TrackTrailStats {
+    trackCount: number;
+    stride: number;
+    // 每条尾迹已记录的采样数（各航迹同步采样，数量一致）。
+    samplesPerTrack: number;
+    // 当前绘制的尾迹顶点总数（不含头部连接段）。
+    renderedVertices: number;
+}
+
+interface TrailRing {
+    // ECEF 坐标环形缓冲，容量 capacity 个点。
+    data: Float64Array;
+    body: Polyline;
+    // 最新采样点到当前位置的连接段，每帧更新，仅两个顶点。
+    head: Polyline;
+    headPositions: Cartesian3[];
+    vertices: Cartesian3[];
+}
+
+/**
+ * 航迹尾迹
+ * 位置按固定间隔写入每条航迹的定长环形缓冲，尾迹主体只在新增采样或切档时重建顶点，
+ * 每帧只更新两点的头部连接段；全部尾迹在同一个 PolylineCollection 中批量绘制。
+ * 替代 PathGraphics 每帧按 resolution 回溯整段历史的重采样。
+ */
+export class TrackTrailLayer {
+    private readonly viewer: Viewer;
+    private readonly options: TrackTrailOptions;
+    private readonly collection: PolylineCollection;
+    private rings: TrailRing[];
+    private writeIndex: number;
+    private sampleCount: number;
+    private lastSampleSeconds: number;
+    private stride: number;
+    private renderedVertices: number;
+
+    constructor(viewer: Viewer, options: TrackTrailOptions = AppConfig.tacticalOverlay.trails) {
+        this.viewer = viewer;
+        this.options = options;
+        this.collection = viewer.scene.primitives.add(new PolylineCollection());
+        this.rings = [];
+        this.writeIndex = 0;
+        this.sampleCount = 0;
+        this.lastSampleSeconds = Number.NEGATIVE_INFINITY;
+        this.stride = 1;
+        this.renderedVertices = 0;
+    }
+
+    /**
+     * 按航迹顺序建立尾迹（下标与位置缓冲中的航迹下标一致），清空已有历史。
+     */
+    public setTracks(colors: readonly Color[]): void {
+        this.clear();
+        const { capacity, width, alpha } = this.options;
+        const show = this.stride > 0;
+        this.rings = colors.map((color) => {
+            const material = Material.fromType('Color', { color: color.withAlpha(alpha) });
+            return {
+                data: new Float64Array(capacity * 3),
+                body: this.collection.add({ positions: [], width, material, show: false }),
+                head: this.collection.add({ positions: [], width, material, show: false }),
+                headPositions: [new Cartesian3(), new Cartesian3()],
+                vertices: Array.from({ length: capacity }, () => new Cartesian3())
+            };
+        });
+        this.collection.show = show;
+    }
+
+    public setLodProfile(profile: TerrainLodProfileName): void {
+        const stride = Math.max(0, Math.floor(this.options.lodStride[profile] ?? 1));
+        if (stride === this.stride) {
+            return;
+        }
+        this.stride = stride;
+        this.collection.show = stride > 0;
+        if (stride > 0) {
+            this.rebuildBodies();
+        }
+    }
+
+    /**
+     * 追加一帧位置：positions 为 ECEF 三元组序列（与 setTracks 顺序一致），seconds 为其对应的仿真时间。
+     * 距上次采样不足采样间隔时只更新头部连接段；时间回退（场景重启）时清空历史。
+     */
+    public append(positions: Float64Array, seconds: number): void {
+        const ringCount = this.rings.length;
+        if (ringCount === 0 || positions.length < ringCount * 3) {
+            return;
+        }
+        if (seconds < this.lastSampleSeconds) {
+            this.resetHistory();
+        }
+        const sample = seconds - this.lastSampleSeconds >= this.options.sampleIntervalSeconds;
+        if (sample) {
+            const offset = this.writeIndex * 3;
+            for (let i = 0; i < ringCount; i += 1) {
+                const data = this.rings[i].data;
+                data[offset] = positions[i * 3];
+                data[offset + 1] = positions[i * 3 + 1];
+                data[offset + 2] = positions[i * 3 + 2];
+            }
+            this.writeIndex = (this.writeIndex + 1) % this.options.capacity;
+            this.sampleCount = Math.min(this.sampleCount + 1, this.options.capacity);
+            this.lastSampleSeconds = seconds;
+        }
+        if (this.stride === 0) {
+            return;
+        }
+        if (sample) {
+            this.rebuildBodies();
+        }
+        const newest = (this.writeIndex - 1 + this.options.capacity) % this.options.capacity;
+        for (let i = 0; i < ringCount; i += 1) {
+            const ring = this.rings[i];
+            Cartesian3.fromArray(ring.data, newest * 3, ring.headPositions[0]);
+            Cartesian3.fromArray(positions, i * 3, ring.headPositions[1]);
+            // 数组长度不变时 Polyline 只标记顶点数据更新，不重建缓冲布局。
+            ring.head.positions = ring.headPositions;
+            ring.head.show = true;
+        }
+    }
+
+    public getStats(): TrackTrailStats {
+        return {
+            trackCount: this.rings.length,
+            stride: this.stride,
+            samplesPerTrack: this.sampleCount,
+            renderedVertices: this.renderedVertices
+        };
+    }
+
+    public clear(): void {
+        this.collection.removeAll();
+        this.rings = [];
+        this.resetHistory();
+    }
+
+    public destroy(): void {
+        this.clear();
+        this.viewer.scene.primitives.remove(this.collection);
+    }
+
+    private resetHistory(): void {
+        this.writeIndex = 0;
+        this.sampleCount = 0;
+        this.lastSampleSeconds = Number.NEGATIVE_INFINITY;
+        this.renderedVertices = 0;
+        for (const ring of this.rings) {
+            ring.body.show = false;
+            ring.head.show = false;
+        }
+    }
+
+    /**
+     * 从环形缓冲按步长取点重建尾迹主体；始终包含最新采样点，使主体与头部连接段相接。
+     */
+    private rebuildBodies(): void {
+        const { capacity } = this.options;
+        const stride = this.stride;
+        const count = this.sampleCount;
+        const oldest = (this.writeIndex - count + capacity) % capacity;
+        // 最新点下标为 count-1，向前按步长回溯后的首个下标。
+        const first = (count - 1) % stride;
+        const vertexCount = count > 0 ? Math.floor((count - 1) / stride) + 1 : 0;
+        this.renderedVertices = 0;
+        for (const ring of this.rings) {
+            if (vertexCount < 2) {
+                ring.body.show = false;
+                continue;
+            }
+            // Polyline 持有 positions 数组引用，每次重建传入新数组（仅在采样节拍或切档时发生）。
+            const positions = new Array<Cartesian3>(vertexCount);
+            for (let k = 0; k < vertexCount; k += 1) {
+                const index = (oldest + first + k * stride) % capacity;
+                positions[k] = Cartesian3.fromArray(ring.data, index * 3, ring.vertices[k]);
+            }
+            ring.body.positions = positions;
+            ring.body.show = true;
+            this.renderedVertices += vertexCount;
+        }
+    }
+}
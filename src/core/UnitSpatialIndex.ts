@@ -0,0 +1,321 @@
+export interface UnitSpatialIndexStats {
+    units: number;
+    cells: number;
+    cellDegrees: number;
+    // 位置更新中跨网格单元迁移的次数（其余更新只改坐标）。
+    cellMoves: number;
+}
+
+export interface NearestUnit {
+    id: string;
+    distanceMeters: number;
+}
+
+interface IndexedUnit {
+    lon: number;
+    lat: number;
+    cell: number;
+}
+
+const EARTH_RADIUS = 6378137.0;
+const DEG_TO_RAD = Math.PI / 180.0;
+const WGS84_ONE_MINUS_E2 = 1.0 - 6.69437999014e-3;
+
+/**
+ * 两点大圆距离（米，球面近似）。
+ */
+export function surfaceDistanceMeters(lon1: number, lat1: number, lon2: number, lat2: number): number {
+    const dLat = (lat2 - lat1) * DEG_TO_RAD;
+    const dLon = (lon2 - lon1) * DEG_TO_RAD;
+    const a = Math.sin(dLat / 2) ** 2 +
+        Math.cos(lat1 * DEG_TO_RAD) * Math.cos(lat2 * DEG_TO_RAD) * Math.sin(dLon / 2) ** 2;
+    return 2 * EARTH_RADIUS * Math.asin(Math.min(1, Math.sqrt(a)));
+}
+
+/**
+ * 单位空间索引：经纬度等间距网格哈希。
+ * 每个单元保存落在其中的单位 id；位置更新只有跨单元时才改动单元集合，适合逐帧移动的航迹。
+ * 支持矩形视口查询（裁剪、标签避让）、半径查询（框选）与最近单位查询（HUD）。
+ */
+export class UnitSpatialIndex {
+    private readonly cellDegrees: number;
+    private readonly columns: number;
+    private readonly rows: number;
+    private readonly units: Map<string, IndexedUnit>;
+    private readonly cells: Map<number, Set<string>>;
+    private cellMoves: number;
+    // 非空单元的行列包围范围，用于限制最近查询的搜索圈数；删除边界单元后惰性重算。
+    private minRow: number;
+    private maxRow: number;
+    private minCol: number;
+    private maxCol: number;
+    private boundsStale: boolean;
+
+    constructor(cellDegrees: number) {
+        this.cellDegrees = Math.max(1e-3, cellDegrees);
+        this.columns = Math.ceil(360.0 / this.cellDegrees);
+        this.rows = Math.ceil(180.0 / this.cellDegrees);
+        this.units = new Map();
+        this.cells = new Map();
+        this.cellMoves = 0;
+        this.minRow = Number.POSITIVE_INFINITY;
+        this.maxRow = Number.NEGATIVE_INFINITY;
+        this.minCol = Number.POSITIVE_INFINITY;
+        this.maxCol = Number.NEGATIVE_INFINITY;
+        this.boundsStale = false;
+    }
+
+    public get size(): number {
+        return this.units.size;
+    }
+
+    public upsert(id: string, lon: number, lat: number): void {
+        const cell = this.cellOf(lon, lat);
+        const entry = this.units.get(id);
+        if (!entry) {
+            this.units.set(id, { lon, lat, cell });
+            this.addToCell(cell, id);
+            return;
+        }
+        entry.lon = lon;
+        entry.lat = lat;
+        if (entry.cell !== cell) {
+            this.removeFromCell(entry.cell, id);
+            this.addToCell(cell, id);
+            entry.cell = cell;
+            this.cellMoves += 1;
+        }
+    }
+
+    /**
+     * 以 ECEF 坐标（米）更新；经纬度按椭球面近似换算，精度远高于网格单元尺寸。
+     */
+    public upsertCartesian(id: string, x: number, y: number, z: number): void {
+        const lon = Math.atan2(y, x) / DEG_TO_RAD;
+        const lat = Math.atan2(z, Math.sqrt(x * x + y * y) * WGS84_ONE_MINUS_E2) / DEG_TO_RAD;
+        this.upsert(id, lon, lat);
+    }
+
+    public remove(id: string): boolean {
+        const entry = this.units.get(id);
+        if (!entry) {
+            return false;
+        }
+        this.removeFromCell(entry.cell, id);
+        this.units.delete(id);
+        return true;
+    }
+
+    public clear(): void {
+        this.units.clear();
+        this.cells.clear();
+        this.boundsStale = true;
+    }
+
+    public getPosition(id: string): { lon: number; lat: number } | undefined {
+        const entry = this.units.get(id);
+        return entry ? { lon: entry.lon, lat: entry.lat } : undefined;
+    }
+
+    /**
+     * 矩形查询（度）；west > east 表示跨越反子午线。结果追加到 out 并返回。
+     */
+    public queryRectangle(west: number, south: number, east: number, north: number, out: string[] = []): string[] {
+        if (west > east) {
+            this.queryRectangle(west, south, 180.0, north, out);
+            return this.queryRectangle(-180.0, south, east, north, out);
+        }
+        const [col0, row0] = this.cellCoords(west, south);
+        const [col1, row1] = this.cellCoords(east, north);
+        for (let row = row0; row <= row1; row += 1) {
+            for (let col = col0; col <= col1; col += 1) {
+                const ids = this.cells.get(row * this.columns + col);
+                if (!ids) continue;
+                for (const id of ids) {
+                    const entry = this.units.get(id) as IndexedUnit;
+                    if (entry.lon >= west && entry.lon <= east && entry.lat >= south && entry.lat <= north) {
+                        out.push(id);
+                    }
+                }
+            }
+        }
+        return out;
+    }
+
+    /**
+     * 半径查询（米），结果按距离升序。
+     */
+    public queryRadius(lon: number, lat: number, radiusMeters: number): NearestUnit[] {
+        const latSpan = radiusMeters / (EARTH_RADIUS * DEG_TO_RAD);
+        const lonSpan = Math.min(180.0, latSpan / Math.max(0.01, Math.cos(lat * DEG_TO_RAD)));
+        const candidates = this.queryRectangle(
+            this.wrapLongitude(lon - lonSpan),
+            Math.max(-90.0, lat - latSpan),
+            this.wrapLongitude(lon + lonSpan),
+            Math.min(90.0, lat + latSpan)
+        );
+        const result: NearestUnit[] = [];
+        for (const id of candidates) {
+            const entry = this.units.get(id) as IndexedUnit;
+            const distanceMeters = surfaceDistanceMeters(lon, lat, entry.lon, entry.lat);
+            if (distanceMeters <= radiusMeters) {
+                result.push({ id, distanceMeters });
+            }
+        }
+        return result.sort((a, b) => a.distanceMeters - b.distanceMeters);
+    }
+
+    /**
+     * 最近单位：按单元环逐圈向外搜索，直到下一圈可能的最小距离已超过当前最优距离；
+     * 圈数不超过覆盖全部非空单元所需的圈数，稀疏索引上不设距离上限也不会扫满全球。
+     */
+    public nearest(lon: number, lat: number, maxDistanceMeters: number = Number.POSITIVE_INFINITY): NearestUnit | undefined {
+        if (this.units.size === 0) {
+            return undefined;
+        }
+        const [col, row] = this.cellCoords(lon, lat);
+        const lastRing = this.ringsToCoverPopulated(col, row);
+        const cellLatMeters = this.cellDegrees * DEG_TO_RAD * EARTH_RADIUS;
+        const cells: Set<string>[] = [];
+        let bestId: string | undefined;
+        let bestDistance = maxDistanceMeters;
+        for (let ring = 0; ring <= lastRing; ring += 1) {
+            // 纬向相距超过当前最优距离的行不可能更近，只需考虑 ±spanRows 行。
+            const bestRows = Number.isFinite(bestDistance) ? Math.ceil(bestDistance / cellLatMeters) + 1 : ring;
+            const spanRows = Math.min(ring, bestRows);
+            // 第 ring 圈的距离下界：经向单元宽度随纬度收缩，取这些行纬度跨度内最小的 cos(lat)。
+            const spanMaxAbsLat = Math.min(90.0, Math.max(
+                Math.abs((row - spanRows) * this.cellDegrees - 90.0),
+                Math.abs((row + spanRows + 1) * this.cellDegrees - 90.0)
+            ));
+            const cellMeters = cellLatMeters * Math.cos(spanMaxAbsLat * DEG_TO_RAD);
+            if (Math.max(0, ring - 1) * cellMeters > bestDistance) {
+                break;
+            }
+            cells.length = 0;
+            this.collectRing(col, row, ring, spanRows, cells);
+            for (const ids of cells) {
+                for (const id of ids) {
+                    const entry = this.units.get(id) as IndexedUnit;
+                    const distanceMeters = surfaceDistanceMeters(lon, lat, entry.lon, entry.lat);
+                    if (distanceMeters <= bestDistance) {
+                        bestId = id;
+                        bestDistance = distanceMeters;
+                    }
+                }
+            }
+        }
+        return bestId === undefined ? undefined : { id: bestId, distanceMeters: bestDistance };
+    }
+
+    public getStats(): UnitSpatialIndexStats {
+        return {
+            units: this.units.size,
+            cells: this.cells.size,
+            cellDegrees: this.cellDegrees,
+            cellMoves: this.cellMoves
+        };
+    }
+
+    /**
+     * 从 (col, row) 出发覆盖全部非空单元所需的圈数（行方向直接相减，列方向取环绕后的较短距离）。
+     */
+    private ringsToCoverPopulated(col: number, row: number): number {
+        if (this.boundsStale) {
+            this.recomputeBounds();
+        }
+        if (this.cells.size === 0) {
+            return 0;
+        }
+        const colReach = (c: number): number => {
+            const d = Math.abs(c - col);
+            return Math.min(d, this.columns - d);
+        };
+        let colRings = Math.max(colReach(this.minCol), colReach(this.maxCol));
+        // 对跖列落在包围范围内时，环绕距离的最大值在对跖列取到。
+        const opposite = (col + Math.floor(this.columns / 2)) % this.columns;
+        if (opposite >= this.minCol && opposite <= this.maxCol) {
+            colRings = Math.floor(this.columns / 2);
+        }
+        const rowRings = Math.max(row - this.minRow, this.maxRow - row, 0);
+        return Math.max(rowRings, colRings);
+    }
+
+    private recomputeBounds(): void {
+        this.minRow = Number.POSITIVE_INFINITY;
+        this.maxRow = Number.NEGATIVE_INFINITY;
+        this.minCol = Number.POSITIVE_INFINITY;
+        this.maxCol = Number.NEGATIVE_INFINITY;
+        for (const cell of this.cells.keys()) {
+            this.expandBounds(cell);
+        }
+        this.boundsStale = false;
+    }
+
+    private expandBounds(cell: number): void {
+        const row = Math.floor(cell / this.columns);
+        const col = cell - row * this.columns;
+        this.minRow = Math.min(this.minRow, row);
+        this.maxRow = Math.max(this.maxRow, row);
+        this.minCol = Math.min(this.minCol, col);
+        this.maxCol = Math.max(this.maxCol, col);
+    }
+
+    private collectRing(col: number, row: number, ring: number, maxRowOffset: number, out: Set<string>[]): void {
+        const rowMin = Math.max(0, row - Math.min(ring, maxRowOffset));
+        const rowMax = Math.min(this.rows - 1, row + Math.min(ring, maxRowOffset));
+        for (let r = rowMin; r <= rowMax; r += 1) {
+            const onEdgeRow = r === row - ring || r === row + ring;
+            // 非首末行只访问左右两列；经度方向环绕。
+            const step = onEdgeRow || ring === 0 ? 1 : ring * 2;
+            for (let c = col - ring; c <= col + ring; c += step) {
+                const wrapped = ((c % this.columns) + this.columns) % this.columns;
+                const ids = this.cells.get(r * this.columns + wrapped);
+                if (ids) out.push(ids);
+            }
+        }
+    }
+
+    private cellCoords(lon: number, lat: number): [number, number] {
+        const col = Math.min(this.columns - 1, Math.max(0, Math.floor((this.wrapLongitude(lon) + 180.0) / this.cellDegrees)));
+        const row = Math.min(this.rows - 1, Math.max(0, Math.floor((lat + 90.0) / this.cellDegrees)));
+        return [col, row];
+    }
+
+    private cellOf(lon: number, lat: number): number {
+        const [col, row] = this.cellCoords(lon, lat);
+        return row * this.columns + col;
+    }
+
+    private wrapLongitude(lon: number): number {
+        if (lon >= -180.0 && lon <= 180.0) return lon;
+        return ((((lon + 180.0) % 360.0) + 360.0) % 360.0) - 180.0;
+    }
+
+    private addToCell(cell: number, id: string): void {
+        let ids = this.cells.get(cell);
+        if (!ids) {
+            ids = new Set();
+            this.cells.set(cell, ids);
+            if (!this.boundsStale) {
+                this.expandBounds(cell);
+            }
+        }
+        ids.add(id);
+    }
+
+    private removeFromCell(cell: number, id: string): void {
+        const ids = this.cells.get(cell);
+        if (!ids) return;
+        ids.delete(id);
+        if (ids.size === 0) {
+            this.cells.delete(cell);
+            const row = Math.floor(cell / this.columns);
+            const col = cell - row * this.columns;
+            // 只有删掉位于包围边界上的单元才可能收缩范围。
+            if (row === this.minRow || row === this.maxRow || col === this.minCol || col === this.maxCol) {
+                this.boundsStale = true;
+            }
+        }
+    }
+}
@@ -1,4 +1,7 @@
 import { Viewer, Cartesian2, Cartesian3, Cartographic, Ellipsoid, sampleTerrain, sampleTerrainMostDetailed, Math as CesiumMath, type TerrainProvider } from 'cesium';
+import { AppConfig } from '../config';
+import type { FrameCapture } from './FrameCapture';
+import { TerrainReliefIndex } from './TerrainReliefIndex';
 
 /**
  * 视觉诊断模块 (Visual Diagnostics)
@@ -6,9 +9,12 @@ import { Viewer, Cartesian2, Cartesian3, Cartographic, Ellipsoid, sampleTerrain,
  */
 export class VisualDiagnostics {
     private viewer: Viewer;
+    private frameCapture: FrameCapture;
+    private reliefIndex?: Promise<TerrainReliefIndex | undefined>;
 
-    constructor(viewer: Viewer) {
+    constructor(viewer: Viewer, frameCapture: FrameCapture) {
         this.viewer = viewer;
+        this.frameCapture = frameCapture;
     }
 
     /**
@@ -36,40 +42,36 @@ export class VisualDiagnostics {
                 return;
             }
             await this.flyTo(116.39, 39.9, 20000000); // 飞到全球视角 (20000km)
-            await this.waitForRender();
             // 采样检查：如果地球存在，中心不应是纯黑（除非背景也是黑且光照关闭，但战术模式下有底色）
             // 简单判断：画面中心必须有内容
             const globeStatus = canReadPixels
-                ? this.checkGlobeRendering('Globe Existence')
+                ? this.checkGlobeRendering('Globe Existence', await this.captureCenter(5))
                 : this.skipPixelCheck('Globe Existence');
             console.log(`[RESULT] Globe Existence: ${globeStatus ? 'PASS' : 'FAIL'}`);
 
             // 1. 检查北极点撕裂 (North Pole Tearing)
             console.log("VisualDiagnostics: Checking North Pole Tearing...");
             await this.flyTo(0.0, 90.0, 20000); // 飞到北极上空 20km
-            await this.waitForRender();
             const poleStatus = canReadPixels
-                ? this.checkPixelSafety('North Pole')
+                ? this.checkPixelSafety('North Pole', await this.captureCenter(5))
                 : this.skipPixelCheck('North Pole');
             console.log(`[RESULT] North Pole Tearing: ${poleStatus ? 'PASS' : 'FAIL'}`);
 
             // 2. 检查远景 LOD (Far Field LOD)
             console.log("VisualDiagnostics: Checking Global View (Far Field)...");
             await this.flyTo(0.0, 90.0, 2000000); // 飞到北极上空 2000km
-            await this.waitForRender();
             // 检查是否有明显的网格噪点（黄色像素不应过多）
             const farStatus = canReadPixels
-                ? this.checkGridDensity('Far Field', 0.01)
+                ? this.checkGridDensity('Far Field', await this.captureCenter(100), 0.01)
                 : this.skipPixelCheck('Far Field'); // 期望黄色极少
             console.log(`[RESULT] Far Field Stability: ${farStatus ? 'PASS' : 'FAIL'}`);
 
             // 3. 检查近景 LOD (Near Field LOD)
             console.log("VisualDiagnostics: Checking Tactical View (Near Field)...");
             await this.flyTo(0.0, 90.0, 5000); // 飞到北极上空 5km
-            await this.waitForRender();
             // 检查是否有网格（应该有黄色像素）
             const nearStatus = canReadPixels
-                ? this.checkGridDensity('Near Field', 0.05, true)
+                ? this.checkGridDensity('Near Field', await this.captureCenter(100), 0.05, true)
                 : this.skipPixelCheck('Near Field'); // 期望有一定黄色
             console.log(`[RESULT] Near Field Detail: ${nearStatus ? 'PASS' : 'FAIL'}`);
 
@@ -107,6 +109,21 @@ export class VisualDiagnostics {
             return;
         }
 
+        // 配置了离线起伏索引时直接查表，不再发起地形瓦片请求。
+        const reliefIndex = await this.getReliefIndex();
+        if (reliefIndex) {
+            const lonDeg = CesiumMath.toDegrees(center.longitude);
+            const latDeg = CesiumMath.toDegrees(center.latitude);
+            const relief = reliefIndex.spanAround(lonDeg, latDeg, 0.3);
+            if (relief) {
+                console.log(
+                    `[Terrain Spread] method=relief-index center=(${lonDeg.toFixed(4)}, ${latDeg.toFixed(4)}) min=${relief.min.toFixed(2)}m max=${relief.max.toFixed(2)}m span=${relief.span.toFixed(2)}m tiles=${relief.tiles} zoom=${relief.zoom}`
+                );
+                return;
+            }
+            console.warn('[Terrain Spread] relief index has no data around center, falling back to terrain sampling.');
+        }
+
         const latStep = CesiumMath.toRadians(0.3);
         const lonStep = CesiumMath.toRadians(0.3);
         const samples: Cartographic[] = [];
@@ -155,6 +172,20 @@ export class VisualDiagnostics {
         }
     }
 
+    private getReliefIndex(): Promise<TerrainReliefIndex | undefined> {
+        const url = AppConfig.terrain.reliefIndexUrl;
+        if (!url) {
+            return Promise.resolve(undefined);
+        }
+        if (!this.reliefIndex) {
+            this.reliefIndex = TerrainReliefIndex.load(url).catch((error) => {
+                console.warn('[Terrain Spread] relief index unavailable, falling back to terrain sampling.', error);
+                return undefined;
+            });
+        }
+        return this.reliefIndex;
+    }
+
     private getCenterCartographic(): Cartographic | undefined {
         const canvas = this.viewer.scene.canvas;
         const center = new Cartesian2(canvas.clientWidth / 2, canvas.clientHeight / 2);
@@ -170,8 +201,7 @@ export class VisualDiagnostics {
     }
 
     private canReadPixels(): boolean {
-        const gl = this.getWebGlContext();
-        if (!gl) {
+        if (!this.frameCapture.canCapture()) {
             console.warn('VisualDiagnostics: WebGL context unavailable, pixel checks will be skipped.');
             return false;
         }
@@ -183,27 +213,24 @@ export class VisualDiagnostics {
         return true;
     }
 
-    private getWebGlContext(): WebGLRenderingContext | WebGL2RenderingContext | null {
-        type SceneContext = {
-            context?: {
-                _gl?: WebGLRenderingContext | WebGL2RenderingContext;
-            };
-        };
-        const sceneWithContext = this.viewer.scene as unknown as SceneContext;
-        return sceneWithContext.context?._gl ?? null;
+    /**
+     * 强制渲染一帧，并在该帧的 postRender 中读取屏幕中心 size×size 像素。
+     */
+    private async captureCenter(size: number): Promise<Uint8Array> {
+        const canvas = this.viewer.scene.canvas;
+        const frame = await this.frameCapture.capture({
+            region: {
+                x: Math.floor(canvas.width / 2 - size / 2),
+                y: Math.floor(canvas.height / 2 - size / 2),
+                width: size,
+                height: size
+            }
+        });
+        return frame.data;
     }
 
-    private checkGlobeRendering(label: string): boolean {
-        const gl = this.getWebGlContext();
-        if (!gl) {
-            return this.skipPixelCheck(label);
-        }
-        const width = gl.drawingBufferWidth;
-        const height = gl.drawingBufferHeight;
-
+    private checkGlobeRendering(label: string, pixelData: Uint8Array): boolean {
         // 采样中心 5x5
-        const pixelData = new Uint8Array(5 * 5 * 4);
-        gl.readPixels(width / 2 - 2, height / 2 - 2, 5, 5, gl.RGBA, gl.UNSIGNED_BYTE, pixelData);
 
         // 获取中心像素色彩
         let validPixels = 0;
@@ -241,18 +268,8 @@ export class VisualDiagnostics {
      * 策略：在战术模式下，背景是 Tan 色，地形也是 Tan/Red。
      * 如果出现纯黑 (0,0,0) 或 深蓝 (Space Blue)，说明也是穿透。
      */
-    private checkPixelSafety(label: string): boolean {
-        const gl = this.getWebGlContext();
-        if (!gl) {
-            return this.skipPixelCheck(label);
-        }
-        const width = gl.drawingBufferWidth;
-        const height = gl.drawingBufferHeight;
-
+    private checkPixelSafety(label: string, pixelData: Uint8Array): boolean {
         // 采样中心 5x5 区域
-        const pixelData = new Uint8Array(5 * 5 * 4);
-        gl.readPixels(width / 2 - 2, height / 2 - 2, 5, 5, gl.RGBA, gl.UNSIGNED_BYTE, pixelData);
-
         let blackCount = 0;
         for (let i = 0; i < pixelData.length; i += 4) {
             const r = pixelData[i];
@@ -277,21 +294,15 @@ export class VisualDiagnostics {
      * 检查网格密度（黄色像素占比）
      * @param expectPresent true=期望存在网格, false=期望无网格
      */
-    private checkGridDensity(label: string, threshold: number, expectPresent: boolean = false): boolean {
-        const gl = this.getWebGlContext();
-        if (!gl) {
-            return this.skipPixelCheck(label);
-        }
-        const width = gl.drawingBufferWidth;
-        const height = gl.drawingBufferHeight;
-
+    private checkGridDensity(
+        label: string,
+        pixelData: Uint8Array,
+        threshold: number,
+        expectPresent: boolean = false
+    ): boolean {
         // 采样中心 100x100 区域
-        const size = 100;
-        const pixelData = new Uint8Array(size * size * 4);
-        gl.readPixels(width / 2 - size / 2, height / 2 - size / 2, size, size, gl.RGBA, gl.UNSIGNED_BYTE, pixelData);
-
         let yellowCount = 0;
-        const totalPixels = size * size;
+        const totalPixels = pixelData.length / 4;
 
         for (let i = 0; i < pixelData.length; i += 4) {
             const r = pixelData[i];
@@ -334,25 +345,4 @@ export class VisualDiagnostics {
             });
         });
     }
-
-    private async waitForRender(): Promise<void> {
-        return new Promise((resolve) => {
-            let settled = false;
-            const onPostRender = () => {
-                if (settled) return;
-                settled = true;
-                this.viewer.scene.postRender.removeEventListener(onPostRender);
-                clearTimeout(fallbackTimer);
-                resolve();
-            };
-            const fallbackTimer = setTimeout(() => {
-                if (settled) return;
-                settled = true;
-                this.viewer.scene.postRender.removeEventListener(onPostRender);
-                resolve();
-            }, 3000);
-            this.viewer.scene.postRender.addEventListener(onPostRender);
-            this.viewer.scene.requestRender();
-        });
-    }
 }
@@ -6,7 +6,14 @@ import {
     Math as CesiumMath,
     TerrainProvider
 } from 'cesium';
-import { calculateSonarParams, type SonarParams } from './OceanPhysics';
+import { AppConfig } from '../config';
+import { LruCache } from '../utils/LruCache';
+import {
+    calculateSonarParams,
+    calculateSonarParamsBatch,
+    type SonarParams,
+    type SonarParamsColumns
+} from './OceanPhysics';
 
 export type TerrainType = 'land' | 'ocean';
 
@@ -18,16 +25,60 @@ export interface LocationInfo {
     sonar: SonarParams;
 }
 
+/**
+ * queryPositionsInfoColumnar 的列式结果：各列按下标与输入点一一对应，isOcean 以 0/1 存储。
+ */
+export interface LocationInfoColumns {
+    count: number;
+    longitude: Float64Array;
+    latitude: Float64Array;
+    elevation: Float64Array;
+    isOcean: Uint8Array;
+    sonar: SonarParamsColumns;
+}
+
+// 低于该高程视为海洋。
+const OCEAN_ELEVATION_THRESHOLD = -150;
+
+export interface HeightCacheStats {
+    size: number;
+    maxEntries: number;
+    hits: number;
+    misses: number;
+    sampledPoints: number;
+    sampleBatches: number;
+}
+
+interface PendingSample {
+    sample: Cartographic;
+    indices: number[];
+}
+
 /**
  * 数据管理器：封装高程查询与态势点位信息聚合。
+ * 高程按 (地形源, 查询层级, 量化经纬度) 缓存，未命中的点合并为一次 sampleTerrain 调用
+ * （Cesium 内部按瓦片分组请求并解码，同一瓦片只解码一次）。
  */
 export class DataManager {
     private viewer: Viewer;
     private preferredTerrainProvider?: TerrainProvider;
     private queryLevel?: number;
+    private readonly heightCache: LruCache<string, number>;
+    private readonly providerIds: WeakMap<TerrainProvider, number>;
+    private nextProviderId: number;
+    // 地形源切换时递增，丢弃切换前发出、切换后才返回的采样结果。
+    private cacheGeneration: number;
+    private sampledPoints: number;
+    private sampleBatches: number;
 
     constructor(viewer: Viewer) {
         this.viewer = viewer;
+        this.heightCache = new LruCache(AppConfig.perf.heightCache.maxEntries);
+        this.providerIds = new WeakMap();
+        this.nextProviderId = 1;
+        this.cacheGeneration = 0;
+        this.sampledPoints = 0;
+        this.sampleBatches = 0;
     }
 
     /**
@@ -35,6 +86,9 @@ export class DataManager {
      * 说明：渲染层可能因全局回退切到椭球地形，但查询仍应尽量使用真实地形源。
      */
     public setPreferredTerrainProvider(provider: TerrainProvider): void {
+        if (provider !== this.preferredTerrainProvider) {
+            this.clearHeightCache();
+        }
         this.preferredTerrainProvider = provider;
     }
 
@@ -48,29 +102,67 @@ export class DataManager {
 
     /**
      * 查询点位信息：
-     * 1. 优先使用 sampleTerrainMostDetailed 获取高程
+     * 1. 优先使用 sampleTerrain/sampleTerrainMostDetailed 获取高程（经缓存）
      * 2. 失败时降级为 globe.getHeight
      */
     public async queryPositionInfo(cartographic: Cartographic): Promise<LocationInfo> {
-        const point = Cartographic.clone(cartographic);
-        let elevation = 0;
-        const terrainProvider = this.preferredTerrainProvider ?? this.viewer.terrainProvider;
+        const [info] = await this.queryPositionsInfo([cartographic]);
+        return info;
+    }
 
-        try {
-            const sampled = this.queryLevel !== undefined
-                ? await sampleTerrain(terrainProvider, this.queryLevel, [point])
-                : await sampleTerrainMostDetailed(terrainProvider, [point]);
-            const sampledHeight = sampled[0]?.height;
-            if (sampledHeight !== undefined && Number.isFinite(sampledHeight)) {
-                elevation = sampledHeight;
-            } else {
-                elevation = this.resolveFastElevation(point);
-            }
-        } catch {
-            elevation = this.resolveFastElevation(point);
+    /**
+     * 批量查询点位信息，适合场景加载时把大量地面单位贴地。
+     * 缓存命中的点不再采样，其余点去重后一次性提交。
+     */
+    public async queryPositionsInfo(cartographics: Cartographic[]): Promise<LocationInfo[]> {
+        const points = cartographics.map((c) => Cartographic.clone(c));
+        const elevations = await this.sampleElevations(points);
+        return points.map((point, index) => this.buildLocationInfo(point, elevations[index]));
+    }
+
+    /**
+     * 批量查询的列式版本：适合深度网格、航迹剖面等数万点的场景，
+     * 结果为数组结构（struct-of-arrays），声呐参数由 calculateSonarParamsBatch 一次填充。
+     */
+    public async queryPositionsInfoColumnar(cartographics: Cartographic[]): Promise<LocationInfoColumns> {
+        const points = cartographics.map((c) => Cartographic.clone(c));
+        const elevations = await this.sampleElevations(points);
+        const count = points.length;
+        const longitude = new Float64Array(count);
+        const latitude = new Float64Array(count);
+        const elevation = new Float64Array(count);
+        const isOcean = new Uint8Array(count);
+        const sonarDepth = new Float64Array(count);
+        for (let i = 0; i < count; i += 1) {
+            const height = elevations[i];
+            const ocean = height < OCEAN_ELEVATION_THRESHOLD;
+            longitude[i] = CesiumMath.toDegrees(points[i].longitude);
+            latitude[i] = CesiumMath.toDegrees(points[i].latitude);
+            elevation[i] = height;
+            isOcean[i] = ocean ? 1 : 0;
+            sonarDepth[i] = ocean ? Math.abs(height) : 0;
         }
+        return {
+            count,
+            longitude,
+            latitude,
+            elevation,
+            isOcean,
+            sonar: calculateSonarParamsBatch(sonarDepth)
+        };
+    }
 
-        return this.buildLocationInfo(point, elevation);
+    public clearHeightCache(): void {
+        this.heightCache.clear();
+        this.cacheGeneration += 1;
+    }
+
+    public getHeightCacheStats(): HeightCacheStats {
+        return {
+            ...this.heightCache.getStats(),
+            sampledPoints: this.sampledPoints,
+            sampleBatches: this.sampleBatches
+        };
     }
 
     /**
@@ -82,6 +174,81 @@ export class DataManager {
         return this.buildLocationInfo(point, elevation);
     }
 
+    private async sampleElevations(points: Cartographic[]): Promise<number[]> {
+        const terrainProvider = this.preferredTerrainProvider ?? this.viewer.terrainProvider;
+        const queryLevel = this.queryLevel;
+        const step = AppConfig.perf.heightCache.quantizationDegrees;
+        const keyPrefix = `${this.getProviderId(terrainProvider)}|${queryLevel ?? 'max'}|`;
+        const elevations = new Array<number>(points.length);
+        const pending = new Map<string, PendingSample>();
+
+        points.forEach((point, index) => {
+            const lonIndex = Math.round(CesiumMath.toDegrees(point.longitude) / step);
+            const latIndex = Math.round(CesiumMath.toDegrees(point.latitude) / step);
+            const key = `${keyPrefix}${lonIndex}|${latIndex}`;
+            const cached = this.heightCache.get(key);
+            if (cached !== undefined) {
+                elevations[index] = cached;
+                return;
+            }
+            const existing = pending.get(key);
+            if (existing) {
+                existing.indices.push(index);
+                return;
+            }
+            // 采样量化格网中心，使同一缓存键无论由哪个点触发都得到相同高程。
+            pending.set(key, {
+                sample: Cartographic.fromDegrees(lonIndex * step, latIndex * step),
+                indices: [index]
+            });
+        });
+        if (pending.size === 0) {
+            return elevations;
+        }
+
+        const entries = [...pending.entries()];
+        const samples = entries.map(([, entry]) => entry.sample);
+        const generation = this.cacheGeneration;
+        let sampled: Cartographic[] | undefined;
+        try {
+            sampled = queryLevel !== undefined
+                ? await sampleTerrain(terrainProvider, queryLevel, samples)
+                : await sampleTerrainMostDetailed(terrainProvider, samples);
+        } catch {
+            sampled = undefined;
+        }
+        this.sampledPoints += samples.length;
+        this.sampleBatches += 1;
+
+        entries.forEach(([key, entry], entryIndex) => {
+            const height = sampled?.[entryIndex]?.height;
+            if (height !== undefined && Number.isFinite(height)) {
+                if (generation === this.cacheGeneration) {
+                    this.heightCache.set(key, height);
+                }
+                for (const index of entry.indices) {
+                    elevations[index] = height;
+                }
+                return;
+            }
+            // 采样失败不写缓存，下次查询重试。
+            for (const index of entry.indices) {
+                elevations[index] = this.resolveFastElevation(points[index]);
+            }
+        });
+        return elevations;
+    }
+
+    private getProviderId(provider: TerrainProvider): number {
+        let id = this.providerIds.get(provider);
+        if (id === undefined) {
+            id = this.nextProviderId;
+            this.nextProviderId += 1;
+            this.providerIds.set(provider, id);
+        }
+        return id;
+    }
+
     private resolveFastElevation(point: Cartographic): number {
         const globeHeight = this.viewer.scene.globe.getHeight(point);
         if (globeHeight !== undefined && Number.isFinite(globeHeight)) {
@@ -94,7 +261,7 @@ export class DataManager {
     }
 
     private buildLocationInfo(point: Cartographic, elevation: number): LocationInfo {
-        const terrainType: TerrainType = elevation < -150 ? 'ocean' : 'land';
+        const terrainType: TerrainType = elevation < OCEAN_ELEVATION_THRESHOLD ? 'ocean' : 'land';
         // 声呐模型只针对海洋深度，陆地按 0 深度处理。
         const sonarDepth = terrainType === 'ocean' ? Math.abs(elevation) : 0;
         const sonar = calculateSonarParams(sonarDepth);
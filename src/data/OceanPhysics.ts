@@ -4,6 +4,36 @@ export interface SonarParams {
     hasConvergenceZone: boolean;
 }
 
+/**
+ * 列式声呐参数：按下标与输入深度一一对应，布尔量以 0/1 存储。
+ */
+export interface SonarParamsColumns {
+    soundSpeed: Float64Array;
+    hasThermocline: Uint8Array;
+    hasConvergenceZone: Uint8Array;
+}
+
+const THERMOCLINE_DEPTH = 200;
+const CONVERGENCE_ZONE_DEPTH = 3000;
+const DEPTH_SOUND_SPEED_GRADIENT = 0.016;
+
+/**
+ * 声速公式中与深度无关的部分（简化常量温度/盐度下为常数）。
+ */
+function surfaceSoundSpeed(): number {
+    const t = 10; // 简化常量温度
+    const s = 35; // 简化常量盐度
+    return (
+        1449.2 +
+        4.6 * t -
+        0.055 * t * t +
+        0.00029 * t * t * t +
+        (1.34 - 0.01 * t) * (s - 35)
+    );
+}
+
+const SURFACE_SOUND_SPEED = surfaceSoundSpeed();
+
 /**
  * 根据深度计算简化声呐参数。
  * 说明：
@@ -13,21 +43,39 @@ export interface SonarParams {
  */
 export function calculateSonarParams(depth: number): SonarParams {
     const z = Math.max(0, depth);
-    const t = 10; // 简化常量温度
-    const s = 35; // 简化常量盐度
-
-    const soundSpeed =
-        1449.2 +
-        4.6 * t -
-        0.055 * t * t +
-        0.00029 * t * t * t +
-        (1.34 - 0.01 * t) * (s - 35) +
-        0.016 * z;
+    return {
+        soundSpeed: SURFACE_SOUND_SPEED + DEPTH_SOUND_SPEED_GRADIENT * z,
+        hasThermocline: z > THERMOCLINE_DEPTH,
+        hasConvergenceZone: z > CONVERGENCE_ZONE_DEPTH
+    };
+}
 
+export function createSonarParamsColumns(length: number): SonarParamsColumns {
     return {
-        soundSpeed,
-        hasThermocline: z > 200,
-        hasConvergenceZone: z > 3000
+        soundSpeed: new Float64Array(length),
+        hasThermocline: new Uint8Array(length),
+        hasConvergenceZone: new Uint8Array(length)
     };
 }
 
+/**
+ * 批量计算声呐参数（深度网格、航迹剖面）。
+ * 结果写入预分配的列式数组，循环内不创建对象；out 可在多次调用间复用，长度不足时报错。
+ */
+export function calculateSonarParamsBatch(
+    depths: Float64Array,
+    out: SonarParamsColumns = createSonarParamsColumns(depths.length)
+): SonarParamsColumns {
+    const count = depths.length;
+    if (out.soundSpeed.length < count || out.hasThermocline.length < count || out.hasConvergenceZone.length < count) {
+        throw new RangeError(`calculateSonarParamsBatch: output columns shorter than ${count} samples.`);
+    }
+    const { soundSpeed, hasThermocline, hasConvergenceZone } = out;
+    for (let i = 0; i < count; i += 1) {
+        const z = Math.max(0, depths[i]);
+        soundSpeed[i] = SURFACE_SOUND_SPEED + DEPTH_SOUND_SPEED_GRADIENT * z;
+        hasThermocline[i] = z > THERMOCLINE_DEPTH ? 1 : 0;
+        hasConvergenceZone[i] = z > CONVERGENCE_ZONE_DEPTH ? 1 : 0;
+    }
+    return out;
+}
@@ -0,0 +1,89 @@
+import { calculateSonarParams, calculateSonarParamsBatch, createSonarParamsColumns } from './OceanPhysics';
+
+export interface SonarBenchmarkOptions {
+    sampleCount?: number;
+    iterations?: number;
+    // 计时前的预热轮数，排除 JIT 编译对首轮的影响。
+    warmupIterations?: number;
+    maxDepth?: number;
+}
+
+export interface SonarBenchmarkReport {
+    sampleCount: number;
+    iterations: number;
+    perObjectMs: { mean: number; min: number };
+    columnarMs: { mean: number; min: number };
+    speedup: number;
+    // 两条路径结果逐项一致。
+    resultsMatch: boolean;
+}
+
+/**
+ * 声呐参数微基准：逐点对象路径 vs 列式批量路径。
+ * 深度序列用固定种子生成，保证多次运行输入一致。
+ */
+export function runSonarBenchmark(options: SonarBenchmarkOptions = {}): SonarBenchmarkReport {
+    const sampleCount = Math.max(1, Math.floor(options.sampleCount ?? 50000));
+    const iterations = Math.max(1, Math.floor(options.iterations ?? 20));
+    const warmupIterations = Math.max(0, Math.floor(options.warmupIterations ?? 5));
+    const maxDepth = options.maxDepth ?? 6000;
+
+    const depths = new Float64Array(sampleCount);
+    let seed = 0x9e3779b9;
+    for (let i = 0; i < sampleCount; i += 1) {
+        // xorshift32，输出 [-10%, 100%] maxDepth，覆盖陆地（负深度）与各深度阈值。
+        seed ^= seed << 13;
+        seed ^= seed >>> 17;
+        seed ^= seed << 5;
+        depths[i] = ((seed >>> 0) / 0xffffffff) * maxDepth * 1.1 - maxDepth * 0.1;
+    }
+    const columns = createSonarParamsColumns(sampleCount);
+
+    // 逐点路径按真实调用方式保留每个对象，避免被优化为死代码。
+    const runPerObject = (): number => {
+        const results = new Array(sampleCount);
+        for (let i = 0; i < sampleCount; i += 1) {
+            results[i] = calculateSonarParams(depths[i]);
+        }
+        return results.length;
+    };
+    const runColumnar = (): number => calculateSonarParamsBatch(depths, columns).soundSpeed.length;
+
+    const measure = (fn: () => number): { mean: number; min: number } => {
+        for (let i = 0; i < warmupIterations; i += 1) {
+            fn();
+        }
+        let total = 0;
+        let min = Number.POSITIVE_INFINITY;
+        for (let i = 0; i < iterations; i += 1) {
+            const begin = performance.now();
+            fn();
+            const elapsed = performance.now() - begin;
+            total += elapsed;
+            min = Math.min(min, elapsed);
+        }
+        return { mean: total / iterations, min };
+    };
+
+    const perObjectMs = measure(runPerObject);
+    const columnarMs = measure(runColumnar);
+
+    calculateSonarParamsBatch(depths, columns);
+    let resultsMatch = true;
+    for (let i = 0; i < sampleCount && resultsMatch; i += 1) {
+        const expected = calculateSonarParams(depths[i]);
+        resultsMatch =
+            expected.soundSpeed === columns.soundSpeed[i] &&
+            expected.hasThermocline === (columns.hasThermocline[i] === 1) &&
+            expected.hasConvergenceZone === (columns.hasConvergenceZone[i] === 1);
+    }
+
+    return {
+        sampleCount,
+        iterations,
+        perObjectMs,
+        columnarMs,
+        speedup: columnarMs.mean > 0 ? perObjectMs.mean / columnarMs.mean : 0,
+        resultsMatch
+    };
+}
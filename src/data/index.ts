@@ -1,5 +1,7 @@
 export { DataManager } from './DataManager';
-export type { LocationInfo, TerrainType } from './DataManager';
-export { calculateSonarParams } from './OceanPhysics';
-export type { SonarParams } from './OceanPhysics';
+export type { HeightCacheStats, LocationInfo, LocationInfoColumns, TerrainType } from './DataManager';
+export { calculateSonarParams, calculateSonarParamsBatch, createSonarParamsColumns } from './OceanPhysics';
+export type { SonarParams, SonarParamsColumns } from './OceanPhysics';
+export { runSonarBenchmark } from './SonarBenchmark';
+export type { SonarBenchmarkOptions, SonarBenchmarkReport } from './SonarBenchmark';
 
@@ -1,7 +1,25 @@
 import './themes/index.css';
 import * as Cesium from 'cesium';
 import { TacticalViewer, type LodSwitchStats, type RenderPerfStats } from './core/TacticalViewer';
+import type { FrameTimeStats } from './core/FrameTimeRecorder';
+import type { LodSwitchTraceEntry } from './core/LodSwitchTracer';
+import type { StartupWarmupReport } from './core/StartupWarmup';
+import type { SceneSettleOptions, SceneSettleResult } from './core/SceneSettleWaiter';
+import type { CameraPath, CameraPathReplayOptions, CameraPathReplayReport } from './core/CameraPathPlayer';
+import type { FrameCaptureOptions, FrameCaptureResult } from './core/FrameCapture';
+import type { HudPipelineStats } from './core/HudPickScheduler';
+import type { CameraMetrics, CameraMetricsCacheStats } from './core/CameraMetricsCache';
+import type { RangeVolumeSpec, RangeVolumeStats, RangeVolumeUpdate } from './core/RangeVolumeLayer';
+import type { TacticalUnitSpec } from './core/TacticalUnitLayer';
+import type { TerrainPrefetchStats } from './core/TerrainPrefetcher';
+import type { TilePipelineStats } from './core/TilePipelineTelemetry';
+import type { ScenarioLoadProgress } from './core/ScenarioStreamLoader';
+import type { ScenarioSource } from './core/ScenarioStreamProtocol';
+import type { TrackKinematicsStats } from './core/TrackKinematicsEngine';
+import type { TrackTrailStats } from './core/TrackTrailLayer';
+import type { NearestUnit, UnitSpatialIndexStats } from './core/UnitSpatialIndex';
 import { AppConfig, type ThemePackName, type LanguageCode } from './config';
+import { runSonarBenchmark, type HeightCacheStats, type LocationInfo, type SonarBenchmarkOptions, type SonarBenchmarkReport } from './data';
 import type { HudMode } from './ui/HudManager';
 import { UiThemeManager } from './themes/UiThemeManager';
 import { i18n } from './i18n';
@@ -24,9 +42,77 @@ declare global {
         getLodState?: () => { profile: string; metersPerPixel: number };
         getTerrainRuntimeMode?: () => string;
         getRenderPerfStats?: () => RenderPerfStats;
+        getFrameTimeStats?: () => FrameTimeStats;
+        getHudPipelineStats?: () => HudPipelineStats;
+        getCameraMetrics?: () => CameraMetrics & { cache: CameraMetricsCacheStats };
+        getLodSwitchTrace?: () => LodSwitchTraceEntry[];
+        warmupReady?: () => Promise<StartupWarmupReport>;
+        waitForSceneSettled?: (options?: SceneSettleOptions) => Promise<SceneSettleResult>;
+        startCameraPathRecording?: (sampleIntervalMs?: number) => void;
+        stopCameraPathRecording?: (name?: string) => CameraPath;
+        replayCameraPath?: (path: CameraPath, options?: CameraPathReplayOptions) => Promise<CameraPathReplayReport>;
+        captureFrame?: (options?: FrameCaptureOptions) => Promise<EncodedFrameCapture>;
+        queryPositionsInfo?: (points: Array<{ longitude: number; latitude: number }>) => Promise<LocationInfo[]>;
+        getHeightCacheStats?: () => HeightCacheStats;
+        getTerrainPrefetchStats?: () => TerrainPrefetchStats;
+        getTilePipelineStats?: () => TilePipelineStats;
+        addOverlayUnits?: (units: OverlayUnitInput[]) => number;
+        updateOverlayUnitPositions?: (ids: string[], lonLatHeight: number[] | Float64Array) => void;
+        removeOverlayUnits?: (ids: string[]) => number;
+        loadScenarioStream?: (source: ScenarioSource) => Promise<ScenarioLoadProgress>;
+        getScenarioLoadProgress?: () => ScenarioLoadProgress;
+        cancelScenarioLoad?: () => void;
+        addRangeVolumes?: (volumes: RangeVolumeInput[]) => RangeVolumeStats;
+        updateRangeVolumes?: (updates: RangeVolumeUpdateInput[]) => void;
+        removeRangeVolumes?: (ids: string[]) => number;
+        getRangeVolumeStats?: () => RangeVolumeStats;
+        getTrackKinematicsStats?: () => TrackKinematicsStats | undefined;
+        getTrackTrailStats?: () => TrackTrailStats;
+        getOverlayUnitIndexStats?: () => UnitSpatialIndexStats & { visibleLabels: number };
+        findNearestOverlayUnit?: (longitude: number, latitude: number, maxDistanceMeters?: number) => NearestUnit | undefined;
+        queryOverlayUnitsInRadius?: (longitude: number, latitude: number, radiusMeters: number) => NearestUnit[];
+        runSonarBenchmark?: (options?: SonarBenchmarkOptions) => SonarBenchmarkReport;
+        getTerrainStatus?: () => 'connected' | 'failed' | 'disabled';
+        resetHarnessState?: () => void;
+        resetRuntimeStats?: () => void;
     }
 }
 
+// 页面外（测试脚本）传入的单位描述：颜色为 CSS 字符串。
+type OverlayUnitInput = Omit<TacticalUnitSpec, 'color' | 'outlineColor' | 'labelOffset' | 'labelHorizontalOrigin' | 'labelVerticalOrigin'> & {
+    color?: string;
+};
+
+type RangeVolumeInput = Omit<RangeVolumeSpec, 'color'> & { color?: string };
+type RangeVolumeUpdateInput = Omit<RangeVolumeUpdate, 'color'> & { color?: string };
+
+/**
+ * 供 Playwright 传回 Python 的帧数据：像素以 base64 编码（page.evaluate 只能传 JSON）。
+ */
+type EncodedFrameCapture = Omit<FrameCaptureResult, 'data'> & {
+    channels: 4;
+    encoding: 'base64';
+    data: string;
+    encodeMs: number;
+};
+
+function encodeFrameCapture(frame: FrameCaptureResult): EncodedFrameCapture {
+    const begin = performance.now();
+    // 分块转换，避免 String.fromCharCode 参数过多导致栈溢出。
+    const chunkSize = 0x8000;
+    const parts: string[] = [];
+    for (let offset = 0; offset < frame.data.length; offset += chunkSize) {
+        parts.push(String.fromCharCode(...frame.data.subarray(offset, offset + chunkSize)));
+    }
+    return {
+        ...frame,
+        channels: 4,
+        encoding: 'base64',
+        data: btoa(parts.join('')),
+        encodeMs: performance.now() - begin
+    };
+}
+
 const uiThemeManager = new UiThemeManager();
 
 window.onerror = function (msg, _url, _lineNo, _columnNo, error) {
@@ -192,6 +278,67 @@ document.addEventListener('DOMContentLoaded', async () => {
         });
         window.getTerrainRuntimeMode = () => viewerInstance.getRuntimeRenderMode();
         window.getRenderPerfStats = () => viewerInstance.getRenderPerfStats();
+        window.getFrameTimeStats = () => viewerInstance.getFrameTimeStats();
+        window.getHudPipelineStats = () => viewerInstance.getHudPipelineStats();
+        window.getCameraMetrics = () => viewerInstance.getCameraMetrics();
+        window.getLodSwitchTrace = () => viewerInstance.getLodSwitchTrace();
+        window.warmupReady = () => viewerInstance.warmupReady();
+        window.waitForSceneSettled = (options) => viewerInstance.waitForSceneSettled(options);
+        window.startCameraPathRecording = (sampleIntervalMs) =>
+            viewerInstance.getCameraPathPlayer().startRecording(sampleIntervalMs);
+        window.stopCameraPathRecording = (name) => viewerInstance.getCameraPathPlayer().stopRecording(name);
+        window.replayCameraPath = (path, options) => viewerInstance.getCameraPathPlayer().replay(path, options);
+        window.captureFrame = async (options) => encodeFrameCapture(await viewerInstance.captureFrame(options));
+        window.queryPositionsInfo = (points) =>
+            viewerInstance.queryPositionsInfo(points.map((p) => Cesium.Cartographic.fromDegrees(p.longitude, p.latitude)));
+        window.getHeightCacheStats = () => viewerInstance.getHeightCacheStats();
+        window.getTerrainPrefetchStats = () => viewerInstance.getTerrainPrefetchStats();
+        window.getTilePipelineStats = () => viewerInstance.getTilePipelineStats();
+        window.runSonarBenchmark = (options) => runSonarBenchmark(options);
+        window.addOverlayUnits = (units) => {
+            viewerInstance.addOverlayUnits(units.map((unit) => ({
+                ...unit,
+                color: Cesium.Color.fromCssColorString(unit.color ?? '#4be6ff')
+            })));
+            return viewerInstance.getOverlayUnitCount();
+        };
+        window.updateOverlayUnitPositions = (ids, lonLatHeight) =>
+            viewerInstance.updateOverlayUnitPositions(
+                ids,
+                lonLatHeight instanceof Float64Array ? lonLatHeight : Float64Array.from(lonLatHeight)
+            );
+        window.removeOverlayUnits = (ids) => viewerInstance.removeOverlayUnits(ids);
+        window.loadScenarioStream = (source) => viewerInstance.loadOverlayScenario(source);
+        window.getScenarioLoadProgress = () => viewerInstance.getOverlayScenarioLoadProgress();
+        window.cancelScenarioLoad = () => viewerInstance.cancelOverlayScenarioLoad();
+        window.addRangeVolumes = (volumes) => {
+            viewerInstance.addRangeVolumes(volumes.map((volume) => ({
+                ...volume,
+                color: Cesium.Color.fromCssColorString(volume.color ?? 'rgba(255, 120, 80, 0.25)')
+            })));
+            return viewerInstance.getRangeVolumeStats();
+        };
+        window.updateRangeVolumes = (updates) =>
+            viewerInstance.updateRangeVolumes(updates.map(({ color, ...update }) =>
+                color === undefined ? update : { ...update, color: Cesium.Color.fromCssColorString(color) }
+            ));
+        window.removeRangeVolumes = (ids) => viewerInstance.removeRangeVolumes(ids);
+        window.getRangeVolumeStats = () => viewerInstance.getRangeVolumeStats();
+        window.getTrackKinematicsStats = () => viewerInstance.getTrackKinematicsStats();
+        window.getTrackTrailStats = () => viewerInstance.getTrackTrailStats();
+        window.getOverlayUnitIndexStats = () => viewerInstance.getOverlayUnitIndexStats();
+        window.findNearestOverlayUnit = (longitude, latitude, maxDistanceMeters) =>
+            viewerInstance.findNearestOverlayUnit(longitude, latitude, maxDistanceMeters);
+        window.queryOverlayUnitsInRadius = (longitude, latitude, radiusMeters) =>
+            viewerInstance.queryOverlayUnitsInRadius(longitude, latitude, radiusMeters);
+        window.getTerrainStatus = () => currentTerrainStatus;
+        // 测试 harness 在场景之间调用：清空叠加层、回到初始视角并清零运行时统计。
+        window.resetRuntimeStats = () => viewerInstance.resetRuntimeStats();
+        window.resetHarnessState = () => {
+            viewerInstance.clearTacticalOverlay();
+            viewerInstance.resetView();
+            viewerInstance.resetRuntimeStats();
+        };
         currentLodProfile = viewerInstance.getCurrentLodProfile();
         currentMpp = viewerInstance.getCurrentMetersPerPixel();
         currentRuntimeMode = viewerInstance.getRuntimeRenderMode();
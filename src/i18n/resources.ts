@@ -44,6 +44,7 @@ export type I18nKey =
     | 'hud.zoom'
     | 'hud.scale'
     | 'hud.mpp'
+    | 'hud.nearestUnit'
     | 'hud.yes'
     | 'hud.no'
     | 'hud.terrainLand'
@@ -96,6 +97,7 @@ export const resources: Record<LanguageCode, ResourceTable> = {
         'hud.zoom': '缩放等级',
         'hud.scale': '比例尺',
         'hud.mpp': '米每像素',
+        'hud.nearestUnit': '最近单位',
         'hud.yes': '是',
         'hud.no': '否',
         'hud.terrainLand': '陆地',
@@ -145,6 +147,7 @@ export const resources: Record<LanguageCode, ResourceTable> = {
         'hud.zoom': 'ZOOM',
         'hud.scale': 'SCALE',
         'hud.mpp': 'MPP',
+        'hud.nearestUnit': 'NEAREST',
         'hud.yes': 'YES',
         'hud.no': 'NO',
         'hud.terrainLand': 'LAND',
@@ -6,8 +6,15 @@ import {
     GeographicTilingScheme,
     buildModuleUrl
 } from 'cesium';
-import { getTacticalMaterialFabric, type TacticalMaterialOptions } from './tacticalMaterial';
+import {
+    getTacticalMaterialFabric,
+    getTacticalMaterialUniforms,
+    type TacticalMaterialOptions
+} from './tacticalMaterial';
 import type { SceneThemeRenderMode, TacticalMaterialPreset } from '../config';
+import { LruCache } from '../utils/LruCache';
+
+type TacticalMaterialUniforms = ReturnType<typeof getTacticalMaterialUniforms>;
 
 /**
  * 默认分层设色图 (Base64)
@@ -20,9 +27,15 @@ import type { SceneThemeRenderMode, TacticalMaterialPreset } from '../config';
  */
 export class ThemeManager {
     private viewer: Viewer;
+    // 战术材质在会话内只创建一次；风格/档位变化只替换 uniforms，不触发着色器重建。
+    private tacticalMaterial?: Material;
+    private uniformCache: LruCache<string, TacticalMaterialUniforms>;
+    private appliedMaterialKey?: string;
+    private appliedTacticalBaseLayer?: boolean;
 
-    constructor(viewer: Viewer) {
+    constructor(viewer: Viewer, materialCacheSize: number = 16) {
         this.viewer = viewer;
+        this.uniformCache = new LruCache(materialCacheSize);
     }
 
     /**
@@ -61,34 +74,22 @@ export class ThemeManager {
         console.log("ThemeManager: Activating Tactical Theme (Red Flag)...");
         const { scene } = this.viewer;
         if (materialPreset !== 'off' && tacticalStyle) {
-            scene.globe.material = new Material({
-                fabric: getTacticalMaterialFabric(tacticalStyle)
-            });
+            this.attachTacticalMaterial(tacticalStyle, materialPreset);
             console.log(`ThemeManager: Tactical material preset '${materialPreset}' enabled (normal).`);
             console.log(`ThemeManager: globe.material attached=${scene.globe.material ? 'yes' : 'no'}.`);
         } else {
-            scene.globe.material = undefined;
+            if (scene.globe.material) {
+                scene.globe.material = undefined;
+            }
+            this.appliedMaterialKey = undefined;
             console.log("ThemeManager: Tactical material disabled for current LOD profile.");
         }
-        this.viewer.imageryLayers.removeAll();
-        if (baseLayerEnabled) {
-            // tactical 模式允许启用离线 NaturalEarthII 底图以增强海陆轮廓辨识。
-            const baseLayer = this.viewer.imageryLayers.addImageryProvider(new UrlTemplateImageryProvider({
-                url: `${buildModuleUrl('Assets/Textures/NaturalEarthII')}/{z}/{x}/{reverseY}.jpg`,
-                tilingScheme: new GeographicTilingScheme(),
-                minimumLevel: 0,
-                maximumLevel: 2
-            }));
-            if (baseLayer) {
-                baseLayer.alpha = 0.72;
-                baseLayer.brightness = 0.84;
-                baseLayer.contrast = 1.32;
-                baseLayer.gamma = 0.90;
-                baseLayer.saturation = 0.22;
-            }
-            console.log("ThemeManager: NaturalEarthII tactical base layer applied.");
+        if (this.appliedTacticalBaseLayer === baseLayerEnabled) {
+            // 底图开关未变化时保留现有图层，避免切档时重复拆建 imagery 导致瓦片重新请求。
+            console.log(`ThemeManager: imagery layers unchanged (baseLayer=${baseLayerEnabled}).`);
         } else {
-            console.log("ThemeManager: Tactical theme running without any imagery fallback.");
+            this.rebuildTacticalImagery(baseLayerEnabled);
+            this.appliedTacticalBaseLayer = baseLayerEnabled;
         }
         console.log(`ThemeManager: imagery layer count = ${this.viewer.imageryLayers.length}.`);
         for (let i = 0; i < this.viewer.imageryLayers.length; i += 1) {
@@ -98,11 +99,6 @@ export class ThemeManager {
             );
         }
 
-        // 不需要再手动设置 uniforms，因为 Fabric 定义里已经包含了初始值
-        // 如果需要动态修改，可以保留引用:
-        // const material = scene.globe.material;
-        // material.uniforms.color = ...
-
         scene.globe.depthTestAgainstTerrain = false;
         scene.globe.enableLighting = true; // 开启光照，增强山体与峡谷体积感
 
@@ -125,6 +121,58 @@ export class ThemeManager {
         scene.requestRender();
     }
 
+    /**
+     * 挂载战术材质。
+     * 缓存键由档位与解析后的风格参数组成；命中已挂载的键直接返回，否则只就地替换 uniforms。
+     * 只有首次创建或从 off 档恢复时才会给 globe.material 赋值（赋值会使地表着色器失效）。
+     */
+    private attachTacticalMaterial(tacticalStyle: TacticalMaterialOptions, materialPreset: TacticalMaterialPreset): void {
+        const { globe } = this.viewer.scene;
+        const key = `tactical|${materialPreset}|${JSON.stringify(tacticalStyle)}`;
+        const attached = !!this.tacticalMaterial && globe.material === this.tacticalMaterial;
+        if (attached && this.appliedMaterialKey === key) {
+            return;
+        }
+        let uniforms = this.uniformCache.get(key);
+        if (!uniforms) {
+            uniforms = getTacticalMaterialUniforms(tacticalStyle);
+            this.uniformCache.set(key, uniforms);
+        }
+        if (!this.tacticalMaterial) {
+            this.tacticalMaterial = new Material({
+                fabric: getTacticalMaterialFabric(tacticalStyle)
+            });
+        }
+        Object.assign(this.tacticalMaterial.uniforms, uniforms);
+        if (!attached) {
+            globe.material = this.tacticalMaterial;
+        }
+        this.appliedMaterialKey = key;
+    }
+
+    private rebuildTacticalImagery(baseLayerEnabled: boolean): void {
+        this.viewer.imageryLayers.removeAll();
+        if (baseLayerEnabled) {
+            // tactical 模式允许启用离线 NaturalEarthII 底图以增强海陆轮廓辨识。
+            const baseLayer = this.viewer.imageryLayers.addImageryProvider(new UrlTemplateImageryProvider({
+                url: `${buildModuleUrl('Assets/Textures/NaturalEarthII')}/{z}/{x}/{reverseY}.jpg`,
+                tilingScheme: new GeographicTilingScheme(),
+                minimumLevel: 0,
+                maximumLevel: 2
+            }));
+            if (baseLayer) {
+                baseLayer.alpha = 0.72;
+                baseLayer.brightness = 0.84;
+                baseLayer.contrast = 1.32;
+                baseLayer.gamma = 0.90;
+                baseLayer.saturation = 0.22;
+            }
+            console.log("ThemeManager: NaturalEarthII tactical base layer applied.");
+        } else {
+            console.log("ThemeManager: Tactical theme running without any imagery fallback.");
+        }
+    }
+
     /**
      * 设置卫星模式
      * 恢复默认写实风格
@@ -135,6 +183,8 @@ export class ThemeManager {
 
         // 恢复默认材质
         globe.material = undefined;
+        this.appliedMaterialKey = undefined;
+        this.appliedTacticalBaseLayer = undefined;
 
         // 恢复大气渲染
         if (scene.skyAtmosphere) scene.skyAtmosphere.show = true;
@@ -1,4 +1,4 @@
-import { Color } from 'cesium';
+import { Cartesian2, Cartesian4, Color } from 'cesium';
 
 export interface TacticalMaterialOptions {
     contourInterval: number;
@@ -49,6 +49,79 @@ export interface TacticalMaterialOptions {
     rockDetailGain?: number;
     seamBandStrength?: number;
     seamMatteStrength?: number;
+    // 程序化参考网格（经纬网）：由叠加层按场景开启，默认关闭。
+    enableReferenceGrid?: boolean;
+    // 网格间距（度）[经向, 纬向]，网格线对齐到范围的西南角。
+    referenceGridSpacing?: [number, number];
+    // 网格范围（度）[west, south, east, north]，缺省为全球。
+    referenceGridBounds?: [number, number, number, number];
+    colorReferenceGrid?: string;
+    referenceGridAlpha?: number;
+    // 线宽（像素），与视距无关。
+    referenceGridWidth?: number;
+}
+
+/**
+ * 计算战术地形材质的 uniform 取值。
+ * 着色器源码与风格参数无关，风格切换只需替换这些取值即可复用已编译的着色器。
+ */
+export function getTacticalMaterialUniforms(options: TacticalMaterialOptions) {
+    return {
+        colorLow: Color.fromCssColorString(options.colorLow),
+        colorHigh: Color.fromCssColorString(options.colorHigh),
+        colorRidge: Color.fromCssColorString(options.colorRidge),
+        colorContour: Color.fromCssColorString(options.colorContour),
+        colorMacroGrid: Color.fromCssColorString(options.colorMacroGrid),
+        colorMicroGrid: Color.fromCssColorString(options.colorMicroGrid),
+        valleyContourMix: options.valleyContourMix ?? 0.34,
+        ridgeAccentMix: options.ridgeAccentMix ?? 0.66,
+        toneGamma: options.toneGamma ?? 0.94,
+        toneShadowFloor: options.toneShadowFloor ?? 0.76,
+        toneHighlightCeiling: options.toneHighlightCeiling ?? 1.27,
+        atmosphereHazeColor: Color.fromCssColorString(options.atmosphereHazeColor ?? '#c7b08a'),
+        atmosphereFarStart: options.atmosphereFarStart ?? 260000.0,
+        atmosphereFarEnd: options.atmosphereFarEnd ?? 1350000.0,
+        atmosphereStrength: options.atmosphereStrength ?? 0.34,
+        atmosphereDesaturate: options.atmosphereDesaturate ?? 0.26,
+        horizonWarmColor: Color.fromCssColorString(options.horizonWarmColor ?? '#d8b784'),
+        horizonCoolColor: Color.fromCssColorString(options.horizonCoolColor ?? '#8d8fa4'),
+        horizonStrength: options.horizonStrength ?? 0.18,
+        horizonFarStart: options.horizonFarStart ?? 220000.0,
+        horizonFarEnd: options.horizonFarEnd ?? 1200000.0,
+        colorSunWarm: Color.fromCssColorString(options.colorSunWarm ?? '#f3c87f'),
+        colorShadowCool: Color.fromCssColorString(options.colorShadowCool ?? '#8f90a0'),
+        warmCoolStrength: options.warmCoolStrength ?? 0.24,
+        minLighting: options.minLighting ?? 0.22,
+        contourInterval: options.contourInterval,
+        contourThickness: options.contourThickness,
+        macroGridDensity: options.macroGridDensity,
+        macroGridWidth: options.macroGridWidth,
+        microGridDensity: options.microGridDensity,
+        microGridWidth: options.microGridWidth,
+        enableRelief: options.enableRelief === false ? 0.0 : 1.0,
+        enableContour: options.enableContour === false ? 0.0 : 1.0,
+        enableMacroGrid: options.enableMacroGrid === false ? 0.0 : 1.0,
+        enableMicroGrid: options.enableMicroGrid === false ? 0.0 : 1.0,
+        seamSuppressStrength: options.seamSuppressStrength ?? 0.0,
+        normalDetailGain: options.normalDetailGain ?? 1.0,
+        edgeEnhanceGain: options.edgeEnhanceGain ?? 1.0,
+        skirtSuppressStrength: options.skirtSuppressStrength ?? 0.0,
+        seamFlattenStrength: options.seamFlattenStrength ?? 0.0,
+        seamLightingSuppress: options.seamLightingSuppress ?? 0.0,
+        plainBlendGain: options.plainBlendGain ?? 1.0,
+        rockDetailGain: options.rockDetailGain ?? 1.0,
+        seamBandStrength: options.seamBandStrength ?? 0.0,
+        seamMatteStrength: options.seamMatteStrength ?? 0.0,
+        enableReferenceGrid: options.enableReferenceGrid === true ? 1.0 : 0.0,
+        referenceGridSpacing: Cartesian2.fromArray(options.referenceGridSpacing ?? [1.0, 1.0]),
+        referenceGridBounds: Cartesian4.fromArray(options.referenceGridBounds ?? [-180.0, -90.0, 180.0, 90.0]),
+        colorReferenceGrid: Color.fromCssColorString(options.colorReferenceGrid ?? '#f4c76a')
+            .withAlpha(options.referenceGridAlpha ?? 0.30),
+        referenceGridWidth: options.referenceGridWidth ?? 1.15,
+        lodNear: options.lodNear,
+        lodMid: options.lodMid,
+        lodFar: options.lodFar
+    };
 }
 
 /**
@@ -58,56 +131,7 @@ export interface TacticalMaterialOptions {
 export function getTacticalMaterialFabric(options: TacticalMaterialOptions) {
     return {
         type: 'TacticalTerrain',
-        uniforms: {
-            colorLow: Color.fromCssColorString(options.colorLow),
-            colorHigh: Color.fromCssColorString(options.colorHigh),
-            colorRidge: Color.fromCssColorString(options.colorRidge),
-            colorContour: Color.fromCssColorString(options.colorContour),
-            colorMacroGrid: Color.fromCssColorString(options.colorMacroGrid),
-            colorMicroGrid: Color.fromCssColorString(options.colorMicroGrid),
-            valleyContourMix: options.valleyContourMix ?? 0.34,
-            ridgeAccentMix: options.ridgeAccentMix ?? 0.66,
-            toneGamma: options.toneGamma ?? 0.94,
-            toneShadowFloor: options.toneShadowFloor ?? 0.76,
-            toneHighlightCeiling: options.toneHighlightCeiling ?? 1.27,
-            atmosphereHazeColor: Color.fromCssColorString(options.atmosphereHazeColor ?? '#c7b08a'),
-            atmosphereFarStart: options.atmosphereFarStart ?? 260000.0,
-            atmosphereFarEnd: options.atmosphereFarEnd ?? 1350000.0,
-            atmosphereStrength: options.atmosphereStrength ?? 0.34,
-            atmosphereDesaturate: options.atmosphereDesaturate ?? 0.26,
-            horizonWarmColor: Color.fromCssColorString(options.horizonWarmColor ?? '#d8b784'),
-            horizonCoolColor: Color.fromCssColorString(options.horizonCoolColor ?? '#8d8fa4'),
-            horizonStrength: options.horizonStrength ?? 0.18,
-            horizonFarStart: options.horizonFarStart ?? 220000.0,
-            horizonFarEnd: options.horizonFarEnd ?? 1200000.0,
-            colorSunWarm: Color.fromCssColorString(options.colorSunWarm ?? '#f3c87f'),
-            colorShadowCool: Color.fromCssColorString(options.colorShadowCool ?? '#8f90a0'),
-            warmCoolStrength: options.warmCoolStrength ?? 0.24,
-            minLighting: options.minLighting ?? 0.22,
-            contourInterval: options.contourInterval,
-            contourThickness: options.contourThickness,
-            macroGridDensity: options.macroGridDensity,
-            macroGridWidth: options.macroGridWidth,
-            microGridDensity: options.microGridDensity,
-            microGridWidth: options.microGridWidth,
-            enableRelief: options.enableRelief === false ? 0.0 : 1.0,
-            enableContour: options.enableContour === false ? 0.0 : 1.0,
-            enableMacroGrid: options.enableMacroGrid === false ? 0.0 : 1.0,
-            enableMicroGrid: options.enableMicroGrid === false ? 0.0 : 1.0,
-            seamSuppressStrength: options.seamSuppressStrength ?? 0.0,
-            normalDetailGain: options.normalDetailGain ?? 1.0,
-            edgeEnhanceGain: options.edgeEnhanceGain ?? 1.0,
-            skirtSuppressStrength: options.skirtSuppressStrength ?? 0.0,
-            seamFlattenStrength: options.seamFlattenStrength ?? 0.0,
-            seamLightingSuppress: options.seamLightingSuppress ?? 0.0,
-            plainBlendGain: options.plainBlendGain ?? 1.0,
-            rockDetailGain: options.rockDetailGain ?? 1.0,
-            seamBandStrength: options.seamBandStrength ?? 0.0,
-            seamMatteStrength: options.seamMatteStrength ?? 0.0,
-            lodNear: options.lodNear,
-            lodMid: options.lodMid,
-            lodFar: options.lodFar
-        },
+        uniforms: getTacticalMaterialUniforms(options),
         source: `
             uniform vec4 colorLow;
             uniform vec4 colorHigh;
@@ -157,6 +181,11 @@ export function getTacticalMaterialFabric(options: TacticalMaterialOptions) {
             uniform float lodNear;
             uniform float lodMid;
             uniform float lodFar;
+            uniform float enableReferenceGrid;
+            uniform vec2 referenceGridSpacing;
+            uniform vec4 referenceGridBounds;
+            uniform vec4 colorReferenceGrid;
+            uniform float referenceGridWidth;
 
             float gridMask(vec2 st, float density, float width) {
                 vec2 g = abs(fract(st * density - 0.5) - 0.5) / fwidth(st * density);
@@ -172,6 +201,27 @@ export function getTacticalMaterialFabric(options: TacticalMaterialOptions) {
                 return vec2((lon + czm_pi) / czm_twoPi, (lat + czm_piOverTwo) / czm_pi);
             }
 
+            // 片元的经纬度（度）：由视点相对位置还原世界坐标；纬度按椭球面点近似，忽略高程项。
+            vec2 geodeticDegrees(vec3 positionToEyeEC) {
+                vec3 positionWC = (czm_inverseView * vec4(-positionToEyeEC, 1.0)).xyz;
+                float lon = atan(positionWC.y, positionWC.x);
+                float lat = atan(positionWC.z, length(positionWC.xy) * 0.99330562);
+                return degrees(vec2(lon, lat));
+            }
+
+            // 程序化参考网格：按屏幕导数换算像素线宽，任意视距下线宽恒定，网格范围外为 0。
+            float referenceGridMask(vec2 lonLat) {
+                vec2 spacing = max(referenceGridSpacing, vec2(1e-6));
+                vec2 coord = (lonLat - referenceGridBounds.xy) / spacing;
+                vec2 coordWidth = max(fwidth(coord), vec2(1e-6));
+                vec2 dist = abs(fract(coord - 0.5) - 0.5) / coordWidth;
+                float halfWidth = 0.5 * max(referenceGridWidth, 0.5);
+                float line = 1.0 - smoothstep(halfWidth, halfWidth + 1.0, min(dist.x, dist.y));
+                vec2 pad = fwidth(lonLat) * halfWidth;
+                vec2 inside = step(referenceGridBounds.xy - pad, lonLat) * step(lonLat, referenceGridBounds.zw + pad);
+                return line * inside.x * inside.y;
+            }
+
             float hash12(vec2 p) {
                 vec3 p3 = fract(vec3(p.xyx) * 0.1031);
                 p3 += dot(p3, p3.yzx + 33.33);
@@ -522,6 +572,10 @@ export function getTacticalMaterialFabric(options: TacticalMaterialOptions) {
                 float seamLuma = dot(finalColor, vec3(0.299, 0.587, 0.114));
                 finalColor = mix(finalColor, vec3(seamLuma), 0.18 * seamMatte);
                 finalColor = mix(finalColor, clamp(finalColor * 0.96, 0.0, 1.0), 0.28 * seamMatte);
+                if (enableReferenceGrid > 0.5) {
+                    float referenceGrid = referenceGridMask(geodeticDegrees(materialInput.positionToEyeEC));
+                    finalColor = mix(finalColor, colorReferenceGrid.rgb, referenceGrid * colorReferenceGrid.a);
+                }
                 finalColor = clamp(finalColor, 0.0, 1.0);
                 if (finalColor.r != finalColor.r || finalColor.g != finalColor.g || finalColor.b != finalColor.b) {
                     finalColor = clamp(base, 0.0, 1.0);
@@ -7,6 +7,8 @@ export interface HudMetrics {
     zoomLevel: number;
     scaleDenominator: number;
     metersPerPixel: number;
+    // 光标附近最近的叠加层单位。
+    nearestUnit?: { id: string; distanceMeters: number };
 }
 
 /**
@@ -89,6 +91,11 @@ export class HudManager {
                 `${i18n.t('hud.scale')}: 1:${Math.round(metrics.scaleDenominator).toLocaleString('en-US')}`,
                 `${i18n.t('hud.mpp')}: ${metrics.metersPerPixel.toFixed(2)} m/px`
             );
+            if (metrics.nearestUnit) {
+                lines.push(
+                    `${i18n.t('hud.nearestUnit')}: ${metrics.nearestUnit.id} (${(metrics.nearestUnit.distanceMeters / 1000).toFixed(2)} km)`
+                );
+            }
         }
         this.root.textContent = lines.join('\n');
     }
@@ -0,0 +1,65 @@
+/**
+ * 基于 Map 插入顺序的 LRU 缓存
+ * get/set 都会把条目移到最新位置，超出容量时淘汰最久未使用的条目。
+ */
+export class LruCache<K, V> {
+    private readonly maxEntries: number;
+    private readonly entries: Map<K, V>;
+    private hitCount: number;
+    private missCount: number;
+
+    constructor(maxEntries: number) {
+        this.maxEntries = Math.max(1, Math.floor(maxEntries));
+        this.entries = new Map();
+        this.hitCount = 0;
+        this.missCount = 0;
+    }
+
+    public get size(): number {
+        return this.entries.size;
+    }
+
+    public get(key: K): V | undefined {
+        const value = this.entries.get(key);
+        if (value === undefined) {
+            this.missCount += 1;
+            return undefined;
+        }
+        this.hitCount += 1;
+        this.entries.delete(key);
+        this.entries.set(key, value);
+        return value;
+    }
+
+    public has(key: K): boolean {
+        return this.entries.has(key);
+    }
+
+    public set(key: K, value: V): void {
+        if (this.entries.has(key)) {
+            this.entries.delete(key);
+        }
+        this.entries.set(key, value);
+        while (this.entries.size > this.maxEntries) {
+            const oldest = this.entries.keys().next().value as K;
+            this.entries.delete(oldest);
+        }
+    }
+
+    public delete(key: K): boolean {
+        return this.entries.delete(key);
+    }
+
+    public clear(): void {
+        this.entries.clear();
+    }
+
+    public getStats(): { size: number; maxEntries: number; hits: number; misses: number } {
+        return {
+            size: this.entries.size,
+            maxEntries: this.maxEntries,
+            hits: this.hitCount,
+            misses: this.missCount
+        };
+    }
+}
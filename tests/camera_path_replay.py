@@ -0,0 +1,124 @@
+import json
+import os
+import sys
+import time
+from typing import Any
+
+from harness import ROOT, WarmBrowserHarness, parse_bool_env, wait_scene_settled
+
+
+DEFAULT_CAMERA_PATH = os.path.join("tests", "camera_paths", "nevada_range_sweep.json")
+
+
+def load_camera_path(path: str) -> dict[str, Any]:
+    resolved = path if os.path.isabs(path) else os.path.join(ROOT, path)
+    with open(resolved, "r", encoding="utf-8") as f:
+        camera_path = json.load(f)
+    if len(camera_path.get("keyframes", [])) < 2:
+        raise ValueError(f"Camera path needs at least 2 keyframes: {resolved}")
+    return camera_path
+
+
+def replay_camera_path(harness: WarmBrowserHarness, camera_path: dict[str, Any], fps: float) -> dict[str, Any]:
+    page = harness.page
+    first = camera_path["keyframes"][0]
+    # 先把相机放到起点并等待稳定，使每次回放都从同一个已加载的画面开始。
+    page.evaluate(
+        """(k) => window.viewer.camera.setView({
+            destination: Cesium.Cartesian3.fromDegrees(k.longitude, k.latitude, k.height),
+            orientation: {
+                heading: Cesium.Math.toRadians(k.heading),
+                pitch: Cesium.Math.toRadians(k.pitch),
+                roll: Cesium.Math.toRadians(k.roll || 0)
+            }
+        })""",
+        first,
+    )
+    wait_scene_settled(page, timeout_seconds=10.0)
+    return page.evaluate(
+        "([path, fps]) => window.replayCameraPath(path, { fps })",
+        [camera_path, fps],
+    )
+
+
+def print_replay_report(report: dict[str, Any]) -> None:
+    overall = report["overall"]
+    print("\n=== CAMERA PATH REPLAY REPORT ===")
+    print(
+        f"Path: {report['name']} frames={report['frames']} simulated={report['simulatedSeconds']:.1f}s "
+        f"wall={report['wallClockMs'] / 1000:.1f}s"
+    )
+    print(
+        f"Overall: p50={overall['p50Ms']:.2f}ms p95={overall['p95Ms']:.2f}ms "
+        f"p99={overall['p99Ms']:.2f}ms max={overall['maxMs']:.2f}ms long={overall['longFrameCount']}"
+    )
+    print(f"{'segment':<24}{'frames':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'long':>6}")
+    for segment in report["segments"]:
+        stats = segment["frameTime"]
+        print(
+            f"{segment['label']:<24}{segment['frames']:>8}{stats['p50Ms']:>9.2f}{stats['p95Ms']:>9.2f}"
+            f"{stats['p99Ms']:>9.2f}{stats['maxMs']:>9.2f}{stats['longFrameCount']:>6}"
+        )
+
+
+def run_camera_path_scenario(
+    harness: WarmBrowserHarness,
+    path_file: str,
+    fps: float,
+    max_p95_frame_ms: float | None,
+) -> dict[str, Any]:
+    camera_path = load_camera_path(path_file)
+    report = replay_camera_path(harness, camera_path, fps)
+    print_replay_report(report)
+
+    errors: list[str] = []
+    if max_p95_frame_ms is not None:
+        for segment in report["segments"]:
+            if float(segment["frameTime"]["p95Ms"]) > max_p95_frame_ms:
+                errors.append(f"{segment['label']}: p95FrameMs>{max_p95_frame_ms}")
+    if errors:
+        print(f"CAMERA PATH GATE FAILED: {errors}")
+    return {"rc": 1 if errors else 0, "errors": errors, "path": path_file, "report": report}
+
+
+def camera_path_scenario_from_env() -> tuple[str, Any]:
+    path_file = os.getenv("CAMERA_PATH_FILE", DEFAULT_CAMERA_PATH).strip()
+    fps = float(os.getenv("CAMERA_PATH_FPS", "60"))
+    raw_max_p95 = os.getenv("CAMERA_PATH_MAX_P95_FRAME_MS", "").strip()
+    max_p95_frame_ms = float(raw_max_p95) if raw_max_p95 else None
+    return "camera_path", lambda harness: run_camera_path_scenario(harness, path_file, fps, max_p95_frame_ms)
+
+
+def record(path_file: str, seconds: float, interval_ms: int, name: str) -> int:
+    # 录制模式：打开有界面的浏览器，由操作员手动飞行，结束后写出路径文件。
+    with WarmBrowserHarness(headless=False, warm_up=False) as harness:
+        print(f"Recording camera path for {seconds:.0f}s (interval={interval_ms}ms). Fly the camera now...")
+        harness.page.evaluate("(ms) => window.startCameraPathRecording(ms)", interval_ms)
+        time.sleep(seconds)
+        camera_path = harness.page.evaluate("(name) => window.stopCameraPathRecording(name)", name)
+    resolved = path_file if os.path.isabs(path_file) else os.path.join(ROOT, path_file)
+    os.makedirs(os.path.dirname(resolved), exist_ok=True)
+    with open(resolved, "w", encoding="utf-8") as f:
+        json.dump(camera_path, f, ensure_ascii=False, indent=2)
+    print(f"Camera path written: {resolved} (keyframes={len(camera_path['keyframes'])})")
+    return 0
+
+
+def run() -> int:
+    if parse_bool_env("CAMERA_PATH_RECORD", "false"):
+        path_file = os.getenv("CAMERA_PATH_FILE", os.path.join("tests", "camera_paths", "recorded.json")).strip()
+        name = os.path.splitext(os.path.basename(path_file))[0]
+        return record(
+            path_file,
+            float(os.getenv("CAMERA_PATH_RECORD_SECONDS", "60")),
+            int(os.getenv("CAMERA_PATH_RECORD_INTERVAL_MS", "250")),
+            name,
+        )
+    name, scenario = camera_path_scenario_from_env()
+    with WarmBrowserHarness() as harness:
+        result = harness.run_scenarios([(name, scenario)])[0]
+    return int(result["rc"])
+
+
+if __name__ == "__main__":
+    sys.exit(run())
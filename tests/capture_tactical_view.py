@@ -2,75 +2,92 @@ import json
 import os
 import sys
 import time
-from playwright.sync_api import sync_playwright
+from typing import Any
 
+from harness import WarmBrowserHarness, capture_frame, ensure_screenshot_path, parse_bool_env, wait_scene_settled
 
-def parse_bool_env(name: str, default: str) -> bool:
-    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+# Nevada 演练区候选范围 [west, south, east, north]（度），覆盖原浏览器内扫描的 7 个候选点。
+NEVADA_BOUNDS = (-118.45, 36.45, -114.75, 37.80)
 
 
-def ensure_screenshot_path(path: str, default_name: str) -> str:
-    resolved = path.strip() or os.path.join("tests", "artifacts", default_name)
-    screenshot_dir = os.path.dirname(resolved)
-    if screenshot_dir:
-        os.makedirs(screenshot_dir, exist_ok=True)
-    return resolved
+def pick_relief_focus() -> dict[str, Any] | None:
+    # 离线起伏索引可用时直接取范围内起伏最大的瓦片中心，省去浏览器内逐点采样地形。
+    from terrain_relief import open_relief_index
 
+    index = open_relief_index()
+    if index is None:
+        return None
+    sites = index.top_relief_sites(NEVADA_BOUNDS, count=1)
+    if not sites:
+        return None
+    site = sites[0]
+    return {"lon": site["lon"], "lat": site["lat"], "span": site["relief"], "source": "relief-index"}
 
-def run() -> int:
-    app_url = os.getenv("E3_APP_URL", "http://localhost:5173").strip()
-    terrain_layer_json_url = os.getenv(
-        "E3_TERRAIN_LAYER_JSON_URL",
-        "http://localhost:4444/terrain/layer.json",
-    ).strip()
-    wait_seconds = float(os.getenv("CAPTURE_WAIT_SECONDS", "6"))
-    wait_tiles = parse_bool_env("CAPTURE_WAIT_TILES", "true")
-    wait_tiles_timeout = float(os.getenv("CAPTURE_WAIT_TILES_TIMEOUT", "20"))
-    screenshot_path = ensure_screenshot_path(
-        os.getenv("CAPTURE_SCREENSHOT", "").strip(),
-        "capture_tactical_view.png",
-    )
-    scan_nevada = parse_bool_env("CAPTURE_SCAN_NEVADA", "true")
-    align_redflag = os.getenv("CAPTURE_ALIGN_REDFLAG", "").strip().lower()
-    terrain_only = parse_bool_env("CAPTURE_TERRAIN_ONLY", "true")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page(viewport={"width": 1440, "height": 900})
-        logs: list[str] = []
-        page.on("console", lambda msg: logs.append(msg.text))
-
-        page.goto(app_url, timeout=30000)
-        page.wait_for_selector(".cesium-viewer", timeout=30000)
+def run_capture_scenario(
+    harness: WarmBrowserHarness,
+    app_url: str,
+    terrain_layer_json_url: str,
+    wait_seconds: float,
+    wait_tiles: bool,
+    wait_tiles_timeout: float,
+    screenshot_path: str,
+    scan_nevada: bool,
+    align_redflag: str,
+    terrain_only: bool,
+    frame_metrics: bool = False,
+    frame_downsample: int = 1,
+    save_png: bool = True,
+) -> dict[str, Any]:
+    page = harness.page
+    if wait_seconds > 0:
         time.sleep(wait_seconds)
 
-        if terrain_only:
-            page.evaluate(
-                """
-                (() => {
-                    if (window.clearRedFlagOverlay) {
-                        window.clearRedFlagOverlay();
-                    }
-                })()
-                """
-            )
+    if terrain_only:
+        page.evaluate(
+            """
+            (() => {
+                if (window.clearRedFlagOverlay) {
+                    window.clearRedFlagOverlay();
+                }
+            })()
+            """
+        )
 
-        if align_redflag in ("wide", "focus"):
-            aligned = page.evaluate(
+    if align_redflag in ("wide", "focus"):
+        aligned = page.evaluate(
+            """
+            (variant) => {
+                if (window.alignRedFlagReference) {
+                    window.alignRedFlagReference(variant);
+                    return true;
+                }
+                return false;
+            }
+            """,
+            align_redflag,
+        )
+        print(f"RedFlagAlign: variant={align_redflag} applied={aligned}")
+        wait_scene_settled(page, tiles_loaded=False, timeout_seconds=6.0)
+    elif scan_nevada:
+        best_focus = pick_relief_focus()
+        if best_focus:
+            page.evaluate(
                 """
-                (variant) => {
-                    if (window.alignRedFlagReference) {
-                        window.alignRedFlagReference(variant);
-                        return true;
-                    }
-                    return false;
+                (focus) => {
+                    window.viewer.camera.setView({
+                        destination: Cesium.Cartesian3.fromDegrees(focus.lon, focus.lat, 5200.0),
+                        orientation: {
+                            heading: Cesium.Math.toRadians(24.0),
+                            pitch: Cesium.Math.toRadians(-22.0),
+                            roll: 0.0
+                        }
+                    });
                 }
                 """,
-                align_redflag,
+                best_focus,
             )
-            print(f"RedFlagAlign: variant={align_redflag} applied={aligned}")
-            time.sleep(2.2)
-        elif scan_nevada:
+        else:
             best_focus = page.evaluate(
                 """
                 async () => {
@@ -126,185 +143,278 @@ def run() -> int:
                 }
                 """
             )
-            print(f"NevadaBestFocus: {best_focus}")
-            time.sleep(1.2)
-            # LOD 切档是逐级推进，补一段轻量 zoomIn 触发，确保进入 tactical 近景档位。
-            for _ in range(8):
-                lod_state = page.evaluate("window.getLodState ? window.getLodState() : null")
-                if lod_state and lod_state.get("profile") == "tactical":
-                    break
-                page.evaluate(
-                    """
-                    (() => {
-                        const h = window.viewer.camera.positionCartographic.height;
-                        const amount = Math.max(120.0, h * 0.14);
-                        window.viewer.camera.zoomIn(amount);
-                    })()
-                    """
-                )
-                time.sleep(0.45)
-
-        tile_wait_report = {"enabled": wait_tiles, "tilesLoaded": None, "elapsedSeconds": 0.0}
-        if wait_tiles:
-            start_wait = time.time()
-            last_state = {}
-            while time.time() - start_wait < wait_tiles_timeout:
-                last_state = page.evaluate(
-                    """
-                    (() => {
-                        if (!window.viewer) return { viewerReady: false };
-                        const provider = window.viewer.terrainProvider;
-                        const globe = window.viewer.scene.globe;
-                        return {
-                            viewerReady: true,
-                            providerType: provider && provider.constructor ? provider.constructor.name : 'unknown',
-                            providerReady: !!provider,
-                            tilesLoaded: !!globe.tilesLoaded
-                        };
-                    })()
-                    """
-                )
-                if last_state.get("tilesLoaded"):
-                    break
-                time.sleep(0.35)
-            tile_wait_report = {
-                "enabled": wait_tiles,
-                "tilesLoaded": bool(last_state.get("tilesLoaded")),
-                "elapsedSeconds": round(time.time() - start_wait, 2),
-                "lastState": last_state
-            }
-
-        # 等待一次稳定渲染，避免抓到切档中间帧。
-        page.evaluate("window.viewer.scene.requestRender()")
-        time.sleep(1.0)
+        print(f"NevadaBestFocus: {best_focus}")
+        wait_scene_settled(page, tiles_loaded=False, timeout_seconds=4.0)
+        # LOD 切档是逐级推进，补一段轻量 zoomIn 触发，确保进入 tactical 近景档位。
+        for _ in range(8):
+            lod_state = page.evaluate("window.getLodState ? window.getLodState() : null")
+            if lod_state and lod_state.get("profile") == "tactical":
+                break
+            page.evaluate(
+                """
+                (() => {
+                    const h = window.viewer.camera.positionCartographic.height;
+                    const amount = Math.max(120.0, h * 0.14);
+                    window.viewer.camera.zoomIn(amount);
+                })()
+                """
+            )
+            wait_scene_settled(page, tiles_loaded=False, frames=1, timeout_seconds=3.0)
 
-        state = page.evaluate("window.getLodState ? window.getLodState() : null")
-        mode = page.evaluate("window.getTerrainRuntimeMode ? window.getTerrainRuntimeMode() : null")
-        camera = page.evaluate(
+    tile_wait_report = {"enabled": wait_tiles, "tilesLoaded": None, "elapsedSeconds": 0.0}
+    if wait_tiles:
+        start_wait = time.time()
+        settle = wait_scene_settled(page, timeout_seconds=wait_tiles_timeout)
+        last_state = page.evaluate(
             """
             (() => {
-                if (!window.viewer) return null;
-                const c = window.viewer.camera.positionCartographic;
+                if (!window.viewer) return { viewerReady: false };
+                const provider = window.viewer.terrainProvider;
+                const globe = window.viewer.scene.globe;
                 return {
-                    lonDeg: Cesium.Math.toDegrees(c.longitude),
-                    latDeg: Cesium.Math.toDegrees(c.latitude),
-                    height: c.height,
-                    pitchDeg: Cesium.Math.toDegrees(window.viewer.camera.pitch)
+                    viewerReady: true,
+                    providerType: provider && provider.constructor ? provider.constructor.name : 'unknown',
+                    providerReady: !!provider,
+                    tilesLoaded: !!globe.tilesLoaded
                 };
             })()
             """
         )
+        tile_wait_report = {
+            "enabled": wait_tiles,
+            "tilesLoaded": bool(last_state.get("tilesLoaded")),
+            "elapsedSeconds": round(time.time() - start_wait, 2),
+            "lastState": last_state,
+            "settle": settle,
+        }
 
-        terrain_probe = page.evaluate(
-            """
-            async () => {
-                if (!window.viewer || !window.Cesium) return { error: 'viewer_or_cesium_missing' };
-                const Cesium = window.Cesium;
-                const camera = window.viewer.camera;
-                const canvas = window.viewer.scene.canvas;
-                const center = new Cesium.Cartesian2(canvas.clientWidth / 2, canvas.clientHeight / 2);
-                const ray = camera.getPickRay(center);
-                if (!ray) return { error: 'pick_ray_missing' };
-                const hit = window.viewer.scene.globe.pick(ray, window.viewer.scene);
-                if (!hit) return { error: 'globe_pick_missing' };
-                const c = Cesium.Cartographic.fromCartesian(hit);
-                const lonStep = Cesium.Math.toRadians(0.1);
-                const latStep = Cesium.Math.toRadians(0.1);
-                const points = [];
-                for (let y = -1; y <= 1; y += 1) {
-                    for (let x = -1; x <= 1; x += 1) {
-                        points.push(new Cesium.Cartographic(c.longitude + x * lonStep, c.latitude + y * latStep, 0));
-                    }
-                }
-                let sampled;
-                try {
-                    sampled = await Cesium.sampleTerrainMostDetailed(window.viewer.terrainProvider, points);
-                } catch (_err) {
-                    sampled = await Cesium.sampleTerrain(window.viewer.terrainProvider, 9, points);
+    # 等待连续稳定帧，避免抓到切档中间帧。
+    wait_scene_settled(page, tiles_loaded=wait_tiles, frames=3, timeout_seconds=5.0)
+
+    state = page.evaluate("window.getLodState ? window.getLodState() : null")
+    mode = page.evaluate("window.getTerrainRuntimeMode ? window.getTerrainRuntimeMode() : null")
+    camera = page.evaluate(
+        """
+        (() => {
+            if (!window.viewer) return null;
+            const c = window.viewer.camera.positionCartographic;
+            return {
+                lonDeg: Cesium.Math.toDegrees(c.longitude),
+                latDeg: Cesium.Math.toDegrees(c.latitude),
+                height: c.height,
+                pitchDeg: Cesium.Math.toDegrees(window.viewer.camera.pitch)
+            };
+        })()
+        """
+    )
+
+    terrain_probe = page.evaluate(
+        """
+        async () => {
+            if (!window.viewer || !window.Cesium) return { error: 'viewer_or_cesium_missing' };
+            const Cesium = window.Cesium;
+            const camera = window.viewer.camera;
+            const canvas = window.viewer.scene.canvas;
+            const center = new Cesium.Cartesian2(canvas.clientWidth / 2, canvas.clientHeight / 2);
+            const ray = camera.getPickRay(center);
+            if (!ray) return { error: 'pick_ray_missing' };
+            const hit = window.viewer.scene.globe.pick(ray, window.viewer.scene);
+            if (!hit) return { error: 'globe_pick_missing' };
+            const c = Cesium.Cartographic.fromCartesian(hit);
+            const lonStep = Cesium.Math.toRadians(0.1);
+            const latStep = Cesium.Math.toRadians(0.1);
+            const points = [];
+            for (let y = -1; y <= 1; y += 1) {
+                for (let x = -1; x <= 1; x += 1) {
+                    points.push(new Cesium.Cartographic(c.longitude + x * lonStep, c.latitude + y * latStep, 0));
                 }
-                const heights = sampled
-                    .map((p) => p.height)
-                    .filter((h) => Number.isFinite(h));
-                if (heights.length === 0) return { error: 'no_finite_heights' };
-                const min = Math.min(...heights);
-                const max = Math.max(...heights);
-                return {
-                    centerLonDeg: Cesium.Math.toDegrees(c.longitude),
-                    centerLatDeg: Cesium.Math.toDegrees(c.latitude),
-                    min,
-                    max,
-                    span: max - min,
-                    sampleCount: heights.length
-                };
             }
-            """
-        )
+            let sampled;
+            try {
+                sampled = await Cesium.sampleTerrainMostDetailed(window.viewer.terrainProvider, points);
+            } catch (_err) {
+                sampled = await Cesium.sampleTerrain(window.viewer.terrainProvider, 9, points);
+            }
+            const heights = sampled
+                .map((p) => p.height)
+                .filter((h) => Number.isFinite(h));
+            if (heights.length === 0) return { error: 'no_finite_heights' };
+            const min = Math.min(...heights);
+            const max = Math.max(...heights);
+            return {
+                centerLonDeg: Cesium.Math.toDegrees(c.longitude),
+                centerLatDeg: Cesium.Math.toDegrees(c.latitude),
+                min,
+                max,
+                span: max - min,
+                sampleCount: heights.length
+            };
+        }
+        """
+    )
 
-        provider_probe = page.evaluate(
-            """
-            (() => {
-                if (!window.viewer) return { error: 'viewer_missing' };
-                const provider = window.viewer.terrainProvider;
-                if (!provider) return { error: 'terrain_provider_missing' };
+    provider_probe = page.evaluate(
+        """
+        (() => {
+            if (!window.viewer) return { error: 'viewer_missing' };
+            const provider = window.viewer.terrainProvider;
+            if (!provider) return { error: 'terrain_provider_missing' };
+            return {
+                providerType: provider.constructor ? provider.constructor.name : 'unknown',
+                requestVertexNormals: provider.requestVertexNormals ?? provider._requestVertexNormals ?? null,
+                hasVertexNormals: provider.hasVertexNormals ?? provider._hasVertexNormals ?? null,
+                hasWaterMask: provider.hasWaterMask ?? provider._hasWaterMask ?? null,
+                ready: provider.ready ?? null
+            };
+        })()
+        """
+    )
+
+    layer_meta = page.evaluate(
+        """
+        async (layerUrl) => {
+            try {
+                const resp = await fetch(layerUrl);
+                const json = await resp.json();
                 return {
-                    providerType: provider.constructor ? provider.constructor.name : 'unknown',
-                    requestVertexNormals: provider.requestVertexNormals ?? provider._requestVertexNormals ?? null,
-                    hasVertexNormals: provider.hasVertexNormals ?? provider._hasVertexNormals ?? null,
-                    hasWaterMask: provider.hasWaterMask ?? provider._hasWaterMask ?? null,
-                    ready: provider.ready ?? null
+                    status: resp.status,
+                    ok: resp.ok,
+                    format: json.format ?? null,
+                    minzoom: json.minzoom ?? null,
+                    maxzoom: json.maxzoom ?? null,
+                    extensions: json.extensions ?? null
                 };
-            })()
-            """
-        )
-
-        layer_meta = page.evaluate(
-            """
-            async (layerUrl) => {
-                try {
-                    const resp = await fetch(layerUrl);
-                    const json = await resp.json();
-                    return {
-                        status: resp.status,
-                        ok: resp.ok,
-                        format: json.format ?? null,
-                        minzoom: json.minzoom ?? null,
-                        maxzoom: json.maxzoom ?? null,
-                        extensions: json.extensions ?? null
-                    };
-                } catch (error) {
-                    return { error: String(error) };
-                }
+            } catch (error) {
+                return { error: String(error) };
             }
-            """,
-            terrain_layer_json_url
+        }
+        """,
+        terrain_layer_json_url
+    )
+
+    meta = {
+        "mode": mode,
+        "state": state,
+        "camera": camera,
+        "align_redflag": align_redflag,
+        "scan_nevada": scan_nevada,
+        "terrain_only": terrain_only,
+    }
+    metrics_result = None
+    if frame_metrics:
+        # 直接读回绘制缓冲计算指标，省去截图的 PNG 编码与再解码。
+        import image_metrics
+
+        start_capture = time.time()
+        frame = capture_frame(page, downsample=frame_downsample)
+        luma = image_metrics.frame_to_luma(frame)
+        baseline = image_metrics.DEFAULT_BASELINE
+        baseline_metrics = image_metrics.compute_metrics(
+            image_metrics.downsample_luma(image_metrics.load_luma(baseline), frame_downsample),
+            image_metrics.DEFAULT_WINDOWS,
+        )
+        metrics_result = image_metrics.evaluate_luma(
+            "live-frame",
+            luma,
+            meta,
+            baseline_metrics,
+            image_metrics.DEFAULT_WINDOWS,
+            image_metrics.DEFAULT_THRESHOLDS,
+            image_metrics.DEFAULT_MPP_RANGE,
         )
+        metrics_result["capture"] = {
+            key: frame[key]
+            for key in ("width", "height", "downsample", "renderMs", "readMs", "encodeMs")
+        }
+        metrics_result["capture"]["roundTripSeconds"] = round(time.time() - start_capture, 3)
+        image_metrics.print_results([metrics_result])
 
+    if save_png:
         page.screenshot(path=screenshot_path)
+        # 侧车元数据供 image_metrics.py 校验比较前提（tactical 档位、mpp 同尺度、机位）。
+        with open(screenshot_path + ".meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
 
-        print("=== CAPTURE REPORT ===")
-        print(f"AppUrl: {app_url}")
-        print(f"TerrainLayerJsonUrl: {terrain_layer_json_url}")
-        print(f"TileWait: {json.dumps(tile_wait_report, ensure_ascii=False)}")
-        print(f"Mode: {mode}")
-        print(f"LOD State: {state}")
-        print(f"Camera: {camera}")
-        print(f"ProviderProbe: {json.dumps(provider_probe, ensure_ascii=False)}")
-        print(f"LayerMeta: {json.dumps(layer_meta, ensure_ascii=False)}")
-        print(f"TerrainProbe: {json.dumps(terrain_probe, ensure_ascii=False)}")
-        print(f"Screenshot: {screenshot_path}")
-        if logs:
-            for line in logs:
-                if (
-                    "LOD profile switched" in line
-                    or "Tactical material preset" in line
-                    or "globe.material attached" in line
-                    or "imagery layer count" in line
-                    or "Fallback imagery" in line
-                ):
-                    print(f"log: {line}")
+    print("=== CAPTURE REPORT ===")
+    print(f"AppUrl: {app_url}")
+    print(f"TerrainLayerJsonUrl: {terrain_layer_json_url}")
+    print(f"TileWait: {json.dumps(tile_wait_report, ensure_ascii=False)}")
+    print(f"Mode: {mode}")
+    print(f"LOD State: {state}")
+    print(f"Camera: {camera}")
+    print(f"ProviderProbe: {json.dumps(provider_probe, ensure_ascii=False)}")
+    print(f"LayerMeta: {json.dumps(layer_meta, ensure_ascii=False)}")
+    print(f"TerrainProbe: {json.dumps(terrain_probe, ensure_ascii=False)}")
+    print(f"Screenshot: {screenshot_path if save_png else 'skipped'}")
+    if metrics_result:
+        print(f"FrameCapture: {json.dumps(metrics_result['capture'], ensure_ascii=False)}")
+    if harness.logs:
+        for line in harness.logs:
+            if (
+                "LOD profile switched" in line
+                or "Tactical material preset" in line
+                or "globe.material attached" in line
+                or "imagery layer count" in line
+                or "Fallback imagery" in line
+            ):
+                print(f"log: {line}")
 
-        browser.close()
-    return 0
+    return {
+        "rc": 1 if metrics_result and not metrics_result["passed"] else 0,
+        "mode": mode,
+        "state": state,
+        "camera": camera,
+        "tile_wait": tile_wait_report,
+        "provider_probe": provider_probe,
+        "layer_meta": layer_meta,
+        "terrain_probe": terrain_probe,
+        "screenshot": screenshot_path if save_png else None,
+        "frame_metrics": metrics_result,
+    }
+
+
+def capture_scenario_from_env() -> tuple[str, Any]:
+    app_url = os.getenv("E3_APP_URL", "http://localhost:5173").strip()
+    terrain_layer_json_url = os.getenv(
+        "E3_TERRAIN_LAYER_JSON_URL",
+        "http://localhost:4444/terrain/layer.json",
+    ).strip()
+    # 热页面已由 harness 完成地形连接与预热，默认不再额外固定等待。
+    wait_seconds = float(os.getenv("CAPTURE_WAIT_SECONDS", "0"))
+    wait_tiles = parse_bool_env("CAPTURE_WAIT_TILES", "true")
+    wait_tiles_timeout = float(os.getenv("CAPTURE_WAIT_TILES_TIMEOUT", "20"))
+    screenshot_path = ensure_screenshot_path(
+        os.getenv("CAPTURE_SCREENSHOT", "").strip(),
+        "capture_tactical_view.png",
+    )
+    scan_nevada = parse_bool_env("CAPTURE_SCAN_NEVADA", "true")
+    align_redflag = os.getenv("CAPTURE_ALIGN_REDFLAG", "").strip().lower()
+    terrain_only = parse_bool_env("CAPTURE_TERRAIN_ONLY", "true")
+    frame_metrics = parse_bool_env("CAPTURE_FRAME_METRICS", "false")
+    frame_downsample = int(os.getenv("CAPTURE_FRAME_DOWNSAMPLE", "1"))
+    save_png = parse_bool_env("CAPTURE_SAVE_PNG", "true")
+    return "capture", lambda harness: run_capture_scenario(
+        harness,
+        app_url,
+        terrain_layer_json_url,
+        wait_seconds,
+        wait_tiles,
+        wait_tiles_timeout,
+        screenshot_path,
+        scan_nevada,
+        align_redflag,
+        terrain_only,
+        frame_metrics,
+        frame_downsample,
+        save_png,
+    )
+
+
+def run() -> int:
+    name, scenario = capture_scenario_from_env()
+    with WarmBrowserHarness() as harness:
+        result = harness.run_scenarios([(name, scenario)])[0]
+    return int(result["rc"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,227 @@
+import base64
+import json
+import os
+import time
+from typing import Any, Callable
+
+from playwright.sync_api import Page, sync_playwright
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_APP_URL = "http://localhost:5173"
+DEFAULT_VIEWPORT = (1440, 900)
+
+
+def parse_bool_env(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+def ensure_screenshot_path(path: str, default_name: str) -> str:
+    resolved = path.strip() or os.path.join("tests", "artifacts", default_name)
+    screenshot_dir = os.path.dirname(resolved)
+    if screenshot_dir:
+        os.makedirs(screenshot_dir, exist_ok=True)
+    return resolved
+
+
+def get_lod_state(page: Page) -> dict | None:
+    return page.evaluate("window.getLodState ? window.getLodState() : null")
+
+
+def wait_scene_settled(
+    page: Page,
+    lod_settled: bool = True,
+    tiles_loaded: bool = True,
+    frames: int = 2,
+    timeout_seconds: float = 10.0,
+) -> dict | None:
+    # 页内 waitForSceneSettled 由相机/切档/瓦片事件驱动，场景一稳定就返回，不再按最坏情况 sleep。
+    return page.evaluate(
+        """(opts) => window.waitForSceneSettled ? window.waitForSceneSettled(opts) : null""",
+        {
+            "lodSettled": lod_settled,
+            "tilesLoaded": tiles_loaded,
+            "frames": frames,
+            "timeoutMs": int(timeout_seconds * 1000),
+        },
+    )
+
+
+def drive_mpp_towards(page: Page, target_mpp: float, direction: str) -> None:
+    for _ in range(36):
+        state = get_lod_state(page)
+        if not state:
+            return
+        mpp = float(state["metersPerPixel"])
+        if direction == "in" and mpp <= target_mpp:
+            return
+        if direction == "out" and mpp >= target_mpp:
+            return
+        page.evaluate(
+            """(dir) => {
+                const h = window.viewer.camera.positionCartographic.height;
+                const amount = Math.max(120000.0, h * 0.42);
+                if (dir === 'in') {
+                    window.viewer.camera.zoomIn(amount);
+                } else {
+                    window.viewer.camera.zoomOut(amount);
+                }
+            }""",
+            direction,
+        )
+        # 每步只需等待切档定时器与相机稳定，不等瓦片加载完成。
+        wait_scene_settled(page, tiles_loaded=False, frames=1, timeout_seconds=3.0)
+
+
+def capture_frame(page: Page, downsample: int = 1, region: dict[str, int] | None = None) -> dict[str, Any]:
+    # 页内渲染一帧并 readPixels，像素以 base64 传回后解码为原始 RGBA 字节（行序自上而下），不经过 PNG 编解码。
+    options: dict[str, Any] = {"downsample": downsample}
+    if region:
+        options["region"] = region
+    frame = page.evaluate("(opts) => window.captureFrame(opts)", options)
+    frame["data"] = base64.b64decode(frame["data"])
+    return frame
+
+
+def wait_tiles_loaded(page: Page, timeout_seconds: float) -> bool:
+    result = wait_scene_settled(page, lod_settled=False, tiles_loaded=True, frames=1, timeout_seconds=timeout_seconds)
+    return bool(result and result.get("settled"))
+
+
+class WarmBrowserHarness:
+    """
+    共享热浏览器：只启动一次 Chromium 并保持已预热的页面（地形已连接、各档材质已编译），
+    多个 benchmark/gate/capture 场景在同一页面上依次执行，场景之间通过 reset 复位。
+    """
+
+    def __init__(
+        self,
+        app_url: str | None = None,
+        viewport: tuple[int, int] = DEFAULT_VIEWPORT,
+        headless: bool = True,
+        warm_up: bool | None = None,
+        runtime_config: str | None = None,
+        config_overrides: dict[str, Any] | None = None,
+    ) -> None:
+        self.app_url = (app_url or os.getenv("E3_APP_URL", DEFAULT_APP_URL)).strip()
+        self.viewport = viewport
+        self.headless = headless
+        # runtime_config：以 public/config.<name>.js 替换页面加载的 /config.js，不改动工作区文件。
+        # config_overrides：在 config.js 执行前注入 window.E3_CONFIG，覆盖 mppThresholds/modeSwitch 等字段。
+        self.runtime_config = runtime_config
+        self.config_overrides = config_overrides or {}
+        self.warm_up_enabled = parse_bool_env("HARNESS_WARMUP", "true") if warm_up is None else warm_up
+        self.terrain_timeout = float(os.getenv("HARNESS_TERRAIN_TIMEOUT", "20"))
+        self.logs: list[str] = []
+        self._playwright = None
+        self._browser = None
+        self._page: Page | None = None
+
+    @property
+    def page(self) -> Page:
+        if self._page is None:
+            raise RuntimeError("Harness is not started.")
+        return self._page
+
+    def __enter__(self) -> "WarmBrowserHarness":
+        self.start()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def start(self) -> None:
+        print("Launching browser...")
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=self.headless)
+        width, height = self.viewport
+        self._page = self._browser.new_page(viewport={"width": width, "height": height})
+        self._page.on("console", lambda msg: self.logs.append(msg.text))
+        self._page.on("pageerror", lambda err: self.logs.append(f"PAGEERROR: {err}"))
+        self._install_runtime_config()
+
+        print(f"Navigating to {self.app_url} ...")
+        self._page.goto(self.app_url, timeout=30000)
+        self._page.wait_for_selector(".cesium-viewer", timeout=30000)
+        self._page.wait_for_function("() => !!window.resetHarnessState", timeout=30000)
+        self.wait_terrain_connected()
+        # 页面开启 startupWarmup 时先等待页内预热完成（未开启时立即返回 enabled=false）。
+        warmup_report = self._page.evaluate("window.warmupReady ? window.warmupReady() : null")
+        if warmup_report and warmup_report.get("enabled"):
+            print(f"Harness: in-page startup warm-up report={warmup_report}")
+        if self.warm_up_enabled:
+            self.warm_up()
+        self.reset()
+
+    def _install_runtime_config(self) -> None:
+        if self.runtime_config:
+            config_path = self.runtime_config
+            if not os.path.isabs(config_path):
+                config_path = os.path.join(ROOT, config_path)
+            if not os.path.isfile(config_path):
+                raise FileNotFoundError(f"Runtime config not found: {config_path}")
+            self.page.route(
+                "**/config.js",
+                lambda route: route.fulfill(path=config_path, content_type="application/javascript"),
+            )
+        if self.config_overrides:
+            # config.<profile>.js 以 Object.assign(defaults, window.E3_CONFIG) 合并，预先注入的字段优先。
+            self.page.add_init_script(
+                f"window.E3_CONFIG = Object.assign({{}}, window.E3_CONFIG || {{}}, {json.dumps(self.config_overrides)});"
+            )
+
+    def close(self) -> None:
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+        self._page = None
+
+    def wait_terrain_connected(self) -> str | None:
+        start = time.time()
+        status = None
+        while time.time() - start < self.terrain_timeout:
+            status = self.page.evaluate("window.getTerrainStatus ? window.getTerrainStatus() : null")
+            if status in ("connected", "failed"):
+                break
+            time.sleep(0.25)
+        print(f"Harness: terrain status={status} after {time.time() - start:.2f}s")
+        return status
+
+    def warm_up(self) -> None:
+        # 依次进入 continental/regional/tactical，触发本地 terrain 连接、瓦片解码与各档材质编译，
+        # 预热开销只在会话开始时付一次，不再混入每个场景的首帧数据。
+        begin = time.time()
+        for target_mpp in (5200.0, 1600.0, 400.0):
+            drive_mpp_towards(self.page, target_mpp, "in")
+            wait_tiles_loaded(self.page, 6.0)
+        state = get_lod_state(self.page)
+        print(f"Harness: warm-up finished in {time.time() - begin:.2f}s, state={state}")
+
+    def reset(self) -> None:
+        self.page.evaluate("window.resetHarnessState()")
+        # 复位后的视角变化同样会触发切档，等待切档与瓦片都稳定后再清零一次统计。
+        wait_scene_settled(self.page, timeout_seconds=6.0)
+        self.page.evaluate("window.resetHarnessState()")
+        self.logs.clear()
+
+    def run_scenarios(
+        self,
+        scenarios: list[tuple[str, Callable[["WarmBrowserHarness"], dict[str, Any]]]],
+    ) -> list[dict[str, Any]]:
+        results: list[dict[str, Any]] = []
+        for index, (name, scenario) in enumerate(scenarios):
+            if index > 0:
+                self.reset()
+            print(f"\n--- Scenario: {name} ---")
+            begin = time.time()
+            try:
+                result = scenario(self)
+            except Exception as exc:
+                result = {"rc": 1, "error": str(exc)}
+                print(f"Scenario {name} raised: {exc}")
+            result = {"scenario": name, "elapsed_seconds": round(time.time() - begin, 2), **result}
+            results.append(result)
+        return results
@@ -0,0 +1,316 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import zlib
+from typing import Any
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 可选：缺失时使用下方的最小 PNG 解码器（Playwright 截图均为 8-bit PNG）。
+    Image = None
+
+
+DEFAULT_BASELINE = os.path.join("tests", "artifacts", "capture_tactical_baseline_step0.png")
+
+# 窗口为归一化坐标 [x0, y0, x1, y1]，对应 CAPTURE_ALIGN_REDFLAG=wide 机位下的山脊带与平原带。
+# 机位或视口变化后需要用 --windows 重新指定。
+DEFAULT_WINDOWS: dict[str, list[float]] = {
+    "ridge": [0.38, 0.28, 0.68, 0.58],
+    "plain": [0.06, 0.68, 0.36, 0.94],
+}
+
+# TODO.md Step 1 放行条件：相对 baseline 的最小变化率。
+DEFAULT_THRESHOLDS: dict[str, float] = {
+    "ridge_edge_mean": -0.05,
+    "plain_edge_mean": -0.05,
+    "global_edge_mean": -0.05,
+    "global_luma_mean": -0.08,
+}
+
+# 仅在近似同尺度下比较（TODO.md：mpp in [175, 195]，tactical 档位）。
+DEFAULT_MPP_RANGE = (175.0, 195.0)
+
+SIDECAR_SUFFIX = ".meta.json"
+
+
+def _unfilter_scalar(kind: int, row: list[int], prev: list[int], channels: int) -> list[int]:
+    # Average/Paeth 依赖同一行左侧已解码字节，只能逐字节推进；用 Python int 列表避免逐像素的小数组开销。
+    cur = [0] * len(row)
+    for x, value in enumerate(row):
+        left = cur[x - channels] if x >= channels else 0
+        up = prev[x]
+        if kind == 3:
+            pred = (left + up) >> 1
+        else:
+            up_left = prev[x - channels] if x >= channels else 0
+            p = left + up - up_left
+            pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+            pred = left if pa <= pb and pa <= pc else (up if pb <= pc else up_left)
+        cur[x] = (value + pred) & 0xFF
+    return cur
+
+
+def _decode_png(path: str) -> np.ndarray:
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError(f"Not a PNG file: {path}")
+    offset = 8
+    idat = bytearray()
+    width = height = bit_depth = color_type = interlace = 0
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset:offset + 4])
+        chunk_type = data[offset + 4:offset + 8]
+        chunk = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+        if chunk_type == b"IHDR":
+            width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"IDAT":
+            idat.extend(chunk)
+        elif chunk_type == b"IEND":
+            break
+    channels = {0: 1, 2: 3, 4: 2, 6: 4}.get(color_type)
+    if bit_depth != 8 or channels is None or interlace != 0:
+        raise ValueError(
+            f"Unsupported PNG (bit_depth={bit_depth}, color_type={color_type}, interlace={interlace}); install Pillow."
+        )
+
+    stride = width * channels
+    raw = np.frombuffer(zlib.decompress(bytes(idat)), dtype=np.uint8).reshape(height, stride + 1)
+    filters = raw[:, 0]
+    rows = raw[:, 1:]
+    out = np.empty((height, stride), dtype=np.uint8)
+    prev = np.zeros(stride, dtype=np.uint8)
+    for y in range(height):
+        kind = int(filters[y])
+        row = rows[y]
+        if kind == 0:
+            cur = row
+        elif kind == 1:
+            # Sub 滤波等价于按通道的前缀和取模（uint8 累加自然回绕）。
+            cur = np.cumsum(row.reshape(width, channels), axis=0, dtype=np.uint8).reshape(stride)
+        elif kind == 2:
+            cur = row + prev
+        elif kind in (3, 4):
+            cur = np.array(_unfilter_scalar(kind, row.tolist(), prev.tolist(), channels), dtype=np.uint8)
+        else:
+            raise ValueError(f"Invalid PNG filter type {kind} in {path}")
+        out[y] = cur
+        prev = out[y]
+    return out.reshape(height, width, channels)
+
+
+def rgb_to_luma(pixels: np.ndarray) -> np.ndarray:
+    # 转换为 float32 亮度矩阵（0~255，Rec.601 权重）；忽略 alpha 通道。
+    pixels = pixels.astype(np.float32)
+    if pixels.shape[2] in (1, 2):
+        return pixels[:, :, 0]
+    return pixels[:, :, :3] @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def load_luma(path: str) -> np.ndarray:
+    if Image is not None:
+        with Image.open(path) as img:
+            return rgb_to_luma(np.asarray(img.convert("RGB")))
+    return rgb_to_luma(_decode_png(path))
+
+
+def frame_to_array(frame: dict[str, Any]) -> np.ndarray:
+    # harness.capture_frame 返回的原始 RGBA 字节 -> (height, width, 4) uint8，零拷贝视图。
+    return np.frombuffer(frame["data"], dtype=np.uint8).reshape(frame["height"], frame["width"], frame["channels"])
+
+
+def frame_to_luma(frame: dict[str, Any]) -> np.ndarray:
+    return rgb_to_luma(frame_to_array(frame))
+
+
+def sobel_magnitude(luma: np.ndarray) -> np.ndarray:
+    # 3x3 Sobel 梯度幅值：以切片平移实现卷积，边界按复制填充。
+    p = np.pad(luma, 1, mode="edge")
+    tl, tc, tr = p[:-2, :-2], p[:-2, 1:-1], p[:-2, 2:]
+    ml, mr = p[1:-1, :-2], p[1:-1, 2:]
+    bl, bc, br = p[2:, :-2], p[2:, 1:-1], p[2:, 2:]
+    gx = (tr + 2.0 * mr + br) - (tl + 2.0 * ml + bl)
+    gy = (bl + 2.0 * bc + br) - (tl + 2.0 * tc + tr)
+    return np.hypot(gx, gy)
+
+
+def crop_window(array: np.ndarray, window: list[float]) -> np.ndarray:
+    height, width = array.shape[:2]
+    x0, y0, x1, y1 = window
+    left, right = int(round(x0 * width)), int(round(x1 * width))
+    top, bottom = int(round(y0 * height)), int(round(y1 * height))
+    if right <= left or bottom <= top:
+        raise ValueError(f"Empty metric window: {window}")
+    return array[top:bottom, left:right]
+
+
+def compute_metrics(luma: np.ndarray, windows: dict[str, list[float]]) -> dict[str, float]:
+    edges = sobel_magnitude(luma)
+    return {
+        "global_luma_mean": float(luma.mean()),
+        "global_luma_std": float(luma.std()),
+        "global_edge_mean": float(edges.mean()),
+        "plain_edge_mean": float(crop_window(edges, windows["plain"]).mean()),
+        "ridge_edge_mean": float(crop_window(edges, windows["ridge"]).mean()),
+    }
+
+
+def relative_delta(current: dict[str, float], baseline: dict[str, float]) -> dict[str, float]:
+    return {
+        key: (current[key] - baseline[key]) / baseline[key] if baseline[key] else 0.0
+        for key in current
+    }
+
+
+def evaluate_gate(delta: dict[str, float], thresholds: dict[str, float]) -> list[str]:
+    return [
+        f"{key}={delta[key] * 100:+.2f}% < {minimum * 100:+.0f}%"
+        for key, minimum in thresholds.items()
+        if delta[key] < minimum
+    ]
+
+
+def load_sidecar(path: str) -> dict[str, Any] | None:
+    sidecar = path + SIDECAR_SUFFIX
+    if not os.path.isfile(sidecar):
+        return None
+    with open(sidecar, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_comparable(meta: dict[str, Any] | None, mpp_range: tuple[float, float]) -> list[str]:
+    # 有 capture 侧车元数据时校验比较前提：tactical 档位且 mpp 在同尺度区间内。
+    if not meta:
+        return []
+    issues: list[str] = []
+    state = meta.get("state") or {}
+    profile = state.get("profile")
+    mpp = state.get("metersPerPixel")
+    if profile is not None and profile != "tactical":
+        issues.append(f"profile={profile} (expected tactical)")
+    if mpp is not None and not (mpp_range[0] <= float(mpp) <= mpp_range[1]):
+        issues.append(f"mpp={float(mpp):.2f} outside [{mpp_range[0]}, {mpp_range[1]}]")
+    return issues
+
+
+def collect_images(paths: list[str], baseline: str) -> list[str]:
+    images: list[str] = []
+    baseline_abs = os.path.abspath(baseline)
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                # 目录扫描只收带 sidecar 的截图，跳过 diff 图等无 mpp/profile 元数据的 PNG。
+                candidate = os.path.join(path, name)
+                if name.lower().endswith(".png") and os.path.isfile(candidate + SIDECAR_SUFFIX):
+                    images.append(candidate)
+        else:
+            images.append(path)
+    return [image for image in images if os.path.abspath(image) != baseline_abs]
+
+
+def downsample_luma(luma: np.ndarray, factor: int) -> np.ndarray:
+    # 与页内 FrameCapture 相同的整数盒式降采样，使 baseline 与降采样帧在同一尺度上比较边缘强度。
+    if factor <= 1:
+        return luma
+    height, width = luma.shape[0] // factor, luma.shape[1] // factor
+    return luma[:height * factor, :width * factor].reshape(height, factor, width, factor).mean(axis=(1, 3))
+
+
+def evaluate_luma(
+    image: str,
+    luma: np.ndarray,
+    meta: dict[str, Any] | None,
+    baseline_metrics: dict[str, float],
+    windows: dict[str, list[float]],
+    thresholds: dict[str, float],
+    mpp_range: tuple[float, float],
+) -> dict[str, Any]:
+    metrics = compute_metrics(luma, windows)
+    delta = relative_delta(metrics, baseline_metrics)
+    comparability = check_comparable(meta, mpp_range)
+    errors = evaluate_gate(delta, thresholds)
+    return {
+        "image": image,
+        "metrics": metrics,
+        "baseline_metrics": baseline_metrics,
+        "delta": delta,
+        "comparability_issues": comparability,
+        "errors": errors,
+        "passed": not errors and not comparability,
+    }
+
+
+def run_metrics(
+    images: list[str],
+    baseline: str,
+    windows: dict[str, list[float]],
+    thresholds: dict[str, float],
+    mpp_range: tuple[float, float],
+) -> list[dict[str, Any]]:
+    baseline_metrics = compute_metrics(load_luma(baseline), windows)
+    return [
+        evaluate_luma(image, load_luma(image), load_sidecar(image), baseline_metrics, windows, thresholds, mpp_range)
+        for image in images
+    ]
+
+
+def print_results(results: list[dict[str, Any]]) -> None:
+    keys = ("ridge_edge_mean", "plain_edge_mean", "global_edge_mean", "global_luma_mean", "global_luma_std")
+    print("\n=== IMAGE METRICS (delta vs baseline) ===")
+    print(f"{'image':<44}" + "".join(f"{key:>18}" for key in keys) + f"{'gate':>8}")
+    for result in results:
+        name = os.path.basename(result["image"])
+        cells = "".join(f"{result['delta'][key] * 100:>+17.2f}%" for key in keys)
+        print(f"{name:<44}{cells}{'PASS' if result['passed'] else 'FAIL':>8}")
+        for issue in result["comparability_issues"]:
+            print(f"  not comparable: {issue}")
+        for error in result["errors"]:
+            print(f"  gate: {error}")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Tactical visual gate metrics (TODO.md Step 1).")
+    parser.add_argument("paths", nargs="*", default=[os.path.join("tests", "artifacts")],
+                        help="PNG files or directories to evaluate.")
+    parser.add_argument("--baseline", default=os.getenv("IMAGE_METRICS_BASELINE", DEFAULT_BASELINE))
+    parser.add_argument("--windows", default=os.getenv("IMAGE_METRICS_WINDOWS", ""),
+                        help="JSON file with normalized ridge/plain windows.")
+    parser.add_argument("--json", dest="json_out", default=os.getenv("IMAGE_METRICS_JSON", ""),
+                        help="Write results to this JSON file.")
+    return parser.parse_args(argv)
+
+
+def run(argv: list[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    windows = dict(DEFAULT_WINDOWS)
+    if args.windows:
+        with open(args.windows, "r", encoding="utf-8") as f:
+            windows.update(json.load(f))
+    if not os.path.isfile(args.baseline):
+        print(f"Baseline not found: {args.baseline}")
+        return 2
+    images = collect_images(args.paths, args.baseline)
+    if not images:
+        print(f"No PNG images found in {args.paths}")
+        return 2
+
+    results = run_metrics(images, args.baseline, windows, DEFAULT_THRESHOLDS, DEFAULT_MPP_RANGE)
+    print(f"Baseline: {args.baseline}")
+    print(f"Windows: {windows}")
+    print_results(results)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"baseline": args.baseline, "windows": windows, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"Metrics written: {args.json_out}")
+    failed = [result for result in results if not result["passed"]]
+    print(f"Images: {len(results)}, failed: {len(failed)}")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
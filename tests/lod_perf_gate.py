@@ -1,7 +1,10 @@
 import os
 import sys
 import time
-from playwright.sync_api import sync_playwright
+from typing import Any
+
+from camera_path_replay import load_camera_path, replay_camera_path
+from harness import WarmBrowserHarness, ensure_screenshot_path, parse_bool_env, wait_scene_settled
 
 
 def parse_float_env(name: str, default: float) -> float:
@@ -11,16 +14,199 @@ def parse_float_env(name: str, default: float) -> float:
     return float(raw)
 
 
-def ensure_screenshot_path(path: str, default_name: str) -> str:
-    resolved = path.strip() or os.path.join("tests", "artifacts", default_name)
-    screenshot_dir = os.path.dirname(resolved)
-    if screenshot_dir:
-        os.makedirs(screenshot_dir, exist_ok=True)
-    return resolved
+def parse_optional_float_env(name: str) -> float | None:
+    raw = os.getenv(name, "").strip()
+    return float(raw) if raw else None
+
 
+def run_perf_gate_scenario(
+    harness: WarmBrowserHarness,
+    screenshot: str,
+    min_avg_fps: float,
+    min_recent_fps: float,
+    max_avg_switch_cost_ms: float,
+    run_seconds: int,
+    *,
+    max_p95_frame_ms: float | None = None,
+    max_p99_frame_ms: float | None = None,
+    max_long_frames: float | None = None,
+    camera_path_file: str = "",
+    hud_sweep: bool = False,
+    max_hud_picks_per_frame: float | None = None,
+    max_p95_time_to_loaded_ms: float | None = None,
+    settle_timeout_seconds: float = 20.0,
+    max_frame_ms: float | None = None,
+    max_timed_out_episodes: float | None = None,
+) -> dict[str, Any]:
+    page = harness.page
+    width, height = harness.viewport
 
-def run() -> int:
-    app_url = os.getenv("E3_APP_URL", "http://localhost:5173").strip()
+    print(f"Running workload for {run_seconds}s ...")
+    end_time = time.time() + run_seconds
+    replay_reports: list[dict[str, Any]] = []
+    if camera_path_file:
+        # 使用录制的相机路径作为负载，循环回放直到时长用尽，各次运行经过的帧序列一致。
+        camera_path = load_camera_path(camera_path_file)
+        while time.time() < end_time:
+            replay_reports.append(replay_camera_path(harness, camera_path, 60.0))
+        print(f"Camera path replays: {len(replay_reports)} x {camera_path['name']}")
+    zoom_in = True
+    while not camera_path_file and time.time() < end_time:
+        page.evaluate(
+            """(flag) => {
+                const h = window.viewer.camera.positionCartographic.height;
+                const amount = Math.max(100000.0, h * 0.4);
+                if (flag) {
+                    window.viewer.camera.zoomIn(amount);
+                } else {
+                    window.viewer.camera.zoomOut(amount);
+                }
+            }""",
+            zoom_in,
+        )
+        zoom_in = not zoom_in
+        if hud_sweep:
+            # 光标对角扫过视口，压测 HUD 拾取管线（Playwright 每步派发一次 mousemove）。
+            page.mouse.move(width * 0.1, height * 0.1)
+            page.mouse.move(width * 0.9, height * 0.9, steps=40)
+        # 负载循环以切档稳定为节拍，不等待瓦片，保持对加载路径的压力。
+        wait_scene_settled(page, tiles_loaded=False, frames=1, timeout_seconds=3.0)
+
+    if max_p95_time_to_loaded_ms is not None:
+        # 负载结束后等瓦片加载完成，让最后一次相机移动/切档的 time-to-loaded 结算进样本。
+        wait_scene_settled(page, tiles_loaded=True, frames=2, timeout_seconds=settle_timeout_seconds)
+    perf = page.evaluate("window.getRenderPerfStats ? window.getRenderPerfStats() : null")
+    frame_stats = page.evaluate("window.getFrameTimeStats ? window.getFrameTimeStats() : null")
+    hud_stats = page.evaluate("window.getHudPipelineStats ? window.getHudPipelineStats() : null")
+    tile_stats = page.evaluate("window.getTilePipelineStats ? window.getTilePipelineStats() : null")
+    lod_stats = page.evaluate("window.getLodRuntimeStats ? window.getLodRuntimeStats() : null")
+    lod_state = page.evaluate("window.getLodState ? window.getLodState() : null")
+    mode = page.evaluate("window.getTerrainRuntimeMode ? window.getTerrainRuntimeMode() : null")
+
+    text = "\n".join(harness.logs)
+    wasm_oom_hits = text.count("WebAssembly.instantiate") + text.count("WASM OOM")
+    unhandled_hits = text.lower().count("unhandledrejection")
+
+    print("\n=== PERF GATE REPORT ===")
+    print(f"Mode: {mode}")
+    print(f"LOD State: {lod_state}")
+    print(f"Perf: {perf}")
+    if frame_stats:
+        print(
+            f"Frame Time: p50={frame_stats['p50Ms']:.2f}ms p95={frame_stats['p95Ms']:.2f}ms "
+            f"p99={frame_stats['p99Ms']:.2f}ms max={frame_stats['maxMs']:.2f}ms "
+            f"long(>{frame_stats['budgetMs']}ms)={frame_stats['longFrameCount']}/{frame_stats['sampleCount']}"
+        )
+        print(f"Frame Histogram: {frame_stats['histogram']}")
+    if hud_stats:
+        print(
+            f"HUD Pipeline: events={hud_stats['mouseMoveEvents']} frames={hud_stats['processedFrames']} "
+            f"picks/frame={hud_stats['picksPerFrame']:.2f} avgPick={hud_stats['avgPickMs']:.3f}ms "
+            f"maxPick={hud_stats['maxPickMs']:.2f}ms analyticMpp={hud_stats['analyticMppCount']} "
+            f"pickMpp={hud_stats['pickMppCount']}"
+        )
+    if tile_stats:
+        tiles = tile_stats["tiles"]
+        loaded = tile_stats["timeToLoaded"]
+        network = tile_stats["network"]
+        print(
+            f"Tile Pipeline: requested={tiles['requested']} throttled={tiles['throttled']} "
+            f"failed={tiles['failed']} decoded={tiles['decoded']} "
+            f"queueMax={tile_stats['queue']['max']} queueMean={tile_stats['queue']['timeWeightedMean']:.1f} "
+            f"netRequests={network['requests']} netBytes={network['bytes']}"
+        )
+        # fetch 偏高看服务端/网络，wait 偏高看主循环，decode 偏高看 Worker 解码。
+        for stage in ("fetch", "wait", "decode", "total"):
+            summary = tiles[stage]
+            print(
+                f"  tile {stage}: n={summary['count']} p50={summary['p50Ms']:.1f}ms "
+                f"p95={summary['p95Ms']:.1f}ms max={summary['maxMs']:.1f}ms"
+            )
+        print(
+            f"Time To Loaded: settled={loaded['settled']} timedOut={loaded['timedOut']} "
+            f"superseded={loaded['superseded']} pending={loaded['pending']} "
+            f"p50={loaded['p50Ms']:.1f}ms p95={loaded['p95Ms']:.1f}ms max={loaded['maxMs']:.1f}ms"
+        )
+    print(f"LOD Stats: {lod_stats}")
+    print(f"WASM_OOM_HITS: {wasm_oom_hits}")
+    print(f"UNHANDLED_REJECTION_HITS: {unhandled_hits}")
+
+    errors: list[str] = []
+    if not perf:
+        errors.append("Render perf API unavailable")
+    else:
+        if float(perf["averageFps"]) < min_avg_fps:
+            errors.append(f"averageFps<{min_avg_fps}")
+        if float(perf["recentFps"]) < min_recent_fps:
+            errors.append(f"recentFps<{min_recent_fps}")
+    frame_gates = (max_p95_frame_ms, max_p99_frame_ms, max_long_frames, max_frame_ms)
+    if any(gate is not None for gate in frame_gates):
+        if not frame_stats:
+            errors.append("Frame time API unavailable")
+        else:
+            if max_p95_frame_ms is not None and float(frame_stats["p95Ms"]) > max_p95_frame_ms:
+                errors.append(f"p95FrameMs>{max_p95_frame_ms}")
+            if max_p99_frame_ms is not None and float(frame_stats["p99Ms"]) > max_p99_frame_ms:
+                errors.append(f"p99FrameMs>{max_p99_frame_ms}")
+            if max_long_frames is not None and int(frame_stats["longFrameCount"]) > max_long_frames:
+                errors.append(f"longFrameCount>{int(max_long_frames)}")
+            # 单次长时间停顿在分位数里会被稀释，单独用最大帧间隔兜底。
+            if max_frame_ms is not None and float(frame_stats["maxMs"]) > max_frame_ms:
+                errors.append(f"maxFrameMs>{max_frame_ms}")
+    if max_hud_picks_per_frame is not None:
+        if not hud_stats:
+            errors.append("HUD pipeline API unavailable")
+        elif float(hud_stats["picksPerFrame"]) > max_hud_picks_per_frame:
+            errors.append(f"hudPicksPerFrame>{max_hud_picks_per_frame}")
+    if max_p95_time_to_loaded_ms is not None:
+        # 超时记录已按 settleTimeoutMs 截尾计入 p95；启用 p95 门限时超时次数默认不允许超过 0。
+        timed_out_limit = 0 if max_timed_out_episodes is None else int(max_timed_out_episodes)
+        if not tile_stats:
+            errors.append("Tile pipeline API unavailable")
+        else:
+            loaded = tile_stats["timeToLoaded"]
+            if int(loaded["settled"]) + int(loaded["timedOut"]) == 0:
+                errors.append("No time-to-loaded samples")
+            elif float(loaded["p95Ms"]) > max_p95_time_to_loaded_ms:
+                errors.append(f"p95TimeToLoadedMs>{max_p95_time_to_loaded_ms}")
+            if int(loaded["timedOut"]) > timed_out_limit:
+                errors.append(f"timedOutEpisodes>{timed_out_limit}")
+    if not lod_stats:
+        errors.append("LOD stats API unavailable")
+    else:
+        if float(lod_stats["averageSwitchDurationMs"]) > max_avg_switch_cost_ms:
+            errors.append(f"averageSwitchDurationMs>{max_avg_switch_cost_ms}")
+    if wasm_oom_hits > 0:
+        errors.append("WASM OOM detected")
+    if unhandled_hits > 0:
+        errors.append("Unhandled rejection detected")
+
+    page.screenshot(path=screenshot)
+    print(f"Screenshot: {screenshot}")
+
+    if errors:
+        print(f"PERF GATE FAILED: {errors}")
+    else:
+        print("PERF GATE PASSED")
+    return {
+        "rc": 1 if errors else 0,
+        "passed": not errors,
+        "errors": errors,
+        "mode": mode,
+        "state": lod_state,
+        "perf": perf,
+        "frame_stats": frame_stats,
+        "hud_stats": hud_stats,
+        "tile_stats": tile_stats,
+        "camera_path_replays": replay_reports,
+        "lod_stats": lod_stats,
+        "wasm_oom_hits": wasm_oom_hits,
+        "unhandled_hits": unhandled_hits,
+        "screenshot": screenshot,
+    }
+
+
+def perf_gate_scenario_from_env() -> tuple[str, Any]:
     screenshot = ensure_screenshot_path(
         os.getenv("PERF_GATE_SCREENSHOT", "").strip(),
         "lod_perf_gate.png",
@@ -29,84 +215,44 @@ def run() -> int:
     min_recent_fps = parse_float_env("MIN_RECENT_FPS", 12.0)
     max_avg_switch_cost_ms = parse_float_env("MAX_AVG_SWITCH_COST_MS", 30.0)
     run_seconds = int(parse_float_env("PERF_DURATION_SECONDS", 90.0))
+    # 帧时门限默认关闭，按需设置 MAX_P95_FRAME_MS / MAX_P99_FRAME_MS / MAX_LONG_FRAMES / MAX_FRAME_MS。
+    max_p95_frame_ms = parse_optional_float_env("MAX_P95_FRAME_MS")
+    max_p99_frame_ms = parse_optional_float_env("MAX_P99_FRAME_MS")
+    max_long_frames = parse_optional_float_env("MAX_LONG_FRAMES")
+    max_frame_ms = parse_optional_float_env("MAX_FRAME_MS")
+    camera_path_file = os.getenv("PERF_CAMERA_PATH", "").strip()
+    hud_sweep = parse_bool_env("PERF_HUD_SWEEP", "false")
+    max_hud_picks_per_frame = parse_optional_float_env("MAX_HUD_PICKS_PER_FRAME")
+    # 相机移动/切档后到 tilesLoaded 的 p95 门限，默认关闭。
+    max_p95_time_to_loaded_ms = parse_optional_float_env("MAX_P95_TIME_TO_LOADED_MS")
+    # 允许的 time-to-loaded 超时次数；未设置时随 p95 门限启用，默认 0。
+    max_timed_out_episodes = parse_optional_float_env("MAX_TIMED_OUT_EPISODES")
+    settle_timeout_seconds = parse_float_env("PERF_SETTLE_TIMEOUT_SECONDS", 20.0)
+    return "perf_gate", lambda harness: run_perf_gate_scenario(
+        harness,
+        screenshot,
+        min_avg_fps,
+        min_recent_fps,
+        max_avg_switch_cost_ms,
+        run_seconds,
+        max_p95_frame_ms=max_p95_frame_ms,
+        max_p99_frame_ms=max_p99_frame_ms,
+        max_long_frames=max_long_frames,
+        camera_path_file=camera_path_file,
+        hud_sweep=hud_sweep,
+        max_hud_picks_per_frame=max_hud_picks_per_frame,
+        max_p95_time_to_loaded_ms=max_p95_time_to_loaded_ms,
+        settle_timeout_seconds=settle_timeout_seconds,
+        max_frame_ms=max_frame_ms,
+        max_timed_out_episodes=max_timed_out_episodes,
+    )
 
-    with sync_playwright() as p:
-        print("Launching browser...")
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page(viewport={"width": 1440, "height": 900})
-        logs: list[str] = []
-        page.on("console", lambda msg: logs.append(msg.text))
-        page.on("pageerror", lambda err: logs.append(f"PAGEERROR: {err}"))
-
-        print(f"Navigating to {app_url} ...")
-        page.goto(app_url, timeout=30000)
-        page.wait_for_selector(".cesium-viewer", timeout=30000)
-        time.sleep(2.0)
-
-        print(f"Running workload for {run_seconds}s ...")
-        end_time = time.time() + run_seconds
-        zoom_in = True
-        while time.time() < end_time:
-            page.evaluate(
-                """(flag) => {
-                    const h = window.viewer.camera.positionCartographic.height;
-                    const amount = Math.max(100000.0, h * 0.4);
-                    if (flag) {
-                        window.viewer.camera.zoomIn(amount);
-                    } else {
-                        window.viewer.camera.zoomOut(amount);
-                    }
-                }""",
-                zoom_in,
-            )
-            zoom_in = not zoom_in
-            time.sleep(0.3)
-
-        perf = page.evaluate("window.getRenderPerfStats ? window.getRenderPerfStats() : null")
-        lod_stats = page.evaluate("window.getLodRuntimeStats ? window.getLodRuntimeStats() : null")
-        lod_state = page.evaluate("window.getLodState ? window.getLodState() : null")
-        mode = page.evaluate("window.getTerrainRuntimeMode ? window.getTerrainRuntimeMode() : null")
-
-        text = "\n".join(logs)
-        wasm_oom_hits = text.count("WebAssembly.instantiate") + text.count("WASM OOM")
-        unhandled_hits = text.lower().count("unhandledrejection")
-
-        print("\n=== PERF GATE REPORT ===")
-        print(f"Mode: {mode}")
-        print(f"LOD State: {lod_state}")
-        print(f"Perf: {perf}")
-        print(f"LOD Stats: {lod_stats}")
-        print(f"WASM_OOM_HITS: {wasm_oom_hits}")
-        print(f"UNHANDLED_REJECTION_HITS: {unhandled_hits}")
-
-        errors: list[str] = []
-        if not perf:
-            errors.append("Render perf API unavailable")
-        else:
-            if float(perf["averageFps"]) < min_avg_fps:
-                errors.append(f"averageFps<{min_avg_fps}")
-            if float(perf["recentFps"]) < min_recent_fps:
-                errors.append(f"recentFps<{min_recent_fps}")
-        if not lod_stats:
-            errors.append("LOD stats API unavailable")
-        else:
-            if float(lod_stats["averageSwitchDurationMs"]) > max_avg_switch_cost_ms:
-                errors.append(f"averageSwitchDurationMs>{max_avg_switch_cost_ms}")
-        if wasm_oom_hits > 0:
-            errors.append("WASM OOM detected")
-        if unhandled_hits > 0:
-            errors.append("Unhandled rejection detected")
-
-        page.screenshot(path=screenshot)
-        print(f"Screenshot: {screenshot}")
-
-        browser.close()
 
-        if errors:
-            print(f"PERF GATE FAILED: {errors}")
-            return 1
-        print("PERF GATE PASSED")
-        return 0
+def run() -> int:
+    name, scenario = perf_gate_scenario_from_env()
+    with WarmBrowserHarness() as harness:
+        result = harness.run_scenarios([(name, scenario)])[0]
+    return int(result["rc"])
 
 
 if __name__ == "__main__":
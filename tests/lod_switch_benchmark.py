@@ -1,49 +1,155 @@
 import sys
-import time
 import os
 import re
-from playwright.sync_api import sync_playwright
-
-
-def get_lod_state(page):
-    return page.evaluate("window.getLodState ? window.getLodState() : null")
-
+from typing import Any
+
+from harness import (
+    WarmBrowserHarness,
+    drive_mpp_towards,
+    ensure_screenshot_path,
+    get_lod_state,
+    wait_scene_settled,
+)
+
+
+def summarize_switch_trace(trace: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    # 按 from->to 聚合：各阶段平均耗时、同步总耗时与切档后到 tilesLoaded 的帧数/时长。
+    grouped: dict[str, list[dict[str, Any]]] = {}
+    for entry in trace:
+        grouped.setdefault(f"{entry['from']}->{entry['to']}", []).append(entry)
+
+    summary: dict[str, dict[str, Any]] = {}
+    for transition, entries in grouped.items():
+        phase_totals: dict[str, float] = {}
+        for entry in entries:
+            for phase in entry["phases"]:
+                phase_totals[phase["name"]] = phase_totals.get(phase["name"], 0.0) + float(phase["durationMs"])
+        settled = [entry for entry in entries if entry["settleState"] == "tilesLoaded"]
+        summary[transition] = {
+            "count": len(entries),
+            "avg_total_ms": sum(float(entry["totalMs"]) for entry in entries) / len(entries),
+            "avg_phase_ms": {name: total / len(entries) for name, total in phase_totals.items()},
+            "settled_count": len(settled),
+            "avg_frames_until_tiles_loaded": (
+                sum(int(entry["framesUntilTilesLoaded"]) for entry in settled) / len(settled) if settled else None
+            ),
+            "avg_ms_until_tiles_loaded": (
+                sum(float(entry["msUntilTilesLoaded"]) for entry in settled) / len(settled) if settled else None
+            ),
+        }
+    return summary
+
+
+def print_switch_trace_summary(summary: dict[str, dict[str, Any]]) -> None:
+    print("\n=== LOD SWITCH PHASE BREAKDOWN ===")
+    if not summary:
+        print("No traced switches.")
+        return
+    for transition, item in summary.items():
+        phases = ", ".join(f"{name}={ms:.2f}" for name, ms in item["avg_phase_ms"].items())
+        frames = item["avg_frames_until_tiles_loaded"]
+        settle_ms = item["avg_ms_until_tiles_loaded"]
+        print(
+            f"{transition}: n={item['count']} total={item['avg_total_ms']:.2f}ms [{phases}] "
+            f"tilesLoaded={item['settled_count']}/{item['count']} "
+            f"frames={f'{frames:.1f}' if frames is not None else '-'} "
+            f"settle={f'{settle_ms:.0f}ms' if settle_ms is not None else '-'}"
+        )
 
-def ensure_screenshot_path(path: str, default_name: str) -> str:
-    resolved = path.strip() or os.path.join("tests", "artifacts", default_name)
-    screenshot_dir = os.path.dirname(resolved)
-    if screenshot_dir:
-        os.makedirs(screenshot_dir, exist_ok=True)
-    return resolved
 
+def run_benchmark_scenario(
+    harness: WarmBrowserHarness,
+    screenshot_path: str,
+    min_switch_count: int,
+    required_profiles: list[str],
+) -> dict[str, Any]:
+    page = harness.page
+
+    # 按目标 mpp 驱动相机，确保跨越阈值并触发切档。
+    checkpoints = [
+        ("out", 22000.0),
+        ("in", 9000.0),
+        ("in", 5200.0),
+        ("in", 3200.0),
+        ("in", 1600.0),
+        ("in", 600.0),
+        ("in", 180.0),
+        ("out", 7000.0),
+        ("out", 18000.0),
+    ]
 
-def drive_mpp_towards(page, target_mpp: float, direction: str) -> None:
-    for _ in range(36):
+    print("Running LOD switch benchmark path...")
+    for direction, target_mpp in checkpoints:
+        drive_mpp_towards(page, target_mpp, direction)
+        wait_scene_settled(page, timeout_seconds=6.0)
         state = get_lod_state(page)
-        if not state:
-            return
-        mpp = float(state["metersPerPixel"])
-        if direction == "in" and mpp <= target_mpp:
-            return
-        if direction == "out" and mpp >= target_mpp:
-            return
-        page.evaluate(
-            """(dir) => {
-                const h = window.viewer.camera.positionCartographic.height;
-                const amount = Math.max(120000.0, h * 0.42);
-                if (dir === 'in') {
-                    window.viewer.camera.zoomIn(amount);
-                } else {
-                    window.viewer.camera.zoomOut(amount);
-                }
-            }""",
-            direction,
+        if state:
+            print(
+                f"Checkpoint dir={direction} target_mpp={target_mpp:.2f} "
+                f"reached_mpp={float(state['metersPerPixel']):.2f} profile={state['profile']}"
+            )
+
+    stats = page.evaluate("window.getLodRuntimeStats ? window.getLodRuntimeStats() : null")
+    state = get_lod_state(page)
+    mode = page.evaluate("window.getTerrainRuntimeMode ? window.getTerrainRuntimeMode() : null")
+    trace = page.evaluate("window.getLodSwitchTrace ? window.getLodSwitchTrace() : []")
+
+    print("\n=== LOD BENCHMARK REPORT ===")
+    if not stats or not state:
+        print("LOD runtime APIs are unavailable.")
+        return {"rc": 2}
+
+    print(f"Current Profile: {state['profile']}")
+    print(f"Current MPP: {state['metersPerPixel']:.2f}")
+    print(f"Runtime Mode: {mode}")
+    print(f"Switch Count: {stats['switchCount']}")
+    print(f"Last Switch Cost: {stats['lastSwitchDurationMs']:.2f} ms")
+    print(f"Average Switch Cost: {stats['averageSwitchDurationMs']:.2f} ms")
+    print(f"Last Switch At(EpochMs): {stats.get('lastSwitchAtEpochMs')}")
+
+    switch_profiles: list[str] = []
+    pattern = re.compile(r"LOD profile switched to ([a-zA-Z]+)")
+    for line in harness.logs:
+        match = pattern.search(line)
+        if match:
+            switch_profiles.append(match.group(1).lower())
+    print(f"Switch Sequence: {switch_profiles}")
+    trace_summary = summarize_switch_trace(trace or [])
+    print_switch_trace_summary(trace_summary)
+
+    result: dict[str, Any] = {
+        "rc": 0,
+        "mode": mode,
+        "state": state,
+        "stats": stats,
+        "switch_count": int(stats["switchCount"]),
+        "switch_sequence": switch_profiles,
+        "switch_trace": trace,
+        "switch_trace_summary": trace_summary,
+    }
+    missing_profiles = [
+        profile for profile in required_profiles
+        if profile not in switch_profiles and state["profile"] != profile
+    ]
+    if result["switch_count"] < min_switch_count:
+        print(
+            f"ERROR: switchCount too low. required>={min_switch_count}, actual={result['switch_count']}"
         )
-        time.sleep(0.35)
+        result["rc"] = 3
+        return result
+    if missing_profiles:
+        print(f"ERROR: required profiles not reached: {missing_profiles}")
+        result["rc"] = 4
+        result["missing_profiles"] = missing_profiles
+        return result
 
+    page.screenshot(path=screenshot_path)
+    print(f"Screenshot saved to {screenshot_path}")
+    result["screenshot"] = screenshot_path
+    return result
 
-def run() -> int:
-    app_url = os.getenv("E3_APP_URL", "http://localhost:5173").strip()
+
+def benchmark_scenario_from_env() -> tuple[str, Any]:
     screenshot_path = ensure_screenshot_path(
         os.getenv("LOD_BENCH_SCREENSHOT", "").strip(),
         "lod_switch_benchmark.png",
@@ -57,97 +163,20 @@ def run() -> int:
         for item in required_profiles_raw.split(",")
         if item.strip()
     ]
+    return "benchmark", lambda harness: run_benchmark_scenario(
+        harness, screenshot_path, min_switch_count, required_profiles
+    )
 
-    with sync_playwright() as p:
-        print("Launching browser...")
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page(viewport={"width": 1440, "height": 900})
-        logs: list[str] = []
-        page.on("console", lambda msg: logs.append(msg.text))
-
-        print(f"Navigating to {app_url} ...")
-        try:
-            page.goto(app_url, timeout=30000)
-            page.wait_for_selector(".cesium-viewer", timeout=30000)
-        except Exception as exc:
-            print(f"Failed to open app: {exc}")
-            browser.close()
-            return 1
-
-        # 等待初始地形与 LOD 逻辑稳定
-        time.sleep(2.0)
-
-        # 按目标 mpp 驱动相机，确保跨越阈值并触发切档。
-        checkpoints = [
-            ("out", 22000.0),
-            ("in", 9000.0),
-            ("in", 5200.0),
-            ("in", 3200.0),
-            ("in", 1600.0),
-            ("in", 600.0),
-            ("in", 180.0),
-            ("out", 7000.0),
-            ("out", 18000.0),
-        ]
-
-        print("Running LOD switch benchmark path...")
-        for direction, target_mpp in checkpoints:
-            drive_mpp_towards(page, target_mpp, direction)
-            time.sleep(0.9)
-            state = get_lod_state(page)
-            if state:
-                print(
-                    f"Checkpoint dir={direction} target_mpp={target_mpp:.2f} "
-                    f"reached_mpp={float(state['metersPerPixel']):.2f} profile={state['profile']}"
-                )
-
-        stats = page.evaluate("window.getLodRuntimeStats ? window.getLodRuntimeStats() : null")
-        state = page.evaluate("window.getLodState ? window.getLodState() : null")
-        mode = page.evaluate("window.getTerrainRuntimeMode ? window.getTerrainRuntimeMode() : null")
-
-        print("\n=== LOD BENCHMARK REPORT ===")
-        if not stats or not state:
-            print("LOD runtime APIs are unavailable.")
-            browser.close()
-            return 2
-
-        print(f"Current Profile: {state['profile']}")
-        print(f"Current MPP: {state['metersPerPixel']:.2f}")
-        print(f"Runtime Mode: {mode}")
-        print(f"Switch Count: {stats['switchCount']}")
-        print(f"Last Switch Cost: {stats['lastSwitchDurationMs']:.2f} ms")
-        print(f"Average Switch Cost: {stats['averageSwitchDurationMs']:.2f} ms")
-        print(f"Last Switch At(EpochMs): {stats.get('lastSwitchAtEpochMs')}")
-
-        switch_profiles: list[str] = []
-        pattern = re.compile(r"LOD profile switched to ([a-zA-Z]+)")
-        for line in logs:
-            match = pattern.search(line)
-            if match:
-                switch_profiles.append(match.group(1).lower())
-        print(f"Switch Sequence: {switch_profiles}")
-
-        actual_switch_count = int(stats["switchCount"])
-        missing_profiles = [
-            profile for profile in required_profiles
-            if profile not in switch_profiles and state["profile"] != profile
-        ]
-        if actual_switch_count < min_switch_count:
-            print(
-                f"ERROR: switchCount too low. required>={min_switch_count}, actual={actual_switch_count}"
-            )
-            browser.close()
-            return 3
-        if missing_profiles:
-            print(f"ERROR: required profiles not reached: {missing_profiles}")
-            browser.close()
-            return 4
-
-        page.screenshot(path=screenshot_path)
-        print(f"Screenshot saved to {screenshot_path}")
-
-        browser.close()
-        return 0
+
+def run() -> int:
+    name, scenario = benchmark_scenario_from_env()
+    try:
+        with WarmBrowserHarness() as harness:
+            result = harness.run_scenarios([(name, scenario)])[0]
+    except Exception as exc:
+        print(f"Failed to open app: {exc}")
+        return 1
+    return int(result["rc"])
 
 
 if __name__ == "__main__":
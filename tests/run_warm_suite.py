@@ -0,0 +1,55 @@
+import json
+import os
+import sys
+
+from camera_path_replay import camera_path_scenario_from_env
+from capture_tactical_view import capture_scenario_from_env
+from harness import WarmBrowserHarness
+from lod_perf_gate import perf_gate_scenario_from_env
+from lod_switch_benchmark import benchmark_scenario_from_env
+from scenario_stream_gate import scenario_stream_scenario_from_env
+from sonar_batch_benchmark import sonar_benchmark_scenario_from_env
+from visual_verification import diagnostics_scenario_from_env
+
+
+SCENARIO_FACTORIES = {
+    "benchmark": benchmark_scenario_from_env,
+    "perf_gate": perf_gate_scenario_from_env,
+    "capture": capture_scenario_from_env,
+    "diagnostics": diagnostics_scenario_from_env,
+    "camera_path": camera_path_scenario_from_env,
+    "sonar_benchmark": sonar_benchmark_scenario_from_env,
+    "scenario_stream": scenario_stream_scenario_from_env,
+}
+
+
+def run() -> int:
+    # 用法：python tests/run_warm_suite.py benchmark perf_gate capture
+    # 未指定时按 WARM_SUITE_SCENARIOS（逗号分隔）执行，默认 benchmark,perf_gate,capture。
+    names = sys.argv[1:] or [
+        item.strip()
+        for item in os.getenv("WARM_SUITE_SCENARIOS", "benchmark,perf_gate,capture").split(",")
+        if item.strip()
+    ]
+    unknown = [name for name in names if name not in SCENARIO_FACTORIES]
+    if unknown:
+        print(f"Unknown scenarios: {unknown}. Available: {sorted(SCENARIO_FACTORIES)}")
+        return 2
+
+    scenarios = [SCENARIO_FACTORIES[name]() for name in names]
+    with WarmBrowserHarness() as harness:
+        results = harness.run_scenarios(scenarios)
+
+    print("\n=== WARM SUITE SUMMARY ===")
+    for result in results:
+        print(f"{result['scenario']}: rc={result['rc']} elapsed={result['elapsed_seconds']}s")
+    summary_path = os.getenv("WARM_SUITE_SUMMARY", "").strip()
+    if summary_path:
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+        print(f"Summary written: {summary_path}")
+    return 0 if all(result["rc"] == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,208 @@
+import os
+import sys
+import time
+from typing import Any
+
+from harness import WarmBrowserHarness, parse_bool_env
+from lod_perf_gate import parse_float_env, parse_optional_float_env
+
+# 在页内生成合成想定（与 tools/scenario_pack.py --synthetic 同分布），以 Blob 交给流式加载器，
+# 不经过 page.evaluate 传输大块数据，也不在工作区落盘。
+BUILD_BLOB_SCRIPT = """(opts) => {
+    const colors = ['#4be6ff', '#52f5d2', '#ff57b0', '#ffcf66', '#ff5f5f', '#8affc9'];
+    const [west, south, east, north] = [-118.95, 36.15, -117.55, 36.92];
+    let seed = 7;
+    const random = () => {
+        seed = (seed * 1664525 + 1013904223) >>> 0;
+        return seed / 4294967296;
+    };
+    const units = [];
+    for (let i = 0; i < opts.count; i += 1) {
+        const airborne = i % 10 === 0;
+        units.push({
+            id: 'U' + String(i).padStart(6, '0'),
+            lon: west + random() * (east - west),
+            lat: south + random() * (north - south),
+            height: airborne ? 4000 + random() * 5000 : 0,
+            color: colors[i % colors.length],
+            size: airborne ? 12 : 8,
+            ground: !airborne,
+            label: i % 50 === 0 ? 'U' + String(i).padStart(6, '0') : ''
+        });
+    }
+    let blob;
+    if (opts.format === 'binary') {
+        const encoder = new TextEncoder();
+        const parts = [];
+        const header = new DataView(new ArrayBuffer(16));
+        'E3SU'.split('').forEach((c, i) => header.setUint8(i, c.charCodeAt(0)));
+        header.setUint16(4, 1, true);
+        header.setUint32(8, units.length, true);
+        parts.push(header.buffer);
+        for (const unit of units) {
+            const id = encoder.encode(unit.id);
+            const label = encoder.encode(unit.label);
+            const record = new DataView(new ArrayBuffer(30 + id.length + label.length));
+            record.setFloat64(0, unit.lon, true);
+            record.setFloat64(8, unit.lat, true);
+            record.setFloat32(16, unit.height, true);
+            record.setUint32(20, (parseInt(unit.color.slice(1), 16) * 256 + 255) >>> 0, true);
+            record.setUint8(24, unit.size);
+            record.setUint8(25, unit.ground ? 1 : 0);
+            record.setUint16(26, id.length, true);
+            record.setUint16(28, label.length, true);
+            new Uint8Array(record.buffer).set(id, 30);
+            new Uint8Array(record.buffer).set(label, 30 + id.length);
+            parts.push(record.buffer);
+        }
+        blob = new Blob(parts);
+    } else {
+        const lines = [JSON.stringify({ type: 'header', units: units.length })];
+        for (const unit of units) {
+            lines.push(JSON.stringify(unit));
+        }
+        blob = new Blob([lines.join('\\n') + '\\n']);
+    }
+    window.__scenarioStreamBlob = blob;
+    return blob.size;
+}"""
+
+# 生成数据本身会阻塞主线程，先清零帧时统计再开始加载，只度量加载过程。
+START_LOAD_SCRIPT = """() => {
+    const blob = window.__scenarioStreamBlob;
+    window.__scenarioStreamBlob = undefined;
+    window.__scenarioStreamResult = null;
+    window.resetRuntimeStats();
+    window.loadScenarioStream(blob).then((result) => { window.__scenarioStreamResult = result; });
+}"""
+
+
+def run_scenario_stream_scenario(
+    harness: WarmBrowserHarness,
+    unit_count: int,
+    data_format: str,
+    timeout_seconds: float,
+    hud_sweep: bool,
+    max_p99_frame_ms: float | None,
+    max_late_p99_frame_ms: float | None,
+    max_slice_ms: float | None,
+    min_units_per_second: float | None,
+) -> dict[str, Any]:
+    page = harness.page
+    width, height = harness.viewport
+    page.evaluate("window.resetHarnessState()")
+    size_bytes = page.evaluate(BUILD_BLOB_SCRIPT, {"count": unit_count, "format": data_format})
+    print(f"Streaming {unit_count} units ({data_format}, {size_bytes / 1024.0 / 1024.0:.1f} MB) ...")
+    page.evaluate(START_LOAD_SCRIPT)
+
+    samples: list[dict[str, Any]] = []
+    deadline = time.time() + timeout_seconds
+    result = None
+    while time.time() < deadline:
+        if hud_sweep:
+            # 加载期间光标持续扫过视口，验证 HUD 拾取不被写入批次阻塞。
+            page.mouse.move(width * 0.2, height * 0.2)
+            page.mouse.move(width * 0.8, height * 0.8, steps=10)
+        progress = page.evaluate("window.getScenarioLoadProgress()")
+        samples.append(progress)
+        result = page.evaluate("window.__scenarioStreamResult")
+        if result:
+            break
+        page.wait_for_timeout(200)
+    if not result:
+        page.evaluate("window.cancelScenarioLoad()")
+        result = page.evaluate("window.getScenarioLoadProgress()")
+
+    frame_stats = page.evaluate("window.getFrameTimeStats ? window.getFrameTimeStats() : null")
+    hud_stats = page.evaluate("window.getHudPipelineStats ? window.getHudPipelineStats() : null")
+
+    print("\n=== SCENARIO STREAM REPORT ===")
+    print(
+        f"State: {result['state']} mode={result['mode']} applied={result['unitsApplied']}/{unit_count} "
+        f"rejected={result['rejected']} bytes={result['bytesRead']}"
+    )
+    print(
+        f"Throughput: {result['unitsPerSecond']:.0f} units/s elapsed={result['elapsedMs']:.0f}ms "
+        f"parse={result['parseMs']:.0f}ms slices={result['slices']} "
+        f"avgSlice={result['avgSliceMs']:.2f}ms maxSlice={result['maxSliceMs']:.2f}ms"
+    )
+    if frame_stats:
+        print(
+            f"Frame Time: p50={frame_stats['p50Ms']:.2f}ms p95={frame_stats['p95Ms']:.2f}ms "
+            f"p99={frame_stats['p99Ms']:.2f}ms max={frame_stats['maxMs']:.2f}ms "
+            f"long(>{frame_stats['budgetMs']}ms)={frame_stats['longFrameCount']}/{frame_stats['sampleCount']}"
+        )
+    print(f"Late-load Frame Time: p99={result['lateFrameP99Ms']:.2f}ms (last 25% of slices)")
+    if hud_stats:
+        print(f"HUD Pipeline: events={hud_stats['mouseMoveEvents']} frames={hud_stats['processedFrames']}")
+    print(f"Progress samples: {len(samples)}")
+
+    errors: list[str] = []
+    if result["state"] != "done":
+        errors.append(f"state={result['state']}")
+    if int(result["unitsApplied"]) != unit_count:
+        errors.append(f"unitsApplied={result['unitsApplied']}!={unit_count}")
+    if int(result["rejected"]) > 0:
+        errors.append(f"rejected={result['rejected']}")
+    if max_p99_frame_ms is not None:
+        if not frame_stats:
+            errors.append("Frame time API unavailable")
+        elif float(frame_stats["p99Ms"]) > max_p99_frame_ms:
+            errors.append(f"p99FrameMs>{max_p99_frame_ms}")
+    # 整体 p99 会被加载前段的快帧稀释；集合重建随已加载单位线性增长时，只有后段帧会超限。
+    if max_late_p99_frame_ms is not None and float(result["lateFrameP99Ms"]) > max_late_p99_frame_ms:
+        errors.append(f"lateFrameP99Ms>{max_late_p99_frame_ms}")
+    if max_slice_ms is not None and float(result["maxSliceMs"]) > max_slice_ms:
+        errors.append(f"maxSliceMs>{max_slice_ms}")
+    if min_units_per_second is not None and float(result["unitsPerSecond"]) < min_units_per_second:
+        errors.append(f"unitsPerSecond<{min_units_per_second}")
+    if hud_sweep and hud_stats and int(hud_stats["processedFrames"]) == 0:
+        errors.append("HUD did not process pointer events during load")
+
+    if errors:
+        print(f"SCENARIO STREAM GATE FAILED: {errors}")
+    else:
+        print("SCENARIO STREAM GATE PASSED")
+    return {
+        "rc": 1 if errors else 0,
+        "passed": not errors,
+        "errors": errors,
+        "result": result,
+        "frame_stats": frame_stats,
+        "hud_stats": hud_stats,
+        "progress_samples": samples,
+    }
+
+
+def scenario_stream_scenario_from_env() -> tuple[str, Any]:
+    unit_count = int(parse_float_env("SCENARIO_STREAM_UNITS", 100000.0))
+    data_format = os.getenv("SCENARIO_STREAM_FORMAT", "ndjson").strip() or "ndjson"
+    timeout_seconds = parse_float_env("SCENARIO_STREAM_TIMEOUT_SECONDS", 120.0)
+    hud_sweep = parse_bool_env("SCENARIO_STREAM_HUD_SWEEP", "true")
+    # 帧时 p99 门限默认 50ms（加载期间仍能维持约 20fps 以上的交互），加载后段单独再卡一次；切片与吞吐门限默认关闭。
+    max_p99_frame_ms = parse_float_env("SCENARIO_STREAM_MAX_P99_FRAME_MS", 50.0)
+    max_late_p99_frame_ms = parse_float_env("SCENARIO_STREAM_MAX_LATE_P99_FRAME_MS", 50.0)
+    max_slice_ms = parse_optional_float_env("SCENARIO_STREAM_MAX_SLICE_MS")
+    min_units_per_second = parse_optional_float_env("SCENARIO_STREAM_MIN_UNITS_PER_SECOND")
+    return "scenario_stream", lambda harness: run_scenario_stream_scenario(
+        harness,
+        unit_count,
+        data_format,
+        timeout_seconds,
+        hud_sweep,
+        max_p99_frame_ms,
+        max_late_p99_frame_ms,
+        max_slice_ms,
+        min_units_per_second,
+    )
+
+
+def run() -> int:
+    name, scenario = scenario_stream_scenario_from_env()
+    with WarmBrowserHarness() as harness:
+        result = harness.run_scenarios([(name, scenario)])[0]
+    return int(result["rc"])
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,55 @@
+import os
+import sys
+from typing import Any
+
+from harness import WarmBrowserHarness
+
+
+def run_sonar_benchmark_scenario(
+    harness: WarmBrowserHarness,
+    sample_count: int,
+    iterations: int,
+    min_speedup: float | None,
+) -> dict[str, Any]:
+    report = harness.page.evaluate(
+        "(opts) => window.runSonarBenchmark(opts)",
+        {"sampleCount": sample_count, "iterations": iterations},
+    )
+    per_object = report["perObjectMs"]
+    columnar = report["columnarMs"]
+    print("\n=== SONAR BATCH BENCHMARK ===")
+    print(f"Samples: {report['sampleCount']} Iterations: {report['iterations']}")
+    print(f"Per-object: mean={per_object['mean']:.3f}ms min={per_object['min']:.3f}ms")
+    print(f"Columnar:   mean={columnar['mean']:.3f}ms min={columnar['min']:.3f}ms")
+    print(f"Speedup: {report['speedup']:.2f}x ResultsMatch: {report['resultsMatch']}")
+
+    errors: list[str] = []
+    if not report["resultsMatch"]:
+        errors.append("columnar results differ from per-object results")
+    if min_speedup is not None and float(report["speedup"]) < min_speedup:
+        errors.append(f"speedup<{min_speedup}")
+    if errors:
+        print(f"SONAR BENCHMARK FAILED: {errors}")
+    return {"rc": 1 if errors else 0, "errors": errors, "report": report}
+
+
+def sonar_benchmark_scenario_from_env() -> tuple[str, Any]:
+    sample_count = int(os.getenv("SONAR_BENCH_SAMPLES", "50000"))
+    iterations = int(os.getenv("SONAR_BENCH_ITERATIONS", "20"))
+    raw_min_speedup = os.getenv("SONAR_BENCH_MIN_SPEEDUP", "").strip()
+    min_speedup = float(raw_min_speedup) if raw_min_speedup else None
+    return "sonar_benchmark", lambda harness: run_sonar_benchmark_scenario(
+        harness, sample_count, iterations, min_speedup
+    )
+
+
+def run() -> int:
+    name, scenario = sonar_benchmark_scenario_from_env()
+    # 纯计算基准，不依赖地形与材质预热。
+    with WarmBrowserHarness(warm_up=False) as harness:
+        result = harness.run_scenarios([(name, scenario)])[0]
+    return int(result["rc"])
+
+
+if __name__ == "__main__":
+    sys.exit(run())
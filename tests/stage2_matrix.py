@@ -1,109 +1,221 @@
+import itertools
 import json
 import os
-import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-
-
-ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-PYTHON = os.path.join(ROOT, ".venv", "bin", "python")
-
-
-def run_cmd(cmd: list[str], env: dict[str, str]) -> tuple[int, str]:
-    proc = subprocess.run(
-        cmd,
-        cwd=ROOT,
-        env=env,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
+from typing import Any
+
+from harness import ROOT, WarmBrowserHarness, ensure_screenshot_path
+from lod_perf_gate import parse_float_env, parse_optional_float_env, run_perf_gate_scenario
+from lod_switch_benchmark import run_benchmark_scenario
+
+
+RUNTIME_CONFIGS = {
+    "stable": os.path.join("public", "config.stable.js"),
+    "adaptive": os.path.join("public", "config.adaptive.js"),
+}
+
+# 默认覆盖组：基线 + 阈值/切档参数各扫一档，可用 STAGE2_OVERRIDES_FILE 指向 JSON 替换。
+DEFAULT_OVERRIDE_SETS: dict[str, dict[str, Any]] = {
+    "default": {},
+    "wide_hysteresis": {"modeSwitch": {"hysteresisRatio": 0.18, "cooldownMs": 900}},
+    "fast_switch": {"modeSwitch": {"debounceMs": 120, "cooldownMs": 300}},
+    "coarse_thresholds": {"mppThresholds": {"global": 12000, "continental": 3600, "regional": 900}},
+}
+
+
+def parse_list_env(name: str, default: str) -> list[str]:
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+def parse_viewport(raw: str) -> tuple[int, int]:
+    width, height = raw.lower().split("x", 1)
+    return int(width), int(height)
+
+
+def load_override_sets() -> dict[str, dict[str, Any]]:
+    path = os.getenv("STAGE2_OVERRIDES_FILE", "").strip()
+    if not path:
+        override_sets = DEFAULT_OVERRIDE_SETS
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            override_sets = json.load(f)
+    selected = parse_list_env("STAGE2_OVERRIDES", ",".join(override_sets))
+    unknown = [name for name in selected if name not in override_sets]
+    if unknown:
+        raise ValueError(f"Unknown override sets: {unknown}. Available: {sorted(override_sets)}")
+    return {name: override_sets[name] for name in selected}
+
+
+def build_cases() -> list[dict[str, Any]]:
+    configs = parse_list_env("STAGE2_CONFIGS", ",".join(RUNTIME_CONFIGS))
+    unknown = [name for name in configs if name not in RUNTIME_CONFIGS]
+    if unknown:
+        raise ValueError(f"Unknown runtime configs: {unknown}. Available: {sorted(RUNTIME_CONFIGS)}")
+    viewports = [parse_viewport(item) for item in parse_list_env("STAGE2_VIEWPORTS", "1440x900,1920x1080")]
+    override_sets = load_override_sets()
+
+    cases: list[dict[str, Any]] = []
+    for config_name, (override_name, overrides), (width, height) in itertools.product(
+        configs, override_sets.items(), viewports
+    ):
+        cases.append(
+            {
+                "case": f"{config_name}__{override_name}__{width}x{height}",
+                "config": config_name,
+                "overrides_name": override_name,
+                "overrides": overrides,
+                "viewport": [width, height],
+            }
+        )
+    return cases
+
+
+def run_case(case: dict[str, Any], gate: dict[str, float | None]) -> dict[str, Any]:
+    # 在独立进程中执行：每个 worker 持有自己的 Chromium，case 之间互不共享页面状态。
+    artifact_dir = os.path.join("tests", "artifacts", "stage2", case["case"])
+    harness = WarmBrowserHarness(
+        viewport=tuple(case["viewport"]),
+        runtime_config=RUNTIME_CONFIGS[case["config"]],
+        config_overrides=case["overrides"],
     )
-    return proc.returncode, proc.stdout
-
-
-def extract_line(text: str, prefix: str) -> str:
-    for line in text.splitlines():
-        if line.startswith(prefix):
-            return line
-    return ""
-
-
-def parse_perf_pass(output: str) -> bool:
-    return "PERF GATE PASSED" in output
-
-
-def main() -> int:
-    case_name = "adaptive_default"
-    perf_duration = os.getenv("STAGE2_PERF_DURATION_SECONDS", "45")
-    min_avg_fps = os.getenv("STAGE2_MIN_AVG_FPS", "15")
-    min_recent_fps = os.getenv("STAGE2_MIN_RECENT_FPS", "12")
-    max_avg_switch_ms = os.getenv("STAGE2_MAX_AVG_SWITCH_COST_MS", "30")
-    rows: list[dict[str, str | int | bool]] = []
-
-    case_env = os.environ.copy()
-
-    bench_rc, bench_out = run_cmd(
-        [PYTHON, os.path.join(ROOT, "tests", "lod_switch_benchmark.py")],
-        case_env,
-    )
-    perf_env = case_env.copy()
-    perf_env.update(
-        {
-            "PERF_DURATION_SECONDS": perf_duration,
-            "MIN_AVG_FPS": min_avg_fps,
-            "MIN_RECENT_FPS": min_recent_fps,
-            "MAX_AVG_SWITCH_COST_MS": max_avg_switch_ms,
-        }
-    )
-    perf_rc, perf_out = run_cmd(
-        [PYTHON, "-u", os.path.join(ROOT, "tests", "lod_perf_gate.py")],
-        perf_env,
+    row: dict[str, Any] = {**case}
+    try:
+        harness.start()
+        benchmark, perf = harness.run_scenarios(
+            [
+                (
+                    "benchmark",
+                    lambda h: run_benchmark_scenario(
+                        h,
+                        ensure_screenshot_path(os.path.join(artifact_dir, "benchmark.png"), ""),
+                        int(gate["min_switch_count"]),
+                        ["global", "continental", "regional", "tactical"],
+                    ),
+                ),
+                (
+                    "perf_gate",
+                    lambda h: run_perf_gate_scenario(
+                        h,
+                        ensure_screenshot_path(os.path.join(artifact_dir, "perf_gate.png"), ""),
+                        gate["min_avg_fps"],
+                        gate["min_recent_fps"],
+                        gate["max_avg_switch_ms"],
+                        int(gate["perf_duration"]),
+                        max_p95_frame_ms=gate["max_p95_frame_ms"],
+                        max_p99_frame_ms=gate["max_p99_frame_ms"],
+                        max_p95_time_to_loaded_ms=gate["max_p95_time_to_loaded_ms"],
+                        max_frame_ms=gate["max_frame_ms"],
+                        max_timed_out_episodes=gate["max_timed_out_episodes"],
+                    ),
+                ),
+            ]
+        )
+        row["benchmark"] = benchmark
+        row["perf"] = perf
+    except Exception as exc:
+        row["error"] = str(exc)
+    finally:
+        harness.close()
+    row["passed"] = (
+        "error" not in row
+        and row["benchmark"]["rc"] == 0
+        and row["perf"]["rc"] == 0
+        and bool(row["perf"].get("passed"))
     )
+    return row
 
-    rows.append(
-        {
-            "profile": case_name,
-            "benchmark_rc": bench_rc,
-            "benchmark_switch_count": extract_line(bench_out, "Switch Count:"),
-            "benchmark_switch_seq": extract_line(bench_out, "Switch Sequence:"),
-            "perf_rc": perf_rc,
-            "perf_passed": parse_perf_pass(perf_out),
-            "perf_mode": extract_line(perf_out, "Mode:"),
-            "perf_state": extract_line(perf_out, "LOD State:"),
-            "perf_summary": extract_line(perf_out, "Perf:"),
-        }
-    )
 
+def write_reports(rows: list[dict[str, Any]], stamp: str, workers: int) -> tuple[str, str]:
     report_dir = os.path.join(ROOT, "docs")
     os.makedirs(report_dir, exist_ok=True)
-    stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     report_md = os.path.join(report_dir, "stage2_matrix_report.md")
     report_json = os.path.join(report_dir, "stage2_matrix_report.json")
 
     with open(report_json, "w", encoding="utf-8") as f:
-        json.dump({"generated_at": stamp, "rows": rows}, f, ensure_ascii=False, indent=2)
+        json.dump({"generated_at": stamp, "workers": workers, "rows": rows}, f, ensure_ascii=False, indent=2, default=str)
 
     with open(report_md, "w", encoding="utf-8") as f:
-        f.write(f"# Stage2 Matrix Report\n\nGenerated at: {stamp}\n\n")
-        f.write("| Profile | Benchmark | Perf Gate |\n")
-        f.write("|---|---:|---:|\n")
+        f.write(f"# Stage2 Matrix Report\n\nGenerated at: {stamp}\n\nWorkers: {workers}\n\n")
+        f.write("| Case | Config | Overrides | Viewport | Switches | Avg FPS | p95 ms | p99 ms | Avg Switch ms | Benchmark | Perf Gate |\n")
+        f.write("|---|---|---|---|---:|---:|---:|---:|---:|---:|---:|\n")
         for row in rows:
-            bench_ok = "PASS" if row["benchmark_rc"] == 0 else "FAIL"
-            perf_ok = "PASS" if row["perf_rc"] == 0 and row["perf_passed"] else "FAIL"
-            f.write(f"| {row['profile']} | {bench_ok} | {perf_ok} |\n")
+            benchmark = row.get("benchmark") or {}
+            perf = row.get("perf") or {}
+            perf_stats = perf.get("perf") or {}
+            lod_stats = perf.get("lod_stats") or {}
+            frame_stats = perf.get("frame_stats") or {}
+            p95 = frame_stats.get("p95Ms")
+            p99 = frame_stats.get("p99Ms")
+            bench_ok = "PASS" if benchmark.get("rc") == 0 else "FAIL"
+            perf_ok = "PASS" if perf.get("rc") == 0 and perf.get("passed") else "FAIL"
+            avg_fps = perf_stats.get("averageFps")
+            avg_switch = lod_stats.get("averageSwitchDurationMs")
+            f.write(
+                f"| {row['case']} | {row['config']} | {row['overrides_name']} "
+                f"| {row['viewport'][0]}x{row['viewport'][1]} "
+                f"| {benchmark.get('switch_count', '-')} "
+                f"| {f'{avg_fps:.1f}' if avg_fps is not None else '-'} "
+                f"| {f'{p95:.1f}' if p95 is not None else '-'} "
+                f"| {f'{p99:.1f}' if p99 is not None else '-'} "
+                f"| {f'{avg_switch:.2f}' if avg_switch is not None else '-'} "
+                f"| {bench_ok} | {perf_ok} |\n"
+            )
         f.write("\n## Details\n\n")
         for row in rows:
-            f.write(f"### {row['profile']}\n")
-            f.write(f"- benchmark_rc: {row['benchmark_rc']}\n")
-            f.write(f"- {row['benchmark_switch_count']}\n")
-            f.write(f"- {row['benchmark_switch_seq']}\n")
-            f.write(f"- perf_rc: {row['perf_rc']}\n")
-            f.write(f"- perf_passed: {row['perf_passed']}\n")
-            f.write(f"- {row['perf_mode']}\n")
-            f.write(f"- {row['perf_state']}\n")
-            f.write(f"- {row['perf_summary']}\n\n")
-
-    failed = [r for r in rows if not (r["benchmark_rc"] == 0 and r["perf_rc"] == 0 and r["perf_passed"])]
+            benchmark = row.get("benchmark") or {}
+            perf = row.get("perf") or {}
+            f.write(f"### {row['case']}\n")
+            f.write(f"- overrides: `{json.dumps(row['overrides'], ensure_ascii=False)}`\n")
+            if "error" in row:
+                f.write(f"- error: {row['error']}\n\n")
+                continue
+            f.write(f"- benchmark_rc: {benchmark.get('rc')}\n")
+            f.write(f"- switch_sequence: {benchmark.get('switch_sequence')}\n")
+            f.write(f"- perf_rc: {perf.get('rc')}\n")
+            f.write(f"- perf_errors: {perf.get('errors')}\n")
+            f.write(f"- perf_mode: {perf.get('mode')}\n")
+            f.write(f"- perf_state: {perf.get('state')}\n")
+            f.write(f"- perf_summary: {perf.get('perf')}\n\n")
+    return report_md, report_json
+
+
+def main() -> int:
+    gate = {
+        "perf_duration": parse_float_env("STAGE2_PERF_DURATION_SECONDS", 45.0),
+        "min_avg_fps": parse_float_env("STAGE2_MIN_AVG_FPS", 15.0),
+        "min_recent_fps": parse_float_env("STAGE2_MIN_RECENT_FPS", 12.0),
+        "max_avg_switch_ms": parse_float_env("STAGE2_MAX_AVG_SWITCH_COST_MS", 30.0),
+        "min_switch_count": parse_float_env("STAGE2_MIN_SWITCH_COUNT", 3.0),
+        "max_p95_frame_ms": parse_optional_float_env("STAGE2_MAX_P95_FRAME_MS"),
+        "max_p99_frame_ms": parse_optional_float_env("STAGE2_MAX_P99_FRAME_MS"),
+        "max_frame_ms": parse_optional_float_env("STAGE2_MAX_FRAME_MS"),
+        "max_p95_time_to_loaded_ms": parse_optional_float_env("STAGE2_MAX_P95_TIME_TO_LOADED_MS"),
+        "max_timed_out_episodes": parse_optional_float_env("STAGE2_MAX_TIMED_OUT_EPISODES"),
+    }
+    cases = build_cases()
+    # 每个 worker 一个浏览器进程；默认按 CPU 核数并行，GPU/显存紧张时用 STAGE2_WORKERS 收紧。
+    workers = max(1, min(len(cases), int(os.getenv("STAGE2_WORKERS", str(os.cpu_count() or 1)))))
+    print(f"Stage2 matrix: cases={len(cases)}, workers={workers}")
+
+    rows: list[dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_case, case, gate): case for case in cases}
+        for future in as_completed(futures):
+            case = futures[future]
+            try:
+                row = future.result()
+            except Exception as exc:
+                row = {**case, "error": str(exc), "passed": False}
+            print(f"[{len(rows) + 1}/{len(cases)}] {row['case']}: {'PASS' if row['passed'] else 'FAIL'}")
+            rows.append(row)
+    rows.sort(key=lambda row: row["case"])
+
+    stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    report_md, report_json = write_reports(rows, stamp, workers)
+
+    failed = [row for row in rows if not row["passed"]]
     print(f"Matrix report written: {report_md}")
     print(f"Matrix data written: {report_json}")
     print(f"Cases: {len(rows)}, failed: {len(failed)}")
@@ -0,0 +1,336 @@
+import gzip
+import json
+import math
+import os
+import sqlite3
+import struct
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator
+
+import numpy as np
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INDEX_PATH = os.path.join(ROOT, ".cache", "terrain_relief.e3ri")
+
+# 索引文件布局（小端）：
+#   8 字节 magic "E3RELIEF" | uint32 头长度 N | N 字节 JSON 头 | 补齐到 64 字节边界后为数据区。
+#   每个层级一个 int16 数组 [rows, cols, 4]（min/max/mean/relief，米），offset 相对数据区起点。
+#   TMS 行序（y=0 在南），与 MBTiles/quantized-mesh 一致；缺失瓦片为 NODATA。
+MAGIC = b"E3RELIEF"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+NODATA = -32768
+CHANNELS = ("min", "max", "mean", "relief")
+QUANTIZED_MESH_HEADER_BYTES = 88
+QUANTIZED_MAX = 32767.0
+FETCH_BATCH = 4096
+
+
+def parse_int_env(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    return int(raw) if raw else default
+
+
+def align(value: int) -> int:
+    return (value + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def level_shape(zoom: int) -> tuple[int, int]:
+    # 地理坐标 TMS：第 0 级为东西两块瓦片。
+    return 1 << zoom, 1 << (zoom + 1)
+
+
+def decode_quantized_mesh(tile: bytes) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # 顶点数据：u/v/height 三组 uint16，zigzag + 差分编码；高度按瓦片头的最小/最大高度反量化。
+    if tile[:2] == b"\x1f\x8b":
+        tile = gzip.decompress(tile)
+    min_height, max_height = struct.unpack_from("<ff", tile, 24)
+    vertex_count = struct.unpack_from("<I", tile, QUANTIZED_MESH_HEADER_BYTES)[0]
+    encoded = np.frombuffer(
+        tile,
+        dtype="<u2",
+        count=vertex_count * 3,
+        offset=QUANTIZED_MESH_HEADER_BYTES + 4,
+    ).reshape(3, vertex_count).astype(np.int32)
+    decoded = np.cumsum((encoded >> 1) ^ -(encoded & 1), axis=1)
+    u, v, h = decoded
+    heights = min_height + (h / QUANTIZED_MAX) * (max_height - min_height)
+    return u, v, heights
+
+
+def rasterize_heightfield(u: np.ndarray, v: np.ndarray, heights: np.ndarray, size: int) -> np.ndarray:
+    # 顶点按 (u, v) 落入 size × size 栅格取均值，行 0 在南；无顶点的格为 NaN。
+    cols = np.minimum((u * size) // (int(QUANTIZED_MAX) + 1), size - 1)
+    rows = np.minimum((v * size) // (int(QUANTIZED_MAX) + 1), size - 1)
+    cells = rows * size + cols
+    sums = np.bincount(cells, weights=heights, minlength=size * size)
+    counts = np.bincount(cells, minlength=size * size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grid = sums / counts
+    grid[counts == 0] = np.nan
+    return grid.reshape(size, size)
+
+
+def tile_stats(args: tuple[int, int, int, bytes, int]) -> tuple[int, int, int, tuple[float, float, float, float] | None]:
+    z, x, y, tile, size = args
+    try:
+        u, v, heights = decode_quantized_mesh(tile)
+    except (struct.error, ValueError, OSError):
+        return z, x, y, None
+    if heights.size == 0:
+        return z, x, y, None
+    low = float(heights.min())
+    high = float(heights.max())
+    # 均值取栅格面积平均，避免顶点密集区（山脊）拉偏。
+    mean = float(np.nanmean(rasterize_heightfield(u, v, heights, size)))
+    return z, x, y, (low, high, mean, high - low)
+
+
+def iter_tiles(mbtiles_path: str, max_zoom: int, size: int) -> Iterator[list[tuple[int, int, int, bytes, int]]]:
+    connection = sqlite3.connect(f"file:{os.path.abspath(mbtiles_path)}?mode=ro", uri=True)
+    try:
+        cursor = connection.execute(
+            "SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles WHERE zoom_level <= ?",
+            (max_zoom,),
+        )
+        while True:
+            rows = cursor.fetchmany(FETCH_BATCH)
+            if not rows:
+                return
+            yield [(int(z), int(x), int(y), bytes(data), size) for z, x, y, data in rows]
+    finally:
+        connection.close()
+
+
+def fill_from_children(levels: list[np.ndarray]) -> None:
+    # 库中缺失而子级存在的瓦片由四个子瓦片聚合：min 取最小、max 取最大、mean 取均值。
+    for zoom in range(len(levels) - 2, -1, -1):
+        parent = levels[zoom]
+        rows, cols = parent.shape[:2]
+        children = levels[zoom + 1].reshape(rows, 2, cols, 2, 4)
+        missing = np.isnan(parent[..., 0])
+        if not missing.any():
+            continue
+        # 四个子瓦片全缺失时 nanmin/nanmean 给出 NaN 并告警，结果仍保持缺失。
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            aggregated = np.stack(
+                [
+                    np.nanmin(children[..., 0], axis=(1, 3)),
+                    np.nanmax(children[..., 1], axis=(1, 3)),
+                    np.nanmean(children[..., 2], axis=(1, 3)),
+                    np.zeros((rows, cols)),
+                ],
+                axis=-1,
+            )
+        aggregated[..., 3] = aggregated[..., 1] - aggregated[..., 0]
+        parent[missing] = aggregated[missing]
+
+
+def build_relief_index(mbtiles_path: str, index_path: str, max_zoom: int = 9, size: int = 32, workers: int = 0) -> dict[str, Any]:
+    started = time.perf_counter()
+    levels = [np.full(level_shape(zoom) + (4,), np.nan, dtype=np.float32) for zoom in range(max_zoom + 1)]
+    decoded = 0
+    failed = 0
+
+    def record(results: Iterator[tuple[int, int, int, tuple[float, float, float, float] | None]]) -> None:
+        nonlocal decoded, failed
+        for z, x, y, stats in results:
+            rows, cols = levels[z].shape[:2]
+            if stats is None or y >= rows or x >= cols:
+                failed += 1
+                continue
+            levels[z][y, x] = stats
+            decoded += 1
+            if decoded % 50000 == 0:
+                print(f"ReliefIndex: {decoded} tiles decoded ({time.perf_counter() - started:.1f}s)")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for batch in iter_tiles(mbtiles_path, max_zoom, size):
+                record(executor.map(tile_stats, batch, chunksize=64))
+    else:
+        for batch in iter_tiles(mbtiles_path, max_zoom, size):
+            record(map(tile_stats, batch))
+
+    fill_from_children(levels)
+    write_relief_index(index_path, levels, os.path.basename(mbtiles_path), size)
+    return {
+        "indexPath": index_path,
+        "bytes": os.path.getsize(index_path),
+        "tilesDecoded": decoded,
+        "tilesFailed": failed,
+        "maxZoom": max_zoom,
+        "elapsedSeconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def write_relief_index(index_path: str, levels: list[np.ndarray], source: str, size: int) -> None:
+    header: dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "scheme": "tms",
+        "projection": "EPSG:4326",
+        "channels": list(CHANNELS),
+        "dtype": "int16",
+        "nodata": NODATA,
+        "source": source,
+        "heightfieldSize": size,
+        "levels": [],
+    }
+    offset = 0
+    encoded_levels: list[np.ndarray] = []
+    for zoom, level in enumerate(levels):
+        rows, cols = level.shape[:2]
+        values = np.where(np.isnan(level), NODATA, np.clip(np.rint(level), NODATA + 1, 32767)).astype("<i2")
+        header["levels"].append({"zoom": zoom, "rows": rows, "cols": cols, "offset": offset})
+        encoded_levels.append(values)
+        offset = align(offset + values.nbytes)
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_offset = align(len(MAGIC) + 4 + len(header_bytes))
+    directory = os.path.dirname(index_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for entry, values in zip(header["levels"], encoded_levels):
+            f.write(b"\0" * (data_offset + entry["offset"] - f.tell()))
+            f.write(values.tobytes())
+    os.replace(temp_path, index_path)
+
+
+class ReliefIndex:
+    # 只读内存映射：打开只解析头部，查询只触及相关瓦片所在的页。
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"not a relief index: {path}")
+            header_length = struct.unpack("<I", f.read(4))[0]
+            self.header: dict[str, Any] = json.loads(f.read(header_length).decode("utf-8"))
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported relief index version: {self.header.get('version')}")
+        data_offset = align(len(MAGIC) + 4 + header_length)
+        self.levels: list[np.ndarray] = [
+            np.memmap(path, dtype="<i2", mode="r", offset=data_offset + entry["offset"], shape=(entry["rows"], entry["cols"], 4))
+            for entry in self.header["levels"]
+        ]
+
+    @property
+    def max_zoom(self) -> int:
+        return len(self.levels) - 1
+
+    def tile_of(self, lon: float, lat: float, zoom: int) -> tuple[int, int]:
+        rows, cols = self.levels[zoom].shape[:2]
+        tile_degrees = 180.0 / rows
+        x = min(cols - 1, max(0, int(math.floor((lon + 180.0) / tile_degrees))))
+        y = min(rows - 1, max(0, int(math.floor((lat + 90.0) / tile_degrees))))
+        return x, y
+
+    def tile_center(self, x: int, y: int, zoom: int) -> tuple[float, float]:
+        tile_degrees = 180.0 / self.levels[zoom].shape[0]
+        return -180.0 + (x + 0.5) * tile_degrees, -90.0 + (y + 0.5) * tile_degrees
+
+    def stats_at(self, lon: float, lat: float, zoom: int | None = None) -> dict[str, float] | None:
+        level_zoom = self.max_zoom if zoom is None else zoom
+        x, y = self.tile_of(lon, lat, level_zoom)
+        values = self.levels[level_zoom][y, x]
+        if int(values[0]) == NODATA:
+            return None
+        return {name: float(value) for name, value in zip(CHANNELS, values)}
+
+    def span_around(self, lon: float, lat: float, radius_degrees: float, zoom: int | None = None) -> dict[str, Any] | None:
+        # 覆盖 [lon ± r, lat ± r] 的瓦片窗口内的高程范围。
+        level_zoom = self.max_zoom if zoom is None else zoom
+        x0, y0 = self.tile_of(lon - radius_degrees, lat - radius_degrees, level_zoom)
+        x1, y1 = self.tile_of(lon + radius_degrees, lat + radius_degrees, level_zoom)
+        window = np.asarray(self.levels[level_zoom][y0:y1 + 1, x0:x1 + 1]).reshape(-1, 4)
+        window = window[window[:, 0] != NODATA]
+        if window.size == 0:
+            return None
+        low = float(window[:, 0].min())
+        high = float(window[:, 1].max())
+        return {
+            "min": low,
+            "max": high,
+            "mean": float(window[:, 2].mean()),
+            "span": high - low,
+            "tiles": int(window.shape[0]),
+            "zoom": level_zoom,
+        }
+
+    def top_relief_sites(
+        self,
+        bounds: tuple[float, float, float, float],
+        count: int = 5,
+        zoom: int | None = None,
+        min_separation_tiles: int = 2,
+    ) -> list[dict[str, float]]:
+        # bounds 为 [west, south, east, north]（度）；按瓦片起伏降序，相邻入选瓦片至少间隔 min_separation_tiles。
+        level_zoom = self.max_zoom if zoom is None else zoom
+        west, south, east, north = bounds
+        x0, y0 = self.tile_of(west, south, level_zoom)
+        x1, y1 = self.tile_of(east, north, level_zoom)
+        window = np.asarray(self.levels[level_zoom][y0:y1 + 1, x0:x1 + 1])
+        relief = np.where(window[..., 0] == NODATA, -1, window[..., 3]).astype(np.int32)
+        sites: list[dict[str, float]] = []
+        for flat in np.argsort(relief, axis=None)[::-1]:
+            if len(sites) >= count:
+                break
+            row, col = divmod(int(flat), relief.shape[1])
+            if relief[row, col] < 0:
+                break
+            x, y = x0 + col, y0 + row
+            if any(max(abs(x - s["x"]), abs(y - s["y"])) < min_separation_tiles for s in sites):
+                continue
+            lon, lat = self.tile_center(x, y, level_zoom)
+            values = window[row, col]
+            sites.append({
+                "lon": lon,
+                "lat": lat,
+                "x": x,
+                "y": y,
+                "min": float(values[0]),
+                "max": float(values[1]),
+                "mean": float(values[2]),
+                "relief": float(values[3]),
+            })
+        return sites
+
+
+def open_relief_index(path: str = "") -> ReliefIndex | None:
+    # 未构建索引时返回 None，由调用方回退到浏览器内采样。
+    resolved = path or os.getenv("E3_RELIEF_INDEX", "").strip() or DEFAULT_INDEX_PATH
+    if not os.path.isfile(resolved):
+        return None
+    return ReliefIndex(resolved)
+
+
+def run() -> int:
+    mbtiles_path = os.getenv("E3_TERRAIN_DATA", "").strip()
+    index_path = os.getenv("E3_RELIEF_INDEX", "").strip() or DEFAULT_INDEX_PATH
+    max_zoom = parse_int_env("RELIEF_MAX_ZOOM", 9)
+    size = parse_int_env("RELIEF_HEIGHTFIELD_SIZE", 32)
+    workers = parse_int_env("RELIEF_WORKERS", os.cpu_count() or 1)
+    if not mbtiles_path or not os.path.isfile(mbtiles_path):
+        print(f"[ERROR] E3_TERRAIN_DATA MBTiles not found: {mbtiles_path or '(unset)'}")
+        return 2
+    report = build_relief_index(mbtiles_path, index_path, max_zoom, size, workers)
+    print("=== RELIEF INDEX REPORT ===")
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    index = ReliefIndex(index_path)
+    for level in range(index.max_zoom + 1):
+        values = np.asarray(index.levels[level])
+        valid = int((values[..., 0] != NODATA).sum())
+        print(f"zoom={level} tiles={valid}/{values.shape[0] * values.shape[1]}")
+    return 0 if report["tilesDecoded"] > 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
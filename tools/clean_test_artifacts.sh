@@ -7,8 +7,8 @@ ARTIFACT_DIR="${PROJECT_ROOT}/tests/artifacts"
 
 mkdir -p "$ARTIFACT_DIR"
 
-before_count="$(find "$ARTIFACT_DIR" -type f \( -name "*.png" -o -name "*.jpg" -o -name "*.jpeg" \) | wc -l | tr -d ' ')"
-find "$ARTIFACT_DIR" -type f \( -name "*.png" -o -name "*.jpg" -o -name "*.jpeg" \) -delete
+before_count="$(find "$ARTIFACT_DIR" -type f \( -name "*.png" -o -name "*.jpg" -o -name "*.jpeg" -o -name "*.meta.json" \) | wc -l | tr -d ' ')"
+find "$ARTIFACT_DIR" -type f \( -name "*.png" -o -name "*.jpg" -o -name "*.jpeg" -o -name "*.meta.json" \) -delete
 
 removed_legacy=0
 
@@ -11,8 +11,29 @@ SERVER_BIN="${E3_SERVER_BIN:-${GIS_PROJECT_PATH}/build-macos-release/bin/e3_tile
 # 默认指向最新的 octvertexnormals 数据，可通过 E3_TERRAIN_DATA 覆盖
 MBTILES_FILE="${E3_TERRAIN_DATA:-/Users/wangshanping/terrain/webgis/e3_terrain_zoom9_octvertexnormals.mbtiles}"
 PORT="${E3_SERVER_PORT:-4444}"
-LOG_FILE="${GIS_PROJECT_PATH}/e3_tiles_server.log"
-PID_FILE="${GIS_PROJECT_PATH}/server.pid"
+# 地形服务实现：auto（默认，二进制不存在时回退到 Python 替身）| native | python
+SERVER_IMPL="${E3_SERVER_IMPL:-auto}"
+PYTHON_BIN="${E3_PYTHON_BIN:-python3}"
+PY_SERVER="${SCRIPT_DIR}/terrain_server.py"
+if [ "$SERVER_IMPL" = "auto" ]; then
+    if [ -f "$SERVER_BIN" ]; then
+        SERVER_IMPL="native"
+    else
+        SERVER_IMPL="python"
+    fi
+fi
+if [ "$SERVER_IMPL" = "python" ]; then
+    # Python 替身不依赖 e3-gis 目录，日志与 PID 放在本项目下。
+    SERVER_MATCH="$PY_SERVER"
+    SERVER_CMD=("$PYTHON_BIN" "$PY_SERVER")
+    LOG_FILE="/tmp/e3-tcs-terrain-server.log"
+    PID_FILE="${PROJECT_ROOT}/.terrain_server.pid"
+else
+    SERVER_MATCH="$SERVER_BIN"
+    SERVER_CMD=("$SERVER_BIN")
+    LOG_FILE="${GIS_PROJECT_PATH}/e3_tiles_server.log"
+    PID_FILE="${GIS_PROJECT_PATH}/server.pid"
+fi
 FRONTEND_PID_FILE="${PROJECT_ROOT}/.vite.pid"
 FRONTEND_LOG_FILE="/tmp/e3-tcs-vite.log"
 VITE_BIN="${PROJECT_ROOT}/node_modules/.bin/vite"
@@ -120,27 +141,27 @@ stop_by_pid_file() {
 echo -e "${YELLOW}[INFO] Managing Backend Server...${NC}"
 
 # Kill existing by PID file first
-stop_by_pid_file "$PID_FILE" "$SERVER_BIN" "backend server"
+stop_by_pid_file "$PID_FILE" "$SERVER_MATCH" "backend server"
 
 # Fallback: kill orphan process only when command line strictly matches this project binary and port
-ORPHAN_PIDS=$(pgrep -f "$SERVER_BIN" || true)
+ORPHAN_PIDS=$(pgrep -f "$SERVER_MATCH" || true)
 if [ -n "$ORPHAN_PIDS" ]; then
     for pid in $ORPHAN_PIDS; do
-        if process_matches "$pid" "$SERVER_BIN" && process_matches "$pid" "-p $PORT"; then
+        if process_matches "$pid" "$SERVER_MATCH" && process_matches "$pid" "-p $PORT"; then
             terminate_pid "$pid" "backend orphan"
         fi
     done
 fi
 
 # Check if binary exists
-if [ ! -f "$SERVER_BIN" ]; then
+if [ "$SERVER_IMPL" = "native" ] && [ ! -f "$SERVER_BIN" ]; then
     echo -e "${RED}[ERROR] Server binary not found at: $SERVER_BIN${NC}"
     echo "Please verify build."
     exit 1
 fi
 
-echo -e "${YELLOW}[INFO] Starting e3_tile_server...${NC}"
-echo "Binary: $SERVER_BIN"
+echo -e "${YELLOW}[INFO] Starting terrain server (${SERVER_IMPL})...${NC}"
+echo "Command: ${SERVER_CMD[*]}"
 echo "Data:   $MBTILES_FILE"
 
 # Start new server and save PID
@@ -149,7 +170,8 @@ echo "Data:   $MBTILES_FILE"
 # Let's run it in foreground mode '&' effectively to capture the correct PID.
 # We remove --background flag to keep it simple and controllable here.
 
-"$SERVER_BIN" -f "$MBTILES_FILE" -p "$PORT" --log "$LOG_FILE" > /dev/null 2>&1 &
+# Python 替身另外读取 TERRAIN_LATENCY_MS / TERRAIN_JITTER_MS / TERRAIN_BANDWIDTH_KBPS / TERRAIN_CACHE_MB 注入内网条件。
+"${SERVER_CMD[@]}" -f "$MBTILES_FILE" -p "$PORT" --log "$LOG_FILE" > /dev/null 2>&1 &
 NEW_PID=$!
 echo "$NEW_PID" > "$PID_FILE"
 
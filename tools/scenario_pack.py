@@ -0,0 +1,177 @@
+import argparse
+import json
+import math
+import random
+import struct
+import sys
+from typing import Any, Iterator, TextIO
+
+# 想定单位文件工具：NDJSON 与 E3SU 二进制互转，或生成合成想定用于加载压测。
+# 格式定义与 src/core/ScenarioStreamProtocol.ts 保持一致：
+#   头 16 字节："E3SU" | uint16 版本 | uint16 保留 | uint32 单位数 | uint32 保留
+#   记录：float64 经度 | float64 纬度 | float32 高度 | uint32 RGBA | uint8 像素大小 | uint8 标志（bit0 贴地）
+#         | uint16 id 字节数 | uint16 标签字节数 | UTF-8 id | UTF-8 标签
+
+MAGIC = b"E3SU"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+RECORD = struct.Struct("<ddfIBBHH")
+FLAG_CLAMP_TO_GROUND = 1
+DEFAULT_COLOR = 0xFFFFFFFF
+DEFAULT_PIXEL_SIZE = 10
+# Red Flag 演示区域 [west, south, east, north]，与 TacticalOverlayManager 的参考网格一致。
+DEFAULT_BOUNDS = (-118.95, 36.15, -117.55, 36.92)
+SYNTHETIC_COLORS = ("#4be6ff", "#52f5d2", "#ff57b0", "#ffcf66", "#ff5f5f", "#8affc9")
+
+
+def parse_hex_color(value: Any) -> int:
+    if not isinstance(value, str) or not value.startswith("#"):
+        return DEFAULT_COLOR
+    digits = value[1:]
+    if len(digits) in (3, 4):
+        digits = "".join(c * 2 for c in digits)
+    if len(digits) == 6:
+        digits += "ff"
+    try:
+        return int(digits, 16) if len(digits) == 8 else DEFAULT_COLOR
+    except ValueError:
+        return DEFAULT_COLOR
+
+
+def format_hex_color(rgba: int) -> str:
+    return f"#{rgba:08x}" if rgba & 0xFF != 0xFF else f"#{rgba >> 8:06x}"
+
+
+def read_ndjson(stream: TextIO) -> Iterator[dict[str, Any]]:
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if record.get("type") == "header":
+            continue
+        yield record
+
+
+def read_binary(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, "rb") as f:
+        magic, version, _reserved, _count, _reserved2 = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not an E3SU v{VERSION} file")
+        while True:
+            fixed = f.read(RECORD.size)
+            if len(fixed) < RECORD.size:
+                break
+            lon, lat, height, rgba, size, flags, id_bytes, label_bytes = RECORD.unpack(fixed)
+            unit_id = f.read(id_bytes).decode("utf-8")
+            label = f.read(label_bytes).decode("utf-8")
+            record: dict[str, Any] = {
+                "id": unit_id,
+                "lon": lon,
+                "lat": lat,
+                "height": height,
+                "color": format_hex_color(rgba),
+                "size": size,
+            }
+            if label:
+                record["label"] = label
+            if flags & FLAG_CLAMP_TO_GROUND:
+                record["ground"] = True
+            yield record
+
+
+def encode_record(record: dict[str, Any]) -> bytes:
+    unit_id = str(record["id"]).encode("utf-8")
+    label = str(record.get("label") or "").encode("utf-8")
+    size = int(record.get("size", DEFAULT_PIXEL_SIZE))
+    fixed = RECORD.pack(
+        float(record["lon"]),
+        float(record["lat"]),
+        float(record.get("height", 0.0)),
+        parse_hex_color(record.get("color")),
+        min(255, max(1, size)),
+        FLAG_CLAMP_TO_GROUND if record.get("ground") is True else 0,
+        len(unit_id),
+        len(label),
+    )
+    return fixed + unit_id + label
+
+
+def write_binary(path: str, records: list[dict[str, Any]]) -> int:
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(records), 0))
+        for record in records:
+            f.write(encode_record(record))
+        return f.tell()
+
+
+def write_ndjson(path: str, records: list[dict[str, Any]]) -> int:
+    with open(path, "w", encoding="utf-8") as f:
+        # header 行声明总数，前端据此报告加载进度。
+        f.write(json.dumps({"type": "header", "units": len(records)}) + "\n")
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        return f.tell()
+
+
+def synthesize(count: int, bounds: tuple[float, float, float, float], seed: int) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    west, south, east, north = bounds
+    records: list[dict[str, Any]] = []
+    for i in range(count):
+        # 约一成为空中单位，其余贴地；每 50 个单位带一个标签，接近真实想定的标注密度。
+        airborne = i % 10 == 0
+        record: dict[str, Any] = {
+            "id": f"U{i:06d}",
+            "lon": round(rng.uniform(west, east), 6),
+            "lat": round(rng.uniform(south, north), 6),
+            "height": round(rng.uniform(4000.0, 9000.0), 1) if airborne else 0.0,
+            "color": SYNTHETIC_COLORS[i % len(SYNTHETIC_COLORS)],
+            "size": 12 if airborne else 8,
+        }
+        if not airborne:
+            record["ground"] = True
+        if i % 50 == 0:
+            record["label"] = f"U{i:06d}"
+        records.append(record)
+    return records
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert or synthesize E3 scenario unit files (NDJSON / E3SU).")
+    parser.add_argument("output", help="output path; .e3su writes binary, anything else writes NDJSON")
+    parser.add_argument("-i", "--input", default="", help="input NDJSON or .e3su file")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate N random units instead of reading input")
+    parser.add_argument("--bounds", default=",".join(str(v) for v in DEFAULT_BOUNDS), help="west,south,east,north")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def run() -> int:
+    args = parse_args()
+    if args.synthetic > 0:
+        values = [float(v) for v in args.bounds.split(",")]
+        if len(values) != 4 or not all(math.isfinite(v) for v in values):
+            print(f"Invalid bounds: {args.bounds}")
+            return 2
+        records = synthesize(args.synthetic, (values[0], values[1], values[2], values[3]), args.seed)
+    elif args.input:
+        if args.input.endswith(".e3su"):
+            records = list(read_binary(args.input))
+        else:
+            with open(args.input, encoding="utf-8") as f:
+                records = list(read_ndjson(f))
+    else:
+        print("Either --input or --synthetic is required.")
+        return 2
+
+    if args.output.endswith(".e3su"):
+        size = write_binary(args.output, records)
+    else:
+        size = write_ndjson(args.output, records)
+    print(f"Wrote {len(records)} units to {args.output} ({size / 1024.0:.1f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,478 @@
+import argparse
+import json
+import os
+import queue
+import random
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+# e3_tile_server 的 Python 替身：直接从 MBTiles 读取 quantized-mesh 瓦片并提供 layer.json，
+# 路径与 C++ 版本一致（/terrain/layer.json、/terrain/{z}/{x}/{y}.terrain），可在任意 Linux CI 上运行。
+# MBTiles 与 quantized-mesh 都使用 TMS 行序，tile_row 即请求中的 y，无需翻转。
+
+TILE_PATH = re.compile(r"^/terrain/(\d+)/(\d+)/(\d+)\.terrain$")
+LAYER_PATHS = ("/terrain/layer.json", "/terrain/layer.json/")
+# tests/terrain_relief.py 生成的离线起伏索引，供前端诊断查表（AppConfig.terrain.reliefIndexUrl）。
+RELIEF_INDEX_PATH = "/terrain/relief.e3ri"
+WRITE_CHUNK_BYTES = 16 * 1024
+# 缺失瓦片在缓存中的名义占用：键与 OrderedDict 节点本身的开销，使负缓存同样受字节预算约束。
+NEGATIVE_ENTRY_BYTES = 64
+
+
+def parse_float_env(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    return float(raw) if raw else default
+
+
+def parse_int_env(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    return int(raw) if raw else default
+
+
+class ConnectionPool:
+    # 只读连接池：每个请求线程借用一个连接，避免在线程间共享同一 sqlite3 连接。
+    def __init__(self, path: str, size: int) -> None:
+        self._connections: queue.Queue[sqlite3.Connection] = queue.Queue()
+        uri = f"file:{os.path.abspath(path)}?mode=ro"
+        for _ in range(max(1, size)):
+            connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            connection.execute("PRAGMA query_only = ON")
+            self._connections.put(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connections.get()
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    def close(self) -> None:
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+class TileCache:
+    # 热点瓦片 LRU，按字节预算淘汰；缺失瓦片也缓存（值为 None，按 NEGATIVE_ENTRY_BYTES 计占用），避免重复查库。
+    # max_bytes 为 0 时完全不缓存。
+    def __init__(self, max_bytes: int) -> None:
+        self._entries: OrderedDict[tuple[int, int, int], bytes | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_bytes = max(0, max_bytes)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_size(data: bytes | None) -> int:
+        return len(data) if data is not None else NEGATIVE_ENTRY_BYTES
+
+    def get(self, key: tuple[int, int, int]) -> tuple[bool, bytes | None]:
+        if self._max_bytes == 0:
+            return False, None
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._entries[key]
+
+    def put(self, key: tuple[int, int, int], data: bytes | None) -> None:
+        size = self._entry_size(data)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entry_size(self._entries.pop(key))
+            self._entries[key] = data
+            self._bytes += size
+            while self._bytes > self._max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(evicted)
+                self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self._max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+class LinkThrottle:
+    # 模拟共享内网链路：所有连接按到达顺序预约发送时间片，总吞吐不超过 bandwidth_kbps。
+    def __init__(self, bandwidth_kbps: float) -> None:
+        self._bytes_per_second = bandwidth_kbps * 1000.0 / 8.0
+        self._lock = threading.Lock()
+        self._next_free = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._bytes_per_second > 0
+
+    def wait_for(self, size: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            start = max(time.monotonic(), self._next_free)
+            self._next_free = start + size / self._bytes_per_second
+            finish = self._next_free
+        delay = finish - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TerrainStore:
+    def __init__(
+        self,
+        path: str,
+        pool_size: int,
+        cache_bytes: int,
+        extensions: list[str],
+        relief_index_path: str = "",
+    ) -> None:
+        self.path = path
+        self.relief_index_path = relief_index_path
+        self.pool = ConnectionPool(path, pool_size)
+        self.cache = TileCache(cache_bytes)
+        self.metadata = self._read_metadata()
+        self.extensions = extensions or [
+            item.strip() for item in self.metadata.get("extensions", "").split(",") if item.strip()
+        ]
+        self.layer_json = self._build_layer_json()
+
+    def get_tile(self, z: int, x: int, y: int) -> bytes | None:
+        key = (z, x, y)
+        cached, data = self.cache.get(key)
+        if cached:
+            return data
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                "SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                key,
+            ).fetchone()
+        data = bytes(row[0]) if row else None
+        self.cache.put(key, data)
+        return data
+
+    def _read_metadata(self) -> dict[str, str]:
+        with self.pool.connection() as connection:
+            try:
+                rows = connection.execute("SELECT name, value FROM metadata").fetchall()
+            except sqlite3.OperationalError:
+                return {}
+        return {str(name): str(value) for name, value in rows}
+
+    def _build_layer_json(self) -> bytes:
+        # 优先使用库内保存的 layer.json；没有时按 tiles 表逐级统计可用范围生成。
+        for key in ("layer.json", "json"):
+            raw = self.metadata.get(key)
+            if not raw:
+                continue
+            try:
+                layer = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(layer, dict) and "tiles" in layer and "available" in layer:
+                return json.dumps(layer).encode("utf-8")
+
+        available = self._scan_available()
+        layer: dict[str, Any] = {
+            "tilejson": "2.1.0",
+            "name": self.metadata.get("name", os.path.basename(self.path)),
+            "version": self.metadata.get("version", "1.0.0"),
+            "format": "quantized-mesh-1.0",
+            "scheme": "tms",
+            "tiles": ["{z}/{x}/{y}.terrain?v={version}"],
+            "projection": "EPSG:4326",
+            "bounds": [-180, -90, 180, 90],
+            "minzoom": 0,
+            "maxzoom": max(len(available) - 1, 0),
+            "available": available,
+        }
+        if self.extensions:
+            layer["extensions"] = self.extensions
+        return json.dumps(layer).encode("utf-8")
+
+    def _scan_available(self) -> list[list[dict[str, int]]]:
+        # 每行把连续列合并为区间，再把相邻行中相同的列区间合并为矩形。
+        with self.pool.connection() as connection:
+            max_zoom = connection.execute("SELECT MAX(zoom_level) FROM tiles").fetchone()[0]
+            if max_zoom is None:
+                return []
+            available: list[list[dict[str, int]]] = []
+            for zoom in range(int(max_zoom) + 1):
+                rows = connection.execute(
+                    "SELECT tile_row, tile_column FROM tiles WHERE zoom_level = ? ORDER BY tile_row, tile_column",
+                    (zoom,),
+                )
+                row_runs: dict[int, list[tuple[int, int]]] = {}
+                for tile_row, tile_column in rows:
+                    runs = row_runs.setdefault(tile_row, [])
+                    if runs and runs[-1][1] + 1 == tile_column:
+                        runs[-1] = (runs[-1][0], tile_column)
+                    else:
+                        runs.append((tile_column, tile_column))
+                open_ranges: dict[tuple[int, int], dict[str, int]] = {}
+                ranges: list[dict[str, int]] = []
+                for tile_row in sorted(row_runs):
+                    next_open: dict[tuple[int, int], dict[str, int]] = {}
+                    for run in row_runs[tile_row]:
+                        current = open_ranges.get(run)
+                        if current and current["endY"] + 1 == tile_row:
+                            current["endY"] = tile_row
+                        else:
+                            current = {"startX": run[0], "startY": tile_row, "endX": run[1], "endY": tile_row}
+                            ranges.append(current)
+                        next_open[run] = current
+                    open_ranges = next_open
+                available.append(ranges)
+        return available
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class ServerStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.tiles_served = 0
+            self.tiles_missing = 0
+            self.bytes_sent = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def begin(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def end(self, size: int, found: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if found:
+                self.tiles_served += 1
+                self.bytes_sent += size
+            else:
+                self.tiles_missing += 1
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "tilesServed": self.tiles_served,
+                "tilesMissing": self.tiles_missing,
+                "bytesSent": self.bytes_sent,
+                "inFlight": self.in_flight,
+                "maxInFlight": self.max_in_flight,
+            }
+
+
+class TerrainServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        store: TerrainStore,
+        latency_ms: float,
+        jitter_ms: float,
+        throttle: LinkThrottle,
+        quiet: bool,
+    ) -> None:
+        super().__init__(address, TerrainRequestHandler)
+        self.store = store
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle = throttle
+        self.quiet = quiet
+        self.stats = ServerStats()
+
+    def tile_delay_seconds(self) -> float:
+        jitter = random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000.0
+
+
+class TerrainRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: TerrainServer
+
+    def do_OPTIONS(self) -> None:
+        self.send_response(204)
+        self._send_cors_headers()
+        self.send_header("Access-Control-Allow-Methods", "GET, HEAD, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "*")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self) -> None:
+        self._handle(send_body=False)
+
+    def do_GET(self) -> None:
+        self._handle(send_body=True)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _handle(self, send_body: bool) -> None:
+        path = urlsplit(self.path).path
+        if path in LAYER_PATHS:
+            self._send_bytes(200, self.server.store.layer_json, "application/json", send_body)
+            return
+        if path == RELIEF_INDEX_PATH:
+            relief_path = self.server.store.relief_index_path
+            if not relief_path or not os.path.isfile(relief_path):
+                self._send_bytes(404, b"relief index not configured", "text/plain", send_body)
+                return
+            with open(relief_path, "rb") as f:
+                self._send_bytes(200, f.read(), "application/octet-stream", send_body)
+            return
+        if path == "/stats":
+            payload = {"server": self.server.stats.snapshot(), "cache": self.server.store.cache.stats()}
+            self._send_bytes(200, json.dumps(payload).encode("utf-8"), "application/json", send_body)
+            return
+        if path == "/stats/reset":
+            self.server.stats.reset()
+            self.server.store.cache.reset_stats()
+            self._send_bytes(200, b"{}", "application/json", send_body)
+            return
+        match = TILE_PATH.match(path)
+        if not match:
+            self._send_bytes(404, b"not found", "text/plain", send_body)
+            return
+        self._send_tile(int(match.group(1)), int(match.group(2)), int(match.group(3)), send_body)
+
+    def _send_tile(self, z: int, x: int, y: int, send_body: bool) -> None:
+        server = self.server
+        server.stats.begin()
+        data: bytes | None = None
+        try:
+            data = server.store.get_tile(z, x, y)
+            # 注入的单瓦片延迟在查库之后、首字节之前，模拟服务端与网络往返时间。
+            delay = server.tile_delay_seconds()
+            if delay > 0:
+                time.sleep(delay)
+            if data is None:
+                self._send_bytes(404, b"tile not found", "text/plain", send_body)
+                return
+            content_type = "application/vnd.quantized-mesh"
+            if server.store.extensions:
+                content_type += ";extensions=" + "-".join(server.store.extensions)
+            gzipped = data[:2] == b"\x1f\x8b"
+            self._send_bytes(200, data, content_type, send_body, gzipped=gzipped, throttled=True)
+        except (BrokenPipeError, ConnectionResetError):
+            # 相机移动时 Cesium 会取消过期请求，连接提前关闭属正常情况。
+            pass
+        finally:
+            server.stats.end(len(data) if data else 0, data is not None)
+
+    def _send_bytes(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str,
+        send_body: bool,
+        gzipped: bool = False,
+        throttled: bool = False,
+    ) -> None:
+        self.send_response(status)
+        self._send_cors_headers()
+        self.send_header("Content-Type", content_type)
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if not send_body:
+            return
+        if not throttled or not self.server.throttle.enabled:
+            self.wfile.write(body)
+            return
+        for offset in range(0, len(body), WRITE_CHUNK_BYTES):
+            chunk = body[offset:offset + WRITE_CHUNK_BYTES]
+            self.server.throttle.wait_for(len(chunk))
+            self.wfile.write(chunk)
+
+    def _send_cors_headers(self) -> None:
+        self.send_header("Access-Control-Allow-Origin", "*")
+        # 允许页面跨源读取 Resource Timing 的传输字节与分段耗时（瓦片管线遥测）。
+        self.send_header("Timing-Allow-Origin", "*")
+
+
+def parse_args() -> argparse.Namespace:
+    # 参数名与 e3_tile_server 保持一致（-f/-p/--log），可直接替换 restart_server.sh 中的二进制。
+    parser = argparse.ArgumentParser(description="Serve quantized-mesh terrain tiles from an MBTiles file.")
+    parser.add_argument("-f", "--file", default=os.getenv("E3_TERRAIN_DATA", ""))
+    parser.add_argument("-p", "--port", type=int, default=parse_int_env("E3_SERVER_PORT", 4444))
+    parser.add_argument("--host", default=os.getenv("TERRAIN_SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--log", default="")
+    parser.add_argument("--pool-size", type=int, default=parse_int_env("TERRAIN_POOL_SIZE", 8))
+    parser.add_argument("--cache-mb", type=float, default=parse_float_env("TERRAIN_CACHE_MB", 256.0))
+    parser.add_argument("--latency-ms", type=float, default=parse_float_env("TERRAIN_LATENCY_MS", 0.0))
+    parser.add_argument("--jitter-ms", type=float, default=parse_float_env("TERRAIN_JITTER_MS", 0.0))
+    parser.add_argument("--bandwidth-kbps", type=float, default=parse_float_env("TERRAIN_BANDWIDTH_KBPS", 0.0))
+    parser.add_argument("--relief-index", default=os.getenv("E3_RELIEF_INDEX", ""))
+    parser.add_argument("--extensions", default=os.getenv("TERRAIN_EXTENSIONS", ""))
+    parser.add_argument("--quiet", action="store_true", default=os.getenv("TERRAIN_SERVER_QUIET", "") == "1")
+    return parser.parse_args()
+
+
+def run() -> int:
+    args = parse_args()
+    if args.log:
+        log_file = open(args.log, "a", buffering=1, encoding="utf-8")
+        sys.stdout = log_file
+        sys.stderr = log_file
+    if not args.file or not os.path.isfile(args.file):
+        print(f"[ERROR] MBTiles file not found: {args.file or '(unset)'}", file=sys.stderr)
+        return 2
+
+    extensions = [item.strip() for item in args.extensions.split(",") if item.strip()]
+    started = time.perf_counter()
+    store = TerrainStore(args.file, args.pool_size, int(args.cache_mb * 1024 * 1024), extensions, args.relief_index)
+    throttle = LinkThrottle(args.bandwidth_kbps)
+    server = TerrainServer((args.host, args.port), store, args.latency_ms, args.jitter_ms, throttle, args.quiet)
+    zooms = json.loads(store.layer_json).get("available", [])
+    print(f"TerrainServer: {args.file} ({len(zooms)} zoom levels, layer.json in {time.perf_counter() - started:.2f}s)")
+    print(
+        f"TerrainServer: listening on http://{args.host}:{args.port}/terrain/ "
+        f"(latency={args.latency_ms}ms jitter={args.jitter_ms}ms bandwidth={args.bandwidth_kbps or 'unlimited'}kbps "
+        f"cache={args.cache_mb}MB pool={args.pool_size})"
+    )
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())